@@ -3,11 +3,26 @@
 # @TASK P3-T3.3 - Anthropic Provider
 # @TASK P3-T3.4 - Google Gemini Provider
 # @SPEC docs/plans/2026-01-29-labnote-ai-design.md#AI-Router
-"""AI Provider implementations."""
+"""AI Provider implementations.
 
-from app.ai_router.providers.anthropic import AnthropicProvider
-from app.ai_router.providers.google import GoogleProvider
-from app.ai_router.providers.openai import OpenAIProvider
-from app.ai_router.providers.zhipuai import ZhipuAIProvider
+Provider classes are imported on first attribute access so that importing
+``app.ai_router.providers.base`` does not load every vendor SDK.
+"""
+
+import importlib
+
+_PROVIDER_MODULES = {
+    "AnthropicProvider": "app.ai_router.providers.anthropic",
+    "GoogleProvider": "app.ai_router.providers.google",
+    "OpenAIProvider": "app.ai_router.providers.openai",
+    "ZhipuAIProvider": "app.ai_router.providers.zhipuai",
+}
 
 __all__ = ["AnthropicProvider", "GoogleProvider", "OpenAIProvider", "ZhipuAIProvider"]
+
+
+def __getattr__(name: str):
+    module_path = _PROVIDER_MODULES.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_path), name)
@@ -20,19 +20,21 @@ Usage:
 
 from __future__ import annotations
 
-import json
 import logging
 import os
+import time
 from collections.abc import AsyncIterator
 from typing import Any
 
 from app.ai_router.providers.base import AIProvider
+from app.services.instrumentation import AI_FAILURES, AI_FIRST_TOKEN_SECONDS, AI_REQUEST_SECONDS
 from app.ai_router.schemas import (
     AIRequest,
     AIResponse,
     ModelInfo,
     ProviderError,
 )
+from app.ai_router.streaming import DONE, StreamEvent, to_sse
 
 logger = logging.getLogger(__name__)
 
@@ -162,6 +164,10 @@ class AIRouter:
             return True
         return False
 
+    def _provider_name(self, provider: AIProvider) -> str:
+        """Registered name of ``provider`` (metric label)."""
+        return next((name for name, p in self._providers.items() if p is provider), "unknown")
+
     def get_provider(self, provider_name: str) -> AIProvider:
         """Retrieve a registered provider by name.
 
@@ -279,22 +285,71 @@ class AIRouter:
         if request.max_tokens is not None:
             kwargs["max_tokens"] = request.max_tokens
 
-        return await provider.chat(
-            messages=request.messages,
-            model=model_name,
-            **kwargs,
-        )
+        name = self._provider_name(provider)
+        started = time.perf_counter()
+        try:
+            response = await provider.chat(
+                messages=request.messages,
+                model=model_name,
+                **kwargs,
+            )
+        except Exception:
+            AI_FAILURES.inc(provider=name, mode="chat")
+            raise
+        AI_REQUEST_SECONDS.observe(time.perf_counter() - started, provider=name, mode="chat")
+        return response
 
     # ------------------------------------------------------------------
     # Stream (SSE)
     # ------------------------------------------------------------------
 
+    async def stream_events(self, request: AIRequest) -> AsyncIterator[StreamEvent]:
+        """Stream a chat response as structured :class:`StreamEvent` objects.
+
+        Yields one ``chunk`` event per provider text chunk, then ``done``.
+        A :class:`ProviderError` raised mid-stream becomes a single
+        ``error`` event that ends the stream.  Callers serialise with
+        :func:`app.ai_router.streaming.to_sse` at the response edge.
+
+        Raises:
+            ProviderError: If the model/provider cannot be resolved
+                (raised before any yield).
+        """
+        model_name, provider = self.resolve_model(request.model)
+
+        kwargs: dict[str, Any] = {}
+        if request.temperature is not None:
+            kwargs["temperature"] = request.temperature
+        if request.max_tokens is not None:
+            kwargs["max_tokens"] = request.max_tokens
+
+        name = self._provider_name(provider)
+        started = time.perf_counter()
+        first_chunk = True
+        try:
+            async for chunk in provider.stream(
+                messages=request.messages,
+                model=model_name,
+                **kwargs,
+            ):
+                if first_chunk:
+                    first_chunk = False
+                    AI_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started, provider=name)
+                yield StreamEvent("chunk", chunk)
+        except ProviderError as exc:
+            AI_FAILURES.inc(provider=name, mode="stream")
+            yield StreamEvent("error", exc.message)
+            return
+
+        AI_REQUEST_SECONDS.observe(time.perf_counter() - started, provider=name, mode="stream")
+        yield DONE
+
     async def stream(self, request: AIRequest) -> AsyncIterator[str]:
         """Stream a chat response in SSE (Server-Sent Events) format.
 
         Each text chunk from the provider is wrapped as an SSE data line::
 
-            data: {text_chunk}\\n\\n
+            data: {"chunk": text_chunk}\\n\\n
 
         After all chunks are consumed, a terminal marker is sent::
 
@@ -303,7 +358,7 @@ class AIRouter:
         If a :class:`ProviderError` occurs mid-stream, an SSE error event
         is emitted instead::
 
-            event: error\\ndata: {error_message}\\n\\n
+            event: error\\ndata: {"error": error_message}\\n\\n
 
         Args:
             request: Unified AI request with messages, model, and parameters.
@@ -315,23 +370,5 @@ class AIRouter:
             ProviderError: If the model/provider cannot be resolved
                 (raised before any yield).
         """
-        model_name, provider = self.resolve_model(request.model)
-
-        kwargs: dict[str, Any] = {}
-        if request.temperature is not None:
-            kwargs["temperature"] = request.temperature
-        if request.max_tokens is not None:
-            kwargs["max_tokens"] = request.max_tokens
-
-        try:
-            async for chunk in provider.stream(
-                messages=request.messages,
-                model=model_name,
-                **kwargs,
-            ):
-                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-        except ProviderError as exc:
-            yield f"event: error\ndata: {json.dumps({'error': exc.message})}\n\n"
-            return
-
-        yield "data: [DONE]\n\n"
+        async for event in self.stream_events(request):
+            yield to_sse(event)
@@ -0,0 +1,113 @@
+"""Throughput benchmark for the AI streaming pipeline.
+
+Streams a synthetic response from a local fake provider through
+:class:`AIRouter` and compares the per-chunk cost of
+
+* ``legacy``     -- SSE line per chunk, re-parsed with ``json.loads`` to
+  accumulate text (the previous ``/ai/stream`` path),
+* ``structured`` -- :meth:`AIRouter.stream_events`, serialised once,
+* ``coalesced``  -- as ``structured`` with :func:`coalesce_chunks`::
+
+    python -m app.ai_router.stream_benchmark
+    python -m app.ai_router.stream_benchmark --chunks 20000 --interval-ms 0.2 --coalesce-ms 25
+
+No network or API key is needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.ai_router.providers.base import AIProvider
+from app.ai_router.router import AIRouter
+from app.ai_router.schemas import AIRequest, AIResponse, Message, ModelInfo
+from app.ai_router.streaming import coalesce_chunks, to_sse
+
+_MODEL = "fake-stream"
+
+
+class FakeStreamProvider(AIProvider):
+    """Yields ``chunks`` short tokens, optionally ``interval`` seconds apart."""
+
+    def __init__(self, chunks: int, interval: float) -> None:
+        self._chunks = chunks
+        self._interval = interval
+
+    async def chat(self, messages: list[Message], model: str, **kwargs: Any) -> AIResponse:
+        text = "".join(self._token(i) for i in range(self._chunks))
+        return AIResponse(content=text, model=model, provider="fake")
+
+    async def stream(self, messages: list[Message], model: str, **kwargs: Any) -> AsyncIterator[str]:
+        for i in range(self._chunks):
+            await asyncio.sleep(self._interval)
+            yield self._token(i)
+
+    def available_models(self) -> list[ModelInfo]:
+        return [ModelInfo(id=_MODEL, name="Fake stream", provider="fake", max_tokens=0)]
+
+    @staticmethod
+    def _token(i: int) -> str:
+        return "노트 " if i % 3 == 0 else f"tok{i % 97} "
+
+
+async def _legacy(router: AIRouter, request: AIRequest) -> tuple[int, int, int]:
+    frames = size = 0
+    accumulated = ""
+    async for sse_line in router.stream(request):
+        frames += 1
+        size += len(sse_line)
+        if sse_line.startswith("data: ") and "[DONE]" not in sse_line:
+            accumulated += json.loads(sse_line[6:]).get("chunk", "")
+    return frames, size, len(accumulated)
+
+
+async def _structured(router: AIRouter, request: AIRequest, coalesce_ms: float, max_chars: int) -> tuple[int, int, int]:
+    frames = size = 0
+    parts: list[str] = []
+    events = coalesce_chunks(router.stream_events(request), max_delay=coalesce_ms / 1000, max_chars=max_chars)
+    async for event in events:
+        frame = to_sse(event)
+        frames += 1
+        size += len(frame)
+        if event.kind == "chunk":
+            parts.append(event.text)
+    return frames, size, len("".join(parts))
+
+
+async def _run(chunks: int, interval_ms: float, coalesce_ms: float, max_chars: int) -> None:
+    router = AIRouter()
+    router.register_provider("fake", FakeStreamProvider(chunks, interval_ms / 1000))
+    request = AIRequest(messages=[Message(role="user", content="benchmark")], model=_MODEL, stream=True)
+
+    variants = {
+        "legacy": lambda: _legacy(router, request),
+        "structured": lambda: _structured(router, request, 0, max_chars),
+        "coalesced": lambda: _structured(router, request, coalesce_ms, max_chars),
+    }
+    print(f"{'variant':<12} {'seconds':>9} {'chunks/s':>11} {'frames':>8} {'bytes':>10}")  # noqa: T201
+    for label, run in variants.items():
+        started = time.perf_counter()
+        frames, size, text_len = await run()
+        elapsed = time.perf_counter() - started
+        print(  # noqa: T201
+            f"{label:<12} {elapsed:>9.3f} {chunks / elapsed:>11.0f} {frames:>8} {size:>10}  (text {text_len})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AI streaming pipeline benchmark")
+    parser.add_argument("--chunks", type=int, default=10000, help="Tokens streamed by the fake provider")
+    parser.add_argument("--interval-ms", type=float, default=0.0, help="Delay between tokens")
+    parser.add_argument("--coalesce-ms", type=float, default=20.0, help="Coalescing window for the last variant")
+    parser.add_argument("--max-chars", type=int, default=512, help="Coalesced frame size bound")
+    args = parser.parse_args()
+    asyncio.run(_run(args.chunks, args.interval_ms, args.coalesce_ms, args.max_chars))
+
+
+if __name__ == "__main__":
+    main()
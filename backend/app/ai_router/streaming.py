@@ -0,0 +1,104 @@
+"""Structured stream events and their SSE encoding.
+
+:meth:`AIRouter.stream_events` yields :class:`StreamEvent` objects;
+endpoints read the text directly (accumulation, :class:`StreamMonitor`)
+and serialise each event exactly once with :func:`to_sse` when writing
+the response.  The wire format is unchanged::
+
+    data: {"chunk": "..."}\\n\\n
+    event: error\\ndata: {"error": "..."}\\n\\n
+    data: [DONE]\\n\\n
+
+:func:`coalesce_chunks` optionally merges consecutive token chunks into
+fewer SSE frames, bounded by size and by how long text may wait.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Literal
+
+
+@dataclass(slots=True)
+class StreamEvent:
+    """One event of a streamed AI response (plain dataclass: created per token)."""
+
+    kind: Literal["chunk", "error", "done"]
+    text: str = ""
+
+
+DONE = StreamEvent("done")
+
+
+def to_sse(event: StreamEvent) -> str:
+    """Encode ``event`` as an SSE frame."""
+    if event.kind == "chunk":
+        return f"data: {json.dumps({'chunk': event.text})}\n\n"
+    if event.kind == "error":
+        return f"event: error\ndata: {json.dumps({'error': event.text})}\n\n"
+    return "data: [DONE]\n\n"
+
+
+async def coalesce_chunks(
+    events: AsyncIterator[StreamEvent],
+    max_delay: float,
+    max_chars: int,
+) -> AsyncIterator[StreamEvent]:
+    """Merge consecutive chunk events into larger ones.
+
+    Buffered text is emitted once it reaches ``max_chars`` or has waited
+    ``max_delay`` seconds (also while the provider is silent), and before
+    any non-chunk event.  ``max_delay <= 0`` passes events through.
+    """
+    if max_delay <= 0:
+        async for event in events:
+            yield event
+        return
+
+    iterator = aiter(events)
+    parts: list[str] = []
+    size = 0
+    deadline = 0.0
+    pending: asyncio.Future[StreamEvent] | None = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator))
+            if parts:
+                done, _ = await asyncio.wait({pending}, timeout=max(0.0, deadline - time.monotonic()))
+                if not done:
+                    yield StreamEvent("chunk", "".join(parts))
+                    parts.clear()
+                    size = 0
+                    continue
+            try:
+                event = await pending
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+
+            if event.kind != "chunk":
+                if parts:
+                    yield StreamEvent("chunk", "".join(parts))
+                    parts.clear()
+                    size = 0
+                yield event
+                continue
+            if not parts:
+                deadline = time.monotonic() + max_delay
+            parts.append(event.text)
+            size += len(event.text)
+            if size >= max_chars:
+                yield StreamEvent("chunk", "".join(parts))
+                parts.clear()
+                size = 0
+        if parts:
+            yield StreamEvent("chunk", "".join(parts))
+    finally:
+        if pending is not None:
+            pending.cancel()
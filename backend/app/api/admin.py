@@ -23,9 +23,10 @@ from app.config import get_settings
 from app.constants import MemberRole
 from app.database import get_db
 from app.models import TrashOperation
-from app.services import trash_service
+from app.services import blob_store, trash_service
 from app.services.activity_log import get_trigger_name, log_activity
 from app.services.auth_service import get_current_user
+from app.services.job_queue import JobContext, job_handler, submit_job
 
 logger = logging.getLogger(__name__)
 
@@ -205,6 +206,8 @@ async def get_data_usage(
     images_dir_size = _dir_size(settings.NSX_IMAGES_PATH)
     exports_dir_size = _dir_size(settings.NSX_EXPORTS_PATH)
     uploads_dir_size = _dir_size(settings.UPLOADS_PATH)
+    image_cache_size = _dir_size(settings.NAS_IMAGE_CACHE_PATH)
+    storage_total = images_dir_size + exports_dir_size + uploads_dir_size + image_cache_size
 
     # Activity logs count
     logs_result = await db.execute(text("SELECT COUNT(*) FROM activity_logs"))
@@ -223,6 +226,10 @@ async def get_data_usage(
 
     exports_file_count = _dir_file_count(settings.NSX_EXPORTS_PATH)
 
+    # Images and uploads are hard links into the blob store, so the
+    # directory sizes above count shared content once per path.
+    blobs = await blob_store.storage_savings(db)
+
     return {
         "notes": {
             "count": notes_row.count if notes_row else 0,
@@ -245,14 +252,21 @@ async def get_data_usage(
             "images": {"bytes": images_dir_size, "human": _human_size(images_dir_size)},
             "exports": {"bytes": exports_dir_size, "human": _human_size(exports_dir_size)},
             "uploads": {"bytes": uploads_dir_size, "human": _human_size(uploads_dir_size)},
-            "total_bytes": images_dir_size + exports_dir_size + uploads_dir_size,
-            "total": _human_size(images_dir_size + exports_dir_size + uploads_dir_size),
+            "image_cache": {"bytes": image_cache_size, "human": _human_size(image_cache_size)},
+            "total_bytes": storage_total,
+            "total": _human_size(storage_total),
         },
         "activity_logs": {"count": logs_count},
         "vision_data": {
             "ocr_completed": vision_row.ocr_completed if vision_row else 0,
             "vision_completed": vision_row.vision_completed if vision_row else 0,
         },
+        "blob_store": {
+            **blobs,
+            "physical_size": _human_size(blobs["physical_bytes"]),
+            "logical_size": _human_size(blobs["logical_bytes"]),
+            "saved_size": _human_size(blobs["saved_bytes"]),
+        },
         "exports": {
             "count": exports_file_count,
             "size": exports_dir_size,
@@ -360,7 +374,9 @@ async def get_nas_status(
     admin: dict = Depends(require_admin),  # noqa: B008
     db: AsyncSession = Depends(get_db),  # noqa: B008
 ) -> dict:
-    """NAS connection status and configuration."""
+    """NAS connection status, configuration and client pool health."""
+    from app.synology_gateway.pool import get_pool_stats
+
     settings_map = await load_settings_from_db(db)
 
     nas_url = (settings_map.get("nas_url", "") or "").strip().strip('"')
@@ -379,6 +395,7 @@ async def get_nas_status(
         "nas_url": nas_url if configured else None,
         "last_sync": last_sync,
         "synced_notes": synced_count.scalar() or 0,
+        "pool": get_pool_stats(),
     }
 
 
@@ -618,6 +635,42 @@ async def clean_orphan_files(
     }
 
 
+@router.post("/storage/migrate-blobs")
+async def migrate_blobs(
+    admin: dict = Depends(require_admin),  # noqa: B008
+) -> dict:
+    """Move existing images and uploads into the deduplicated blob store.
+
+    Runs as a ``blob_migrate`` background job; follow it via ``/jobs``.
+    """
+    job, created = await submit_job(
+        "blob_migrate",
+        progress={"status": "migrating", "files_done": 0, "deduplicated": 0},
+        triggered_by=get_trigger_name(admin),
+    )
+    return {"status": "started" if created else "already_running", "job_id": job.id}
+
+
+@job_handler("blob_migrate")
+async def _blob_migrate_job(ctx: JobContext) -> dict:
+    """Job queue entry point for :func:`blob_store.migrate_existing_files`."""
+    result = await blob_store.migrate_existing_files(
+        on_progress=lambda done, dedup: ctx.report(status="migrating", files_done=done, deduplicated=dedup),
+        is_cancelled=ctx.is_cancelled,
+    )
+    await log_activity(
+        "admin",
+        "completed",
+        message=(
+            f"블롭 저장소 마이그레이션: {result['migrated']}개 파일, "
+            f"{result['deduplicated']}개 중복 제거 ({_human_size(result['saved_bytes'])} 절약)"
+        ),
+        details=result,
+        triggered_by=ctx.triggered_by,
+    )
+    return result
+
+
 @router.post("/storage/clean-exports")
 async def clean_exports(
     confirm: bool = Query(False),  # noqa: B008
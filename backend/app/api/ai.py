@@ -15,8 +15,10 @@ All endpoints require JWT authentication via Bearer token.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+from contextlib import aclosing
 from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -28,6 +30,8 @@ from app.ai_router.image_utils import extract_note_images, get_cached_image_desc
 from app.ai_router.prompts import insight, search_qa, spellcheck, spellcheck_inline, summarize, template, writing
 from app.ai_router.router import AIRouter
 from app.ai_router.schemas import AIRequest, AIResponse, Message, ModelInfo, ProviderError
+from app.ai_router.streaming import coalesce_chunks, to_sse
+from app.config import get_settings
 from app.database import get_db
 from app.models import Note, Notebook
 from app.search.engine import FullTextSearchEngine
@@ -755,46 +759,49 @@ async def ai_stream(
 
             stream_monitor = StreamMonitor(task=request.feature, lang=lang)
 
-        accumulated_content = ""
+        settings = get_settings()
+        parts: list[str] = []
         retry_count = 0
         max_retries = 1
 
         while True:
-            accumulated_content = ""
+            parts = []
             should_retry = False
 
             try:
-                async for sse_line in effective_router.stream(ai_request):
-                    yield sse_line
-                    # Accumulate text chunks for quality evaluation
-                    if sse_line.startswith("data: ") and "[DONE]" not in sse_line:
-                        try:
-                            chunk_data = json.loads(sse_line[6:])
-                            chunk_text = chunk_data.get("chunk", "")
-                            accumulated_content += chunk_text
-
-                            # Mid-stream quality check
-                            if stream_monitor:
-                                check = stream_monitor.process_chunk(chunk_text)
-
-                                if check.action == StreamAction.WARN:
-                                    warn_data = json.dumps(
-                                        {"reason": check.reason, "issue_type": check.issue_type},
-                                        ensure_ascii=False,
-                                    )
-                                    yield f"event: stream_warning\ndata: {warn_data}\n\n"
-
-                                elif check.action == StreamAction.ABORT and retry_count < max_retries:
-                                    retry_data = json.dumps(
-                                        {"reason": check.reason, "issue_type": check.issue_type},
-                                        ensure_ascii=False,
-                                    )
-                                    yield f"event: retry\ndata: {retry_data}\n\n"
-                                    should_retry = True
-                                    retry_count += 1
-                                    break
-                        except (json.JSONDecodeError, KeyError):
-                            pass
+                stream = coalesce_chunks(
+                    effective_router.stream_events(ai_request),
+                    max_delay=settings.AI_STREAM_COALESCE_MS / 1000,
+                    max_chars=settings.AI_STREAM_COALESCE_CHARS,
+                )
+                async with aclosing(stream) as events:
+                    async for event in events:
+                        yield to_sse(event)
+                        if event.kind != "chunk":
+                            continue
+                        # Accumulate text chunks for quality evaluation
+                        parts.append(event.text)
+
+                        # Mid-stream quality check
+                        if stream_monitor:
+                            check = stream_monitor.process_chunk(event.text)
+
+                            if check.action == StreamAction.WARN:
+                                warn_data = json.dumps(
+                                    {"reason": check.reason, "issue_type": check.issue_type},
+                                    ensure_ascii=False,
+                                )
+                                yield f"event: stream_warning\ndata: {warn_data}\n\n"
+
+                            elif check.action == StreamAction.ABORT and retry_count < max_retries:
+                                retry_data = json.dumps(
+                                    {"reason": check.reason, "issue_type": check.issue_type},
+                                    ensure_ascii=False,
+                                )
+                                yield f"event: retry\ndata: {retry_data}\n\n"
+                                should_retry = True
+                                retry_count += 1
+                                break
             except ProviderError as exc:
                 logger.error("AI stream error: %s", exc)
                 yield f"event: error\ndata: {exc.message}\n\n"
@@ -808,43 +815,21 @@ async def ai_stream(
 
             break
 
-        # Quality gate evaluation after streaming complete
+        # Quality gate (and search QA) evaluations after streaming complete, run concurrently
+        accumulated_content = "".join(parts)
         if quality_gate_on and accumulated_content:
-            try:
-                from app.ai_router.quality_gate import QualityGate
-
-                gate = QualityGate(effective_router)
-                quality_result = await gate.evaluate(
-                    task=request.feature,
-                    original_request=request.content,
-                    ai_response=accumulated_content,
-                    lang=lang,
-                )
-                if quality_result:
-                    yield f"event: quality\ndata: {json.dumps(quality_result.model_dump(), ensure_ascii=False)}\n\n"
-            except Exception:
-                logger.exception("Stream quality gate evaluation failed")
-
-            # Search QA specific evaluation (correctness + utility)
+            evaluations = [
+                _quality_gate_frame(effective_router, request.feature, request.content, accumulated_content, lang)
+            ]
             if request.feature == "search_qa":
-                try:
-                    from app.ai_router.search_qa_evaluator import SearchQAEvaluator
-
-                    eval_context = effective_options.get("context_notes", [])
-                    eval_notes = [str(n) for n in eval_context] if isinstance(eval_context, list) else []
-                    evaluator = SearchQAEvaluator(effective_router)
-                    qa_result = await evaluator.evaluate(
-                        question=request.content,
-                        context_notes=eval_notes,
-                        note_titles=[],
-                        ai_response=accumulated_content,
-                        lang=lang,
-                    )
-                    if qa_result:
-                        qa_json = json.dumps(qa_result.model_dump(), ensure_ascii=False)
-                        yield f"event: qa_evaluation\ndata: {qa_json}\n\n"
-                except Exception:
-                    logger.exception("Stream search QA evaluation failed")
+                eval_context = effective_options.get("context_notes", [])
+                eval_notes = [str(n) for n in eval_context] if isinstance(eval_context, list) else []
+                evaluations.append(
+                    _search_qa_frame(effective_router, request.content, eval_notes, accumulated_content, lang)
+                )
+            for frame in await asyncio.gather(*evaluations):
+                if frame:
+                    yield frame
 
     return StreamingResponse(
         event_generator(),
@@ -857,6 +842,57 @@ async def ai_stream(
     )
 
 
+async def _quality_gate_frame(
+    router: AIRouter,
+    task: str,
+    original_request: str,
+    ai_response: str,
+    lang: str,
+) -> str | None:
+    """Run the quality gate on a streamed response; returns the ``quality`` SSE frame."""
+    try:
+        from app.ai_router.quality_gate import QualityGate
+
+        quality_result = await QualityGate(router).evaluate(
+            task=task,
+            original_request=original_request,
+            ai_response=ai_response,
+            lang=lang,
+        )
+    except Exception:
+        logger.exception("Stream quality gate evaluation failed")
+        return None
+    if not quality_result:
+        return None
+    return f"event: quality\ndata: {json.dumps(quality_result.model_dump(), ensure_ascii=False)}\n\n"
+
+
+async def _search_qa_frame(
+    router: AIRouter,
+    question: str,
+    context_notes: list[str],
+    ai_response: str,
+    lang: str,
+) -> str | None:
+    """Search QA specific evaluation (correctness + utility); returns the ``qa_evaluation`` SSE frame."""
+    try:
+        from app.ai_router.search_qa_evaluator import SearchQAEvaluator
+
+        qa_result = await SearchQAEvaluator(router).evaluate(
+            question=question,
+            context_notes=context_notes,
+            note_titles=[],
+            ai_response=ai_response,
+            lang=lang,
+        )
+    except Exception:
+        logger.exception("Stream search QA evaluation failed")
+        return None
+    if not qa_result:
+        return None
+    return f"event: qa_evaluation\ndata: {json.dumps(qa_result.model_dump(), ensure_ascii=False)}\n\n"
+
+
 @router.get("/models", response_model=ModelListResponse)
 async def list_models(
     current_user: dict = Depends(get_current_user),  # noqa: B008
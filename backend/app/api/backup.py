@@ -4,17 +4,19 @@
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
+import logging
+import os
 import re
 import shutil
+import time
 import zipfile
 from datetime import UTC, datetime
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.admin import _create_db_backup_internal, _human_size, _restore_db_from_server_internal, require_admin
@@ -24,13 +26,19 @@ from app.database import async_session_factory, get_db
 from app.models import Note, NoteAttachment, NoteImage
 from app.services.activity_log import get_trigger_name, log_activity
 from app.services.auth_service import get_current_user
+from app.services.backup_archive import ArchiveWriter, read_records, stream_rows
+from app.services.blob_store import StoredBlob, get_blob_store, register_refs
 from app.synology_gateway.notestation import NoteStationService
 from app.utils.datetime_utils import datetime_from_iso, datetime_to_iso
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["backup"])
 settings = get_settings()
 
-BACKUP_VERSION = "ainx-1"
+BACKUP_VERSION = "ainx-2"  # ainx-1: single JSON array entries; ainx-2: JSONL entries
+_RESTORE_BATCH_SIZE = 500
+_RESTORE_EXTRACT_WORKERS = 4
 
 _SETTINGS_BACKUP_FILENAME_PATTERN = re.compile(r"^settings_backup_\d{8}_\d{6}\.json$")
 _NATIVE_BACKUP_FILENAME_PATTERN = re.compile(r"^ainx_backup_\d{8}_\d{6}\.zip$")
@@ -54,107 +62,122 @@ class BackupExportResponse(dict):
     pass
 
 
-def _compute_md5(file_path: Path) -> str:
-    digest = hashlib.md5()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
+def _note_record(row) -> dict:
+    return {
+        "note_id": row.synology_note_id,
+        "title": row.title,
+        "content_html": row.content_html,
+        "content_json": row.content_json,
+        "content_text": row.content_text,
+        "notebook": row.notebook_name,
+        "tags": row.tags,
+        "is_todo": row.is_todo,
+        "is_shortcut": row.is_shortcut,
+        "source_created_at": datetime_to_iso(row.source_created_at),
+        "source_updated_at": datetime_to_iso(row.source_updated_at),
+        "synced_at": datetime_to_iso(row.synced_at),
+    }
+
+
+def _image_record(row) -> dict:
+    return {
+        "note_id": row.synology_note_id,
+        "ref": row.ref,
+        "name": row.name,
+        "md5": row.md5,
+        "mime_type": row.mime_type,
+        "width": row.width,
+        "height": row.height,
+        "file_path": f"images/{row.synology_note_id}/{row.ref}",
+    }
+
+
+def _attachment_record(row) -> dict:
+    return {
+        "note_id": row.synology_note_id,
+        "file_id": row.file_id,
+        "name": row.name,
+        "mime_type": row.mime_type,
+        "size": row.size,
+        "file_path": f"attachments/{row.file_id}",
+    }
 
 
 async def _create_native_backup_internal(
     db: AsyncSession,
     triggered_by: str | None = None,
 ) -> dict:
-    """Create a native backup archive. Reusable by endpoint and full-backup."""
+    """Create a native backup archive. Reusable by endpoint and full-backup.
+
+    Rows are streamed from server-side cursors into JSONL entries, so memory
+    use stays flat regardless of library size.
+    """
     export_dir = _native_backup_dir()
     timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
     export_path = export_dir / f"ainx_backup_{timestamp}.zip"
 
-    notes_result = await db.execute(select(Note))
-    notes = notes_result.scalars().all()
-
-    images_result = await db.execute(select(NoteImage))
-    images = images_result.scalars().all()
-
-    attachments_result = await db.execute(select(NoteAttachment))
-    attachments = attachments_result.scalars().all()
-
-    notes_payload = [
-        {
-            "note_id": note.synology_note_id,
-            "title": note.title,
-            "content_html": note.content_html,
-            "content_json": note.content_json,
-            "content_text": note.content_text,
-            "notebook": note.notebook_name,
-            "tags": note.tags,
-            "is_todo": note.is_todo,
-            "is_shortcut": note.is_shortcut,
-            "source_created_at": datetime_to_iso(note.source_created_at),
-            "source_updated_at": datetime_to_iso(note.source_updated_at),
-            "synced_at": datetime_to_iso(note.synced_at),
-        }
-        for note in notes
-    ]
-
-    images_payload = [
-        {
-            "note_id": image.synology_note_id,
-            "ref": image.ref,
-            "name": image.name,
-            "md5": image.md5,
-            "mime_type": image.mime_type,
-            "width": image.width,
-            "height": image.height,
-            "file_path": f"images/{image.synology_note_id}/{image.ref}",
-        }
-        for image in images
-    ]
-
-    attachments_payload = []
-    note_lookup = {note.id: note.synology_note_id for note in notes}
-    for att in attachments:
-        note_id = note_lookup.get(att.note_id)
-        if not note_id:
-            continue
-        attachments_payload.append(
-            {
-                "note_id": note_id,
-                "file_id": att.file_id,
-                "name": att.name,
-                "mime_type": att.mime_type,
-                "size": att.size,
-                "file_path": f"attachments/{att.file_id}",
-            }
+    notes_stmt = select(
+        Note.synology_note_id,
+        Note.title,
+        Note.content_html,
+        Note.content_json,
+        Note.content_text,
+        Note.notebook_name,
+        Note.tags,
+        Note.is_todo,
+        Note.is_shortcut,
+        Note.source_created_at,
+        Note.source_updated_at,
+        Note.synced_at,
+    ).order_by(Note.id)
+    images_stmt = select(
+        NoteImage.synology_note_id,
+        NoteImage.ref,
+        NoteImage.name,
+        NoteImage.md5,
+        NoteImage.mime_type,
+        NoteImage.width,
+        NoteImage.height,
+        NoteImage.file_path,
+    ).order_by(NoteImage.id)
+    attachments_stmt = (
+        select(
+            Note.synology_note_id,
+            NoteAttachment.file_id,
+            NoteAttachment.name,
+            NoteAttachment.mime_type,
+            NoteAttachment.size,
         )
+        .join(Note, Note.id == NoteAttachment.note_id)
+        .order_by(NoteAttachment.id)
+    )
 
-    manifest = {
-        "version": BACKUP_VERSION,
-        "created_at": datetime.now(UTC).isoformat(),
-        "note_count": len(notes_payload),
-        "image_count": len(images_payload),
-        "attachment_count": len(attachments_payload),
-    }
-
-    with zipfile.ZipFile(export_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
-        archive.writestr("notes.json", json.dumps(notes_payload, ensure_ascii=False, indent=2))
-        archive.writestr("note_images.json", json.dumps(images_payload, ensure_ascii=False, indent=2))
-        archive.writestr("note_attachments.json", json.dumps(attachments_payload, ensure_ascii=False, indent=2))
+    async with ArchiveWriter(export_path) as writer:
+        note_count = await writer.write_records("notes", stream_rows(db, notes_stmt), _note_record)
+        image_count = await writer.write_records("note_images", stream_rows(db, images_stmt), _image_record)
+        attachment_count = await writer.write_records(
+            "note_attachments", stream_rows(db, attachments_stmt), _attachment_record
+        )
 
-        for image in images:
-            if not image.file_path:
-                continue
-            file_path = Path(image.file_path)
-            if file_path.exists():
-                archive.write(file_path, arcname=f"images/{image.synology_note_id}/{image.ref}")
+        async for batch in stream_rows(db, select(NoteImage.synology_note_id, NoteImage.ref, NoteImage.file_path)):
+            await writer.write_files(
+                (Path(row.file_path), f"images/{row.synology_note_id}/{row.ref}") for row in batch if row.file_path
+            )
 
         uploads_dir = Path(settings.UPLOADS_PATH)
-        for att in attachments:
-            file_path = uploads_dir / att.file_id
-            if file_path.exists():
-                archive.write(file_path, arcname=f"attachments/{att.file_id}")
+        async for batch in stream_rows(db, attachments_stmt.with_only_columns(NoteAttachment.file_id)):
+            await writer.write_files((uploads_dir / row.file_id, f"attachments/{row.file_id}") for row in batch)
+
+        await writer.write_json(
+            "manifest.json",
+            {
+                "version": BACKUP_VERSION,
+                "created_at": datetime.now(UTC).isoformat(),
+                "note_count": note_count,
+                "image_count": image_count,
+                "attachment_count": attachment_count,
+            },
+        )
 
     file_size = export_path.stat().st_size
     created_at = datetime.now(UTC).isoformat()
@@ -175,6 +198,328 @@ async def _create_native_backup_internal(
     }
 
 
+async def _restore_notes_batch(session: AsyncSession, batch: list[dict], note_ids: dict[str, int]) -> None:
+    ids = [p["note_id"] for p in batch if p.get("note_id")]
+    existing_result = await session.execute(select(Note).where(Note.synology_note_id.in_(ids)))
+    existing = {note.synology_note_id: note for note in existing_result.scalars().all()}
+
+    restored: list[Note] = []
+    for payload in batch:
+        note_id = payload.get("note_id")
+        if not note_id:
+            continue
+
+        content_html = payload.get("content_html") or ""
+        content_text = payload.get("content_text") or NoteStationService.extract_text(content_html)
+        note = existing.get(note_id)
+
+        if note:
+            note.title = payload.get("title", "")
+            note.content_html = content_html
+            note.content_json = payload.get("content_json")
+            note.content_text = content_text
+            note.notebook_name = payload.get("notebook")
+            note.tags = payload.get("tags")
+            note.is_todo = bool(payload.get("is_todo"))
+            note.is_shortcut = bool(payload.get("is_shortcut"))
+            note.source_created_at = datetime_from_iso(payload.get("source_created_at"))
+            note.source_updated_at = datetime_from_iso(payload.get("source_updated_at"))
+            note.synced_at = datetime_from_iso(payload.get("synced_at"))
+        else:
+            note = Note(
+                synology_note_id=note_id,
+                title=payload.get("title", ""),
+                content_html=content_html,
+                content_json=payload.get("content_json"),
+                content_text=content_text,
+                notebook_name=payload.get("notebook"),
+                tags=payload.get("tags"),
+                is_todo=bool(payload.get("is_todo")),
+                is_shortcut=bool(payload.get("is_shortcut")),
+                source_created_at=datetime_from_iso(payload.get("source_created_at")),
+                source_updated_at=datetime_from_iso(payload.get("source_updated_at")),
+                synced_at=datetime_from_iso(payload.get("synced_at")),
+            )
+            session.add(note)
+        restored.append(note)
+
+    await session.flush()
+    for note in restored:
+        note_ids[note.synology_note_id] = note.id
+
+
+# A file written by a restore: (path, sha256 of the new content, hard link to
+# the file it replaced or None if the path did not exist).
+_RestoredFile = tuple[Path, str, Path | None]
+
+
+def _extract_member(archive: zipfile.ZipFile, member: str, target: Path) -> tuple[StoredBlob, Path | None]:
+    """Copy an archive member into the blob store, linked at *target*.
+
+    An existing *target* is first hard-linked aside so a failed restore can
+    put it back; returns the blob and that backup path.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    backup = None
+    if target.exists():
+        backup = target.with_name(f".{target.name}.pre-restore")
+        backup.unlink(missing_ok=True)
+        os.link(target, backup)
+    try:
+        with archive.open(member) as src:
+            return get_blob_store().put_stream(src, link_to=target), backup
+    except BaseException:
+        if backup is not None:
+            backup.unlink(missing_ok=True)
+        raise
+
+
+async def _extract_members(
+    archive: zipfile.ZipFile, jobs: list[tuple[str, Path]], written: list[_RestoredFile]
+) -> list[StoredBlob]:
+    """Extract ``(member, target)`` pairs concurrently in worker threads.
+
+    ``ZipFile`` serialises raw reads internally; decompression, hashing and
+    writing overlap across members.  Every target is appended to *written*
+    so a failed restore can remove new files and put replaced ones back.
+    """
+    semaphore = asyncio.Semaphore(_RESTORE_EXTRACT_WORKERS)
+
+    async def _one(member: str, target: Path) -> StoredBlob:
+        async with semaphore:
+            blob, backup = await asyncio.to_thread(_extract_member, archive, member, target)
+            written.append((target, blob.sha256, backup))
+            return blob
+
+    return list(await asyncio.gather(*(_one(member, target) for member, target in jobs)))
+
+
+def _undo_restored_files(written: list[_RestoredFile]) -> None:
+    """Undo the file side of a failed restore (rows were rolled back).
+
+    New files are removed; replaced files get their previous content back.
+    """
+    store = get_blob_store()
+    for path, sha256, backup in written:
+        if backup is None:
+            path.unlink(missing_ok=True)
+        else:
+            os.replace(backup, path)
+        store.remove(sha256)
+    if written:
+        logger.info("Reverted %d files written by a failed restore", len(written))
+
+
+def _drop_backups(written: list[_RestoredFile]) -> None:
+    """Discard the copies of replaced files once the restore has committed."""
+    for _path, _sha256, backup in written:
+        if backup is not None:
+            backup.unlink(missing_ok=True)
+
+
+async def _stage_rows(session: AsyncSession, table: str, ddl: str, columns: list[str], rows: list[tuple]) -> None:
+    """Create a transaction-scoped temp table and bulk-load *rows* with COPY.
+
+    The restore runs in one transaction, so a table left by the previous
+    batch is dropped first.
+    """
+    await session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    await session.execute(text(f"CREATE TEMP TABLE {table} ({ddl}) ON COMMIT DROP"))
+    raw = await (await session.connection()).get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(table, records=rows, columns=columns)
+
+
+async def _restore_images_batch(
+    session: AsyncSession,
+    archive: zipfile.ZipFile,
+    members: set[str],
+    batch: list[dict],
+    written: list[_RestoredFile],
+) -> None:
+    images_dir = Path(settings.NSX_IMAGES_PATH)
+    records: list[dict] = []
+    for img in batch:
+        note_id = img.get("note_id")
+        ref = img.get("ref")
+        image_rel = img.get("file_path") or f"images/{note_id}/{ref}"
+        if note_id and ref and image_rel in members:
+            records.append({**img, "_member": image_rel, "_target": images_dir / note_id / ref})
+    if not records:
+        return
+
+    blobs = await _extract_members(archive, [(r["_member"], r["_target"]) for r in records], written)
+
+    await _stage_rows(
+        session,
+        "_restore_note_images",
+        "seq int, synology_note_id text, ref text, name text, md5 text, file_path text,"
+        " mime_type text, width int, height int",
+        ["seq", "synology_note_id", "ref", "name", "md5", "file_path", "mime_type", "width", "height"],
+        [
+            (
+                seq,
+                r["note_id"],
+                r["ref"],
+                r.get("name") or r["ref"],
+                r.get("md5") or blob.md5,
+                str(r["_target"]),
+                r.get("mime_type") or "application/octet-stream",
+                r.get("width"),
+                r.get("height"),
+            )
+            for seq, (r, blob) in enumerate(zip(records, blobs, strict=True))
+        ],
+    )
+    # Later records win, as they would when applied one by one.
+    await session.execute(
+        text("""
+            INSERT INTO note_images (synology_note_id, ref, name, md5, file_path, mime_type, width, height)
+            SELECT DISTINCT ON (synology_note_id, ref)
+                synology_note_id, ref, name, md5, file_path, mime_type, width, height
+            FROM _restore_note_images
+            ORDER BY synology_note_id, ref, seq DESC
+            ON CONFLICT ON CONSTRAINT uq_note_images_note_ref DO UPDATE SET
+                name = EXCLUDED.name,
+                md5 = EXCLUDED.md5,
+                file_path = EXCLUDED.file_path,
+                mime_type = EXCLUDED.mime_type,
+                width = EXCLUDED.width,
+                height = EXCLUDED.height
+        """)
+    )
+    await register_refs(session, blobs)
+
+
+async def _restore_attachments_batch(
+    session: AsyncSession,
+    archive: zipfile.ZipFile,
+    members: set[str],
+    batch: list[dict],
+    note_ids: dict[str, int],
+    written: list[_RestoredFile],
+) -> None:
+    uploads_dir = Path(settings.UPLOADS_PATH)
+    records: list[tuple] = []
+    jobs: list[tuple[str, Path]] = []
+    for att in batch:
+        file_id = att.get("file_id")
+        note_pk = note_ids.get(att.get("note_id"))
+        if not file_id or not note_pk:
+            continue
+        att_rel = att.get("file_path") or f"attachments/{file_id}"
+        if att_rel in members:
+            jobs.append((att_rel, uploads_dir / file_id))
+        records.append((len(records), note_pk, file_id, att.get("name"), att.get("mime_type"), att.get("size")))
+    if not records:
+        return
+
+    blobs = await _extract_members(archive, jobs, written)
+
+    await _stage_rows(
+        session,
+        "_restore_note_attachments",
+        "seq int, note_id int, file_id text, name text, mime_type text, size int",
+        ["seq", "note_id", "file_id", "name", "mime_type", "size"],
+        records,
+    )
+    # note_attachments has no unique key on (note_id, file_id), so merge
+    # with UPDATE ... FROM plus INSERT ... WHERE NOT EXISTS.
+    await session.execute(
+        text("""
+            WITH latest AS (
+                SELECT DISTINCT ON (note_id, file_id) *
+                FROM _restore_note_attachments
+                ORDER BY note_id, file_id, seq DESC
+            )
+            UPDATE note_attachments a SET
+                name = COALESCE(latest.name, a.name),
+                mime_type = latest.mime_type,
+                size = latest.size
+            FROM latest
+            WHERE a.note_id = latest.note_id AND a.file_id = latest.file_id
+        """)
+    )
+    await session.execute(
+        text("""
+            INSERT INTO note_attachments (note_id, file_id, name, mime_type, size)
+            SELECT DISTINCT ON (s.note_id, s.file_id)
+                s.note_id, s.file_id, COALESCE(s.name, s.file_id), s.mime_type, s.size
+            FROM _restore_note_attachments s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM note_attachments a
+                WHERE a.note_id = s.note_id AND a.file_id = s.file_id
+            )
+            ORDER BY s.note_id, s.file_id, s.seq DESC
+        """)
+    )
+    await register_refs(session, blobs)
+
+
+async def _restore_native_backup_internal(archive_path: Path) -> dict:
+    """Restore notes, images, and attachments from a native backup archive.
+
+    Records are streamed from the archive and flushed batch by batch, but
+    the whole restore commits once: a failure rolls every row back and
+    removes the files it had created and puts back the ones it had
+    replaced, leaving the library as it was.
+    Both the JSONL format and legacy ``ainx-1`` JSON entries are accepted.
+
+    Raises:
+        ValueError: If the archive has no manifest.
+    """
+    started = time.monotonic()
+    counts = {"note_count": 0, "image_count": 0, "attachment_count": 0}
+    # synology_note_id -> notes.id for notes in this backup (attachments only
+    # restore for notes contained in the same archive)
+    note_ids: dict[str, int] = {}
+    written: list[_RestoredFile] = []
+
+    with zipfile.ZipFile(archive_path, "r") as archive:
+        members = set(archive.namelist())
+        if "manifest.json" not in members:
+            raise ValueError("Invalid backup: manifest.json missing")
+
+        try:
+            async with async_session_factory() as session:
+                async for batch in read_records(archive, "notes", _RESTORE_BATCH_SIZE):
+                    await _restore_notes_batch(session, batch, note_ids)
+                    session.expunge_all()
+                    counts["note_count"] += len(batch)
+
+                async for batch in read_records(archive, "note_images", _RESTORE_BATCH_SIZE):
+                    await _restore_images_batch(session, archive, members, batch, written)
+                    session.expunge_all()
+                    counts["image_count"] += len(batch)
+
+                async for batch in read_records(archive, "note_attachments", _RESTORE_BATCH_SIZE):
+                    await _restore_attachments_batch(session, archive, members, batch, note_ids, written)
+                    session.expunge_all()
+                    counts["attachment_count"] += len(batch)
+
+                await session.commit()
+        except BaseException:
+            await asyncio.shield(asyncio.to_thread(_undo_restored_files, written))
+            raise
+    await asyncio.to_thread(_drop_backups, written)
+
+    # Restore throughput relative to archive size, for tuning batch size and
+    # extraction workers against real libraries.
+    elapsed = time.monotonic() - started
+    archive_mb = archive_path.stat().st_size / 1_048_576
+    logger.info(
+        "Native restore of %s: %d notes, %d images, %d attachments, %.1f MB in %.1fs (%.1f MB/s)",
+        archive_path.name,
+        counts["note_count"],
+        counts["image_count"],
+        counts["attachment_count"],
+        archive_mb,
+        elapsed,
+        archive_mb / elapsed if elapsed > 0 else 0.0,
+    )
+    counts["elapsed_seconds"] = round(elapsed, 2)
+    return counts
+
+
 @router.get("/backup/export")
 async def export_backup(
     current_user: dict = Depends(require_admin),  # noqa: B008
@@ -224,168 +569,14 @@ async def import_backup(
             detail=f"파일 저장 실패: {exc}",
         ) from exc
 
-    notes_payload: list[dict] = []
-    images_payload: list[dict] = []
-    attachments_payload: list[dict] = []
-
     try:
-        with zipfile.ZipFile(temp_path, "r") as archive:
-            if "manifest.json" not in archive.namelist():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid backup: manifest.json missing",
-                )
-
-            if "notes.json" in archive.namelist():
-                notes_payload = json.loads(archive.read("notes.json").decode("utf-8"))
-            if "note_images.json" in archive.namelist():
-                images_payload = json.loads(archive.read("note_images.json").decode("utf-8"))
-            if "note_attachments.json" in archive.namelist():
-                attachments_payload = json.loads(archive.read("note_attachments.json").decode("utf-8"))
-
-            async with async_session_factory() as session:
-                note_map: dict[str, Note] = {}
-                if notes_payload:
-                    note_ids = [n.get("note_id") for n in notes_payload if n.get("note_id")]
-                    existing_result = await session.execute(select(Note).where(Note.synology_note_id.in_(note_ids)))
-                    existing = {note.synology_note_id: note for note in existing_result.scalars().all()}
-
-                    for payload in notes_payload:
-                        note_id = payload.get("note_id")
-                        if not note_id:
-                            continue
-
-                        content_html = payload.get("content_html") or ""
-                        content_text = payload.get("content_text") or NoteStationService.extract_text(content_html)
-                        note = existing.get(note_id)
-
-                        if note:
-                            note.title = payload.get("title", "")
-                            note.content_html = content_html
-                            note.content_json = payload.get("content_json")
-                            note.content_text = content_text
-                            note.notebook_name = payload.get("notebook")
-                            note.tags = payload.get("tags")
-                            note.is_todo = bool(payload.get("is_todo"))
-                            note.is_shortcut = bool(payload.get("is_shortcut"))
-                            note.source_created_at = datetime_from_iso(payload.get("source_created_at"))
-                            note.source_updated_at = datetime_from_iso(payload.get("source_updated_at"))
-                            note.synced_at = datetime_from_iso(payload.get("synced_at"))
-                        else:
-                            note = Note(
-                                synology_note_id=note_id,
-                                title=payload.get("title", ""),
-                                content_html=content_html,
-                                content_json=payload.get("content_json"),
-                                content_text=content_text,
-                                notebook_name=payload.get("notebook"),
-                                tags=payload.get("tags"),
-                                is_todo=bool(payload.get("is_todo")),
-                                is_shortcut=bool(payload.get("is_shortcut")),
-                                source_created_at=datetime_from_iso(payload.get("source_created_at")),
-                                source_updated_at=datetime_from_iso(payload.get("source_updated_at")),
-                                synced_at=datetime_from_iso(payload.get("synced_at")),
-                            )
-                            session.add(note)
-                        note_map[note_id] = note
-
-                await session.flush()
-
-                images_dir = Path(settings.NSX_IMAGES_PATH)
-                uploads_dir = Path(settings.UPLOADS_PATH)
-                images_dir.mkdir(parents=True, exist_ok=True)
-                uploads_dir.mkdir(parents=True, exist_ok=True)
-
-                for img in images_payload:
-                    note_id = img.get("note_id")
-                    ref = img.get("ref")
-                    if not note_id or not ref:
-                        continue
-
-                    image_rel = img.get("file_path") or f"images/{note_id}/{ref}"
-                    if image_rel not in archive.namelist():
-                        continue
-
-                    target_dir = images_dir / note_id
-                    target_dir.mkdir(parents=True, exist_ok=True)
-                    target_path = target_dir / ref
-
-                    with archive.open(image_rel) as src, open(target_path, "wb") as dst:
-                        shutil.copyfileobj(src, dst)
-
-                    md5 = img.get("md5") or _compute_md5(target_path)
-                    existing_result = await session.execute(
-                        select(NoteImage).where(NoteImage.synology_note_id == note_id).where(NoteImage.ref == ref)
-                    )
-                    existing_img = existing_result.scalar_one_or_none()
-                    if existing_img:
-                        existing_img.md5 = md5
-                        existing_img.name = img.get("name")
-                        existing_img.file_path = str(target_path)
-                        existing_img.mime_type = img.get("mime_type") or existing_img.mime_type
-                        existing_img.width = img.get("width")
-                        existing_img.height = img.get("height")
-                    else:
-                        session.add(
-                            NoteImage(
-                                synology_note_id=note_id,
-                                ref=ref,
-                                name=img.get("name") or ref,
-                                md5=md5,
-                                file_path=str(target_path),
-                                mime_type=img.get("mime_type") or "application/octet-stream",
-                                width=img.get("width"),
-                                height=img.get("height"),
-                            )
-                        )
-
-                for att in attachments_payload:
-                    note_id = att.get("note_id")
-                    file_id = att.get("file_id")
-                    if not note_id or not file_id:
-                        continue
-                    note = note_map.get(note_id)
-                    if not note:
-                        continue
-
-                    att_rel = att.get("file_path") or f"attachments/{file_id}"
-                    if att_rel in archive.namelist():
-                        target_path = uploads_dir / file_id
-                        with archive.open(att_rel) as src, open(target_path, "wb") as dst:
-                            shutil.copyfileobj(src, dst)
-
-                    existing_result = await session.execute(
-                        select(NoteAttachment)
-                        .where(NoteAttachment.note_id == note.id)
-                        .where(NoteAttachment.file_id == file_id)
-                    )
-                    existing_att = existing_result.scalar_one_or_none()
-                    if existing_att:
-                        existing_att.name = att.get("name") or existing_att.name
-                        existing_att.mime_type = att.get("mime_type")
-                        existing_att.size = att.get("size")
-                    else:
-                        session.add(
-                            NoteAttachment(
-                                note_id=note.id,
-                                file_id=file_id,
-                                name=att.get("name") or file_id,
-                                mime_type=att.get("mime_type"),
-                                size=att.get("size"),
-                            )
-                        )
-
-                await session.commit()
-
+        counts = await _restore_native_backup_internal(temp_path)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     finally:
         temp_path.unlink(missing_ok=True)
 
-    return {
-        "status": "imported",
-        "note_count": len(notes_payload),
-        "image_count": len(images_payload),
-        "attachment_count": len(attachments_payload),
-    }
+    return {"status": "imported", **counts}
 
 
 # ---------------------------------------------------------------------------
@@ -508,178 +699,20 @@ async def restore_native_from_server(
             detail="Native backup file not found",
         )
 
-    notes_payload: list[dict] = []
-    images_payload: list[dict] = []
-    attachments_payload: list[dict] = []
-
-    with zipfile.ZipFile(file_path, "r") as archive:
-        if "manifest.json" not in archive.namelist():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid backup: manifest.json missing",
-            )
-
-        if "notes.json" in archive.namelist():
-            notes_payload = json.loads(archive.read("notes.json").decode("utf-8"))
-        if "note_images.json" in archive.namelist():
-            images_payload = json.loads(archive.read("note_images.json").decode("utf-8"))
-        if "note_attachments.json" in archive.namelist():
-            attachments_payload = json.loads(archive.read("note_attachments.json").decode("utf-8"))
-
-        async with async_session_factory() as session:
-            note_map: dict[str, Note] = {}
-            if notes_payload:
-                note_ids = [n.get("note_id") for n in notes_payload if n.get("note_id")]
-                existing_result = await session.execute(select(Note).where(Note.synology_note_id.in_(note_ids)))
-                existing = {note.synology_note_id: note for note in existing_result.scalars().all()}
-
-                for payload in notes_payload:
-                    note_id = payload.get("note_id")
-                    if not note_id:
-                        continue
-
-                    content_html = payload.get("content_html") or ""
-                    content_text = payload.get("content_text") or NoteStationService.extract_text(content_html)
-                    note = existing.get(note_id)
-
-                    if note:
-                        note.title = payload.get("title", "")
-                        note.content_html = content_html
-                        note.content_json = payload.get("content_json")
-                        note.content_text = content_text
-                        note.notebook_name = payload.get("notebook")
-                        note.tags = payload.get("tags")
-                        note.is_todo = bool(payload.get("is_todo"))
-                        note.is_shortcut = bool(payload.get("is_shortcut"))
-                        note.source_created_at = datetime_from_iso(payload.get("source_created_at"))
-                        note.source_updated_at = datetime_from_iso(payload.get("source_updated_at"))
-                        note.synced_at = datetime_from_iso(payload.get("synced_at"))
-                    else:
-                        note = Note(
-                            synology_note_id=note_id,
-                            title=payload.get("title", ""),
-                            content_html=content_html,
-                            content_json=payload.get("content_json"),
-                            content_text=content_text,
-                            notebook_name=payload.get("notebook"),
-                            tags=payload.get("tags"),
-                            is_todo=bool(payload.get("is_todo")),
-                            is_shortcut=bool(payload.get("is_shortcut")),
-                            source_created_at=datetime_from_iso(payload.get("source_created_at")),
-                            source_updated_at=datetime_from_iso(payload.get("source_updated_at")),
-                            synced_at=datetime_from_iso(payload.get("synced_at")),
-                        )
-                        session.add(note)
-                    note_map[note_id] = note
-
-            await session.flush()
-
-            images_dir = Path(settings.NSX_IMAGES_PATH)
-            uploads_dir = Path(settings.UPLOADS_PATH)
-            images_dir.mkdir(parents=True, exist_ok=True)
-            uploads_dir.mkdir(parents=True, exist_ok=True)
-
-            for img in images_payload:
-                note_id = img.get("note_id")
-                ref = img.get("ref")
-                if not note_id or not ref:
-                    continue
-
-                image_rel = img.get("file_path") or f"images/{note_id}/{ref}"
-                if image_rel not in archive.namelist():
-                    continue
-
-                target_dir = images_dir / note_id
-                target_dir.mkdir(parents=True, exist_ok=True)
-                target_path = target_dir / ref
-
-                with archive.open(image_rel) as src, open(target_path, "wb") as dst:
-                    shutil.copyfileobj(src, dst)
-
-                md5 = img.get("md5") or _compute_md5(target_path)
-                existing_result = await session.execute(
-                    select(NoteImage).where(NoteImage.synology_note_id == note_id).where(NoteImage.ref == ref)
-                )
-                existing_img = existing_result.scalar_one_or_none()
-                if existing_img:
-                    existing_img.md5 = md5
-                    existing_img.name = img.get("name")
-                    existing_img.file_path = str(target_path)
-                    existing_img.mime_type = img.get("mime_type") or existing_img.mime_type
-                    existing_img.width = img.get("width")
-                    existing_img.height = img.get("height")
-                else:
-                    session.add(
-                        NoteImage(
-                            synology_note_id=note_id,
-                            ref=ref,
-                            name=img.get("name") or ref,
-                            md5=md5,
-                            file_path=str(target_path),
-                            mime_type=img.get("mime_type") or "application/octet-stream",
-                            width=img.get("width"),
-                            height=img.get("height"),
-                        )
-                    )
-
-            for att in attachments_payload:
-                note_id = att.get("note_id")
-                file_id = att.get("file_id")
-                if not note_id or not file_id:
-                    continue
-                note = note_map.get(note_id)
-                if not note:
-                    continue
-
-                att_rel = att.get("file_path") or f"attachments/{file_id}"
-                if att_rel in archive.namelist():
-                    target_path = uploads_dir / file_id
-                    with archive.open(att_rel) as src, open(target_path, "wb") as dst:
-                        shutil.copyfileobj(src, dst)
-
-                existing_result = await session.execute(
-                    select(NoteAttachment)
-                    .where(NoteAttachment.note_id == note.id)
-                    .where(NoteAttachment.file_id == file_id)
-                )
-                existing_att = existing_result.scalar_one_or_none()
-                if existing_att:
-                    existing_att.name = att.get("name") or existing_att.name
-                    existing_att.mime_type = att.get("mime_type")
-                    existing_att.size = att.get("size")
-                else:
-                    session.add(
-                        NoteAttachment(
-                            note_id=note.id,
-                            file_id=file_id,
-                            name=att.get("name") or file_id,
-                            mime_type=att.get("mime_type"),
-                            size=att.get("size"),
-                        )
-                    )
-
-            await session.commit()
+    try:
+        counts = await _restore_native_backup_internal(file_path)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
     await log_activity(
         "admin",
         "completed",
         message=f"네이티브 백업 복원 (서버): {filename}",
-        details={
-            "filename": filename,
-            "note_count": len(notes_payload),
-            "image_count": len(images_payload),
-            "attachment_count": len(attachments_payload),
-        },
+        details={"filename": filename, **counts},
         triggered_by=get_trigger_name(current_user),
     )
 
-    return {
-        "status": "restored",
-        "filename": filename,
-        "note_count": len(notes_payload),
-        "image_count": len(images_payload),
-        "attachment_count": len(attachments_payload),
-    }
+    return {"status": "restored", "filename": filename, **counts}
 
 
 # ---------------------------------------------------------------------------
@@ -767,164 +800,13 @@ async def restore_full_backup(
             native_error = "No native backup found"
             return
         try:
-            # Call restore_native_from_server logic inline
             file_path = _native_backup_dir() / native_filename
             if not file_path.exists():
                 native_error = "Native backup file not found"
                 return
 
-            notes_payload: list[dict] = []
-            images_payload: list[dict] = []
-            attachments_payload: list[dict] = []
-
-            with zipfile.ZipFile(file_path, "r") as archive:
-                if "manifest.json" not in archive.namelist():
-                    native_error = "Invalid backup: manifest.json missing"
-                    return
-
-                if "notes.json" in archive.namelist():
-                    notes_payload = json.loads(archive.read("notes.json").decode("utf-8"))
-                if "note_images.json" in archive.namelist():
-                    images_payload = json.loads(archive.read("note_images.json").decode("utf-8"))
-                if "note_attachments.json" in archive.namelist():
-                    attachments_payload = json.loads(archive.read("note_attachments.json").decode("utf-8"))
-
-                async with async_session_factory() as session:
-                    note_map: dict[str, Note] = {}
-                    if notes_payload:
-                        note_ids = [n.get("note_id") for n in notes_payload if n.get("note_id")]
-                        existing_result = await session.execute(
-                            select(Note).where(Note.synology_note_id.in_(note_ids))
-                        )
-                        existing = {n.synology_note_id: n for n in existing_result.scalars().all()}
-
-                        for payload in notes_payload:
-                            nid = payload.get("note_id")
-                            if not nid:
-                                continue
-                            content_html = payload.get("content_html") or ""
-                            content_text = payload.get("content_text") or NoteStationService.extract_text(
-                                content_html
-                            )
-                            note = existing.get(nid)
-                            if note:
-                                note.title = payload.get("title", "")
-                                note.content_html = content_html
-                                note.content_json = payload.get("content_json")
-                                note.content_text = content_text
-                                note.notebook_name = payload.get("notebook")
-                                note.tags = payload.get("tags")
-                                note.is_todo = bool(payload.get("is_todo"))
-                                note.is_shortcut = bool(payload.get("is_shortcut"))
-                                note.source_created_at = datetime_from_iso(payload.get("source_created_at"))
-                                note.source_updated_at = datetime_from_iso(payload.get("source_updated_at"))
-                                note.synced_at = datetime_from_iso(payload.get("synced_at"))
-                            else:
-                                note = Note(
-                                    synology_note_id=nid,
-                                    title=payload.get("title", ""),
-                                    content_html=content_html,
-                                    content_json=payload.get("content_json"),
-                                    content_text=content_text,
-                                    notebook_name=payload.get("notebook"),
-                                    tags=payload.get("tags"),
-                                    is_todo=bool(payload.get("is_todo")),
-                                    is_shortcut=bool(payload.get("is_shortcut")),
-                                    source_created_at=datetime_from_iso(payload.get("source_created_at")),
-                                    source_updated_at=datetime_from_iso(payload.get("source_updated_at")),
-                                    synced_at=datetime_from_iso(payload.get("synced_at")),
-                                )
-                                session.add(note)
-                            note_map[nid] = note
-
-                    await session.flush()
-
-                    images_dir = Path(settings.NSX_IMAGES_PATH)
-                    uploads_dir = Path(settings.UPLOADS_PATH)
-                    images_dir.mkdir(parents=True, exist_ok=True)
-                    uploads_dir.mkdir(parents=True, exist_ok=True)
-
-                    for img in images_payload:
-                        nid = img.get("note_id")
-                        ref = img.get("ref")
-                        if not nid or not ref:
-                            continue
-                        image_rel = img.get("file_path") or f"images/{nid}/{ref}"
-                        if image_rel not in archive.namelist():
-                            continue
-                        target_dir = images_dir / nid
-                        target_dir.mkdir(parents=True, exist_ok=True)
-                        target_path = target_dir / ref
-                        with archive.open(image_rel) as src, open(target_path, "wb") as dst:
-                            shutil.copyfileobj(src, dst)
-                        md5 = img.get("md5") or _compute_md5(target_path)
-                        er = await session.execute(
-                            select(NoteImage).where(NoteImage.synology_note_id == nid).where(NoteImage.ref == ref)
-                        )
-                        ei = er.scalar_one_or_none()
-                        if ei:
-                            ei.md5 = md5
-                            ei.name = img.get("name")
-                            ei.file_path = str(target_path)
-                            ei.mime_type = img.get("mime_type") or ei.mime_type
-                            ei.width = img.get("width")
-                            ei.height = img.get("height")
-                        else:
-                            session.add(
-                                NoteImage(
-                                    synology_note_id=nid,
-                                    ref=ref,
-                                    name=img.get("name") or ref,
-                                    md5=md5,
-                                    file_path=str(target_path),
-                                    mime_type=img.get("mime_type") or "application/octet-stream",
-                                    width=img.get("width"),
-                                    height=img.get("height"),
-                                )
-                            )
-
-                    for att in attachments_payload:
-                        nid = att.get("note_id")
-                        fid = att.get("file_id")
-                        if not nid or not fid:
-                            continue
-                        note = note_map.get(nid)
-                        if not note:
-                            continue
-                        att_rel = att.get("file_path") or f"attachments/{fid}"
-                        if att_rel in archive.namelist():
-                            tp = uploads_dir / fid
-                            with archive.open(att_rel) as src, open(tp, "wb") as dst:
-                                shutil.copyfileobj(src, dst)
-                        er = await session.execute(
-                            select(NoteAttachment)
-                            .where(NoteAttachment.note_id == note.id)
-                            .where(NoteAttachment.file_id == fid)
-                        )
-                        ea = er.scalar_one_or_none()
-                        if ea:
-                            ea.name = att.get("name") or ea.name
-                            ea.mime_type = att.get("mime_type")
-                            ea.size = att.get("size")
-                        else:
-                            session.add(
-                                NoteAttachment(
-                                    note_id=note.id,
-                                    file_id=fid,
-                                    name=att.get("name") or fid,
-                                    mime_type=att.get("mime_type"),
-                                    size=att.get("size"),
-                                )
-                            )
-
-                    await session.commit()
-
-            native_result = {
-                "filename": native_filename,
-                "note_count": len(notes_payload),
-                "image_count": len(images_payload),
-                "attachment_count": len(attachments_payload),
-            }
+            counts = await _restore_native_backup_internal(file_path)
+            native_result = {"filename": native_filename, **counts}
 
             await log_activity(
                 "admin",
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Annotated
 
@@ -8,10 +9,12 @@ from pydantic import BaseModel
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import Note, Notebook, NoteCluster, NoteEmbedding
+from app.database import async_session_factory, get_db, get_read_db
+from app.models import Note, Notebook, NoteCluster, NotebookNoteDay
 from app.services.auth_service import get_current_user
 from app.services.clustering import get_cached_clusters
+from app.services.graph_service import compute_similarity_edges, fetch_note_centroids
+from app.services.job_queue import JobContext, job_handler
 from app.services.notebook_access_control import check_notebook_access
 from app.services.rediscovery import RediscoveryService
 from app.tasks.clustering import (
@@ -40,6 +43,7 @@ class ClusterStatusResponse(BaseModel):
     status: str
     error_message: str | None = None
     clusters: list[dict] | None = None
+    timings: dict | None = None
 
 
 class GraphNode(BaseModel):
@@ -92,7 +96,7 @@ async def trigger_clustering(
     if not notebook:
         raise HTTPException(status_code=404, detail="Notebook not found")
 
-    if not await check_notebook_access(db, current_user["id"], request.notebook_id):
+    if not await check_notebook_access(db, current_user["user_id"], request.notebook_id):
         raise HTTPException(status_code=403, detail="Access denied")
 
     if request.num_clusters < 2 or request.num_clusters > 20:
@@ -127,6 +131,7 @@ async def get_clustering_status(
         task_id=task_id,
         status=task.status,
         error_message=task.error_message,
+        timings=task.timings,
     )
 
     if task.status == "completed":
@@ -150,14 +155,17 @@ async def get_clustering_status(
 @router.get("/graph", response_model=GraphDataResponse)
 async def get_graph_data(
     notebook_id: int,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     current_user: Annotated[dict, Depends(get_current_user)],
+    limit: int = Query(default=300, ge=2, le=5000),
+    similarity_threshold: float = Query(default=0.4, ge=0.3, le=0.95),
+    neighbors_per_note: int = Query(default=5, ge=1, le=20),
 ) -> GraphDataResponse:
     notebook = await db.get(Notebook, notebook_id)
     if not notebook:
         raise HTTPException(status_code=404, detail="Notebook not found")
 
-    if not await check_notebook_access(db, current_user["id"], notebook_id):
+    if not await check_notebook_access(db, current_user["user_id"], notebook_id):
         raise HTTPException(status_code=403, detail="Access denied")
 
     cached = await get_cached_clusters(db, notebook_id)
@@ -170,7 +178,12 @@ async def get_graph_data(
             for note_id in cluster.note_ids:
                 note_to_cluster[note_id] = cluster.cluster_index
 
-    notes_query = select(Note.id, Note.title).where(Note.notebook_id == notebook_id).limit(50)
+    notes_query = (
+        select(Note.id, Note.title)
+        .where(Note.notebook_id == notebook_id)
+        .order_by(Note.updated_at.desc())
+        .limit(limit)
+    )
     result = await db.execute(notes_query)
     notes = result.all()
 
@@ -191,45 +204,20 @@ async def get_graph_data(
                 for nid2 in cluster_notes[i + 1 :]:
                     links.append(GraphLink(source=nid1, target=nid2, weight=0.5))
 
-    # Add similarity-based edges from embeddings
+    # Add similarity-based edges from per-note centroid embeddings
     if len(nodes) > 1:
-        node_ids_list = [n.id for n in nodes]
         try:
-            import numpy as np
-
-            emb_stmt = (
-                select(NoteEmbedding.note_id, NoteEmbedding.embedding)
-                .where(NoteEmbedding.note_id.in_(node_ids_list))
+            centroids = await fetch_note_centroids(db, [n.id for n in nodes])
+            existing_edges = {(min(lk.source, lk.target), max(lk.source, lk.target)) for lk in links}
+            edges = await asyncio.to_thread(
+                compute_similarity_edges,
+                list(centroids),
+                list(centroids.values()),
+                similarity_threshold,
+                neighbors_per_note,
+                existing_edges,
             )
-            emb_result = await db.execute(emb_stmt)
-            emb_rows = emb_result.all()
-
-            # Average embeddings per note (for multi-chunk)
-            note_vectors: dict[int, list] = {}
-            for nid, emb in emb_rows:
-                note_vectors.setdefault(nid, []).append(np.array(emb, dtype=np.float32))
-
-            centroids: dict[int, np.ndarray] = {}
-            for nid, vecs in note_vectors.items():
-                centroids[nid] = np.mean(vecs, axis=0)
-
-            # Compute pairwise cosine similarities
-            existing_edges = {(lk.source, lk.target) for lk in links} | {(lk.target, lk.source) for lk in links}
-            centroid_ids = list(centroids.keys())
-            sim_threshold = 0.4
-
-            for i, nid1 in enumerate(centroid_ids):
-                for nid2 in centroid_ids[i + 1 :]:
-                    if (nid1, nid2) in existing_edges:
-                        continue
-                    v1, v2 = centroids[nid1], centroids[nid2]
-                    dot = float(np.dot(v1, v2))
-                    norm = float(np.linalg.norm(v1) * np.linalg.norm(v2))
-                    if norm == 0:
-                        continue
-                    similarity = dot / norm
-                    if similarity >= sim_threshold:
-                        links.append(GraphLink(source=nid1, target=nid2, weight=round(similarity, 3)))
+            links.extend(GraphLink(source=src, target=tgt, weight=round(sim, 3)) for src, tgt, sim in edges)
         except Exception:
             logger.debug("Could not compute similarity edges", exc_info=True)
 
@@ -239,29 +227,26 @@ async def get_graph_data(
 @router.get("/timeline", response_model=TimelineResponse)
 async def get_timeline(
     notebook_id: int,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     current_user: Annotated[dict, Depends(get_current_user)],
 ) -> TimelineResponse:
     notebook = await db.get(Notebook, notebook_id)
     if not notebook:
         raise HTTPException(status_code=404, detail="Notebook not found")
 
-    if not await check_notebook_access(db, current_user["id"], notebook_id):
+    if not await check_notebook_access(db, current_user["user_id"], notebook_id):
         raise HTTPException(status_code=403, detail="Access denied")
 
+    # Per-day counts are maintained by a trigger on notes (notebook_note_days)
     query = (
-        select(
-            func.date_trunc("day", Note.created_at).label("day"),
-            func.count(Note.id).label("count"),
-        )
-        .where(Note.notebook_id == notebook_id)
-        .group_by(func.date_trunc("day", Note.created_at))
-        .order_by(func.date_trunc("day", Note.created_at))
+        select(NotebookNoteDay.day, NotebookNoteDay.count)
+        .where(NotebookNoteDay.notebook_id == notebook_id, NotebookNoteDay.count > 0)
+        .order_by(NotebookNoteDay.day)
     )
     result = await db.execute(query)
     rows = result.all()
 
-    entries = [TimelineEntry(date=row.day.strftime("%Y-%m-%d"), count=row.count) for row in rows if row.day]
+    entries = [TimelineEntry(date=row.day.strftime("%Y-%m-%d"), count=row.count) for row in rows]
 
     return TimelineResponse(entries=entries)
 
@@ -273,15 +258,21 @@ async def get_rediscovery(
     limit: int = Query(default=5, ge=1, le=20),
     days_threshold: int = Query(default=30, ge=7, le=365),
 ) -> RediscoveryResponse:
-    """Return forgotten notes that are relevant to recent work."""
+    """Return forgotten notes that are relevant to recent work.
+
+    Samples the user's cached pool; a stale pool is rebuilt by the
+    ``rediscovery_pool`` job.
+    """
     service = RediscoveryService(db)
     try:
         items = await service.get_rediscoveries(
+            current_user["user_id"],
             limit=limit,
             days_threshold=days_threshold,
         )
     except Exception:
         logger.exception("Rediscovery query failed")
+        await db.rollback()
         return RediscoveryResponse(items=[])
 
     return RediscoveryResponse(
@@ -297,3 +288,11 @@ async def get_rediscovery(
             for item in items
         ]
     )
+
+
+@job_handler("rediscovery_pool")
+async def _rediscovery_pool_job(ctx: JobContext) -> dict:
+    """Rebuild one user's rediscovery candidate pool."""
+    async with async_session_factory() as db:
+        candidates = await RediscoveryService(db).refresh_pool(ctx.payload["user_id"])
+    return {"candidates": candidates}
@@ -3,8 +3,7 @@
 
 from __future__ import annotations
 
-import json
-import zipfile
+import asyncio
 from datetime import UTC, datetime
 from pathlib import Path
 
@@ -17,88 +16,114 @@ from app.config import get_settings
 from app.database import get_db
 from app.models import Note, NoteAttachment, NoteImage
 from app.services.auth_service import get_current_user
+from app.services.backup_archive import ArchiveWriter, stream_rows
 from app.utils.datetime_utils import datetime_to_iso
 
 router = APIRouter(tags=["export"])
 settings = get_settings()
 
 
+def _note_record(row) -> dict:
+    return {
+        "note_id": row.synology_note_id,
+        "title": row.title,
+        "content_html": row.content_html,
+        "content_text": row.content_text,
+        "notebook": row.notebook_name,
+        "tags": row.tags,
+        "is_todo": row.is_todo,
+        "source_created_at": datetime_to_iso(row.source_created_at),
+        "source_updated_at": datetime_to_iso(row.source_updated_at),
+        "synced_at": datetime_to_iso(row.synced_at),
+        "created_at": datetime_to_iso(row.created_at),
+        "updated_at": datetime_to_iso(row.updated_at),
+    }
+
+
+def _image_record(row) -> dict:
+    return {
+        "note_id": row.synology_note_id,
+        "ref": row.ref,
+        "name": row.name,
+        "md5": row.md5,
+        "file_path": row.file_path,
+        "mime_type": row.mime_type,
+        "width": row.width,
+        "height": row.height,
+        "created_at": datetime_to_iso(row.created_at),
+    }
+
+
+def _attachment_record(row) -> dict:
+    return {
+        "note_id": row.note_id,
+        "file_id": row.file_id,
+        "name": row.name,
+        "mime_type": row.mime_type,
+        "size": row.size,
+        "created_at": datetime_to_iso(row.created_at),
+    }
+
+
 @router.get("/export/notes")
 async def export_notes(
     current_user: dict = Depends(get_current_user),  # noqa: B008
     db: AsyncSession = Depends(get_db),  # noqa: B008
 ) -> FileResponse:
-    """Export notes and extracted images as a ZIP archive."""
+    """Export notes and extracted images as a ZIP archive.
+
+    Records are streamed into ``notes.jsonl``, ``note_images.jsonl`` and
+    ``note_attachments.jsonl`` (one JSON object per line).
+    """
     export_dir = Path(settings.NSX_EXPORTS_PATH) / "exports"
     export_dir.mkdir(parents=True, exist_ok=True)
 
     timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
     zip_path = export_dir / f"notes_export_{timestamp}.zip"
 
-    notes_result = await db.execute(select(Note))
-    notes = notes_result.scalars().all()
-
-    images_result = await db.execute(select(NoteImage))
-    images = images_result.scalars().all()
-
-    attachments_result = await db.execute(select(NoteAttachment))
-    attachments = attachments_result.scalars().all()
-
-    notes_payload = [
-        {
-            "note_id": note.synology_note_id,
-            "title": note.title,
-            "content_html": note.content_html,
-            "content_text": note.content_text,
-            "notebook": note.notebook_name,
-            "tags": note.tags,
-            "is_todo": note.is_todo,
-            "source_created_at": datetime_to_iso(note.source_created_at),
-            "source_updated_at": datetime_to_iso(note.source_updated_at),
-            "synced_at": datetime_to_iso(note.synced_at),
-            "created_at": datetime_to_iso(note.created_at),
-            "updated_at": datetime_to_iso(note.updated_at),
-        }
-        for note in notes
-    ]
-
-    images_payload = [
-        {
-            "note_id": image.synology_note_id,
-            "ref": image.ref,
-            "name": image.name,
-            "md5": image.md5,
-            "file_path": image.file_path,
-            "mime_type": image.mime_type,
-            "width": image.width,
-            "height": image.height,
-            "created_at": datetime_to_iso(image.created_at),
-        }
-        for image in images
-    ]
-
-    attachments_payload = [
-        {
-            "note_id": att.note_id,
-            "file_id": att.file_id,
-            "name": att.name,
-            "mime_type": att.mime_type,
-            "size": att.size,
-            "created_at": datetime_to_iso(att.created_at),
-        }
-        for att in attachments
-    ]
-
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        archive.writestr("notes.json", json.dumps(notes_payload, ensure_ascii=False, indent=2))
-        archive.writestr("note_images.json", json.dumps(images_payload, ensure_ascii=False, indent=2))
-        archive.writestr("note_attachments.json", json.dumps(attachments_payload, ensure_ascii=False, indent=2))
+    notes_stmt = select(
+        Note.synology_note_id,
+        Note.title,
+        Note.content_html,
+        Note.content_text,
+        Note.notebook_name,
+        Note.tags,
+        Note.is_todo,
+        Note.source_created_at,
+        Note.source_updated_at,
+        Note.synced_at,
+        Note.created_at,
+        Note.updated_at,
+    ).order_by(Note.id)
+    images_stmt = select(
+        NoteImage.synology_note_id,
+        NoteImage.ref,
+        NoteImage.name,
+        NoteImage.md5,
+        NoteImage.file_path,
+        NoteImage.mime_type,
+        NoteImage.width,
+        NoteImage.height,
+        NoteImage.created_at,
+    ).order_by(NoteImage.id)
+    attachments_stmt = select(
+        NoteAttachment.note_id,
+        NoteAttachment.file_id,
+        NoteAttachment.name,
+        NoteAttachment.mime_type,
+        NoteAttachment.size,
+        NoteAttachment.created_at,
+    ).order_by(NoteAttachment.id)
+
+    async with ArchiveWriter(zip_path) as writer:
+        await writer.write_records("notes", stream_rows(db, notes_stmt), _note_record)
+        await writer.write_records("note_images", stream_rows(db, images_stmt), _image_record)
+        await writer.write_records("note_attachments", stream_rows(db, attachments_stmt), _attachment_record)
 
         uploads_dir = Path(settings.UPLOADS_PATH)
         if uploads_dir.exists():
-            for file_path in uploads_dir.iterdir():
-                if file_path.is_file():
-                    archive.write(file_path, arcname=f"uploads/{file_path.name}")
+            uploads = await asyncio.to_thread(lambda: [p for p in uploads_dir.iterdir() if p.is_file()])
+            await writer.write_files((path, f"uploads/{path.name}") for path in uploads)
 
     return FileResponse(
         path=zip_path,
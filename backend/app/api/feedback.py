@@ -5,7 +5,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.admin import require_admin
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.services.auth_service import get_current_user
 from app.services.feedback_service import feedback_service
 
@@ -78,7 +78,7 @@ async def submit_ai_feedback(
 async def get_feedback_summary(
     period: str = Query("30d", pattern="^(7d|30d|90d)$"),  # noqa: B008
     admin: dict = Depends(require_admin),  # noqa: B008
-    db: AsyncSession = Depends(get_db),  # noqa: B008
+    db: AsyncSession = Depends(get_read_db),  # noqa: B008
 ) -> dict:
     """Get aggregated feedback summary (admin only)."""
     return await feedback_service.get_feedback_summary(db, period=period)
@@ -87,7 +87,7 @@ async def get_feedback_summary(
 @router.get("/optimization")
 async def get_feedback_optimization(
     admin: dict = Depends(require_admin),  # noqa: B008
-    db: AsyncSession = Depends(get_db),  # noqa: B008
+    db: AsyncSession = Depends(get_read_db),  # noqa: B008
 ) -> dict:
     """Get recommended search params based on feedback data (admin only)."""
     return await feedback_service.compute_optimal_params(db)
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import mimetypes
 from datetime import UTC, datetime
@@ -19,6 +20,7 @@ from app.database import get_db
 from app.models import NoteAttachment, NoteImage
 from app.services.activity_log import get_trigger_name, log_activity
 from app.services.auth_service import get_current_user
+from app.services.blob_store import get_blob_store, register_refs
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,7 @@ _WORD_EXTENSIONS = {".docx", ".doc"}
 async def upload_file(
     file: UploadFile = File(..., description="Attachment file"),  # noqa: B008
     current_user: dict = Depends(get_current_user),  # noqa: B008
+    db: AsyncSession = Depends(get_db),  # noqa: B008
 ) -> dict:
     """Upload a file and return its API URL."""
     if not file.filename:
@@ -62,6 +65,11 @@ async def upload_file(
             detail=f"File upload failed: {exc}",
         ) from exc
 
+    # Move the upload into the deduplicated blob store (path stays the same)
+    stored = await asyncio.to_thread(get_blob_store().adopt, target_path)
+    await register_refs(db, [stored])
+    await db.commit()
+
     await log_activity(
         "note",
         "completed",
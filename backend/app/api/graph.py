@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import delete as sa_delete
@@ -12,10 +14,12 @@ from sqlalchemy import func as sa_func
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import GraphInsight, Note, Notebook
+from app.services.access_scope import ensure_access_scope
 from app.services.auth_service import get_current_user
 from app.services.graph_service import compute_graph_analysis
+from app.services.graph_snapshot import load_graph_snapshot, snapshot_edges
 from app.utils.i18n import get_language
 from app.utils.messages import msg
 
@@ -52,30 +56,32 @@ class GlobalGraphResponse(BaseModel):
     analysis: dict[str, Any] | None = None
 
 
-@router.get("", response_model=GlobalGraphResponse)
-async def get_global_graph(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[dict, Depends(get_current_user)],
-    limit: int = Query(200, ge=0, le=5000, description="0 = all indexed notes"),
-    similarity_threshold: float = Query(0.5, ge=0.3, le=0.95),
-    neighbors_per_note: int = Query(5, ge=1, le=20),
-    max_edges: int = Query(0, ge=0, le=10000, description="0 = auto (nodes×3, cap 10000)"),
-    include_analysis: bool = Query(False),
-) -> GlobalGraphResponse:
-    """Get global note graph with similarity-based links.
-
-    Uses the pre-computed note_avg_embeddings materialized view with
-    LATERAL JOIN for efficient top-K neighbor lookups per note.
-
-    Parameters:
-        limit: Number of nodes (0 = all indexed notes, up to 5000).
-        similarity_threshold: Minimum cosine similarity for a link.
-        neighbors_per_note: Max neighbors per note (LATERAL JOIN K).
-        max_edges: Hard cap on edges (0 = auto = nodes×3, cap 10000).
-        include_analysis: Include graph analysis (hub notes, orphans, stats).
+# Links per ``links`` event in /graph/stream.
+_LINK_CHUNK_SIZE = 2000
+# Analyses of snapshot-backed graphs, keyed by ETag.
+_ANALYSIS_CACHE_SIZE = 8
+_analysis_cache: dict[str, dict[str, Any]] = {}
+
+
+async def _build_global_graph(
+    db: AsyncSession,
+    if_none_match: str | None,
+    limit: int,
+    similarity_threshold: float,
+    neighbors_per_note: int,
+    max_edges: int,
+    include_analysis: bool,
+) -> tuple[GlobalGraphResponse | None, str | None]:
+    """Assemble the global graph; return ``(graph, etag)``.
+
+    ``limit=0`` is served from the latest graph snapshot when one exists
+    (see services/graph_snapshot.py) and carries an ETag; ``graph`` is
+    ``None`` when it matches ``if_none_match``.  Other limits query the
+    neighbours within the selected notes live.  Links are strongest first.
     """
-    total_result = await db.execute(text("SELECT COUNT(*) FROM notes"))
-    total_notes = total_result.scalar() or 0
+    counts = await db.execute(text("SELECT COUNT(*), MAX(updated_at) FROM notes"))
+    total_notes, notes_updated_at = counts.one()
+    total_notes = total_notes or 0
 
     try:
         indexed_result = await db.execute(text("SELECT COUNT(*) FROM note_avg_embeddings"))
@@ -85,7 +91,18 @@ async def get_global_graph(
         await db.rollback()
         return GlobalGraphResponse(
             nodes=[], links=[], total_notes=total_notes, indexed_notes=0, analysis=None,
+        ), None
+
+    snapshot = await load_graph_snapshot(db) if limit == 0 else None
+    etag = None
+    if snapshot is not None:
+        key = (
+            f"{snapshot.version}:{neighbors_per_note}:{similarity_threshold}:{max_edges}:"
+            f"{int(include_analysis)}:{total_notes}:{indexed_notes}:{notes_updated_at}"
         )
+        etag = f'W/"graph-{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+        if if_none_match == etag:
+            return None, etag
 
     # Fetch nodes: limit=0 means all indexed notes
     notes_query = (
@@ -111,19 +128,55 @@ async def get_global_graph(
     ]
 
     node_ids = [n.id for n in nodes]
+    # Compute edge cap
+    edge_cap = max_edges if max_edges > 0 else min(len(node_ids) * 3, 10000)
+
     if len(node_ids) < 2:
-        empty_analysis = compute_graph_analysis([n.model_dump() for n in nodes], []) if include_analysis else None
-        return GlobalGraphResponse(
-            nodes=nodes,
-            links=[],
-            total_notes=total_notes,
-            indexed_notes=indexed_notes,
-            analysis=empty_analysis,
+        links: list[GraphLink] = []
+    elif snapshot is not None:
+        edges = await asyncio.to_thread(
+            snapshot_edges, snapshot, neighbors_per_note, similarity_threshold, edge_cap, node_ids
+        )
+        logger.info("Graph snapshot v%d: %d nodes, %d links", snapshot.version, len(node_ids), len(edges))
+        links = [GraphLink(source=src, target=tgt, weight=sim) for src, tgt, sim in edges]
+    else:
+        links = await _query_similarity_links(
+            db, node_ids, limit, similarity_threshold, neighbors_per_note, edge_cap
         )
 
-    # Compute edge cap
-    edge_cap = max_edges if max_edges > 0 else min(len(node_ids) * 3, 10000)
+    # Compute analysis if requested
+    analysis = None
+    if include_analysis:
+        analysis = _analysis_cache.get(etag) if etag else None
+        if analysis is None:
+            analysis = await asyncio.to_thread(
+                compute_graph_analysis,
+                [n.model_dump() for n in nodes],
+                [link.model_dump() for link in links],
+            )
+            if etag:
+                if len(_analysis_cache) >= _ANALYSIS_CACHE_SIZE:
+                    _analysis_cache.pop(next(iter(_analysis_cache)))
+                _analysis_cache[etag] = analysis
 
+    return GlobalGraphResponse(
+        nodes=nodes,
+        links=links,
+        total_notes=total_notes,
+        indexed_notes=indexed_notes,
+        analysis=analysis,
+    ), etag
+
+
+async def _query_similarity_links(
+    db: AsyncSession,
+    node_ids: list[int],
+    limit: int,
+    similarity_threshold: float,
+    neighbors_per_note: int,
+    edge_cap: int,
+) -> list[GraphLink]:
+    """Top-K neighbour links via LATERAL JOIN on note_avg_embeddings."""
     # LATERAL JOIN: top-K neighbors per note using IVFFlat index
     # When limit=0, node_ids == entire note_avg_embeddings table, so the
     # ANY(:node_ids) filter is redundant and prevents IVFFlat index usage.
@@ -194,27 +247,107 @@ async def get_global_graph(
         sim_result = await db.execute(similarity_query, query_params)
         similarities = sim_result.all()
         logger.info("Found %d similarity links", len(similarities))
-
-        links = [GraphLink(source=src, target=tgt, weight=round(float(sim), 4)) for src, tgt, sim in similarities]
     except Exception as e:
         logger.error("Similarity query failed: %s", e, exc_info=True)
-        links = []
+        return []
 
-    # Compute analysis if requested
-    analysis = None
-    if include_analysis:
-        analysis = compute_graph_analysis(
-            [n.model_dump() for n in nodes],
-            [link.model_dump() for link in links],
-        )
+    links = [GraphLink(source=src, target=tgt, weight=round(float(sim), 4)) for src, tgt, sim in similarities]
+    links.sort(key=lambda link: link.weight, reverse=True)
+    return links
 
-    return GlobalGraphResponse(
-        nodes=nodes,
-        links=links,
-        total_notes=total_notes,
-        indexed_notes=indexed_notes,
-        analysis=analysis,
+
+@router.get("", response_model=GlobalGraphResponse)
+async def get_global_graph(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[dict, Depends(get_current_user)],
+    limit: int = Query(200, ge=0, le=5000, description="0 = all indexed notes"),
+    similarity_threshold: float = Query(0.5, ge=0.3, le=0.95),
+    neighbors_per_note: int = Query(5, ge=1, le=20),
+    max_edges: int = Query(0, ge=0, le=10000, description="0 = auto (nodes×3, cap 10000)"),
+    include_analysis: bool = Query(False),
+):
+    """Get global note graph with similarity-based links.
+
+    ``limit=0`` is cut from the precomputed graph snapshot and supports
+    ``If-None-Match``; smaller graphs use a LATERAL JOIN over the
+    note_avg_embeddings materialized view for top-K neighbor lookups.
+
+    Parameters:
+        limit: Number of nodes (0 = all indexed notes, up to 5000).
+        similarity_threshold: Minimum cosine similarity for a link.
+        neighbors_per_note: Max neighbors per note (LATERAL JOIN K).
+        max_edges: Hard cap on edges (0 = auto = nodes×3, cap 10000).
+        include_analysis: Include graph analysis (hub notes, orphans, stats).
+    """
+    graph, etag = await _build_global_graph(
+        db,
+        request.headers.get("if-none-match"),
+        limit,
+        similarity_threshold,
+        neighbors_per_note,
+        max_edges,
+        include_analysis,
+    )
+    if graph is None:
+        return Response(status_code=304, headers={"ETag": etag})
+    if etag:
+        response.headers["ETag"] = etag
+    return graph
+
+
+@router.get("/stream")
+async def stream_global_graph(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[dict, Depends(get_current_user)],
+    limit: int = Query(0, ge=0, le=5000, description="0 = all indexed notes"),
+    similarity_threshold: float = Query(0.5, ge=0.3, le=0.95),
+    neighbors_per_note: int = Query(5, ge=1, le=20),
+    max_edges: int = Query(0, ge=0, le=10000, description="0 = auto (nodes×3, cap 10000)"),
+    include_analysis: bool = Query(False),
+):
+    """Stream the global graph progressively as SSE.
+
+    Same parameters and ETag handling as ``GET /graph``.
+
+    SSE format:
+        event: nodes     -> { nodes, total_notes, indexed_notes }
+        event: links     -> { links } (strongest first, in chunks)
+        event: analysis  -> analysis dict (if requested)
+        data: [DONE]     -> stream end
+    """
+    graph, etag = await _build_global_graph(
+        db,
+        request.headers.get("if-none-match"),
+        limit,
+        similarity_threshold,
+        neighbors_per_note,
+        max_edges,
+        include_analysis,
     )
+    if graph is None:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    async def event_generator():
+        head = {
+            "nodes": [n.model_dump() for n in graph.nodes],
+            "total_notes": graph.total_notes,
+            "indexed_notes": graph.indexed_notes,
+        }
+        yield f"event: nodes\ndata: {json.dumps(head, ensure_ascii=False)}\n\n"
+        for start in range(0, len(graph.links), _LINK_CHUNK_SIZE):
+            chunk = [link.model_dump() for link in graph.links[start : start + _LINK_CHUNK_SIZE]]
+            yield f"event: links\ndata: {json.dumps({'links': chunk})}\n\n"
+        if graph.analysis is not None:
+            yield f"event: analysis\ndata: {json.dumps(graph.analysis, ensure_ascii=False)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if etag:
+        headers["ETag"] = etag
+    return StreamingResponse(event_generator(), media_type="text/event-stream", headers=headers)
 
 
 # ---------------------------------------------------------------------------
@@ -236,7 +369,7 @@ class GraphSearchResponse(BaseModel):
 
 @router.get("/search", response_model=GraphSearchResponse)
 async def graph_search(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     current_user: Annotated[dict, Depends(get_current_user)],
     q: str = Query(..., min_length=1),
     limit: int = Query(50, ge=1, le=200),
@@ -271,15 +404,18 @@ async def graph_search(
     username = current_user.get("username", "")
     api_key = await _get_openai_api_key(db, username)
 
-    fts = FullTextSearchEngine(session=db)
-    trigram = TrigramSearchEngine(session=db)
+    user_id = current_user.get("user_id")
+    if user_id is not None:
+        await ensure_access_scope(db, user_id)
+    fts = FullTextSearchEngine(session=db, reader_id=user_id)
+    trigram = TrigramSearchEngine(session=db, reader_id=user_id)
 
     if search_type in ("hybrid", "semantic") and api_key:
         embedding_service = EmbeddingService(
             api_key=api_key,
             model=settings.EMBEDDING_MODEL,
         )
-        semantic = SemanticSearchEngine(session=db, embedding_service=embedding_service)
+        semantic = SemanticSearchEngine(session=db, embedding_service=embedding_service, reader_id=user_id)
         engine = HybridSearchEngine(fts_engine=fts, semantic_engine=semantic) if search_type == "hybrid" else semantic
     else:
         # Fallback: FTS + Trigram unified search (works without embeddings)
@@ -343,6 +479,8 @@ async def cluster_insight(
     """
     from app.ai_router.prompts import cluster_insight as ci_prompt
     from app.ai_router.schemas import AIRequest
+    from app.ai_router.streaming import coalesce_chunks, to_sse
+    from app.config import get_settings
     from app.api.ai import _inject_oauth_if_available, get_ai_router
     from app.services.oauth_service import OAuthService
 
@@ -430,8 +568,14 @@ async def cluster_insight(
         yield f"event: metadata\ndata: {meta}\n\n"
 
         try:
-            async for sse_line in effective_router.stream(ai_request):
-                yield sse_line
+            settings = get_settings()
+            events = coalesce_chunks(
+                effective_router.stream_events(ai_request),
+                max_delay=settings.AI_STREAM_COALESCE_MS / 1000,
+                max_chars=settings.AI_STREAM_COALESCE_CHARS,
+            )
+            async for event in events:
+                yield to_sse(event)
         except Exception as exc:
             logger.error("Cluster insight stream error: %s", exc, exc_info=True)
             yield f"event: error\ndata: {exc!s}\n\n"
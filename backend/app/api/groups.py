@@ -253,10 +253,16 @@ async def list_groups_endpoint(
     """List all groups in the organization."""
     groups = await list_groups(db, current_user["org_id"])
 
-    items: list[GroupResponse] = []
-    for g in groups:
-        count = await _count_group_members(db, g.id)
-        items.append(_group_to_response(g, member_count=count))
+    counts: dict[int, int] = {}
+    if groups:
+        count_result = await db.execute(
+            select(MemberGroupMembership.group_id, func.count(MemberGroupMembership.id))
+            .where(MemberGroupMembership.group_id.in_([g.id for g in groups]))
+            .group_by(MemberGroupMembership.group_id)
+        )
+        counts = dict(count_result.tuples().all())
+
+    items = [_group_to_response(g, member_count=counts.get(g.id, 0)) for g in groups]
 
     return GroupListResponse(groups=items, total=len(items))
 
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
 from datetime import UTC, datetime
 
@@ -10,6 +9,17 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 
 from app.services.image_analysis_service import ImageAnalysisService
+from app.services.job_queue import (
+    ACTIVE_STATUSES,
+    JobContext,
+    JobError,
+    apply_progress,
+    get_active_job,
+    get_latest_job,
+    job_handler,
+    request_cancel,
+    submit_job,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,22 +27,22 @@ router = APIRouter(prefix="/image-analysis", tags=["image-analysis"])
 
 
 class ImageAnalysisState:
-    """In-memory state tracker for batch processing progress."""
+    """Batch processing progress, mirrored into the ``image_analysis`` job."""
 
     def __init__(self) -> None:
         self.status: str = "idle"  # idle | processing | completed | error | cancelled
+        self.phase: str | None = None  # analyzing | reindexing
         self.total: int = 0
         self.processed: int = 0
         self.ocr_done: int = 0
         self.vision_done: int = 0
         self.failed: int = 0
+        self.reindex_total: int = 0
+        self.reindexed: int = 0
+        self.reindex_failed: int = 0
         self.error_message: str | None = None
         self.started_at: str | None = None
         self.completed_at: str | None = None
-        self.cancel_requested: bool = False
-
-
-_state = ImageAnalysisState()
 
 
 class TriggerResponse(BaseModel):
@@ -42,11 +52,15 @@ class TriggerResponse(BaseModel):
 
 class StatusResponse(BaseModel):
     status: str
+    phase: str | None = None
     total: int
     processed: int
     ocr_done: int
     vision_done: int
     failed: int
+    reindex_total: int = 0
+    reindexed: int = 0
+    reindex_failed: int = 0
     error_message: str | None = None
     started_at: str | None = None
     completed_at: str | None = None
@@ -68,7 +82,8 @@ async def trigger_analysis():
 
     Returns 409 if already processing.
     """
-    if _state.status == "processing":
+    active = await get_active_job("image_analysis")
+    if active is not None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Batch analysis is already in progress.",
@@ -85,20 +100,20 @@ async def trigger_analysis():
             message="All images are already processed.",
         )
 
-    # Reset state
-    _state.status = "processing"
-    _state.total = stats["total"]
-    _state.processed = 0
-    _state.ocr_done = 0
-    _state.vision_done = 0
-    _state.failed = 0
-    _state.error_message = None
-    _state.started_at = datetime.now(UTC).isoformat()
-    _state.completed_at = None
-    _state.cancel_requested = False
-
-    # Launch background task
-    asyncio.create_task(_run_batch_background())
+    _, created = await submit_job(
+        "image_analysis",
+        progress={
+            "status": "processing",
+            "phase": "analyzing",
+            "total": stats["total"],
+            "started_at": datetime.now(UTC).isoformat(),
+        },
+    )
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch analysis is already in progress.",
+        )
 
     return TriggerResponse(
         status="processing",
@@ -106,33 +121,43 @@ async def trigger_analysis():
     )
 
 
-async def _run_batch_background():
-    """Background task that runs the batch processing."""
+@job_handler("image_analysis")
+async def _image_analysis_job(ctx: JobContext) -> None:
+    """Job queue entry point for batch image analysis."""
+    state = ImageAnalysisState()
+    state.status = "processing"
+    state.phase = "analyzing"
+    state.started_at = datetime.now(UTC).isoformat()
+    ctx.track(state)
+    await _run_batch_background(state, ctx.is_cancelled)
+    if state.status == "error":
+        raise JobError(state.error_message or "Batch analysis failed")
+
+
+async def _run_batch_background(state: ImageAnalysisState, is_cancelled) -> None:
+    """Run the batch processing, recording progress on *state*."""
     try:
         service = ImageAnalysisService()
 
         def on_progress(processed, total, ocr_done, vision_done, failed):
-            _state.processed = processed
-            _state.total = total
-            _state.ocr_done = ocr_done
-            _state.vision_done = vision_done
-            _state.failed = failed
-
-        def is_cancelled():
-            return _state.cancel_requested
+            state.processed = processed
+            state.total = total
+            state.ocr_done = ocr_done
+            state.vision_done = vision_done
+            state.failed = failed
 
         result = await service.run_batch(on_progress=on_progress, is_cancelled=is_cancelled)
 
-        if _state.cancel_requested:
-            _state.status = "cancelled"
-            _state.completed_at = datetime.now(UTC).isoformat()
+        if is_cancelled():
+            state.status = "cancelled"
+            state.completed_at = datetime.now(UTC).isoformat()
             logger.info(
                 "Batch analysis cancelled at %d/%d processed",
-                result["processed"], result.get("total", _state.total),
+                result["processed"], result.get("total", state.total),
             )
         else:
-            _state.status = "completed"
-            _state.completed_at = datetime.now(UTC).isoformat()
+            state.status = "completed"
+            state.completed_at = datetime.now(UTC).isoformat()
             logger.info(
                 "Batch analysis completed: %d processed, %d OCR, %d Vision, %d failed",
                 result["processed"],
@@ -141,42 +166,74 @@ async def _run_batch_background():
                 result["failed"],
             )
 
-        _state.processed = result["processed"]
-        _state.ocr_done = result["ocr_done"]
-        _state.vision_done = result["vision_done"]
-        _state.failed = result["failed"]
+        state.processed = result["processed"]
+        state.ocr_done = result["ocr_done"]
+        state.vision_done = result["vision_done"]
+        state.failed = result["failed"]
     except Exception as exc:
-        _state.status = "error"
-        _state.error_message = str(exc)
-        _state.completed_at = datetime.now(UTC).isoformat()
+        state.status = "error"
+        state.error_message = str(exc)
+        state.completed_at = datetime.now(UTC).isoformat()
         logger.error("Batch analysis failed: %s", exc, exc_info=True)
 
 
+@job_handler("image_reindex")
+async def _image_reindex_job(ctx: JobContext) -> dict:
+    """Re-embed image segments of the notes whose images an analysis run processed.
+
+    Not cancellable: analysed images must reach the index.  Fails (and is
+    retried) when any note could not be re-embedded; re-running a note is
+    idempotent.
+    """
+
+    def on_progress(reindexed, total, failed):
+        ctx.report(reindex_total=total, reindexed=reindexed, reindex_failed=failed)
+
+    summary = await ImageAnalysisService().reindex_affected_notes(ctx.payload.get("image_ids", []), on_progress)
+    if summary["failed"]:
+        raise JobError(f"Re-embedding failed for {summary['failed']} of {summary['total']} notes")
+    return summary
+
+
 @router.get("/status", response_model=StatusResponse)
 async def get_analysis_status():
-    """Get current batch analysis progress."""
+    """Get current batch analysis progress (re-embedding comes from the follow-up job)."""
+    analysis_job = await get_latest_job("image_analysis")
+    state = apply_progress(ImageAnalysisState(), analysis_job)
+    reindex_job = await get_latest_job("image_reindex")
+    if analysis_job is not None and reindex_job is not None and reindex_job.id > analysis_job.id:
+        progress = reindex_job.progress or {}
+        state.reindex_total = progress.get("reindex_total", 0)
+        state.reindexed = progress.get("reindexed", 0)
+        state.reindex_failed = progress.get("reindex_failed", 0)
+        if reindex_job.status in ACTIVE_STATUSES:
+            state.phase = "reindexing"
     return StatusResponse(
-        status=_state.status,
-        total=_state.total,
-        processed=_state.processed,
-        ocr_done=_state.ocr_done,
-        vision_done=_state.vision_done,
-        failed=_state.failed,
-        error_message=_state.error_message,
-        started_at=_state.started_at,
-        completed_at=_state.completed_at,
+        status=state.status,
+        phase=state.phase,
+        total=state.total,
+        processed=state.processed,
+        ocr_done=state.ocr_done,
+        vision_done=state.vision_done,
+        failed=state.failed,
+        reindex_total=state.reindex_total,
+        reindexed=state.reindexed,
+        reindex_failed=state.reindex_failed,
+        error_message=state.error_message,
+        started_at=state.started_at,
+        completed_at=state.completed_at,
     )
 
 
 @router.post("/cancel", response_model=TriggerResponse)
 async def cancel_analysis():
     """Request cancellation of the running batch analysis."""
-    if _state.status != "processing":
+    active = await get_active_job("image_analysis")
+    if active is None or not await request_cancel(active.id):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="No batch analysis is currently running.",
         )
-    _state.cancel_requested = True
     return TriggerResponse(status="cancelling", message="Cancellation requested. Processing will stop shortly.")
 
 
@@ -0,0 +1,126 @@
+"""Background job API endpoints.
+
+Provides:
+- ``GET  /jobs``              -- Recent jobs with optional type/status filter
+- ``GET  /jobs/{job_id}``     -- A single job with its progress
+- ``POST /jobs/{job_id}/cancel`` -- Request cancellation of a queued/running job
+
+Jobs are rows in ``background_jobs`` (see :mod:`app.services.job_queue`).
+"""
+
+import logging
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.admin import require_admin
+from app.database import get_db
+from app.models import BackgroundJob
+from app.services.auth_service import get_current_user
+from app.services.job_queue import request_cancel
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+# ---------------------------------------------------------------------------
+# Response schemas
+# ---------------------------------------------------------------------------
+
+
+class JobItem(BaseModel):
+    id: int
+    job_type: str
+    status: str
+    progress: dict | None
+    result: dict | None
+    error: str | None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    worker_id: str | None
+    triggered_by: str | None
+    created_at: datetime
+    started_at: datetime | None
+    completed_at: datetime | None
+
+
+class JobListResponse(BaseModel):
+    items: list[JobItem]
+
+
+class JobCancelResponse(BaseModel):
+    status: str
+    message: str
+
+
+def _to_item(job: BackgroundJob) -> JobItem:
+    return JobItem(
+        id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+        progress=job.progress,
+        result=job.result,
+        error=job.error,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        cancel_requested=job.cancel_requested,
+        worker_id=job.worker_id,
+        triggered_by=job.triggered_by,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+
+@router.get("", response_model=JobListResponse)
+async def list_jobs(
+    job_type: str | None = Query(None, description="Filter by job type"),  # noqa: B008
+    job_status: str | None = Query(None, alias="status", description="Filter by status"),  # noqa: B008
+    limit: int = Query(20, ge=1, le=100),  # noqa: B008
+    current_user: dict = Depends(get_current_user),  # noqa: B008
+    db: AsyncSession = Depends(get_db),  # noqa: B008
+) -> JobListResponse:
+    """Return recent background jobs, newest first."""
+    query = select(BackgroundJob).order_by(desc(BackgroundJob.id)).limit(limit)
+    if job_type:
+        query = query.where(BackgroundJob.job_type == job_type)
+    if job_status:
+        query = query.where(BackgroundJob.status == job_status)
+    result = await db.execute(query)
+    return JobListResponse(items=[_to_item(job) for job in result.scalars().all()])
+
+
+@router.get("/{job_id}", response_model=JobItem)
+async def get_job(
+    job_id: int,
+    current_user: dict = Depends(get_current_user),  # noqa: B008
+    db: AsyncSession = Depends(get_db),  # noqa: B008
+) -> JobItem:
+    """Return a single background job."""
+    job = await db.get(BackgroundJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return _to_item(job)
+
+
+@router.post("/{job_id}/cancel", response_model=JobCancelResponse)
+async def cancel_job(
+    job_id: int,
+    current_user: dict = Depends(require_admin),  # noqa: B008
+) -> JobCancelResponse:
+    """Request cancellation of a queued or running job."""
+    if not await request_cancel(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job is not queued or running.",
+        )
+    return JobCancelResponse(status="cancelling", message="Cancellation requested.")
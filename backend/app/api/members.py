@@ -48,6 +48,7 @@ from app.services.user_service import (
     get_organization_by_slug,
     get_user_by_email,
     get_user_by_id,
+    get_users_by_ids,
     remove_member_from_org,
 )
 
@@ -470,10 +471,11 @@ async def list_members(
 ) -> MemberListResponse:
     """List all members of the current organization."""
     memberships = await get_org_members(db, current_user["org_id"])
+    users = await get_users_by_ids(db, (m.user_id for m in memberships))
 
     members = []
     for m in memberships:
-        user = await get_user_by_id(db, m.user_id)
+        user = users.get(m.user_id)
         members.append(
             MemberResponse(
                 id=m.id,
@@ -1,11 +1,18 @@
 """Search quality metrics API — admin dashboard + click tracking."""
 
-from fastapi import APIRouter, Depends, Query
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.admin import require_admin
-from app.database import get_db
+from app.config import get_settings
+from app.database import async_session_factory, get_read_db
 from app.services.auth_service import get_current_user
+from app.services.instrumentation import render_metrics
+from app.services.job_queue import JobContext, job_handler
+from app.services.metrics_rollup import prune_raw_events, roll_up_metrics
 from app.services.search_metrics import search_metrics
 
 router = APIRouter(prefix="/admin/metrics", tags=["metrics"])
@@ -15,12 +22,36 @@ router = APIRouter(prefix="/admin/metrics", tags=["metrics"])
 async def get_search_metrics(
     period: str = Query("7d", pattern="^(1d|7d|30d|90d)$"),  # noqa: B008
     admin: dict = Depends(require_admin),  # noqa: B008
-    db: AsyncSession = Depends(get_db),  # noqa: B008
+    db: AsyncSession = Depends(get_read_db),  # noqa: B008
 ) -> dict:
     """Get aggregated search quality metrics for the admin dashboard."""
     return await search_metrics.get_dashboard_data(db, period=period)
 
 
+async def _authorize_scrape(request: Request) -> None:
+    """Accept ``METRICS_SCRAPE_TOKEN`` as a bearer token, otherwise require an admin login."""
+    authorization = request.headers.get("authorization", "")
+    scrape_token = get_settings().METRICS_SCRAPE_TOKEN
+    if scrape_token and hmac.compare_digest(authorization, f"Bearer {scrape_token}"):
+        return
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await require_admin(await get_current_user(token))
+
+
+@router.get("/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics(
+    _: None = Depends(_authorize_scrape),  # noqa: B008
+) -> PlainTextResponse:
+    """Latency histograms and counters of this process in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @router.post("/search/{event_id}/click")
 async def record_search_click(
     event_id: int,
@@ -30,3 +61,13 @@ async def record_search_click(
     """Record that a user clicked a specific search result."""
     await search_metrics.record_click(event_id, note_id)
     return {"status": "ok"}
+
+
+@job_handler("metrics_rollup")
+async def _metrics_rollup_job(ctx: JobContext) -> dict:
+    """Fold settled hours into the dashboard rollups, then apply raw-event retention."""
+    async with async_session_factory() as session:
+        result = await roll_up_metrics(session)
+        await session.commit()
+        result["pruned"] = await prune_raw_events(session)
+    return result
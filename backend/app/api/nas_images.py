@@ -4,7 +4,9 @@
 """NAS image streaming proxy.
 
 Streams NoteStation images through the backend to avoid
-exposing NAS auth tokens to the frontend.
+exposing NAS auth tokens to the frontend.  Images are served from an
+on-disk cache (:mod:`app.services.image_cache`) so repeat views and
+gallery thumbnails (``?w=``) do not go back to the NAS.
 
 NoteStation image URL pattern on the NAS:
     /note/ns/dv/{link_id}/{ver}/{att_key}/{filename}
@@ -19,12 +21,10 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import logging
-import time
-from io import BytesIO
 from pathlib import Path
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -42,54 +42,21 @@ router = APIRouter(prefix="/nas-images", tags=["nas-images"])
 # when notes have hundreds of images (e.g. 260 images in one note).
 _NAS_FETCH_SEMAPHORE = asyncio.Semaphore(8)
 
-# Shared NAS client — reuse a single authenticated session instead of
-# creating + logging in for every image request (260 images = 260 logins!).
-_shared_client: "SynologyClient | None" = None
-_shared_client_lock = asyncio.Lock()
-_shared_client_created_at: float = 0.0
-_SHARED_CLIENT_MAX_AGE = 600  # Re-create after 10 minutes
+# Read size when streaming cached images
+_STREAM_CHUNK_SIZE = 64 * 1024
 
 
 async def _get_shared_nas_client():
-    """Get or create a shared, authenticated SynologyClient for image proxy.
+    """Return an authenticated client from the shared NAS client pool.
 
-    The client is cached and reused across requests.  It is re-created
-    if older than ``_SHARED_CLIENT_MAX_AGE`` seconds or if ``_sid`` has
-    been invalidated.
+    Pooled sessions are reused across requests and re-authenticate on
+    expiry by themselves (see :mod:`app.synology_gateway.pool`).
     """
-    from app.synology_gateway.client import SynologyClient
+    from app.synology_gateway.pool import get_nas_pool
 
-    global _shared_client, _shared_client_created_at  # noqa: PLW0603
+    pool = await get_nas_pool()
+    return await pool.get_client()
 
-    async with _shared_client_lock:
-        now = time.monotonic()
-        if (
-            _shared_client is not None
-            and _shared_client._sid is not None
-            and (now - _shared_client_created_at) < _SHARED_CLIENT_MAX_AGE
-        ):
-            return _shared_client
-
-        # Close stale client if any
-        if _shared_client is not None:
-            try:
-                await _shared_client.close()
-            except Exception:
-                pass
-
-        from app.api.settings import get_nas_config
-
-        nas = get_nas_config()
-        client = SynologyClient(
-            url=nas["url"],
-            user=nas["user"],
-            password=nas["password"],
-        )
-        await client.login()
-        _shared_client = client
-        _shared_client_created_at = now
-        logger.info("Created shared NAS client for image proxy")
-        return _shared_client
 
 # 1x1 transparent GIF that NoteStation returns for deleted/empty attachments.
 # GIF89a header (47 49 46 38 39 61), 1x1 pixel, 43 bytes total.
@@ -134,15 +101,20 @@ async def proxy_nas_image(
     note_id: str,
     att_key: str,
     filename: str,
+    request: Request,
+    w: int | None = Query(None, ge=32, le=2048, description="Thumbnail width in pixels"),
     current_user: dict = Depends(_get_user_flexible),  # noqa: B008
     db: AsyncSession = Depends(get_db),  # noqa: B008
 ):
-    """Stream a NoteStation image through the backend.
+    """Serve a NoteStation image through the backend's disk cache.
 
-    Looks up the note's ``link_id`` and ``nas_ver`` from the database,
-    constructs the NAS image path, fetches the binary via the
-    authenticated SynologyClient, and streams it back to the caller
-    with cache headers.
+    Looks up the note's ``link_id`` and ``nas_ver`` from the database and
+    serves the image from the local cache (see
+    :mod:`app.services.image_cache`).  On a miss the binary is fetched
+    from the NAS via the pooled SynologyClient and stored first.
+    Responses carry a content-hash ``ETag`` (``If-None-Match`` yields 304)
+    and support ``Range`` requests.  ``?w=`` returns a resized WebP
+    thumbnail variant instead of the original.
 
     If the stored ``nas_ver`` is stale (NAS returns HTML instead of an image),
     automatically fetches the latest version from NAS and retries.
@@ -151,11 +123,14 @@ async def proxy_nas_image(
         note_id: The synology_note_id of the note.
         att_key: The NAS attachment key (e.g. ``_yDRx9FC8_sWJ3qvjJxat2w``).
         filename: The image filename (e.g. ``photo.png``).
+        w: Optional thumbnail width.
 
     Raises:
         HTTPException 404: If the note or NAS metadata is not found.
         HTTPException 502: If fetching from the NAS fails.
     """
+    from app.services.image_cache import get_image_cache
+
     # Look up note to get link_id and ver
     result = await db.execute(
         select(Note).where(Note.synology_note_id == note_id)
@@ -164,56 +139,136 @@ async def proxy_nas_image(
     if not note or not note.link_id or not note.nas_ver:
         raise HTTPException(status_code=404, detail="Note or NAS metadata not found")
 
-    # Throttle concurrent NAS fetches to prevent overload
-    async with _NAS_FETCH_SEMAPHORE:
-        try:
-            client = await _get_shared_nas_client()
-
-            # Try with stored version first
-            nas_path = f"/note/ns/dv/{note.link_id}/{note.nas_ver}/{att_key}/{filename}"
-            image_bytes, content_type = await client.fetch_binary(nas_path)
-
-            # If NAS returns HTML, the version is likely stale — refresh and retry
-            if content_type and "text/html" in content_type:
-                logger.info("Stale nas_ver for note %s, fetching latest from NAS", note_id)
-                try:
-                    from app.synology_gateway.notestation import NoteStationService
-
-                    ns = NoteStationService(client)
-                    nas_note = await ns.get_note(note_id)
-                    latest_ver = nas_note.get("ver", "")
-                    if latest_ver and latest_ver != note.nas_ver:
-                        note.nas_ver = latest_ver
-                        await db.commit()
-                        nas_path = f"/note/ns/dv/{note.link_id}/{latest_ver}/{att_key}/{filename}"
-                        image_bytes, content_type = await client.fetch_binary(nas_path)
-                except Exception:
-                    logger.debug("Could not refresh nas_ver for note %s", note_id)
-        except Exception as exc:
-            # Invalidate shared client on failure so it re-creates on next attempt
-            global _shared_client  # noqa: PLW0603
-            _shared_client = None
-            logger.exception("Failed to fetch NAS image: %s", exc)
-            raise HTTPException(status_code=502, detail="NAS 이미지 로드 실패") from exc
-
-    if not image_bytes or (content_type and "text/html" in content_type):
-        raise HTTPException(status_code=404, detail="Image not found on NAS")
+    link_id, nas_ver = note.link_id, note.nas_ver
 
-    # Detect NoteStation placeholder images (1x1 transparent GIF, ~43 bytes).
-    # These are returned for deleted or empty attachments.
-    if len(image_bytes) < _MIN_VALID_IMAGE_SIZE and image_bytes[:6] == b"GIF89a":
-        raise HTTPException(
-            status_code=404,
-            detail="Placeholder image (original deleted from NAS)",
-        )
+    async def fetch_from_nas() -> tuple[str, bytes, str]:
+        # Throttle concurrent NAS fetches to prevent overload
+        async with _NAS_FETCH_SEMAPHORE:
+            try:
+                client = await _get_shared_nas_client()
+
+                # Try with stored version first
+                fetched_ver = nas_ver
+                nas_path = f"/note/ns/dv/{link_id}/{fetched_ver}/{att_key}/{filename}"
+                image_bytes, content_type = await client.fetch_binary(nas_path)
+
+                # If NAS returns HTML, the version is likely stale — refresh and retry
+                if content_type and "text/html" in content_type:
+                    logger.info("Stale nas_ver for note %s, fetching latest from NAS", note_id)
+                    try:
+                        from app.synology_gateway.notestation import NoteStationService
+
+                        ns = NoteStationService(client)
+                        nas_note = await ns.get_note(note_id)
+                        latest_ver = nas_note.get("ver", "")
+                        if latest_ver and latest_ver != nas_ver:
+                            note.nas_ver = latest_ver
+                            await db.commit()
+                            fetched_ver = latest_ver
+                            nas_path = f"/note/ns/dv/{link_id}/{latest_ver}/{att_key}/{filename}"
+                            image_bytes, content_type = await client.fetch_binary(nas_path)
+                    except Exception:
+                        logger.debug("Could not refresh nas_ver for note %s", note_id)
+            except Exception as exc:
+                logger.exception("Failed to fetch NAS image: %s", exc)
+                raise HTTPException(status_code=502, detail="NAS 이미지 로드 실패") from exc
+
+        if not image_bytes or (content_type and "text/html" in content_type):
+            raise HTTPException(status_code=404, detail="Image not found on NAS")
+
+        # Detect NoteStation placeholder images (1x1 transparent GIF, ~43 bytes).
+        # These are returned for deleted or empty attachments.
+        if len(image_bytes) < _MIN_VALID_IMAGE_SIZE and image_bytes[:6] == b"GIF89a":
+            raise HTTPException(
+                status_code=404,
+                detail="Placeholder image (original deleted from NAS)",
+            )
+        return fetched_ver, image_bytes, content_type
+
+    cache = get_image_cache()
+    # Eviction may unlink the file between lookup and open; fetch again once.
+    for _attempt in range(2):
+        entry = await cache.get_or_fetch(link_id, nas_ver, att_key, fetch_from_nas)
+
+        if w is not None:
+            try:
+                entry = await cache.thumbnail(entry, w)
+            except Exception:
+                # Formats Pillow cannot decode (e.g. SVG) are served as-is.
+                logger.warning("Thumbnail failed for %s/%s, serving original", note_id, att_key, exc_info=True)
 
-    # Return with cache headers (images rarely change)
-    return StreamingResponse(
-        BytesIO(image_bytes),
-        media_type=content_type,
-        headers={
+        etag = f'"{entry.etag}"'
+        headers = {
+            "ETag": etag,
             "Cache-Control": "public, max-age=86400",
-        },
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in {tag.strip() for tag in if_none_match.split(",")} or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        opened = await cache.open(entry)
+        if opened is not None:
+            break
+        logger.info("Cached image %s/%s was evicted before serving; fetching again", note_id, att_key)
+    else:
+        raise HTTPException(status_code=503, detail="Image cache is under pressure, retry")
+
+    fh, size = opened
+    return _file_stream_response(fh, size, entry.content_type, headers, request.headers.get("range"))
+
+
+def _parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Single ``bytes=`` range as inclusive ``(start, end)``; None serves the whole file."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+async def _iter_file(fh, start: int, length: int):
+    try:
+        await asyncio.to_thread(fh.seek, start)
+        remaining = length
+        while remaining > 0:
+            chunk = await asyncio.to_thread(fh.read, min(_STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def _file_stream_response(fh, size: int, media_type: str, headers: dict, range_header: str | None) -> Response:
+    """Stream an already-open cache file, honouring a single ``Range``."""
+    try:
+        byte_range = _parse_range(range_header, size)
+    except HTTPException:
+        fh.close()
+        raise
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    length = max(0, end - start + 1)
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_file(fh, start, length), status_code=status_code, media_type=media_type, headers=headers
     )
 
 
@@ -268,21 +323,19 @@ async def ocr_nas_image(
             nas_path = f"/note/ns/dv/{note.link_id}/{note.nas_ver}/{att_key}/{filename}"
             image_bytes, content_type = await client.fetch_binary(nas_path)
         except Exception as exc:
-            global _shared_client  # noqa: PLW0603
-            _shared_client = None
             logger.exception("Failed to fetch NAS image for OCR: %s", exc)
             raise HTTPException(status_code=502, detail="NAS 이미지 다운로드 실패") from exc
 
     if not image_bytes or (content_type and "text/html" in content_type):
         raise HTTPException(status_code=404, detail="Image not found on NAS")
 
-    # Save image to local storage
+    # Save image to local storage (deduplicated blob store)
+    from app.services.blob_store import get_blob_store, register_refs
+
     md5_hash = hashlib.md5(image_bytes).hexdigest()  # noqa: S324
     ext = Path(filename).suffix or ".png"
-    output_dir = Path(settings.NSX_IMAGES_PATH) / note_id
-    output_dir.mkdir(parents=True, exist_ok=True)
-    file_path = output_dir / f"{md5_hash}{ext}"
-    file_path.write_bytes(image_bytes)
+    file_path = Path(settings.NSX_IMAGES_PATH) / note_id / f"{md5_hash}{ext}"
+    stored = await asyncio.to_thread(get_blob_store().put_bytes, image_bytes, file_path)
 
     # Guess mime type from content_type or extension
     mime_type = content_type or "image/png"
@@ -300,6 +353,7 @@ async def ocr_nas_image(
         extraction_status="pending",
     )
     db.add(note_image)
+    await register_refs(db, [stored])
     await db.commit()
     await db.refresh(note_image)
 
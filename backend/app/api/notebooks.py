@@ -12,18 +12,19 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.constants import NotePermission
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Note, Notebook, User
+from app.services.access_scope import get_scoped_notebook_ids
 from app.services.activity_log import log_activity
 from app.services.auth_service import get_current_user
 from app.services.notebook_access_control import (
     can_manage_notebook_access,
     check_notebook_access,
-    get_accessible_notebooks,
     get_notebook_access_list,
     grant_notebook_access,
     revoke_notebook_access,
 )
+from app.services.user_service import get_users_by_ids
 
 router = APIRouter(prefix="/notebooks", tags=["notebooks"])
 
@@ -94,11 +95,11 @@ class NotebooksListResponse(BaseModel):
 
 @router.get("")
 async def list_notebooks(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     current_user: Annotated[dict, Depends(get_current_user)],
 ) -> NotebooksListResponse:
     """List all notebooks accessible to the current user with note counts."""
-    accessible_notebook_ids = await get_accessible_notebooks(db, current_user["user_id"])
+    accessible_notebook_ids = await get_scoped_notebook_ids(db, current_user["user_id"])
 
     if not accessible_notebook_ids:
         return NotebooksListResponse(items=[], total=0)
@@ -332,20 +333,17 @@ async def list_notebook_access(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[dict, Depends(get_current_user)],
 ) -> AccessListResponse:
-    if not await can_manage_notebook_access(db, notebook_id, current_user["user_id"]):
+    if not await can_manage_notebook_access(db, current_user["user_id"], notebook_id):
         raise HTTPException(status_code=403, detail="No permission to manage access")
 
     access_list = await get_notebook_access_list(db, notebook_id)
 
+    users = await get_users_by_ids(db, (access.user_id for access in access_list if access.user_id))
+
     items = []
     for access in access_list:
-        user_email = None
-        if access.user_id:
-            stmt = select(User).where(User.id == access.user_id)
-            result = await db.execute(stmt)
-            user = result.scalar_one_or_none()
-            if user:
-                user_email = user.email
+        user = users.get(access.user_id) if access.user_id else None
+        user_email = user.email if user else None
 
         permission_str = "read"
         if access.permission == NotePermission.WRITE:
@@ -375,7 +373,7 @@ async def grant_notebook_access_endpoint(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[dict, Depends(get_current_user)],
 ) -> AccessResponse:
-    if not await can_manage_notebook_access(db, notebook_id, current_user["user_id"]):
+    if not await can_manage_notebook_access(db, current_user["user_id"], notebook_id):
         raise HTTPException(status_code=403, detail="No permission to manage access")
 
     stmt = select(User).where(User.email == request.email)
@@ -426,7 +424,7 @@ async def update_notebook_access(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[dict, Depends(get_current_user)],
 ) -> AccessResponse:
-    if not await can_manage_notebook_access(db, notebook_id, current_user["user_id"]):
+    if not await can_manage_notebook_access(db, current_user["user_id"], notebook_id):
         raise HTTPException(status_code=403, detail="No permission to manage access")
 
     from app.models import NotebookAccess
@@ -496,7 +494,7 @@ async def revoke_notebook_access_endpoint(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[dict, Depends(get_current_user)],
 ) -> dict:
-    if not await can_manage_notebook_access(db, notebook_id, current_user["user_id"]):
+    if not await can_manage_notebook_access(db, current_user["user_id"], notebook_id):
         raise HTTPException(status_code=403, detail="No permission to manage access")
 
     from app.models import NotebookAccess
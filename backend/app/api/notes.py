@@ -25,19 +25,23 @@ from datetime import UTC, datetime
 from pathlib import Path
 from uuid import uuid4
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from pydantic import BaseModel
 from sqlalchemy import and_, func, select, text
 from sqlalchemy import delete as sa_delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from app.database import async_session_factory, get_db
+from app.database import async_session_factory, get_db, get_read_db
 from app.models import Note, NoteAttachment, NoteImage, User
+from app.services.access_scope import ensure_access_scope, readable_notes_clause
 from app.services.activity_log import get_trigger_name, log_activity
 from app.services.auth_service import get_current_user
+from app.services.blob_store import StoredBlob, get_blob_store, register_refs, release_refs
+from app.services.job_queue import JobContext, JobError, apply_progress, get_latest_job, job_handler, submit_job
+from app.services.query_accounting import query_budget
 from app.services.related_notes import RelatedNotesService
-from app.synology_gateway.client import SynologyApiError, SynologyClient
+from app.synology_gateway.client import SynologyApiError
 from app.synology_gateway.notestation import NoteStationService
 from app.utils.datetime_utils import datetime_to_iso, unix_to_iso
 from app.utils.note_utils import (
@@ -73,16 +77,17 @@ class QuickSearchResponse(BaseModel):
 async def quick_search_notes(
     q: str = Query("", min_length=1, description="Search query"),
     limit: int = Query(10, ge=1, le=30, description="Maximum results"),
-    current_user: dict = Depends(get_current_user),  # noqa: ARG001, B008
-    db: AsyncSession = Depends(get_db),  # noqa: B008
+    current_user: dict = Depends(get_current_user),  # noqa: B008
+    db: AsyncSession = Depends(get_read_db),  # noqa: B008
 ) -> QuickSearchResponse:
     """Quick title search for command palette.
 
     Uses ILIKE for simple fuzzy matching on note titles.
     """
+    await ensure_access_scope(db, current_user["user_id"])
     stmt = (
         select(Note.synology_note_id, Note.title, Note.notebook_name)
-        .where(Note.title.ilike(f"%{q}%"))
+        .where(Note.title.ilike(f"%{q}%"), readable_notes_clause(current_user["user_id"]))
         .order_by(Note.source_updated_at.desc().nulls_last())
         .limit(limit)
     )
@@ -195,24 +200,20 @@ class RelatedNotesResponse(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-def _get_ns_service() -> NoteStationService:
-    """Create a NoteStationService using app settings.
+async def _get_ns_service() -> NoteStationService:
+    """Create a NoteStationService backed by the shared NAS client pool.
 
     This function is extracted to allow easy mocking in tests.
-    The SynologyClient is created with NAS credentials from the
-    settings store (which respects runtime UI overrides).
+    The pooled client uses NAS credentials from the settings store
+    (which respects runtime UI overrides).
 
     Returns:
-        A NoteStationService wrapping an authenticated SynologyClient.
+        A NoteStationService wrapping a pooled SynologyClient.
     """
-    from app.api.settings import get_nas_config
+    from app.synology_gateway.pool import get_nas_pool
 
-    nas = get_nas_config()
-    client = SynologyClient(
-        url=nas["url"],
-        user=nas["user"],
-        password=nas["password"],
-    )
+    pool = await get_nas_pool()
+    client = await pool.get_client(login=False)
     return NoteStationService(client)
 
 
@@ -346,7 +347,7 @@ def _note_to_item(raw: dict, notebook_map: dict[str, str] | None = None) -> Note
 # ---------------------------------------------------------------------------
 
 
-@router.get("/notes", response_model=NoteListResponse)
+@router.get("/notes", response_model=NoteListResponse, dependencies=[Depends(query_budget(10))])
 async def list_notes(
     offset: int = Query(0, ge=0, description="Number of notes to skip"),
     limit: int = Query(50, ge=1, le=200, description="Maximum notes to return"),
@@ -356,7 +357,7 @@ async def list_notes(
     sort_by: str = Query("updated_at", description="Sort field: updated_at or created_at"),
     sort_order: str = Query("desc", description="Sort order: desc or asc"),
     current_user: dict = Depends(get_current_user),  # noqa: B008
-    db: AsyncSession = Depends(get_db),  # noqa: B008
+    db: AsyncSession = Depends(get_read_db),  # noqa: B008
 ) -> NoteListResponse:
     """Retrieve a paginated list of notes.
 
@@ -374,8 +375,10 @@ async def list_notes(
     Returns:
         Paginated response with note items, offset, limit, and total count.
     """
-    count_stmt = select(func.count()).select_from(Note)
-    stmt = select(Note)
+    await ensure_access_scope(db, current_user["user_id"])
+    readable = readable_notes_clause(current_user["user_id"])
+    count_stmt = select(func.count()).select_from(Note).where(readable)
+    stmt = select(Note).where(readable)
 
     if notebook == "__uncategorized__":
         uncategorized_filter = (Note.notebook_name.is_(None)) | (Note.notebook_name == "")
@@ -468,9 +471,6 @@ class TaggingState:
     error_message: str | None = None
 
 
-_tagging_state = TaggingState()
-
-
 class TagResponse(BaseModel):
     tags: list[str]
 
@@ -548,20 +548,32 @@ async def _run_tagging_background(state: TaggingState) -> None:
         state.is_tagging = False
 
 
+@job_handler("auto_tag")
+async def _tagging_job(ctx: JobContext) -> None:
+    """Job queue entry point for batch auto-tagging."""
+    state = TaggingState()
+    ctx.track(state)
+    await _run_tagging_background(state)
+    if state.status == "error":
+        raise JobError(state.error_message or "Batch tagging failed")
+
+
 @router.post("/notes/batch-auto-tag", response_model=TaggingTriggerResponse)
 async def trigger_batch_auto_tag(
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),  # noqa: B008
 ) -> TaggingTriggerResponse:
     """Trigger batch auto-tagging for all untagged notes."""
-    if _tagging_state.is_tagging:
+    _, created = await submit_job(
+        "auto_tag",
+        progress={"status": "tagging", "is_tagging": True},
+        triggered_by=current_user.get("username", "unknown"),
+    )
+    if not created:
         return TaggingTriggerResponse(
             status="already_tagging",
             message="Batch auto-tagging is already in progress.",
         )
 
-    background_tasks.add_task(_run_tagging_background, _tagging_state)
-
     return TaggingTriggerResponse(
         status="tagging",
         message="Batch auto-tagging started.",
@@ -573,12 +585,13 @@ async def get_batch_auto_tag_status(
     current_user: dict = Depends(get_current_user),  # noqa: B008
 ) -> TaggingStatusResponse:
     """Get the current batch auto-tagging status."""
+    state = apply_progress(TaggingState(), await get_latest_job("auto_tag"), running_flag="is_tagging")
     return TaggingStatusResponse(
-        status=_tagging_state.status,
-        total=_tagging_state.total,
-        tagged=_tagging_state.tagged,
-        failed=_tagging_state.failed,
-        error_message=_tagging_state.error_message,
+        status=state.status,
+        total=state.total,
+        tagged=state.tagged,
+        failed=state.failed,
+        error_message=state.error_message,
     )
 
 
@@ -886,7 +899,7 @@ async def delete_note(
     await db.commit()
 
 
-@router.get("/notes/{note_id}", response_model=NoteDetailResponse)
+@router.get("/notes/{note_id}", response_model=NoteDetailResponse, dependencies=[Depends(query_budget(10))])
 async def get_note(
     note_id: str,
     current_user: dict = Depends(get_current_user),  # noqa: B008
@@ -931,9 +944,11 @@ async def get_note(
         # rehype-raw (parse5) cannot handle very large data URI attributes,
         # so we save them as files and use /api/files/ URLs instead.
         if "data:image/" in raw_html:
-            raw_html = extract_data_uri_images(raw_html)
+            blobs: list[StoredBlob] = []
+            raw_html = extract_data_uri_images(raw_html, blobs)
             if raw_html != (db_note.content_html or ""):
                 db_note.content_html = raw_html
+                await register_refs(db, blobs)
                 await db.commit()
                 logger.info("Extracted data URI images for note %s", note_id)
 
@@ -1025,6 +1040,12 @@ async def get_note(
     except Exception:
         logger.warning("Failed to fetch images for note %s", note_id)
 
+    blobs: list[StoredBlob] = []
+    content = extract_data_uri_images(note.get("content", ""), blobs)
+    if blobs:
+        await register_refs(db, blobs)
+        await db.commit()
+
     return NoteDetailResponse(
         note_id=note.get("object_id", note_id),
         title=note.get("title", ""),
@@ -1034,7 +1055,7 @@ async def get_note(
         created_at=unix_to_iso(note.get("ctime")),
         updated_at=unix_to_iso(note.get("mtime")),
         content=rewrite_image_urls(
-            extract_data_uri_images(note.get("content", "")),
+            content,
             note_id,
             att_lookup,
             image_map,
@@ -1248,6 +1269,8 @@ async def add_attachment(
         mime_type=file.content_type,
     )
     db.add(attachment)
+    stored = await asyncio.to_thread(get_blob_store().adopt, target_path)
+    await register_refs(db, [stored])
     await db.flush()
 
     await log_activity(
@@ -1295,6 +1318,7 @@ async def delete_attachment(
     file_path = Path(settings.UPLOADS_PATH) / file_id
     if file_path.exists():
         file_path.unlink(missing_ok=True)
+    await release_refs(db, [str(file_path)])
 
     await log_activity(
         "note", "completed",
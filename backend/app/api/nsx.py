@@ -22,15 +22,17 @@ import json
 import logging
 import re
 import shutil
+import time
 import zipfile
 from datetime import UTC, datetime
 from pathlib import Path
 from uuid import uuid4
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
@@ -38,7 +40,10 @@ from app.database import async_session_factory, get_db
 from app.models import Note, NoteAttachment, NoteImage
 from app.services.activity_log import get_trigger_name, log_activity
 from app.services.auth_service import get_current_user
-from app.services.nsx_parser import NoteRecord, NsxParser
+from app.services.blob_store import StoredBlob, get_blob_store, register_refs
+from app.services.job_queue import JobContext, JobError, apply_progress, get_latest_job, job_handler, submit_job
+from app.services.nsx_parser import AttachmentInfo, NoteRecord, stream_batches_in_subprocess
+from app.synology_gateway.client import SynologyApiError, SynologyClient
 from app.synology_gateway.notestation import NoteStationService
 
 logger = logging.getLogger(__name__)
@@ -46,6 +51,9 @@ settings = get_settings()
 
 router = APIRouter(tags=["nsx"])
 
+# Notes parsed, upserted and committed together during NSX import.
+_IMPORT_BATCH_SIZE = 100
+
 
 # ---------------------------------------------------------------------------
 # Response schemas
@@ -67,6 +75,9 @@ class NsxImportStatusResponse(BaseModel):
     last_import_at: str | None = None
     notes_processed: int | None = None
     images_extracted: int | None = None
+    notes_total: int | None = None
+    notes_per_second: float | None = None
+    elapsed_seconds: float | None = None
     error_message: str | None = None
     errors: list[str] = []
 
@@ -80,12 +91,12 @@ class NsxExportResponse(BaseModel):
 
 
 # ---------------------------------------------------------------------------
-# In-memory import state
+# Import state
 # ---------------------------------------------------------------------------
 
 
 class ImportState:
-    """Mutable in-memory tracker for import progress."""
+    """Mutable tracker for import progress, mirrored into the ``nsx_import`` job."""
 
     def __init__(self) -> None:
         self.status: str = "idle"
@@ -93,20 +104,20 @@ class ImportState:
         self.last_import_at: str | None = None
         self.notes_processed: int | None = None
         self.images_extracted: int | None = None
+        self.notes_total: int | None = None
+        self.notes_per_second: float | None = None
+        self.elapsed_seconds: float | None = None
         self.error_message: str | None = None
         self.errors: list[str] = []
 
 
-_import_state = ImportState()
-
-
 # ---------------------------------------------------------------------------
 # Image sync state (for auto-sync from NAS)
 # ---------------------------------------------------------------------------
 
 
 class ImageSyncState:
-    """Mutable in-memory tracker for image sync progress."""
+    """Mutable tracker for image sync progress, mirrored into the ``image_sync`` job."""
 
     def __init__(self) -> None:
         self.status: str = "idle"  # idle | syncing | completed | partial | error
@@ -120,9 +131,6 @@ class ImageSyncState:
         self.remaining_notes: int = 0
 
 
-_image_sync_state = ImageSyncState()
-
-
 def _unix_to_utc(timestamp: int | float | None) -> datetime | None:
     """Convert Unix timestamp to UTC datetime."""
     if timestamp is None:
@@ -206,6 +214,11 @@ def _rewrite_content_for_nsx(
 async def _run_import_background(nsx_path: Path, state: ImportState) -> None:
     """Execute NSX import and update state accordingly.
 
+    The archive is parsed in a child process (see
+    :func:`~app.services.nsx_parser.stream_batches_in_subprocess`); each
+    batch of notes and image mappings is upserted and committed as it
+    arrives, so progress and throughput are visible while importing.
+
     Args:
         nsx_path: Path to the uploaded NSX file.
         state: ImportState instance to update.
@@ -214,69 +227,50 @@ async def _run_import_background(nsx_path: Path, state: ImportState) -> None:
     state.is_importing = True
     state.error_message = None
     state.errors = []
+    state.notes_processed = 0
+    state.images_extracted = 0
 
+    started = time.monotonic()
     try:
-        # Parse NSX file
         output_dir = Path(settings.NSX_IMAGES_PATH)
-        parser = NsxParser(nsx_path=nsx_path, output_dir=output_dir)
-        result = parser.parse()
-
-        state.notes_processed = result.notes_processed
-        state.images_extracted = result.images_extracted
-        state.errors = result.errors
-
-        # Save notes and image mappings to database
-        async with async_session_factory() as session:
-            if result.notes:
-                await _upsert_notes(session, result.notes)
-
-            for att in result.attachments:
-                # Check if mapping already exists
-                existing = await session.execute(
-                    select(NoteImage).where(
-                        NoteImage.synology_note_id == att.note_id,
-                        NoteImage.ref == att.ref,
-                    )
-                )
-                existing_img = existing.scalar_one_or_none()
-
-                if existing_img:
-                    # Update existing record
-                    existing_img.md5 = att.md5
-                    existing_img.name = att.name
-                    existing_img.file_path = str(att.file_path)
-                    existing_img.mime_type = att.mime_type
-                    existing_img.width = att.width
-                    existing_img.height = att.height
-                else:
-                    # Create new record
-                    new_img = NoteImage(
-                        synology_note_id=att.note_id,
-                        ref=att.ref,
-                        name=att.name,
-                        md5=att.md5,
-                        file_path=str(att.file_path),
-                        mime_type=att.mime_type,
-                        width=att.width,
-                        height=att.height,
-                    )
-                    session.add(new_img)
+        output_dir.mkdir(parents=True, exist_ok=True)
 
-            await session.commit()
+        async for batch in stream_batches_in_subprocess(nsx_path, output_dir, batch_size=_IMPORT_BATCH_SIZE):
+            if batch.notes or batch.attachments:
+                async with async_session_factory() as session:
+                    await _upsert_notes(session, batch.notes)
+                    await _upsert_note_images(session, batch.attachments)
+                    await register_refs(session, [att.blob for att in batch.attachments if att.blob])
+                    await session.commit()
+
+            state.errors.extend(batch.errors)
+            state.notes_total = batch.notes_total or state.notes_total
+            state.notes_processed = batch.notes_processed
+            state.images_extracted = batch.images_extracted
+            state.elapsed_seconds = round(time.monotonic() - started, 1)
+            if state.elapsed_seconds:
+                state.notes_per_second = round(state.notes_processed / state.elapsed_seconds, 1)
 
         state.status = "completed"
         state.last_import_at = datetime.now(UTC).isoformat()
         await log_activity(
             "nsx", "completed",
-            message=f"NSX 가져오기 완료: {result.notes_processed}개 노트, {result.images_extracted}개 이미지",
-            details={"notes": result.notes_processed, "images": result.images_extracted, "errors": len(result.errors)},
+            message=f"NSX 가져오기 완료: {state.notes_processed}개 노트, {state.images_extracted}개 이미지",
+            details={
+                "notes": state.notes_processed,
+                "images": state.images_extracted,
+                "errors": len(state.errors),
+                "elapsed_seconds": state.elapsed_seconds,
+                "notes_per_second": state.notes_per_second,
+            },
         )
 
         logger.info(
-            "NSX import completed: %d notes, %d images, %d errors",
-            result.notes_processed,
-            result.images_extracted,
-            len(result.errors),
+            "NSX import completed: %d notes, %d images, %d errors in %.1fs",
+            state.notes_processed,
+            state.images_extracted,
+            len(state.errors),
+            time.monotonic() - started,
         )
 
     except Exception as exc:
@@ -297,6 +291,50 @@ async def _run_import_background(nsx_path: Path, state: ImportState) -> None:
             pass
 
 
+async def _upsert_note_images(session: AsyncSession, attachments: list[AttachmentInfo]) -> None:
+    """Insert or update image mappings in one ``INSERT ... ON CONFLICT`` statement."""
+    if not attachments:
+        return
+
+    # ON CONFLICT cannot touch the same row twice in one statement.
+    rows = {
+        (att.note_id, att.ref): {
+            "synology_note_id": att.note_id,
+            "ref": att.ref,
+            "name": att.name,
+            "md5": att.md5,
+            "file_path": str(att.file_path),
+            "mime_type": att.mime_type,
+            "width": att.width,
+            "height": att.height,
+        }
+        for att in attachments
+    }
+    stmt = pg_insert(NoteImage).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_note_images_note_ref",
+        set_={
+            "name": stmt.excluded.name,
+            "md5": stmt.excluded.md5,
+            "file_path": stmt.excluded.file_path,
+            "mime_type": stmt.excluded.mime_type,
+            "width": stmt.excluded.width,
+            "height": stmt.excluded.height,
+        },
+    )
+    await session.execute(stmt)
+
+
+@job_handler("nsx_import")
+async def _import_job(ctx: JobContext) -> None:
+    """Job queue entry point for an uploaded NSX import."""
+    state = ImportState()
+    ctx.track(state)
+    await _run_import_background(Path(ctx.payload["nsx_path"]), state)
+    if state.status == "error":
+        raise JobError(state.error_message or "NSX import failed")
+
+
 async def _upsert_notes(
     session: AsyncSession,
     notes: list[NoteRecord],
@@ -357,7 +395,6 @@ async def _upsert_notes(
 
 @router.post("/nsx/import", response_model=NsxImportResponse)
 async def import_nsx(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="NSX export file from NoteStation"),
     current_user: dict = Depends(get_current_user),  # noqa: B008
 ) -> NsxImportResponse:
@@ -368,7 +405,8 @@ async def import_nsx(
 
     Requires JWT authentication via Bearer token.
     """
-    if _import_state.is_importing:
+    latest = await get_latest_job("nsx_import")
+    if latest is not None and latest.status in ("queued", "running"):
         return NsxImportResponse(
             status="already_importing",
             message="이미 NSX 가져오기가 진행 중입니다.",
@@ -398,7 +436,19 @@ async def import_nsx(
         ) from e
 
     # Start background import
-    background_tasks.add_task(_run_import_background, nsx_path, _import_state)
+    _, created = await submit_job(
+        "nsx_import",
+        {"nsx_path": str(nsx_path), "filename": file.filename},
+        progress={"status": "importing", "is_importing": True},
+        triggered_by=get_trigger_name(current_user),
+    )
+    if not created:
+        nsx_path.unlink(missing_ok=True)
+        return NsxImportResponse(
+            status="already_importing",
+            message="이미 NSX 가져오기가 진행 중입니다.",
+            filename=None,
+        )
     await log_activity(
         "nsx", "started",
         message=f"NSX 가져오기 시작: {file.filename}",
@@ -420,13 +470,17 @@ async def get_import_status(
 
     Requires JWT authentication via Bearer token.
     """
+    state = apply_progress(ImportState(), await get_latest_job("nsx_import"), running_flag="is_importing")
     return NsxImportStatusResponse(
-        status=_import_state.status,
-        last_import_at=_import_state.last_import_at,
-        notes_processed=_import_state.notes_processed,
-        images_extracted=_import_state.images_extracted,
-        error_message=_import_state.error_message,
-        errors=_import_state.errors[:10],  # Limit to first 10 errors
+        status=state.status,
+        last_import_at=state.last_import_at,
+        notes_processed=state.notes_processed,
+        images_extracted=state.images_extracted,
+        notes_total=state.notes_total,
+        notes_per_second=state.notes_per_second,
+        elapsed_seconds=state.elapsed_seconds,
+        error_message=state.error_message,
+        errors=state.errors[:10],  # Limit to first 10 errors
     )
 
 
@@ -635,10 +689,17 @@ SYSTEM_FILES = frozenset({"checked", "unchecked", "shadow_title"})
 
 async def _export_note_images(
     client_url: str,
-    sid: str,
+    client: SynologyClient,
     note_id: str,
     output_dir: Path,
+    blobs: list[StoredBlob],
 ) -> tuple[int, str | None]:
+    """Export one note from the NAS and store its image files.
+
+    ``start`` and ``status`` go through ``client`` so an expired session is
+    renewed; the zip download (not a JSON API response) then uses the
+    client's current session id.
+    """
     import io
 
     import httpx
@@ -646,51 +707,29 @@ async def _export_note_images(
     images_extracted = 0
 
     try:
-        async with httpx.AsyncClient(verify=False, timeout=60.0) as http:
-            url = f"{client_url}/webapi/entry.cgi"
-
-            start_resp = await http.post(
-                url,
-                data={
-                    "api": "SYNO.NoteStation.Export.Note",
-                    "version": 1,
-                    "method": "start",
-                    "object_id": note_id,
-                    "_sid": sid,
-                },
-            )
-            start_result = start_resp.json()
-
-            if not start_result.get("success"):
-                return 0, f"Failed to start export: {start_result}"
-
-            task_id = start_result["data"]["task_id"]
-
-            for _ in range(30):
-                await asyncio.sleep(1)
-                status_resp = await http.post(
-                    url,
-                    data={
-                        "api": "SYNO.NoteStation.Export.Note",
-                        "version": 1,
-                        "method": "status",
-                        "task_id": task_id,
-                        "_sid": sid,
-                    },
-                )
-                if status_resp.json().get("data", {}).get("finish"):
-                    break
-            else:
-                return 0, "Export timeout"
+        try:
+            started = await client.post_request("SYNO.NoteStation.Export.Note", "start", object_id=note_id)
+        except SynologyApiError as exc:
+            return 0, f"Failed to start export: {exc}"
+        task_id = started["task_id"]
+
+        for _ in range(30):
+            await asyncio.sleep(1)
+            status = await client.post_request("SYNO.NoteStation.Export.Note", "status", task_id=task_id)
+            if status.get("finish"):
+                break
+        else:
+            return 0, "Export timeout"
 
+        async with httpx.AsyncClient(verify=False, timeout=60.0) as http:
             download_resp = await http.post(
-                url,
+                f"{client_url}/webapi/entry.cgi",
                 data={
                     "api": "SYNO.NoteStation.Export.Note",
                     "version": 1,
                     "method": "download",
                     "task_id": task_id,
-                    "_sid": sid,
+                    "_sid": client.sid,
                 },
             )
 
@@ -712,7 +751,7 @@ async def _export_note_images(
 
                     output_path = output_dir / f"{md5}.{ext}"
                     if not output_path.exists():
-                        output_path.write_bytes(zf.read(name))
+                        blobs.append(await asyncio.to_thread(get_blob_store().put_bytes, zf.read(name), output_path))
 
                     images_extracted += 1
 
@@ -725,12 +764,13 @@ async def _export_note_images(
 
 async def _sync_note_with_images(
     nas_url: str,
-    sid: str,
+    client: SynologyClient,
     note_id: str,
     output_dir: Path,
     notestation,
 ) -> tuple[int, str | None]:
-    images_count, error = await _export_note_images(nas_url, sid, note_id, output_dir)
+    blobs: list[StoredBlob] = []
+    images_count, error = await _export_note_images(nas_url, client, note_id, output_dir, blobs)
     if error:
         return 0, error
 
@@ -776,6 +816,7 @@ async def _sync_note_with_images(
                 )
                 db.add(note_image)
 
+            await register_refs(db, blobs)
             await db.commit()
 
     except Exception as e:
@@ -789,8 +830,8 @@ async def _run_image_sync_background(state: ImageSyncState) -> None:
     from sqlalchemy import text
 
     from app.api.settings import get_nas_config
-    from app.synology_gateway.client import SynologyClient
     from app.synology_gateway.notestation import NoteStationService
+    from app.synology_gateway.pool import get_nas_pool
 
     state.status = "syncing"
     state.is_syncing = True
@@ -802,8 +843,7 @@ async def _run_image_sync_background(state: ImageSyncState) -> None:
 
     try:
         nas = get_nas_config()
-        client = SynologyClient(url=nas["url"], user=nas["user"], password=nas["password"])
-        sid = await client.login()
+        client = await (await get_nas_pool()).get_client()
         notestation = NoteStationService(client)
 
         output_dir = Path(settings.NSX_IMAGES_PATH)
@@ -812,13 +852,14 @@ async def _run_image_sync_background(state: ImageSyncState) -> None:
         async with async_session_factory() as db:
             # Count total notes needing image sync
             # Match notes with original ref="..." tags OR NAS proxy URLs
+            # (precomputed counters, see Note.image_nas_refs / image_proxy_refs)
             count_result = await db.execute(
                 text("""
                     SELECT COUNT(DISTINCT n.synology_note_id)
                     FROM notes n
                     WHERE (
-                        n.content_html ~ '<img[^>]*ref="[^"]+"'
-                        OR n.content_html LIKE '%/api/nas-images/%'
+                        n.image_nas_refs > 0
+                        OR n.image_proxy_refs > 0
                     )
                     AND NOT EXISTS (
                         SELECT 1 FROM note_images ni
@@ -834,8 +875,8 @@ async def _run_image_sync_background(state: ImageSyncState) -> None:
                     SELECT DISTINCT n.synology_note_id
                     FROM notes n
                     WHERE (
-                        n.content_html ~ '<img[^>]*ref="[^"]+"'
-                        OR n.content_html LIKE '%/api/nas-images/%'
+                        n.image_nas_refs > 0
+                        OR n.image_proxy_refs > 0
                     )
                     AND NOT EXISTS (
                         SELECT 1 FROM note_images ni
@@ -852,14 +893,13 @@ async def _run_image_sync_background(state: ImageSyncState) -> None:
         if not note_ids:
             state.status = "completed"
             state.last_sync_at = datetime.now(UTC).isoformat()
-            await client.close()
             return
 
         semaphore = asyncio.Semaphore(5)
 
         async def process_note(note_id: str) -> None:
             async with semaphore:
-                images, error = await _sync_note_with_images(nas["url"], sid, note_id, output_dir, notestation)
+                images, error = await _sync_note_with_images(nas["url"], client, note_id, output_dir, notestation)
                 state.processed_notes += 1
                 if error:
                     state.failed_notes += 1
@@ -868,8 +908,6 @@ async def _run_image_sync_background(state: ImageSyncState) -> None:
 
         await asyncio.gather(*[process_note(nid) for nid in note_ids])
 
-        await client.close()
-
         # Check if there are remaining notes after this batch
         remaining = total_needing_sync - len(note_ids)
         state.remaining_notes = max(0, remaining)
@@ -911,9 +949,19 @@ async def _run_image_sync_background(state: ImageSyncState) -> None:
         state.is_syncing = False
 
 
+@job_handler("image_sync")
+async def _image_sync_job(ctx: JobContext) -> None:
+    """Job queue entry point for NAS image sync."""
+    state = ImageSyncState()
+    state.total_notes = ctx.payload.get("total_notes", 0)
+    ctx.track(state)
+    await _run_image_sync_background(state)
+    if state.status == "error":
+        raise JobError(state.error_message or "Image sync failed")
+
+
 @router.post("/nsx/sync-images", response_model=ImageSyncTriggerResponse)
 async def sync_images_from_nas(
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),  # noqa: B008
 ) -> ImageSyncTriggerResponse:
     """Trigger automatic image sync from NAS.
@@ -921,11 +969,12 @@ async def sync_images_from_nas(
     Exports notes with missing images from NAS and extracts embedded images.
     Processing happens in the background.
     """
-    if _image_sync_state.is_syncing:
+    active = await get_latest_job("image_sync")
+    if active is not None and active.status in ("queued", "running"):
         return ImageSyncTriggerResponse(
             status="already_syncing",
             message="이미 이미지 동기화가 진행 중입니다.",
-            total_notes=_image_sync_state.total_notes,
+            total_notes=(active.progress or {}).get("total_notes", 0),
         )
 
     # Get count of notes needing sync
@@ -939,8 +988,8 @@ async def sync_images_from_nas(
                 SELECT COUNT(DISTINCT n.synology_note_id)
                 FROM notes n
                 WHERE (
-                    n.content_html ~ '<img[^>]*ref="[^"]+"'
-                    OR n.content_html LIKE '%/api/nas-images/%'
+                    n.image_nas_refs > 0
+                    OR n.image_proxy_refs > 0
                 )
                 AND NOT EXISTS (
                     SELECT 1 FROM note_images ni
@@ -957,8 +1006,18 @@ async def sync_images_from_nas(
             total_notes=0,
         )
 
-    _image_sync_state.total_notes = total
-    background_tasks.add_task(_run_image_sync_background, _image_sync_state)
+    job, created = await submit_job(
+        "image_sync",
+        {"total_notes": total},
+        progress={"status": "syncing", "is_syncing": True, "total_notes": total},
+        triggered_by=get_trigger_name(current_user),
+    )
+    if not created:
+        return ImageSyncTriggerResponse(
+            status="already_syncing",
+            message="이미 이미지 동기화가 진행 중입니다.",
+            total_notes=(job.progress or {}).get("total_notes", 0),
+        )
     await log_activity(
         "image_sync", "started",
         message=f"이미지 동기화 시작: {total}개 노트",
@@ -977,15 +1036,16 @@ async def get_image_sync_status(
     current_user: dict = Depends(get_current_user),  # noqa: B008
 ) -> ImageSyncStatusResponse:
     """Get current image sync status."""
+    state = apply_progress(ImageSyncState(), await get_latest_job("image_sync"), running_flag="is_syncing")
     return ImageSyncStatusResponse(
-        status=_image_sync_state.status,
-        total_notes=_image_sync_state.total_notes,
-        processed_notes=_image_sync_state.processed_notes,
-        images_extracted=_image_sync_state.images_extracted,
-        failed_notes=_image_sync_state.failed_notes,
-        last_sync_at=_image_sync_state.last_sync_at,
-        error_message=_image_sync_state.error_message,
-        remaining_notes=_image_sync_state.remaining_notes,
+        status=state.status,
+        total_notes=state.total_notes,
+        processed_notes=state.processed_notes,
+        images_extracted=state.images_extracted,
+        failed_notes=state.failed_notes,
+        last_sync_at=state.last_sync_at,
+        error_message=state.error_message,
+        remaining_notes=state.remaining_notes,
     )
 
 
@@ -27,13 +27,13 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request
 from pydantic import BaseModel
 from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings, get_settings
-from app.database import async_session_factory, get_db
+from app.database import async_session_factory, get_db, get_read_db
 from app.models import Note
 from app.search.embeddings import EmbeddingService
 from app.search.engine import (
@@ -48,7 +48,9 @@ from app.search.engine import (
     UnifiedSearchEngine,
 )
 from app.search.indexer import NoteIndexer
+from app.services.access_scope import ensure_access_scope
 from app.services.auth_service import get_current_user
+from app.services.job_queue import JobContext, JobError, apply_progress, get_latest_job, job_handler, submit_job
 from app.services.oauth_service import OAuthService
 from app.utils.i18n import get_language
 from app.utils.messages import msg
@@ -134,18 +136,19 @@ class SearchResponse(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-def _build_fts_engine(session: AsyncSession) -> FullTextSearchEngine:
+def _build_fts_engine(session: AsyncSession, reader_id: int | None = None) -> FullTextSearchEngine:
     """Create a FullTextSearchEngine instance.
 
     Extracted as a function to allow easy mocking in tests.
     """
-    return FullTextSearchEngine(session=session)
+    return FullTextSearchEngine(session=session, reader_id=reader_id)
 
 
 def _build_semantic_engine(
     session: AsyncSession,
     settings: Settings | None = None,
     api_key: str | None = None,
+    reader_id: int | None = None,
 ) -> SemanticSearchEngine:
     """Create a SemanticSearchEngine with an EmbeddingService.
 
@@ -160,36 +163,37 @@ def _build_semantic_engine(
         model=settings.EMBEDDING_MODEL,
         dimensions=settings.EMBEDDING_DIMENSION,
     )
-    return SemanticSearchEngine(session=session, embedding_service=embedding_service)
+    return SemanticSearchEngine(session=session, embedding_service=embedding_service, reader_id=reader_id)
 
 
 def _build_hybrid_engine(
     session: AsyncSession,
     settings: Settings | None = None,
     api_key: str | None = None,
+    reader_id: int | None = None,
 ) -> HybridSearchEngine:
     """Create a HybridSearchEngine combining FTS and semantic engines.
 
     Extracted as a function to allow easy mocking in tests.
     """
-    fts = _build_fts_engine(session)
-    semantic = _build_semantic_engine(session, settings, api_key)
+    fts = _build_fts_engine(session, reader_id)
+    semantic = _build_semantic_engine(session, settings, api_key, reader_id)
     return HybridSearchEngine(fts_engine=fts, semantic_engine=semantic)
 
 
-def _build_trigram_engine(session: AsyncSession) -> TrigramSearchEngine:
-    return TrigramSearchEngine(session=session)
+def _build_trigram_engine(session: AsyncSession, reader_id: int | None = None) -> TrigramSearchEngine:
+    return TrigramSearchEngine(session=session, reader_id=reader_id)
 
 
-def _build_unified_engine(session: AsyncSession) -> UnifiedSearchEngine:
+def _build_unified_engine(session: AsyncSession, reader_id: int | None = None) -> UnifiedSearchEngine:
     """Create a UnifiedSearchEngine combining FTS + Trigram."""
-    fts = _build_fts_engine(session)
-    trigram = _build_trigram_engine(session)
+    fts = _build_fts_engine(session, reader_id)
+    trigram = _build_trigram_engine(session, reader_id)
     return UnifiedSearchEngine(fts_engine=fts, trigram_engine=trigram)
 
 
-def _build_exact_engine(session: AsyncSession) -> ExactMatchSearchEngine:
-    return ExactMatchSearchEngine(session=session)
+def _build_exact_engine(session: AsyncSession, reader_id: int | None = None) -> ExactMatchSearchEngine:
+    return ExactMatchSearchEngine(session=session, reader_id=reader_id)
 
 
 # ---------------------------------------------------------------------------
@@ -250,7 +254,7 @@ async def search(
     date_to: str | None = Query(None, description="Filter to date (YYYY-MM-DD)"),  # noqa: B008
     rerank: bool = Query(False, description="Apply Cohere reranking"),  # noqa: B008
     current_user: dict = Depends(get_current_user),  # noqa: B008
-    db: AsyncSession = Depends(get_db),  # noqa: B008
+    db: AsyncSession = Depends(get_read_db),  # noqa: B008
 ) -> SearchResponse:
     """Search notes using hybrid, full-text, or semantic search.
 
@@ -297,28 +301,32 @@ async def search(
         "date_to": parsed_date_to,
     }
 
+    # Restrict every engine to notes the caller can read
+    if user_id is not None:
+        await ensure_access_scope(db, user_id)
+
     if type == SearchType.exact:
-        engine = _build_exact_engine(db)
+        engine = _build_exact_engine(db, reader_id=user_id)
         page = await engine.search(q, limit=limit, offset=offset, **filter_kwargs)
 
     elif type == SearchType.semantic:
-        engine = _build_semantic_engine(db, api_key=api_key)
+        engine = _build_semantic_engine(db, api_key=api_key, reader_id=user_id)
         page = await engine.search(q, limit=limit, offset=offset, **filter_kwargs)
 
     elif type == SearchType.fts:
-        engine = _build_fts_engine(db)
+        engine = _build_fts_engine(db, reader_id=user_id)
         page = await engine.search(q, limit=limit, offset=offset, **filter_kwargs)
 
     elif type == SearchType.trigram:
-        engine = _build_trigram_engine(db)
+        engine = _build_trigram_engine(db, reader_id=user_id)
         page = await engine.search(q, limit=limit, offset=offset, **filter_kwargs)
 
     elif type == SearchType.hybrid:
-        engine = _build_hybrid_engine(db, api_key=api_key)
+        engine = _build_hybrid_engine(db, api_key=api_key, reader_id=user_id)
         page = await engine.search(q, limit=limit, offset=offset, **filter_kwargs)
 
     else:  # search (default) — unified FTS + Trigram
-        engine = _build_unified_engine(db)
+        engine = _build_unified_engine(db, reader_id=user_id)
         page = await engine.search(q, limit=limit, offset=offset, **filter_kwargs)
 
     results = page.results
@@ -336,20 +344,17 @@ async def search(
     duration_ms = int((time.monotonic() - t_start) * 1000)
     judge_strategy = page.judge_info.strategy if page.judge_info else None
 
-    # Fire-and-forget search event recording (zero latency impact)
+    # Buffered search event recording (id is pre-allocated, row written later)
     from app.services.search_metrics import search_metrics
 
-    async def _record() -> int | None:
-        return await search_metrics.record_search(
-            query=q,
-            search_type=type.value,
-            result_count=page.total,
-            duration_ms=duration_ms,
-            user_id=user_id,
-            judge_strategy=judge_strategy,
-        )
-
-    record_task = asyncio.create_task(_record())
+    search_event_id = await search_metrics.record_search(
+        query=q,
+        search_type=type.value,
+        result_count=page.total,
+        duration_ms=duration_ms,
+        user_id=user_id,
+        judge_strategy=judge_strategy,
+    )
 
     # Build response
     response = SearchResponse(
@@ -393,13 +398,7 @@ async def search(
         ) if page.judge_info else None,
     )
 
-    # Try to attach search_event_id (wait briefly)
-    try:
-        event_id = await asyncio.wait_for(record_task, timeout=0.5)
-        response.search_event_id = event_id
-    except TimeoutError:
-        pass
-
+    response.search_event_id = search_event_id
     return response
 
 
@@ -484,19 +483,22 @@ async def refine_search(
     # 2. Re-search with refined query
     api_key = await _get_openai_api_key(db, username)
     search_type = request.search_type
+    user_id = current_user.get("user_id")
+    if user_id is not None:
+        await ensure_access_scope(db, user_id)
 
     if search_type == SearchType.exact:
-        engine = _build_exact_engine(db)
+        engine = _build_exact_engine(db, reader_id=user_id)
     elif search_type == SearchType.semantic:
-        engine = _build_semantic_engine(db, api_key=api_key)
+        engine = _build_semantic_engine(db, api_key=api_key, reader_id=user_id)
     elif search_type == SearchType.fts:
-        engine = _build_fts_engine(db)
+        engine = _build_fts_engine(db, reader_id=user_id)
     elif search_type == SearchType.trigram:
-        engine = _build_trigram_engine(db)
+        engine = _build_trigram_engine(db, reader_id=user_id)
     elif search_type == SearchType.hybrid:
-        engine = _build_hybrid_engine(db, api_key=api_key)
+        engine = _build_hybrid_engine(db, api_key=api_key, reader_id=user_id)
     else:
-        engine = _build_unified_engine(db)
+        engine = _build_unified_engine(db, reader_id=user_id)
 
     page: SearchPage = await engine.search(refinement.refined_query, limit=20)
 
@@ -559,7 +561,7 @@ async def search_suggestions(
     prefix: str = Query(..., min_length=1, max_length=100, description="Search prefix"),  # noqa: B008
     limit: int = Query(5, ge=1, le=10, description="Maximum suggestions"),  # noqa: B008
     current_user: dict = Depends(get_current_user),  # noqa: B008
-    db: AsyncSession = Depends(get_db),  # noqa: B008
+    db: AsyncSession = Depends(get_read_db),  # noqa: B008
 ) -> SuggestionResponse:
     """Get search suggestions based on note titles.
 
@@ -609,9 +611,6 @@ class IndexState:
     triggered_by: str | None = None
 
 
-_index_state = IndexState()
-
-
 class IndexStatusResponse(BaseModel):
     status: str
     total_notes: int
@@ -750,6 +749,24 @@ async def _run_index_background(state: IndexState, *, force: bool = False) -> No
         except Exception:
             logger.warning("Failed to refresh graph materialized view after indexing", exc_info=True)
 
+        try:
+            from app.services.related_notes import refresh_stale_neighbors
+
+            async with async_session_factory() as nn_session:
+                await refresh_stale_neighbors(nn_session)
+                await nn_session.commit()
+        except Exception:
+            logger.warning("Failed to refresh related-note neighbours after indexing", exc_info=True)
+
+        try:
+            from app.services.graph_snapshot import refresh_graph_snapshot
+
+            async with async_session_factory() as gs_session:
+                await refresh_graph_snapshot(gs_session)
+                await gs_session.commit()
+        except Exception:
+            logger.warning("Failed to refresh graph snapshot after indexing", exc_info=True)
+
         state.status = "completed"
         await log_activity(
             "embedding",
@@ -779,9 +796,24 @@ async def _run_index_background(state: IndexState, *, force: bool = False) -> No
         state.is_indexing = False
 
 
+@job_handler("index")
+async def _index_job(ctx: JobContext) -> None:
+    """Job queue entry point for batch embedding indexing.
+
+    The API key is resolved here rather than carried in the job payload so
+    it is never persisted in ``background_jobs``.
+    """
+    state = IndexState(triggered_by=ctx.triggered_by)
+    async with async_session_factory() as db:
+        state.api_key = await _get_openai_api_key(db, ctx.payload.get("username", ""))
+    ctx.track(state)
+    await _run_index_background(state, force=bool(ctx.payload.get("force")))
+    if state.status == "error":
+        raise JobError(state.error_message or "Indexing failed")
+
+
 @router.post("/index", response_model=IndexTriggerResponse)
 async def trigger_index(
-    background_tasks: BackgroundTasks,
     request: Request,
     force: bool = Query(False, description="Force re-embedding of all notes"),  # noqa: B008
     current_user: dict = Depends(get_current_user),  # noqa: B008
@@ -794,26 +826,26 @@ async def trigger_index(
     """
     lang = get_language(request)
 
-    if _index_state.is_indexing:
-        return IndexTriggerResponse(
-            status="already_indexing",
-            message=msg("search.index_trigger_already_running", lang),
-        )
-
     username = current_user.get("username", "")
     api_key = await _get_openai_api_key(db, username)
 
-    _index_state.api_key = api_key
-
     if not api_key:
         return IndexTriggerResponse(
             status="error",
             message=msg("search.index_trigger_no_api_key", lang),
         )
 
-    _index_state.triggered_by = current_user.get("username", "unknown")
-
-    background_tasks.add_task(_run_index_background, _index_state, force=force)
+    _, created = await submit_job(
+        "index",
+        {"username": username, "force": force},
+        progress={"status": "indexing", "is_indexing": True},
+        triggered_by=current_user.get("username", "unknown"),
+    )
+    if not created:
+        return IndexTriggerResponse(
+            status="already_indexing",
+            message=msg("search.index_trigger_already_running", lang),
+        )
 
     if force:
         msg_key = "search.index_trigger_force_started"
@@ -863,14 +895,15 @@ async def get_index_status(
     )
     stale_notes = stale_result.scalar() or 0
 
+    index_state = apply_progress(IndexState(), await get_latest_job("index"), running_flag="is_indexing")
     return IndexStatusResponse(
-        status=_index_state.status,
+        status=index_state.status,
         total_notes=total_notes,
         indexed_notes=indexed_notes,
         pending_notes=pending_notes,
         stale_notes=stale_notes,
-        current_batch=_index_state.current_batch,
-        total_batches=_index_state.total_batches,
-        failed=_index_state.failed,
-        error_message=_index_state.error_message,
+        current_batch=index_state.current_batch,
+        total_batches=index_state.total_batches,
+        failed=index_state.failed,
+        error_message=index_state.error_message,
     )
@@ -18,7 +18,7 @@ from app.services.access_control import (
 )
 from app.services.activity_log import get_trigger_name, log_activity
 from app.services.auth_service import get_current_user
-from app.services.user_service import get_user_by_email, get_user_by_id
+from app.services.user_service import get_user_by_email, get_users_by_ids
 
 logger = logging.getLogger(__name__)
 
@@ -67,15 +67,16 @@ async def get_note_sharing(
     accesses = await get_note_access_list(db, note_id)
     can_manage = await can_manage_note_access(db, current_user["user_id"], note_id)
 
+    users = await get_users_by_ids(db, (access.user_id for access in accesses if access.user_id))
+
     access_responses = []
     for access in accesses:
         user_email = None
         user_name = None
-        if access.user_id:
-            user = await get_user_by_id(db, access.user_id)
-            if user:
-                user_email = user.email
-                user_name = user.name
+        user = users.get(access.user_id) if access.user_id else None
+        if user:
+            user_email = user.email
+            user_name = user.name
 
         access_responses.append(
             AccessResponse(
@@ -11,18 +11,19 @@ Provides:
 Both endpoints require JWT authentication via the ``get_current_user``
 dependency.
 
-Sync state is tracked in-memory via :class:`SyncState`. The actual
-synchronisation runs as an ``asyncio.Task`` in the background so the
-trigger endpoint can return immediately.
+The actual synchronisation runs as a ``sync`` job on the durable job
+queue (:mod:`app.services.job_queue`) so the trigger endpoint can return
+immediately.  The worker mirrors the run's :class:`SyncState` into the
+job row, which is where the status endpoint reads it from.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -30,6 +31,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models import Note
 from app.services.auth_service import get_current_user
+from app.services.job_queue import JobContext, JobError, apply_progress, get_latest_job, job_handler, submit_job
 from app.utils.i18n import get_language
 from app.utils.messages import msg
 
@@ -63,15 +65,23 @@ class SyncStatusResponse(BaseModel):
     pushed_count: int | None = None
     conflicts_count: int | None = None
     write_enabled: bool | None = None
+    sync_mode: str | None = None  # "full" | "delta"
+    notes_scanned: int | None = None
+    notes_fetched: int | None = None
+    notes_written: int | None = None
+    duration_ms: int | None = None
 
 
 # ---------------------------------------------------------------------------
-# In-memory sync state
+# Sync state
 # ---------------------------------------------------------------------------
 
 
 class SyncState:
-    """Mutable in-memory tracker for synchronisation progress.
+    """Mutable tracker for synchronisation progress.
+
+    One instance lives for the duration of a ``sync`` job and is mirrored
+    into the job's progress; status requests rebuild it from the job row.
 
     Attributes:
         status: Current sync status (idle / syncing / indexing / completed / error).
@@ -98,10 +108,11 @@ class SyncState:
         self.write_enabled: bool | None = None
         self.triggered_by: str | None = None
         self.user_id: int | None = None
-
-
-# Module-level singleton -- shared across requests.
-_sync_state = SyncState()
+        self.sync_mode: str | None = None
+        self.notes_scanned: int | None = None
+        self.notes_fetched: int | None = None
+        self.notes_written: int | None = None
+        self.duration_ms: int | None = None
 
 
 # ---------------------------------------------------------------------------
@@ -116,26 +127,23 @@ class Sync2FARequiredError(Exception):
 
 
 async def _create_sync_service(user_id: int | None = None) -> tuple:
-    from app.api.settings import get_nas_config
     from app.database import async_session_factory
     from app.services.sync_service import SyncService
-    from app.synology_gateway.client import Synology2FARequired, SynologyClient
+    from app.synology_gateway.client import Synology2FARequired
     from app.synology_gateway.notestation import NoteStationService
+    from app.synology_gateway.pool import get_nas_pool
 
-    nas = get_nas_config()
     session = async_session_factory()
 
-    client = SynologyClient(
-        url=nas["url"],
-        user=nas["user"],
-        password=nas["password"],
-    )
     try:
-        await client.login()
+        pool = await get_nas_pool()
+        client = await pool.get_client()
     except Synology2FARequired:
-        await client.close()
         await session.close()
         raise Sync2FARequiredError("2FA 계정은 자동 동기화를 지원하지 않습니다. NSX 파일을 가져오기하세요.")
+    except Exception:
+        await session.close()
+        raise
 
     notestation = NoteStationService(client)
 
@@ -157,7 +165,7 @@ async def _count_notes_missing_images() -> int:
             text("""
                 SELECT COUNT(DISTINCT n.synology_note_id)
                 FROM notes n
-                WHERE n.content_html ~ '<img[^>]*ref="[^"]+"'
+                WHERE n.image_nas_refs > 0
                 AND NOT EXISTS (
                     SELECT 1 FROM note_images ni
                     WHERE ni.synology_note_id = n.synology_note_id
@@ -222,8 +230,18 @@ async def _index_notes_batch(note_ids: list[int], batch_size: int = 10) -> int:
     return indexed_count
 
 
-async def _run_sync_background(state: SyncState) -> None:
-    """Execute the full synchronisation and update *state* accordingly.
+def _full_sync_due(last_full_at: datetime | None) -> bool:
+    """Return True when the periodic full reconciliation is due."""
+    from app.config import get_settings
+
+    if last_full_at is None:
+        return True
+    max_age = timedelta(hours=get_settings().SYNC_FULL_RECONCILE_HOURS)
+    return datetime.now(UTC) - last_full_at >= max_age
+
+
+async def _run_sync_background(state: SyncState, mode: str = "full") -> None:
+    """Execute a synchronisation and update *state* accordingly.
 
     This function is designed to run as a background task. It catches
     all exceptions so that the sync state is always updated even on
@@ -231,6 +249,10 @@ async def _run_sync_background(state: SyncState) -> None:
 
     Args:
         state: The :class:`SyncState` instance to update.
+        mode: ``"full"`` compares every note and reconciles deletions,
+            ``"delta"`` only handles notes changed since the stored mtime
+            watermark, and ``"auto"`` runs a delta sync unless the periodic
+            full reconciliation is due.
     """
     from sqlalchemy import select
     from app.database import async_session_factory
@@ -247,10 +269,16 @@ async def _run_sync_background(state: SyncState) -> None:
         service, session, write_enabled = await _create_sync_service(user_id=state.user_id)
         state.write_enabled = write_enabled
         try:
-            result = await service.sync_all()
+            full = _full_sync_due(await service.last_full_sync_at()) if mode == "auto" else mode != "delta"
+            result = await service.sync_all(full=full)
             await session.commit()
 
             state.last_sync_at = result.synced_at.isoformat()
+            state.sync_mode = result.mode
+            state.notes_scanned = result.scanned
+            state.notes_fetched = result.fetched
+            state.notes_written = result.written
+            state.duration_ms = result.duration_ms
             state.notes_synced = result.total
             state.pushed_count = result.pushed
             state.conflicts_count = result.conflicts
@@ -308,6 +336,24 @@ async def _run_sync_background(state: SyncState) -> None:
             except Exception:
                 logger.warning("Failed to refresh graph materialized view after sync", exc_info=True)
 
+            try:
+                from app.services.related_notes import refresh_stale_neighbors
+
+                async with async_session_factory() as nn_session:
+                    await refresh_stale_neighbors(nn_session)
+                    await nn_session.commit()
+            except Exception:
+                logger.warning("Failed to refresh related-note neighbours after sync", exc_info=True)
+
+            try:
+                from app.services.graph_snapshot import refresh_graph_snapshot
+
+                async with async_session_factory() as gs_session:
+                    await refresh_graph_snapshot(gs_session)
+                    await gs_session.commit()
+            except Exception:
+                logger.warning("Failed to refresh graph snapshot after sync", exc_info=True)
+
             state.status = "completed"
             state.error_message = None
             await log_activity(
@@ -322,6 +368,11 @@ async def _run_sync_background(state: SyncState) -> None:
                     "conflicts": result.conflicts,
                     "total": result.total,
                     "notes_indexed": state.notes_indexed,
+                    "mode": result.mode,
+                    "scanned": result.scanned,
+                    "fetched": result.fetched,
+                    "written": result.written,
+                    "duration_ms": result.duration_ms,
                 },
                 triggered_by=state.triggered_by,
             )
@@ -344,6 +395,28 @@ async def _run_sync_background(state: SyncState) -> None:
         state.is_syncing = False
 
 
+@job_handler("sync")
+async def _sync_job(ctx: JobContext) -> None:
+    """Job queue entry point for a full NoteStation sync."""
+    state = SyncState()
+    state.triggered_by = ctx.triggered_by
+    state.user_id = ctx.payload.get("user_id")
+    ctx.track(state)
+    await _run_sync_background(state, mode=ctx.payload.get("mode", "full"))
+    if state.status == "error":
+        raise JobError(state.error_message or "Sync failed")
+
+
+async def _load_sync_state() -> SyncState:
+    """Rebuild the latest sync run's state from the job queue."""
+    state = apply_progress(SyncState(), await get_latest_job("sync"), running_flag="is_syncing")
+    if not state.last_sync_at:
+        last_ok = await get_latest_job("sync", status="completed")
+        if last_ok is not None:
+            state.last_sync_at = (last_ok.progress or {}).get("last_sync_at")
+    return state
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -351,7 +424,6 @@ async def _run_sync_background(state: SyncState) -> None:
 
 @router.post("/trigger", response_model=SyncTriggerResponse)
 async def trigger_sync(
-    background_tasks: BackgroundTasks,
     request: Request,
     current_user: dict = Depends(get_current_user),  # noqa: B008
 ) -> SyncTriggerResponse:
@@ -364,16 +436,18 @@ async def trigger_sync(
     """
     lang = get_language(request)
 
-    if _sync_state.is_syncing:
+    _, created = await submit_job(
+        "sync",
+        {"user_id": current_user.get("user_id"), "mode": "full"},
+        progress={"status": "syncing", "is_syncing": True},
+        triggered_by=current_user.get("username", "unknown"),
+    )
+    if not created:
         return SyncTriggerResponse(
             status="already_syncing",
             message=msg("sync.trigger_already_running", lang),
         )
 
-    _sync_state.triggered_by = current_user.get("username", "unknown")
-    _sync_state.user_id = current_user.get("user_id")
-    background_tasks.add_task(_run_sync_background, _sync_state)
-
     return SyncTriggerResponse(
         status="syncing",
         message=msg("sync.trigger_started", lang),
@@ -388,17 +462,23 @@ async def get_sync_status(
 
     Requires a valid Bearer access token.
     """
+    state = await _load_sync_state()
     return SyncStatusResponse(
-        status=_sync_state.status,
-        last_sync_at=_sync_state.last_sync_at,
-        notes_synced=_sync_state.notes_synced,
-        error_message=_sync_state.error_message,
-        notes_missing_images=_sync_state.notes_missing_images,
-        notes_indexed=_sync_state.notes_indexed,
-        notes_pending_index=_sync_state.notes_pending_index,
-        pushed_count=_sync_state.pushed_count,
-        conflicts_count=_sync_state.conflicts_count,
-        write_enabled=_sync_state.write_enabled,
+        status=state.status,
+        last_sync_at=state.last_sync_at,
+        notes_synced=state.notes_synced,
+        error_message=state.error_message,
+        notes_missing_images=state.notes_missing_images,
+        notes_indexed=state.notes_indexed,
+        notes_pending_index=state.notes_pending_index,
+        pushed_count=state.pushed_count,
+        conflicts_count=state.conflicts_count,
+        write_enabled=state.write_enabled,
+        sync_mode=state.sync_mode,
+        notes_scanned=state.notes_scanned,
+        notes_fetched=state.notes_fetched,
+        notes_written=state.notes_written,
+        duration_ms=state.duration_ms,
     )
 
 
@@ -576,8 +656,12 @@ async def push_note(
 
         # Mark as synced and store NAS-format content in DB
         # Extract data URI images the NAS may have left in the content
+        from app.services.blob_store import StoredBlob, register_refs
         from app.utils.note_utils import extract_data_uri_images
-        push_content = extract_data_uri_images(push_content)
+
+        blobs: list[StoredBlob] = []
+        push_content = extract_data_uri_images(push_content, blobs)
+        await register_refs(db, blobs)
         note.content_html = push_content
         note.content_text = NoteStationService.extract_text(push_content)
         note.sync_status = "synced"
@@ -634,6 +718,7 @@ async def pull_note(
         force: If True, overwrite local modifications with NAS version.
     """
     from app.services.activity_log import log_activity
+    from app.services.blob_store import StoredBlob, register_refs
     from app.synology_gateway.notestation import NoteStationService
     from app.utils.note_utils import extract_data_uri_images
 
@@ -677,7 +762,9 @@ async def pull_note(
         # Update local note with NAS data
         content_html = nas_note.get("content", "")
         # Extract data URI images to local files (rehype-raw can't parse huge data URIs)
-        content_html = extract_data_uri_images(content_html)
+        blobs: list[StoredBlob] = []
+        content_html = extract_data_uri_images(content_html, blobs)
+        await register_refs(db, blobs)
         note.title = nas_note.get("title", note.title)
         note.content_html = content_html
         note.content_text = NoteStationService.extract_text(content_html)
@@ -22,11 +22,36 @@ class Settings(BaseSettings):
     # --- Database ---
     DATABASE_URL: str = "postgresql+asyncpg://labnote:labnote@db:5432/labnote"
 
+    # --- Database Pools ---
+    DB_APPLICATION_NAME: str = "labnote-ai"  # Shown in pg_stat_activity, suffixed with the pool role
+    DB_POOL_SIZE: int = 10  # Persistent connections for API requests
+    DB_MAX_OVERFLOW: int = 10  # Extra request connections opened under load
+    DB_BACKGROUND_POOL_SIZE: int = 5  # Persistent connections for job workers and write-behind buffers
+    DB_BACKGROUND_MAX_OVERFLOW: int = 5  # Extra background connections opened under load
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Max wait for a free connection before the request fails
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this (-1 = never)
+    DB_POOL_PRE_PING: bool = True  # Test each connection on checkout (one extra round trip)
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection (0 behind pgbouncer)
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # statement_timeout on request connections (0 = none)
+    DB_BACKGROUND_STATEMENT_TIMEOUT_MS: int = 0  # statement_timeout on background connections (0 = none)
+
+    # --- Read Replica ---
+    READ_REPLICA_URL: str = ""  # Streaming replica for read-heavy endpoints (empty = primary only)
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5.0  # Replay lag above which reads fall back to the primary
+    READ_REPLICA_CHECK_SECONDS: float = 5.0  # How often replica health / lag is re-checked
+    READ_REPLICA_STICKY_SECONDS: float = 10.0  # Lifetime of the write-position cookie set after a caller's write
+
     # --- Synology NAS ---
     SYNOLOGY_URL: str = "http://localhost:5000"
     SYNOLOGY_USER: str = "admin"
     SYNOLOGY_PASSWORD: str = ""
 
+    # --- NAS Client Pool ---
+    NAS_POOL_SIZE: int = 2  # Authenticated NAS sessions shared by all NAS traffic
+    NAS_POOL_MAX_CONNECTIONS: int = 16  # HTTP connection limit towards the NAS host
+    NAS_POOL_MAX_KEEPALIVE: int = 8  # Idle keep-alive connections retained
+    NAS_REQUEST_TIMEOUT_SECONDS: float = 30.0
+
     # --- JWT ---
     JWT_SECRET: str = "change-this-secret-key"
     JWT_ALGORITHM: str = "HS256"
@@ -43,6 +68,10 @@ class Settings(BaseSettings):
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     EMBEDDING_DIMENSION: int = 1536
 
+    # --- AI Streaming ---
+    AI_STREAM_COALESCE_MS: int = 0  # Merge token chunks into one SSE frame for up to this long (0 = frame per chunk)
+    AI_STREAM_COALESCE_CHARS: int = 512  # A merged frame is sent early once it holds this many characters
+
     # --- Reranking ---
     COHERE_API_KEY: str = ""
     RERANK_MODEL: str = "rerank-english-v3.0"
@@ -60,11 +89,66 @@ class Settings(BaseSettings):
     NSX_EXPORTS_PATH: str = "/data/nsx_exports"  # Path for NSX export files
     UPLOADS_PATH: str = "/data/uploads"  # Path for user-uploaded files
     TRASH_PATH: str = "/data/trash"  # Path for trash backup data
+    BLOB_STORE_PATH: str = "/data/blobs"  # Content-addressed store (same filesystem as above)
+
+    # --- NAS Image Cache ---
+    NAS_IMAGE_CACHE_PATH: str = "/data/nas_image_cache"  # Disk cache for proxied NAS images
+    NAS_IMAGE_CACHE_MAX_MB: int = 2048  # LRU size bound for originals + thumbnails
+    NAS_THUMBNAIL_WORKERS: int = 2  # Threads rendering thumbnail variants
+
+    # --- Background Jobs ---
+    JOB_WORKER_ENABLED: bool = True  # Run a job worker inside each API process
+    JOB_WORKER_CONCURRENCY: int = 3  # Jobs a single worker runs at once
+    JOB_LONG_TYPES: str = "sync,nsx_import,image_sync,image_analysis,blob_migrate"  # Jobs that hold a slot for long
+    JOB_SHORT_SLOTS: int = 1  # Worker slots long job types may not take (kept for rollups, indexing, tagging)
+    JOB_WORKER_TYPES: str = ""  # Comma-separated job types to handle (empty = all)
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0  # Idle wait between claim attempts
+    JOB_LEASE_SECONDS: int = 60  # Lease renewed by the running worker
+    JOB_PROGRESS_INTERVAL_SECONDS: float = 1.0  # Heartbeat / progress flush interval
+
+    # --- Event Buffering ---
+    EVENT_FLUSH_INTERVAL_SECONDS: float = 1.0  # Max delay before buffered search events / activity logs are written
+    EVENT_FLUSH_BATCH_SIZE: int = 500  # Rows per multi-row INSERT; a full batch flushes early
+    EVENT_BUFFER_MAX: int = 10000  # Pending rows per table before new events are dropped
+
+    # --- Metrics ---
+    METRICS_SCRAPE_TOKEN: str = ""  # Bearer token for /admin/metrics/prometheus scrapers (empty = admin login only)
+    METRICS_ROLLUP_ENABLED: bool = True  # Fold raw search/feedback events into hourly dashboard rollups
+    METRICS_ROLLUP_INTERVAL_MINUTES: int = 15  # How often the metrics_rollup job is submitted
+    METRICS_RAW_RETENTION_DAYS: int = 180  # Raw search events / AI feedback kept after rollup (0 = forever)
+
+    # --- Query Accounting ---
+    QUERY_ACCOUNTING_ENABLED: bool = False  # Count SQL statements per request, add Server-Timing headers
+    QUERY_BUDGET_DEFAULT: int = 30  # Requests issuing more statements are logged
+    QUERY_REPEAT_THRESHOLD: int = 10  # One statement shape repeated this often per request is logged as N+1
+
+    # --- Startup ---
+    WARMUP_COMPONENTS: str = ""  # Preloaded before serving: kiwi, tiktoken, clustering, ai_providers, pdf, html
+    STARTUP_BUDGET_SECONDS: float = 15.0  # App import + lifespan startup above this is logged as a warning
+    STARTUP_IMPORT_BUDGET_SECONDS: float = 3.0  # `import app.main` budget checked by python -m app.startup_report
+
+    # --- Clustering ---
+    CLUSTERING_WORKERS: int = 1  # Worker processes running k-means off the event loop
+
+    # --- Scheduled Sync ---
+    SYNC_SCHEDULE_ENABLED: bool = False  # Periodic delta syncs from NoteStation
+    SYNC_INTERVAL_MINUTES: int = 15  # Delta sync interval
+    SYNC_JITTER_SECONDS: int = 60  # Random +/- offset applied to each interval
+    SYNC_FULL_RECONCILE_HOURS: int = 24  # Max age of the last full sync (deletions)
+    SYNC_SCHEDULE_OWNER: str = ""  # Email granted admin on notebooks created by scheduled syncs (empty = first owner)
 
     @property
     def async_database_url(self) -> str:
         """Ensure the database URL uses the asyncpg driver."""
-        url = self.DATABASE_URL
+        return self._asyncpg_url(self.DATABASE_URL)
+
+    @property
+    def async_read_replica_url(self) -> str:
+        """READ_REPLICA_URL with the asyncpg driver."""
+        return self._asyncpg_url(self.READ_REPLICA_URL)
+
+    @staticmethod
+    def _asyncpg_url(url: str) -> str:
         if url.startswith("postgresql://"):
             url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
         return url
@@ -1,24 +1,260 @@
 # @TASK P0-T0.3 - SQLAlchemy 2.x async 엔진 및 세션 팩토리
 # @SPEC docs/plans/2026-01-29-labnote-ai-design.md#postgresql-schema
 
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import TextClause, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.requests import Request
 
 from app.config import get_settings
+from app.services.instrumentation import DB_POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=False,
-    pool_pre_ping=True,
+# Which pool new statements use: "interactive" (requests) or "background"
+# (job workers, write-behind buffers).  Set with :func:`use_background_pool`.
+_db_role: ContextVar[str] = ContextVar("db_role", default="interactive")
+
+
+class _InteractivePool(AsyncAdaptedQueuePool):
+    label = "interactive"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started, pool=self.label)
+
+
+class _BackgroundPool(_InteractivePool):
+    label = "background"
+
+
+class _ReplicaPool(_InteractivePool):
+    label = "replica"
+
+
+def _create_engine(
+    pool_class: type[_InteractivePool],
+    pool_size: int,
+    max_overflow: int,
+    timeout_ms: int,
+    url: str | None = None,
+) -> AsyncEngine:
+    server_settings = {"application_name": f"{settings.DB_APPLICATION_NAME}-{pool_class.label}"}
+    if timeout_ms > 0:
+        server_settings["statement_timeout"] = str(timeout_ms)
+    return create_async_engine(
+        url or settings.async_database_url,
+        echo=False,
+        poolclass=pool_class,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    )
+
+
+engine = _create_engine(
+    _InteractivePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, settings.DB_STATEMENT_TIMEOUT_MS
+)
+background_engine = _create_engine(
+    _BackgroundPool,
+    settings.DB_BACKGROUND_POOL_SIZE,
+    settings.DB_BACKGROUND_MAX_OVERFLOW,
+    settings.DB_BACKGROUND_STATEMENT_TIMEOUT_MS,
 )
+replica_engine = (
+    _create_engine(
+        _ReplicaPool,
+        settings.DB_POOL_SIZE,
+        settings.DB_MAX_OVERFLOW,
+        settings.DB_STATEMENT_TIMEOUT_MS,
+        url=settings.async_read_replica_url,
+    )
+    if settings.READ_REPLICA_URL
+    else None
+)
+_engines = tuple(e for e in (engine, background_engine, replica_engine) if e is not None)
+
+if settings.QUERY_ACCOUNTING_ENABLED:
+    from app.services.query_accounting import install as install_query_accounting
+
+    for _engine in _engines:
+        install_query_accounting(_engine)
+
+# session.info keys: the session may read from the replica / has switched to the primary
+_READ_KEY = "read_replica"
+_PRIMARY_KEY = "use_primary"
+
+
+def _is_plain_read(clause) -> bool:
+    """Whether ``clause`` only reads: a SELECT without FOR UPDATE, or raw SQL starting with SELECT."""
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().lower().startswith("select")
+    return bool(getattr(clause, "is_select", False)) and getattr(clause, "_for_update_arg", None) is None
+
+
+class _RoutingSession(Session):
+    """Binds each statement to the pool of the current role.
+
+    Sessions from :func:`get_read_db` read from the replica until they
+    run anything but a plain read; that statement, a flush, or anything
+    after it goes to the primary for the rest of the request
+    (read-your-writes within the session).
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get(_READ_KEY) and not self.info.get(_PRIMARY_KEY):
+            if _is_plain_read(clause):
+                return replica_engine.sync_engine
+            self.info[_PRIMARY_KEY] = True
+        return (background_engine if _db_role.get() == "background" else engine).sync_engine
+
+
+@event.listens_for(_RoutingSession, "before_flush")
+def _flush_on_primary(session: Session, flush_context, instances) -> None:
+    if session.info.get(_READ_KEY):
+        session.info[_PRIMARY_KEY] = True
+
+
+def use_primary(session: AsyncSession) -> None:
+    """Send the rest of a read session to the primary (call before raw-SQL writes)."""
+    session.info[_PRIMARY_KEY] = True
+
+
+def use_background_pool() -> None:
+    """Route sessions opened from the current task (and tasks it starts) to the background pool."""
+    _db_role.set("background")
+
+
+def pool_status() -> dict[str, dict[str, int]]:
+    """Connections per pool: configured size, checked out and overflow in use."""
+    return {
+        pool.label: {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": max(0, pool.overflow())}
+        for pool in (e.pool for e in _engines)
+    }
+
+
+async def dispose_engines() -> None:
+    for e in _engines:
+        await e.dispose()
+
+
+# --- Read replica -----------------------------------------------------------------
+
+_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+_replica_ok = False
+_replica_checked_at = 0.0
+_replica_lock = asyncio.Lock()
+
+# Read-your-writes across processes: after a write request the client gets a
+# signed cookie holding the primary's WAL position, and its reads only use
+# the replica once the replica has replayed that far.
+WRITE_LSN_COOKIE = "db_write_lsn"
+_CURRENT_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+_REPLAY_LSN_SQL = text("SELECT pg_last_wal_replay_lsn()::text")
+
+
+def _lsn_value(lsn: str) -> int:
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def _sign_lsn(lsn: str) -> str:
+    return hmac.new(settings.JWT_SECRET.encode(), lsn.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+async def write_lsn_marker() -> str:
+    """The primary's current WAL position, signed, as the value of :data:`WRITE_LSN_COOKIE`."""
+    async with engine.connect() as conn:
+        lsn = await conn.scalar(_CURRENT_LSN_SQL)
+    return f"{lsn}.{_sign_lsn(lsn)}"
+
+
+def _marker_lsn(marker: str | None) -> int | None:
+    """The WAL position in a :func:`write_lsn_marker` value, or ``None`` if absent or forged."""
+    if not marker:
+        return None
+    lsn, _, signature = marker.rpartition(".")
+    if not lsn or not hmac.compare_digest(signature, _sign_lsn(lsn)):
+        return None
+    try:
+        return _lsn_value(lsn)
+    except ValueError:
+        return None
+
+
+async def _replica_replayed(session: AsyncSession, lsn: int) -> bool:
+    """Whether the replica connection of ``session`` has replayed up to ``lsn``.
+
+    Asked on the session's own connection, so later reads see the same server.
+    """
+    try:
+        replayed = await session.scalar(_REPLAY_LSN_SQL)
+    except Exception:
+        logger.warning("Read replica replay position check failed; reading from the primary", exc_info=True)
+        await session.rollback()
+        return False
+    return replayed is not None and _lsn_value(replayed) >= lsn
+
+
+async def replica_available() -> bool:
+    """Whether reads may go to the replica (reachable and within ``READ_REPLICA_MAX_LAG_SECONDS``).
+
+    Checked at most every ``READ_REPLICA_CHECK_SECONDS``; the result is shared
+    by all requests in between.
+    """
+    global _replica_ok, _replica_checked_at
+
+    if replica_engine is None:
+        return False
+    if time.monotonic() - _replica_checked_at < settings.READ_REPLICA_CHECK_SECONDS:
+        return _replica_ok
+    async with _replica_lock:
+        if time.monotonic() - _replica_checked_at < settings.READ_REPLICA_CHECK_SECONDS:
+            return _replica_ok
+        try:
+            async with replica_engine.connect() as conn:
+                lag = float(await asyncio.wait_for(conn.scalar(_REPLICA_LAG_SQL), timeout=2.0) or 0)
+            ok = lag <= settings.READ_REPLICA_MAX_LAG_SECONDS
+            if not ok:
+                logger.warning("Read replica is %.1fs behind; reading from the primary", lag)
+        except Exception:
+            logger.warning("Read replica check failed; reading from the primary", exc_info=True)
+            ok = False
+        _replica_ok = ok
+        _replica_checked_at = time.monotonic()
+        return ok
+
 
 async_session_factory = async_sessionmaker(
-    bind=engine,
     class_=AsyncSession,
+    sync_session_class=_RoutingSession,
     expire_on_commit=False,
 )
 
@@ -43,3 +279,25 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Like :func:`get_db`, but reads go to the read replica when one is usable.
+
+    Falls back to the primary when no replica is configured, it lags or is
+    unreachable, or it has not yet replayed the caller's last write (the
+    :data:`WRITE_LSN_COOKIE` position).  Writes through the session always
+    reach the primary.
+    """
+    async with async_session_factory() as session:
+        if await replica_available():
+            session.info[_READ_KEY] = True
+            lsn = _marker_lsn(request.cookies.get(WRITE_LSN_COOKIE))
+            if lsn is not None and not await _replica_replayed(session, lsn):
+                session.info[_PRIMARY_KEY] = True
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
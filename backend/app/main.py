@@ -1,18 +1,31 @@
 # @TASK P0-T0.3 - FastAPI 앱 엔트리포인트
 # @SPEC docs/plans/2026-01-29-labnote-ai-design.md#system-architecture
 
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine
+from app.database import dispose_engines, engine
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Manage application lifespan: startup and shutdown events."""
+    from app.services.instrumentation import STARTUP_SECONDS
+
+    lifespan_started = time.perf_counter()
+    STARTUP_SECONDS.set(lifespan_started - _import_started, phase="imports")
+
     # Startup: create all database tables if they don't exist
     from app.database import Base
     from app import models  # noqa: F401 - Import models to register them with Base
@@ -27,9 +40,70 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     async with async_session_factory() as db:
         await sync_api_keys_to_env(db)
 
+    # Durable background job worker (sync, indexing, imports, image analysis)
+    from app.config import get_settings
+    from app.services.job_queue import JobWorker
+
+    settings = get_settings()
+    job_worker = None
+    if settings.JOB_WORKER_ENABLED:
+        job_types = [t.strip() for t in settings.JOB_WORKER_TYPES.split(",") if t.strip()] or None
+        job_worker = JobWorker(job_types=job_types)
+        job_worker.start()
+
+    sync_scheduler = None
+    if settings.SYNC_SCHEDULE_ENABLED:
+        from app.services.sync_scheduler import SyncScheduler
+
+        sync_scheduler = SyncScheduler()
+        sync_scheduler.start()
+
+    metrics_scheduler = None
+    if settings.METRICS_ROLLUP_ENABLED:
+        from app.services.metrics_rollup import MetricsRollupScheduler
+
+        metrics_scheduler = MetricsRollupScheduler()
+        metrics_scheduler.start()
+
+    # Preload the heavy dependencies this deployment serves (imported lazily otherwise)
+    if settings.WARMUP_COMPONENTS:
+        from app.services.warmup import warm_up
+
+        warmup_started = time.perf_counter()
+        await asyncio.to_thread(warm_up, settings.WARMUP_COMPONENTS)
+        STARTUP_SECONDS.set(time.perf_counter() - warmup_started, phase="warmup")
+
+    now = time.perf_counter()
+    STARTUP_SECONDS.set(now - lifespan_started, phase="lifespan")
+    startup_seconds = now - _import_started
+    if settings.STARTUP_BUDGET_SECONDS > 0 and startup_seconds > settings.STARTUP_BUDGET_SECONDS:
+        logger.warning(
+            "Startup took %.2fs (budget %.2fs); run `python -m app.startup_report` to find slow imports",
+            startup_seconds,
+            settings.STARTUP_BUDGET_SECONDS,
+        )
+    else:
+        logger.info("Startup took %.2fs", startup_seconds)
+
     yield
-    # Shutdown: dispose the async engine connection pool
-    await engine.dispose()
+    # Shutdown: stop scheduling and claiming jobs, then dispose the async engine connection pool
+    if metrics_scheduler is not None:
+        await metrics_scheduler.stop()
+    if sync_scheduler is not None:
+        await sync_scheduler.stop()
+    if job_worker is not None:
+        await job_worker.stop()
+
+    from app.services.clustering import shutdown_clustering_pool
+    from app.services.event_buffer import stop_event_buffers
+    from app.services.image_cache import shutdown_image_cache
+    from app.synology_gateway.pool import close_nas_pool
+
+    await stop_event_buffers()
+    shutdown_clustering_pool()
+    shutdown_image_cache()
+    await close_nas_pool()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -56,6 +130,8 @@ app.add_middleware(
 # --- Setup Guard Middleware ---
 from starlette.responses import JSONResponse
 
+from app.config import get_settings as _get_settings
+
 
 @app.middleware("http")
 async def setup_guard(request, call_next):
@@ -94,6 +170,51 @@ async def setup_guard(request, call_next):
     return await call_next(request)
 
 
+# --- Read Replica Stickiness (only with READ_REPLICA_URL) ---
+if _get_settings().READ_REPLICA_URL:
+    from app.database import WRITE_LSN_COOKIE, write_lsn_marker
+
+    @app.middleware("http")
+    async def pin_writers_to_primary(request, call_next):
+        """After a successful write request, hand the caller the primary's WAL position.
+
+        ``get_read_db`` reads from the replica for that caller only once it
+        has replayed up to the position, in whichever process serves them.
+        """
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            try:
+                marker = await write_lsn_marker()
+            except Exception:
+                logger.warning("Could not read the primary WAL position", exc_info=True)
+            else:
+                response.set_cookie(
+                    WRITE_LSN_COOKIE,
+                    marker,
+                    max_age=int(_get_settings().READ_REPLICA_STICKY_SECONDS),
+                    httponly=True,
+                    samesite="lax",
+                )
+        return response
+
+
+# --- Query Accounting Middleware (opt-in) ---
+if _get_settings().QUERY_ACCOUNTING_ENABLED:
+    from app.services import query_accounting
+
+    @app.middleware("http")
+    async def account_queries(request, call_next):
+        """Count SQL statements per request; report them in Server-Timing."""
+        stats, token = query_accounting.begin_request()
+        try:
+            response = await call_next(request)
+        finally:
+            query_accounting.end_request(token)
+        response.headers.append("Server-Timing", stats.server_timing())
+        query_accounting.report(stats, request.method, request.url.path)
+        return response
+
+
 # --- Router includes ---
 from app.api.auth import router as auth_router
 from app.api.notes import router as notes_router
@@ -143,6 +264,7 @@ from app.api.setup import router as setup_router
 from app.api.handwriting import router as handwriting_router
 from app.api.comments import router as comments_router
 from app.api.notifications import router as notifications_router
+from app.api.jobs import router as jobs_router
 
 app.include_router(nsx_router, prefix="/api")
 app.include_router(backup_router, prefix="/api")
@@ -166,6 +288,7 @@ app.include_router(setup_router, prefix="/api")
 app.include_router(handwriting_router, prefix="/api")
 app.include_router(comments_router, prefix="/api")
 app.include_router(notifications_router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
 
 
 @app.get("/api/health", tags=["health"])
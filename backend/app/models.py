@@ -1,27 +1,34 @@
 # @TASK P0-T0.5 - PostgreSQL schema and pgvector migration
 # @SPEC docs/plans/2026-01-29-labnote-ai-design.md#database-schema
 
-from datetime import datetime
+from datetime import date, datetime
 
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
     BigInteger,
     Boolean,
     CheckConstraint,
+    Date,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     SmallInteger,
     String,
     Text,
     UniqueConstraint,
+    event,
     func,
+    text,
 )
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
+from app.utils.note_utils import count_image_refs
 
 
 class Note(Base):
@@ -65,14 +72,39 @@ class Note(Base):
     # Full-text search vector
     search_vector: Mapped[str | None] = mapped_column(TSVECTOR, nullable=True)
 
+    # Image reference counts derived from content_html (see _sync_image_ref_counts)
+    image_nas_refs: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+    image_proxy_refs: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+    image_data_uris: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+    image_local_refs: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+
     __table_args__ = (
         Index("idx_notes_search_vector", "search_vector", postgresql_using="gin"),
         Index("idx_notes_notebook", "notebook_name"),
         Index("idx_notes_synced_at", "synced_at"),
         Index("idx_notes_sync_status", "sync_status"),
+        Index(
+            "idx_notes_image_sync",
+            "synology_note_id",
+            postgresql_where=text("image_nas_refs > 0 OR image_proxy_refs > 0"),
+        ),
     )
 
 
+@event.listens_for(Note, "before_insert")
+@event.listens_for(Note, "before_update")
+def _sync_image_ref_counts(_mapper, _connection, target: Note) -> None:
+    """Keep the ``image_*`` counters in step with ``content_html`` on ORM flush.
+
+    Bulk ``update(Note)`` statements bypass this hook; they must set the
+    counters themselves.
+    """
+    state = sa_inspect(target)
+    if state.pending or state.attrs.content_html.history.has_changes():
+        for name, value in count_image_refs(target.content_html).items():
+            setattr(target, name, value)
+
+
 class Notebook(Base):
     """Notebook model for organizing notes."""
 
@@ -121,6 +153,70 @@ class NoteEmbedding(Base):
     )
 
 
+class NoteNeighbor(Base):
+    """Precomputed top-K related notes per note (refreshed after indexing)."""
+
+    __tablename__ = "note_neighbors"
+
+    note_id: Mapped[int] = mapped_column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    neighbor_id: Mapped[int] = mapped_column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    rank: Mapped[int] = mapped_column(SmallInteger)
+    similarity: Mapped[float] = mapped_column(Float)  # Best chunk of neighbor vs. note centroid
+    snippet: Mapped[str] = mapped_column(Text, default="")
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_note_neighbors_note_rank", "note_id", "rank"),
+        Index("idx_note_neighbors_neighbor_id", "neighbor_id"),
+    )
+
+
+class NoteNeighborRefresh(Base):
+    """When a note's neighbour list was last computed (also for notes with no neighbours)."""
+
+    __tablename__ = "note_neighbor_refreshes"
+
+    note_id: Mapped[int] = mapped_column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class RediscoveryPool(Base):
+    """What a user's rediscovery pool was built from (see services/rediscovery.py)."""
+
+    __tablename__ = "rediscovery_pools"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    recent_ids: Mapped[list] = mapped_column(JSONB, default=list)
+    computed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    requested_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class RediscoveryCandidate(Base):
+    """Cached per-user pool of old notes close to recent work (see services/rediscovery.py)."""
+
+    __tablename__ = "rediscovery_candidates"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    note_id: Mapped[int] = mapped_column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    similarity: Mapped[float] = mapped_column(Float)
+    snippet: Mapped[str] = mapped_column(Text, default="")
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("idx_rediscovery_candidates_user_similarity", "user_id", "similarity"),)
+
+
+class GraphSnapshot(Base):
+    """Versioned top-K neighbour lists for the global graph (see services/graph_snapshot.py)."""
+
+    __tablename__ = "graph_snapshots"
+
+    version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    node_count: Mapped[int] = mapped_column(Integer, default=0)
+    neighbors_per_note: Mapped[int] = mapped_column(SmallInteger)
+    payload: Mapped[bytes] = mapped_column(LargeBinary)  # np.savez_compressed columns
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class Setting(Base):
     """Application settings stored as key-value pairs in JSONB."""
 
@@ -386,6 +482,47 @@ class GroupNotebookAccess(Base):
     )
 
 
+class AccessScope(Base):
+    """Per-user materialised read scope (see services/access_scope.py).
+
+    ``generation`` is the user's generation (global ``access_scope_generation``
+    plus their ``access_scope_user_generations`` row) the scope was built at;
+    ACL tables bump the affected users' counters through statement triggers.
+    """
+
+    __tablename__ = "access_scopes"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    generation: Mapped[int] = mapped_column(BigInteger)
+    built_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class AccessScopeNotebook(Base):
+    """Notebooks a user can access, with the effective permission."""
+
+    __tablename__ = "access_scope_notebooks"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    notebook_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("notebooks.id", ondelete="CASCADE"), primary_key=True
+    )
+    permission: Mapped[str] = mapped_column(String(20))
+
+    __table_args__ = (Index("idx_access_scope_notebooks_notebook_id", "notebook_id"),)
+
+
+class AccessScopeNote(Base):
+    """Notes a user can access through note-level grants."""
+
+    __tablename__ = "access_scope_notes"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    note_id: Mapped[int] = mapped_column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True)
+    permission: Mapped[str] = mapped_column(String(20))
+
+    __table_args__ = (Index("idx_access_scope_notes_note_id", "note_id"),)
+
+
 class ShareLink(Base):
     """Shareable links for notes or notebooks with access control."""
 
@@ -426,6 +563,8 @@ class ClusteringTask(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Per-phase durations: fetch_ms, kmeans_ms, summaries_ms, save_ms, warm_start
+    timings: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
     __table_args__ = (
         Index("idx_clustering_tasks_task_id", "task_id"),
@@ -534,6 +673,7 @@ class SearchEvent(Base):
     __table_args__ = (
         Index("idx_search_events_user_created", "user_id", "created_at"),
         Index("idx_search_events_type_created", "search_type", "created_at"),
+        Index("idx_search_events_created", "created_at"),
     )
 
 
@@ -553,6 +693,7 @@ class SearchFeedback(Base):
 
     __table_args__ = (
         UniqueConstraint("search_event_id", "note_id", "user_id", name="uq_search_feedback_event_note_user"),
+        Index("idx_search_feedback_created", "created_at"),
     )
 
 
@@ -578,6 +719,76 @@ class AIFeedback(Base):
     )
 
 
+class SearchEventRollup(Base):
+    """Hourly search_events aggregates per search type (see services/metrics_rollup)."""
+
+    __tablename__ = "search_event_rollups"
+
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    search_type: Mapped[str] = mapped_column(String(30), primary_key=True)
+    searches: Mapped[int] = mapped_column(Integer, nullable=False)
+    zero_results: Mapped[int] = mapped_column(Integer, nullable=False)
+    result_count_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    duration_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    duration_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class SearchDurationRollup(Base):
+    """Hourly histogram of search durations (bins defined in services/metrics_rollup)."""
+
+    __tablename__ = "search_duration_rollups"
+
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    bin: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class SearchZeroResultRollup(Base):
+    """Hourly counts of queries that returned no results."""
+
+    __tablename__ = "search_zero_result_rollups"
+
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    query: Mapped[str] = mapped_column(String(500), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class SearchFeedbackRollup(Base):
+    """Hourly search relevance feedback per search type."""
+
+    __tablename__ = "search_feedback_rollups"
+
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    search_type: Mapped[str] = mapped_column(String(30), primary_key=True)
+    has_details: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    positive: Mapped[int] = mapped_column(Integer, nullable=False)
+    total: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class AIFeedbackRollup(Base):
+    """Hourly AI rating sums per feature and model ('' = no model recorded)."""
+
+    __tablename__ = "ai_feedback_rollups"
+
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    feature: Mapped[str] = mapped_column(String(50), primary_key=True)
+    model_used: Mapped[str] = mapped_column(String(100), primary_key=True)
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class NotebookNoteDay(Base):
+    """Notes created per notebook and day, kept current by a trigger on notes."""
+
+    __tablename__ = "notebook_note_days"
+
+    notebook_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("notebooks.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
 class EvaluationRun(Base):
     """A/B test evaluation run results."""
 
@@ -643,3 +854,74 @@ class Notification(Base):
         Index("idx_notifications_user_id", "user_id"),
         Index("idx_notifications_user_read", "user_id", "is_read"),
     )
+
+
+class BackgroundJob(Base):
+    """Durable background job (sync, indexing, import, image analysis).
+
+    Rows are claimed by workers with ``FOR UPDATE SKIP LOCKED`` and kept
+    alive through a lease that the running worker renews; an expired
+    lease means the worker died and the job may be retried.
+    """
+
+    __tablename__ = "background_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), server_default="queued", default="queued"
+    )  # queued | running | completed | failed | cancelled
+    payload: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    progress: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, server_default="1", default=1)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, server_default="false", default=False)
+    worker_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    run_after: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    triggered_by: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("idx_background_jobs_claim", "status", "run_after"),
+        Index("idx_background_jobs_type_created", "job_type", "created_at"),
+    )
+
+
+class Blob(Base):
+    """Content-addressed file in the blob store (see ``app.services.blob_store``)."""
+
+    __tablename__ = "blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    md5: Mapped[str] = mapped_column(String(32))
+    size_bytes: Mapped[int] = mapped_column(BigInteger)
+    ref_count: Mapped[int] = mapped_column(Integer, server_default="0", default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("idx_blobs_md5", "md5"),
+        Index("idx_blobs_ref_count", "ref_count"),
+    )
+
+
+class BlobRef(Base):
+    """A logical file path (image, upload) linked to a blob."""
+
+    __tablename__ = "blob_refs"
+
+    path: Mapped[str] = mapped_column(String(1024), primary_key=True)
+    sha256: Mapped[str] = mapped_column(String(64), ForeignKey("blobs.sha256", ondelete="CASCADE"))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("idx_blob_refs_sha256", "sha256"),)
@@ -10,10 +10,11 @@ and cosine similarity search.
 
 import logging
 import os
+from functools import lru_cache
 
 import httpx
-import tiktoken
-from openai import APIError, AsyncOpenAI
+
+from app.services.instrumentation import EMBEDDING_FAILURES, EMBEDDING_SECONDS, EMBEDDING_TEXTS
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,18 @@ class EmbeddingError(Exception):
     """Raised when an embedding API call fails."""
 
 
+@lru_cache(maxsize=4)
+def encoding_for_model(model: str):
+    """Return the (cached) tiktoken encoding for ``model``.
+
+    tiktoken is imported and its BPE ranks loaded on first use, once per
+    process rather than once per :class:`EmbeddingService`.
+    """
+    import tiktoken
+
+    return tiktoken.encoding_for_model(model)
+
+
 class EmbeddingService:
     """Generate vector embeddings for text.
 
@@ -60,9 +73,11 @@ class EmbeddingService:
             self._client = None
             self._encoding = None
         else:
+            from openai import AsyncOpenAI
+
             self._client = AsyncOpenAI(api_key=api_key)
             # Use the tokenizer for the chosen model
-            self._encoding = tiktoken.encoding_for_model(model)
+            self._encoding = encoding_for_model(model)
 
     # ------------------------------------------------------------------
     # Public API
@@ -220,9 +235,16 @@ class EmbeddingService:
         EmbeddingError
             If the underlying API call fails.
         """
-        if self._local_url:
-            return await self._call_local_api(texts)
-        return await self._call_openai_api(texts)
+        backend = "local" if self._local_url else "openai"
+        EMBEDDING_TEXTS.inc(len(texts), backend=backend)
+        try:
+            with EMBEDDING_SECONDS.time(backend=backend):
+                if self._local_url:
+                    return await self._call_local_api(texts)
+                return await self._call_openai_api(texts)
+        except Exception:
+            EMBEDDING_FAILURES.inc(backend=backend)
+            raise
 
     async def _call_openai_api(self, texts: list[str]) -> list[list[float]]:
         """Call the OpenAI embeddings API.
@@ -232,6 +254,8 @@ class EmbeddingService:
         EmbeddingError
             Wraps any ``openai.APIError`` into a domain-specific exception.
         """
+        from openai import APIError
+
         try:
             response = await self._client.embeddings.create(
                 input=texts,
@@ -21,6 +21,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
+import time
 from collections.abc import AsyncIterator
 from datetime import datetime
 
@@ -33,6 +34,13 @@ from app.search.embeddings import EmbeddingError, EmbeddingService
 from app.search.judge import SearchJudge
 from app.search.params import get_search_params
 from app.search.query_preprocessor import QueryAnalysis, analyze_query
+from app.services.access_scope import readable_notes_clause
+from app.services.instrumentation import (
+    SEARCH_ENGINE_FAILURES,
+    SEARCH_ENGINE_SECONDS,
+    SEARCH_JUDGE_DECISIONS,
+    SEARCH_REQUEST_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -117,8 +125,10 @@ class SearchPage(BaseModel):
     judge_info: JudgeInfo | None = None
 
 
-def _apply_note_filters(stmt, notebook_name, date_from, date_to):
-    """Apply common note filters (notebook, date range) to a SQLAlchemy statement."""
+def _apply_note_filters(stmt, notebook_name, date_from, date_to, reader_id=None):
+    """Apply common note filters (notebook, date range, read scope) to a SQLAlchemy statement."""
+    if reader_id is not None:
+        stmt = stmt.where(readable_notes_clause(reader_id))
     if notebook_name is not None:
         stmt = stmt.where(Note.notebook_name == notebook_name)
     if date_from is not None:
@@ -137,10 +147,12 @@ class FullTextSearchEngine:
 
     Args:
         session: An async SQLAlchemy session for database queries.
+        reader_id: Limit results to notes this user can read (see services/access_scope.py).
     """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, reader_id: int | None = None) -> None:
         self._session = session
+        self._reader_id = reader_id
 
     async def search(
         self,
@@ -214,14 +226,14 @@ class FullTextSearchEngine:
             .limit(limit)
             .offset(offset)
         )
-        stmt = _apply_note_filters(stmt, notebook_name, date_from, date_to)
+        stmt = _apply_note_filters(stmt, notebook_name, date_from, date_to, self._reader_id)
 
         result = await self._session.execute(stmt)
         rows = result.fetchall()
 
         # Separate COUNT query (shares same WHERE conditions)
         stmt_count = select(func.count()).select_from(Note).where(match_condition)
-        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to)
+        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to, self._reader_id)
         total = (await self._session.execute(stmt_count)).scalar() or 0
         results = [
             SearchResult(
@@ -277,6 +289,7 @@ class TrigramSearchEngine:
     Args:
         session: An async SQLAlchemy session for database queries.
         similarity_threshold: Minimum similarity score override (default auto-detect).
+        reader_id: Limit results to notes this user can read.
     """
 
     _SNIPPET_MAX_LENGTH: int = 200
@@ -285,9 +298,11 @@ class TrigramSearchEngine:
         self,
         session: AsyncSession,
         similarity_threshold: float | None = None,
+        reader_id: int | None = None,
     ) -> None:
         self._session = session
         self._threshold_override = similarity_threshold
+        self._reader_id = reader_id
 
     def _get_threshold(self, query: str) -> float:
         """Get language-appropriate similarity threshold."""
@@ -357,13 +372,13 @@ class TrigramSearchEngine:
             .limit(limit)
             .offset(offset)
         )
-        stmt = _apply_note_filters(stmt, notebook_name, date_from, date_to)
+        stmt = _apply_note_filters(stmt, notebook_name, date_from, date_to, self._reader_id)
 
         result = await self._session.execute(stmt)
         rows = result.fetchall()
 
         stmt_count = select(func.count()).select_from(Note).where(match_condition)
-        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to)
+        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to, self._reader_id)
         total = (await self._session.execute(stmt_count)).scalar() or 0
         results = [
             SearchResult(
@@ -415,13 +430,13 @@ class TrigramSearchEngine:
             .limit(limit)
             .offset(offset)
         )
-        stmt = _apply_note_filters(stmt, notebook_name, date_from, date_to)
+        stmt = _apply_note_filters(stmt, notebook_name, date_from, date_to, self._reader_id)
 
         result = await self._session.execute(stmt)
         rows = result.fetchall()
 
         stmt_count = select(func.count()).select_from(Note).where(match_condition)
-        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to)
+        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to, self._reader_id)
         total = (await self._session.execute(stmt_count)).scalar() or 0
         results = [
             SearchResult(
@@ -462,6 +477,7 @@ class SemanticSearchEngine:
     Args:
         session: An async SQLAlchemy session for database queries.
         embedding_service: Service to convert text into vector embeddings.
+        reader_id: Limit results to notes this user can read.
     """
 
     _SNIPPET_MAX_LENGTH: int = 200
@@ -470,9 +486,11 @@ class SemanticSearchEngine:
         self,
         session: AsyncSession,
         embedding_service: EmbeddingService,
+        reader_id: int | None = None,
     ) -> None:
         self._session = session
         self._embedding_service = embedding_service
+        self._reader_id = reader_id
 
     async def search(
         self,
@@ -532,7 +550,7 @@ class SemanticSearchEngine:
         )
 
         # Apply optional filters in the inner subquery to reduce work
-        inner = _apply_note_filters(inner, notebook_name, date_from, date_to)
+        inner = _apply_note_filters(inner, notebook_name, date_from, date_to, self._reader_id)
         inner = inner.subquery("best_chunks")
 
         # Outer query: join back to Note for metadata, sort by distance, paginate
@@ -561,7 +579,7 @@ class SemanticSearchEngine:
             .join(Note, NoteEmbedding.note_id == Note.id)
             .where(cosine_distance <= max_distance)
         )
-        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to)
+        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to, self._reader_id)
         total = (await self._session.execute(stmt_count)).scalar() or 0
         results = []
         for rank, row in enumerate(rows):
@@ -664,6 +682,7 @@ class HybridSearchEngine:
         if not query or not query.strip():
             return SearchPage(results=[], total=0)
 
+        started = time.perf_counter()
         analysis = analyze_query(query)
         k, fts_weight, sem_weight = self._compute_rrf_params(analysis)
 
@@ -702,6 +721,8 @@ class HybridSearchEngine:
             )
             # Slice FTS results for requested page
             sliced = fts_page.results[offset : offset + limit]
+            SEARCH_JUDGE_DECISIONS.inc(strategy="fts_only")
+            SEARCH_REQUEST_SECONDS.observe(time.perf_counter() - started, search_type="hybrid")
             return SearchPage(results=sliced, total=fts_page.total, judge_info=judge_info)
 
         # Step 4: Semantic needed — run and merge
@@ -734,6 +755,8 @@ class HybridSearchEngine:
             fts_best_score=decision.best_score,
             term_coverage=decision.term_coverage,
         )
+        SEARCH_JUDGE_DECISIONS.inc(strategy="hybrid")
+        SEARCH_REQUEST_SECONDS.observe(time.perf_counter() - started, search_type="hybrid")
         return SearchPage(results=sliced, total=total, judge_info=judge_info)
 
     async def search_progressive(
@@ -942,15 +965,17 @@ class HybridSearchEngine:
     ) -> SearchPage:
         """Call engine.search() with error handling."""
         try:
-            return await engine.search(
-                query,
-                limit=limit,
-                offset=offset,
-                notebook_name=notebook_name,
-                date_from=date_from,
-                date_to=date_to,
-            )
+            with SEARCH_ENGINE_SECONDS.time(engine=label.lower()):
+                return await engine.search(
+                    query,
+                    limit=limit,
+                    offset=offset,
+                    notebook_name=notebook_name,
+                    date_from=date_from,
+                    date_to=date_to,
+                )
         except Exception:
+            SEARCH_ENGINE_FAILURES.inc(engine=label.lower())
             logger.warning("%s engine failed for query: %r", label, query)
             return SearchPage(results=[], total=0)
 
@@ -988,6 +1013,7 @@ class UnifiedSearchEngine:
         if not query or not query.strip():
             return SearchPage(results=[], total=0)
 
+        started = time.perf_counter()
         # Fetch enough results for merge-then-slice pagination
         fetch_limit = offset + limit
 
@@ -1026,6 +1052,7 @@ class UnifiedSearchEngine:
         sliced = merged[offset : offset + limit]
         # Use max of both totals as conservative estimate (there's overlap)
         total = max(fts_page.total, trigram_page.total)
+        SEARCH_REQUEST_SECONDS.observe(time.perf_counter() - started, search_type="search")
         return SearchPage(results=sliced, total=total)
 
     @staticmethod
@@ -1098,15 +1125,17 @@ class UnifiedSearchEngine:
     ) -> SearchPage:
         """Call engine.search() with error handling."""
         try:
-            return await engine.search(
-                query,
-                limit=limit,
-                offset=offset,
-                notebook_name=notebook_name,
-                date_from=date_from,
-                date_to=date_to,
-            )
+            with SEARCH_ENGINE_SECONDS.time(engine=label.lower()):
+                return await engine.search(
+                    query,
+                    limit=limit,
+                    offset=offset,
+                    notebook_name=notebook_name,
+                    date_from=date_from,
+                    date_to=date_to,
+                )
         except Exception:
+            SEARCH_ENGINE_FAILURES.inc(engine=label.lower())
             logger.warning("%s engine failed for query: %r", label, query)
             return SearchPage(results=[], total=0)
 
@@ -1117,12 +1146,14 @@ class ExactMatchSearchEngine:
     Finds notes where the exact query string appears as-is in the title
     or content, without morpheme analysis or tokenization. Matched text
     is highlighted with <b> tags. Results are sorted by updated date.
+    When ``reader_id`` is set, only notes that user can read are matched.
     """
 
     _SNIPPET_MAX_LENGTH: int = 200
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, reader_id: int | None = None) -> None:
         self._session = session
+        self._reader_id = reader_id
 
     async def search(
         self,
@@ -1165,14 +1196,14 @@ class ExactMatchSearchEngine:
             .limit(limit)
             .offset(offset)
         )
-        stmt = _apply_note_filters(stmt, notebook_name, date_from, date_to)
+        stmt = _apply_note_filters(stmt, notebook_name, date_from, date_to, self._reader_id)
 
         result = await self._session.execute(stmt)
         rows = result.fetchall()
 
         # Separate COUNT query
         stmt_count = select(func.count()).select_from(Note).where(match_condition)
-        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to)
+        stmt_count = _apply_note_filters(stmt_count, notebook_name, date_from, date_to, self._reader_id)
         total = (await self._session.execute(stmt_count)).scalar() or 0
         results = [
             SearchResult(
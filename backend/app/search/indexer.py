@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import logging
 import re
+import time
 from dataclasses import dataclass, field
 from pathlib import PurePosixPath
 
@@ -24,12 +25,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Note, NoteAttachment, NoteEmbedding, NoteImage
 from app.search.embeddings import EmbeddingService
+from app.services.instrumentation import INDEX_EMBEDDINGS, INDEX_NOTE_SECONDS, INDEX_NOTES
 
 logger = logging.getLogger(__name__)
 
 # GLM-OCR bbox pattern: ![](page=0,bbox=[x, y, w, h])
 _BBOX_RE = re.compile(r"!\[\]\(page=\d+,bbox=\[[^\]]*\]\)\s*")
 
+# chunk_type values produced by _get_image_segments
+_IMAGE_CHUNK_TYPES = ("ocr", "vision")
+
 
 def _clean_ocr_text(text: str) -> str:
     """Remove GLM-OCR bbox references and clean up the result."""
@@ -191,15 +196,21 @@ class NoteIndexer:
             try:
                 if not await self.needs_indexing(note_id):
                     result.skipped += 1
+                    INDEX_NOTES.inc(status="skipped")
                     logger.debug("Note %d already indexed, skipping", note_id)
                     continue
 
+                started = time.perf_counter()
                 embeddings_created = await self.index_note(note_id)
+                INDEX_NOTE_SECONDS.observe(time.perf_counter() - started)
                 result.indexed += 1
                 result.total_embeddings += embeddings_created
+                INDEX_NOTES.inc(status="indexed")
+                INDEX_EMBEDDINGS.inc(embeddings_created)
 
             except Exception:
                 result.failed += 1
+                INDEX_NOTES.inc(status="failed")
                 logger.exception("Failed to index note %d", note_id)
 
         return result
@@ -221,6 +232,63 @@ class NoteIndexer:
 
         return await self.index_note(note_id)
 
+    async def reindex_image_segments(self, note_id: int) -> int:
+        """Replace only the OCR/Vision embeddings of a note.
+
+        Content, attachment and summary chunks are left untouched, so a
+        note whose images were just analysed does not pay for re-embedding
+        its whole body.  New image chunks are appended after the current
+        highest ``chunk_index``.
+
+        Args:
+            note_id: Database ID of the note whose image chunks to refresh.
+
+        Returns:
+            Number of image embedding records created.
+
+        Raises:
+            ValueError: If the note with the given ID does not exist.
+        """
+        note = await self._get_note(note_id)
+        prefix = self._build_context_prefix(note)
+
+        await self._session.execute(
+            delete(NoteEmbedding).where(
+                NoteEmbedding.note_id == note_id,
+                NoteEmbedding.chunk_type.in_(_IMAGE_CHUNK_TYPES),
+            )
+        )
+
+        segments = await self._get_image_segments(note)
+        if not segments:
+            return 0
+
+        max_index = await self._session.scalar(
+            select(func.max(NoteEmbedding.chunk_index)).where(NoteEmbedding.note_id == note_id)
+        )
+        chunk_index = (max_index if max_index is not None else -1) + 1
+        created = 0
+        for img_text, chunk_type in segments:
+            segment_text = prefix + img_text if prefix else img_text
+            chunks = await self._embedding_service.embed_chunks(segment_text)
+            for chunk_text, embedding in chunks:
+                self._session.add(
+                    NoteEmbedding(
+                        note_id=note_id,
+                        chunk_index=chunk_index,
+                        chunk_text=chunk_text,
+                        embedding=embedding,
+                        chunk_type=chunk_type,
+                    )
+                )
+                chunk_index += 1
+                created += 1
+
+        await self._session.flush()
+
+        logger.info("Re-embedded image segments for note %d: %d embeddings", note_id, created)
+        return created
+
     async def delete_embeddings(self, note_id: int) -> int:
         """Delete all embedding records for a given note.
 
@@ -9,9 +9,10 @@ from __future__ import annotations
 import re
 import unicodedata
 from functools import lru_cache
-from typing import NamedTuple
+from typing import TYPE_CHECKING, NamedTuple
 
-from kiwipiepy import Kiwi
+if TYPE_CHECKING:
+    from kiwipiepy import Kiwi
 
 
 class QueryAnalysis(NamedTuple):
@@ -45,7 +46,13 @@ _LATIN_RE = re.compile(r"[a-zA-Z]")
 
 @lru_cache(maxsize=1)
 def _get_kiwi() -> Kiwi:
-    """Return a cached Kiwi instance (singleton)."""
+    """Return a cached Kiwi instance (singleton).
+
+    kiwipiepy and its model load on the first Korean query unless
+    ``WARMUP_COMPONENTS`` includes ``kiwi``.
+    """
+    from kiwipiepy import Kiwi
+
     return Kiwi()
 
 
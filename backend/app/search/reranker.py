@@ -12,6 +12,7 @@ from abc import ABC, abstractmethod
 import httpx
 
 from app.config import get_settings
+from app.services.instrumentation import RERANK_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -93,7 +94,7 @@ class CohereReranker(BaseReranker):
         effective_top_n = top_n or len(results)
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with httpx.AsyncClient(timeout=10.0) as client, RERANK_SECONDS.time(reranker="cohere"):
                 response = await client.post(
                     self._RERANK_URL,
                     headers={
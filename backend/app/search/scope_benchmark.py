@@ -0,0 +1,176 @@
+"""Latency benchmark for access-scope filtered search.
+
+Seeds an organisation of ``--users`` members (default 200) that own
+``--notebooks`` notebooks each (default 50), with notes in every notebook,
+read grants on other members' notebooks and a few organisation-wide grants.
+For a sample of the seeded users it then runs full-text and trigram
+searches without a reader and with ``reader_id`` (the
+:func:`readable_notes_clause` filter) and prints median / p95
+milliseconds, plus the cost of building that user's stored scope
+(:func:`ensure_access_scope`)::
+
+    python -m app.search.scope_benchmark
+    python -m app.search.scope_benchmark --users 200 --notebooks 50 --query 실험 --query protocol --repeat 50
+
+Reads ``DATABASE_URL``.  Seeding and measuring run in one transaction that
+is rolled back, so nothing is left behind.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants import NotePermission
+from app.database import async_session_factory
+from app.models import Membership, Note, Notebook, NotebookAccess, Organization, User
+from app.search.engine import FullTextSearchEngine, TrigramSearchEngine
+from app.services.access_scope import ensure_access_scope
+
+_DEFAULT_QUERIES = ("note", "실험", "meeting")
+_WORDS = ("note", "meeting", "protocol", "실험", "결과", "sample", "analysis", "회의", "buffer", "assay")
+
+
+async def _timed(run: Callable[[], Awaitable[object]], repeat: int) -> tuple[float, float]:
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+async def _seed(session: AsyncSession, users: int, notebooks: int, notes: int, shares: int) -> list[int]:
+    """Insert the synthetic organisation; return the seeded user ids."""
+    rng = random.Random(0)
+    tag = uuid.uuid4().hex[:8]
+    org = Organization(name=f"Benchmark {tag}", slug=f"bench-{tag}")
+    session.add(org)
+    await session.flush()
+
+    user_ids = list(
+        await session.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {"email": f"bench-{tag}-{i}@example.test", "password_hash": "!", "name": f"Bench {i}"}
+                for i in range(users)
+            ],
+        )
+    )
+    now = datetime.now(UTC)
+    await session.execute(
+        insert(Membership),
+        [{"user_id": uid, "org_id": org.id, "role": "member", "accepted_at": now} for uid in user_ids],
+    )
+
+    owners = [uid for uid in user_ids for _ in range(notebooks)]
+    notebook_ids = list(
+        await session.scalars(
+            insert(Notebook).returning(Notebook.id, sort_by_parameter_order=True),
+            [{"name": f"bench {tag} {i}", "owner_id": owner, "org_id": org.id} for i, owner in enumerate(owners)],
+        )
+    )
+
+    grants = [
+        {"notebook_id": nb, "user_id": owner, "permission": NotePermission.ADMIN, "granted_by": owner}
+        for nb, owner in zip(notebook_ids, owners, strict=True)
+    ]
+    owner_of = dict(zip(notebook_ids, owners, strict=True))
+    for uid in user_ids:
+        picked = rng.sample(notebook_ids, min(shares + notebooks, len(notebook_ids)))
+        others = [nb for nb in picked if owner_of[nb] != uid]
+        grants.extend(
+            {"notebook_id": nb, "user_id": uid, "permission": NotePermission.READ, "granted_by": owner_of[nb]}
+            for nb in others[:shares]
+        )
+    grants.extend(
+        {"notebook_id": nb, "org_id": org.id, "permission": NotePermission.READ, "granted_by": owners[0]}
+        for nb in rng.sample(notebook_ids, min(20, len(notebook_ids)))
+    )
+    await session.execute(insert(NotebookAccess), grants)
+
+    rows = []
+    for nb in notebook_ids:
+        for i in range(notes):
+            words = " ".join(rng.choices(_WORDS, k=12))
+            rows.append(
+                {
+                    "synology_note_id": f"bench-{tag}-{nb}-{i}",
+                    "title": f"{rng.choice(_WORDS)} {nb}-{i}",
+                    "content_html": f"<p>{words}</p>",
+                    "content_text": words,
+                    "notebook_id": nb,
+                }
+            )
+    await session.execute(insert(Note), rows)
+    return user_ids
+
+
+async def _run(
+    users: int, notebooks: int, notes: int, shares: int, sample: int, queries: list[str], repeat: int
+) -> None:
+    async with async_session_factory() as session:
+        started = time.perf_counter()
+        user_ids = await _seed(session, users, notebooks, notes, shares)
+        print(  # noqa: T201
+            f"Seeded {users} users x {notebooks} notebooks x {notes} notes"
+            f" in {time.perf_counter() - started:.1f}s"
+        )
+
+        header = f"{'user':>6} {'engine':<8} {'query':<12} {'open p50':>9} {'p95':>7} {'scoped p50':>11} {'p95':>7}"
+        print(header)  # noqa: T201
+        for user_id in user_ids[:sample]:
+            started = time.perf_counter()
+            await ensure_access_scope(session, user_id)
+            build_ms = (time.perf_counter() - started) * 1000
+
+            for query in queries:
+                for label, open_engine, scoped_engine in (
+                    ("fts", FullTextSearchEngine(session), FullTextSearchEngine(session, reader_id=user_id)),
+                    ("trigram", TrigramSearchEngine(session), TrigramSearchEngine(session, reader_id=user_id)),
+                ):
+                    open_p50, open_p95 = await _timed(lambda e=open_engine, q=query: e.search(q), repeat)
+                    scoped_p50, scoped_p95 = await _timed(lambda e=scoped_engine, q=query: e.search(q), repeat)
+                    print(  # noqa: T201
+                        f"{user_id:>6} {label:<8} {query[:12]:<12} {open_p50:>9.1f} {open_p95:>7.1f}"
+                        f" {scoped_p50:>11.1f} {scoped_p95:>7.1f}"
+                    )
+            print(f"{user_id:>6} scope build {build_ms:.1f} ms")  # noqa: T201
+        await session.rollback()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Access-scope filtered search latency benchmark")
+    parser.add_argument("--users", type=int, default=200, help="Seeded organisation members")
+    parser.add_argument("--notebooks", type=int, default=50, help="Notebooks owned by each member")
+    parser.add_argument("--notes", type=int, default=2, help="Notes per notebook")
+    parser.add_argument("--shares", type=int, default=25, help="Read grants per member on others' notebooks")
+    parser.add_argument("--sample", type=int, default=5, help="Seeded users to time searches for")
+    parser.add_argument("--query", action="append", help="Search query (repeatable)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per engine and query")
+    args = parser.parse_args()
+    asyncio.run(
+        _run(
+            args.users,
+            args.notebooks,
+            args.notes,
+            args.shares,
+            args.sample,
+            args.query or list(_DEFAULT_QUERIES),
+            args.repeat,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
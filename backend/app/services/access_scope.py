@@ -0,0 +1,244 @@
+"""Materialised per-user read scope for search and list endpoints.
+
+Resolving a user's permissions through notebook_access_control takes
+several queries (memberships, group grants, org grants, note grants).
+Instead, each user's effective notebook permissions and note-level grants
+are stored in ``access_scope_notebooks`` / ``access_scope_notes`` and
+pushed into queries as a subquery filter (:func:`readable_notes_clause`).
+
+Statement triggers on the ACL tables bump a per-user counter in
+``access_scope_user_generations`` for every user a grant, revoke or
+membership change affects -- including bulk deletes and FK cascades --
+so only those users' stored scopes go stale (``TRUNCATE`` bumps the
+global ``access_scope_generation`` instead).  :func:`ensure_access_scope`
+compares generations with one query and rebuilds a stale scope with two
+``INSERT ... SELECT`` statements.
+
+:func:`get_permission_resolver` loads that scope once per session (and
+shares it across requests while the generation holds), so repeated
+notebook/note checks within a request are answered from memory.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field, replace
+
+from sqlalchemy import delete, event, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.constants import NotePermission
+from app.database import use_primary
+from app.models import AccessScope, AccessScopeNote, AccessScopeNotebook, Note
+from app.services.notebook_access_control import PERMISSION_HIERARCHY, permission_satisfies
+
+logger = logging.getLogger(__name__)
+
+_LEVEL = "CASE permission {} ELSE 0 END".format(
+    " ".join(f"WHEN '{perm}' THEN {level}" for perm, level in PERMISSION_HIERARCHY.items())
+)
+
+# A user's generation is the global counter plus their own (migration 043).
+_GENERATION_SQL = text("""
+    SELECT g.value + COALESCE(u.value, 0), s.generation
+    FROM access_scope_generation g
+    LEFT JOIN access_scope_user_generations u ON u.user_id = :user_id
+    LEFT JOIN access_scopes s ON s.user_id = :user_id
+    WHERE g.id = 1
+""")
+
+# Individual grants override group grants, which override org grants;
+# within one source the highest permission wins.
+_BUILD_NOTEBOOKS_SQL = text(f"""
+    WITH member AS (
+        SELECT id AS membership_id, org_id
+        FROM memberships
+        WHERE user_id = :user_id AND accepted_at IS NOT NULL
+    ),
+    grants AS (
+        SELECT notebook_id, permission, 1 AS source
+        FROM notebook_access
+        WHERE user_id = :user_id
+        UNION ALL
+        SELECT gna.notebook_id, gna.permission, 2
+        FROM group_notebook_access gna
+        JOIN member_group_memberships mgm ON mgm.group_id = gna.group_id
+        JOIN member m ON m.membership_id = mgm.membership_id
+        UNION ALL
+        SELECT na.notebook_id, na.permission, 3
+        FROM notebook_access na
+        JOIN member m ON m.org_id = na.org_id
+    )
+    INSERT INTO access_scope_notebooks (user_id, notebook_id, permission)
+    SELECT DISTINCT ON (notebook_id) :user_id, notebook_id, permission
+    FROM grants
+    ORDER BY notebook_id, source, {_LEVEL} DESC
+    ON CONFLICT (user_id, notebook_id) DO UPDATE SET permission = EXCLUDED.permission
+""")  # noqa: S608 - _LEVEL is a module constant
+
+_BUILD_NOTES_SQL = text(f"""
+    INSERT INTO access_scope_notes (user_id, note_id, permission)
+    SELECT DISTINCT ON (note_id) :user_id, note_id, permission
+    FROM note_access
+    WHERE user_id = :user_id
+       OR org_id IN (
+           SELECT org_id FROM memberships WHERE user_id = :user_id AND accepted_at IS NOT NULL
+       )
+    ORDER BY note_id, {_LEVEL} DESC
+    ON CONFLICT (user_id, note_id) DO UPDATE SET permission = EXCLUDED.permission
+""")  # noqa: S608 - _LEVEL is a module constant
+
+
+async def ensure_access_scope(db: AsyncSession, user_id: int) -> int:
+    """Rebuild the stored scope of ``user_id`` if an ACL changed since it was built.
+
+    Flushes but does not commit; ``get_db`` commits at the end of the request.
+    Returns the generation the scope is current for.
+    """
+    current, built = (await db.execute(_GENERATION_SQL, {"user_id": user_id})).one()
+    if built == current:
+        return current
+
+    started = time.monotonic()
+    use_primary(db)
+    await db.execute(delete(AccessScopeNotebook).where(AccessScopeNotebook.user_id == user_id))
+    await db.execute(delete(AccessScopeNote).where(AccessScopeNote.user_id == user_id))
+    await db.execute(_BUILD_NOTEBOOKS_SQL, {"user_id": user_id})
+    await db.execute(_BUILD_NOTES_SQL, {"user_id": user_id})
+    # Store the generation read *before* building: a change committed
+    # meanwhile leaves the scope stale and it is rebuilt next time.
+    await db.execute(
+        pg_insert(AccessScope)
+        .values(user_id=user_id, generation=current)
+        .on_conflict_do_update(
+            index_elements=[AccessScope.user_id],
+            set_={"generation": current, "built_at": text("now()")},
+        )
+    )
+    await db.flush()
+    logger.debug("Rebuilt access scope for user %d in %.1fms", user_id, (time.monotonic() - started) * 1000)
+    return current
+
+
+def readable_notes_clause(user_id: int):
+    """WHERE clause limiting ``Note`` rows to those ``user_id`` can read.
+
+    Notes outside any notebook are not notebook-scoped and stay visible;
+    a note-level grant makes a note readable regardless of its notebook.
+    Call :func:`ensure_access_scope` first in the same request.
+    """
+    return or_(
+        Note.notebook_id.is_(None),
+        Note.notebook_id.in_(
+            select(AccessScopeNotebook.notebook_id).where(AccessScopeNotebook.user_id == user_id)
+        ),
+        Note.id.in_(select(AccessScopeNote.note_id).where(AccessScopeNote.user_id == user_id)),
+    )
+
+
+# --- Permission resolver ---------------------------------------------------
+
+_RESOLVER_KEY = "permission_resolvers"
+_ACL_TABLES = frozenset(
+    {"memberships", "notebook_access", "note_access", "member_group_memberships", "group_notebook_access"}
+)
+# Resolvers shared across requests, keyed by user; valid while the generation matches.
+_MAX_SHARED_RESOLVERS = 1024
+_shared_resolvers: dict[int, PermissionResolver] = {}
+
+
+@dataclass(slots=True)
+class PermissionResolver:
+    """A user's notebook and note permissions, loaded from the stored scope.
+
+    Answers notebook checks from memory; note checks need each note's
+    notebook once per session, memoised in ``note_notebooks``.
+    """
+
+    user_id: int
+    generation: int
+    notebooks: dict[int, str]
+    notes: dict[int, str]
+    note_notebooks: dict[int, int | None] = field(default_factory=dict)
+
+    def notebook_permission(self, notebook_id: int) -> str | None:
+        return self.notebooks.get(notebook_id)
+
+    def can_access_notebook(self, notebook_id: int, required_permission: str = NotePermission.READ) -> bool:
+        permission = self.notebooks.get(notebook_id)
+        return permission is not None and permission_satisfies(permission, required_permission)
+
+    def accessible_notebooks(self, min_permission: str = NotePermission.READ) -> list[int]:
+        return [nb_id for nb_id, perm in self.notebooks.items() if permission_satisfies(perm, min_permission)]
+
+    async def note_permission(self, db: AsyncSession, note_id: int) -> str | None:
+        """Note-level grant if any (it always wins), else the notebook's permission."""
+        if note_id in self.notes:
+            return self.notes[note_id]
+        if note_id not in self.note_notebooks:
+            self.note_notebooks[note_id] = await db.scalar(select(Note.notebook_id).where(Note.id == note_id))
+        notebook_id = self.note_notebooks[note_id]
+        return None if notebook_id is None else self.notebooks.get(notebook_id)
+
+
+async def get_permission_resolver(db: AsyncSession, user_id: int) -> PermissionResolver:
+    """Return the permission resolver of ``user_id`` for this session.
+
+    The first call per session costs one generation query (plus a scope
+    rebuild and two loads when ACLs changed); later calls are free until
+    the session writes to an ACL table.
+    """
+    memo: dict[int, PermissionResolver] = db.info.setdefault(_RESOLVER_KEY, {})
+    resolver = memo.get(user_id)
+    if resolver is not None:
+        return resolver
+
+    generation = await ensure_access_scope(db, user_id)
+    resolver = _shared_resolvers.get(user_id)
+    if resolver is None or resolver.generation != generation:
+        notebooks = await db.execute(
+            select(AccessScopeNotebook.notebook_id, AccessScopeNotebook.permission).where(
+                AccessScopeNotebook.user_id == user_id
+            )
+        )
+        notes = await db.execute(
+            select(AccessScopeNote.note_id, AccessScopeNote.permission).where(AccessScopeNote.user_id == user_id)
+        )
+        resolver = PermissionResolver(
+            user_id=user_id,
+            generation=generation,
+            notebooks=dict(notebooks.tuples().all()),
+            notes=dict(notes.tuples().all()),
+        )
+        if user_id not in _shared_resolvers and len(_shared_resolvers) >= _MAX_SHARED_RESOLVERS:
+            _shared_resolvers.pop(next(iter(_shared_resolvers)))
+        _shared_resolvers[user_id] = resolver
+
+    # Note -> notebook lookups are only trusted for the current session.
+    resolver = replace(resolver, note_notebooks={})
+    memo[user_id] = resolver
+    return resolver
+
+
+@event.listens_for(Session, "after_flush")
+def _drop_resolvers_after_acl_flush(session: Session, flush_context) -> None:
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(getattr(obj, "__tablename__", None) in _ACL_TABLES for obj in changed):
+        session.info.pop(_RESOLVER_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _drop_resolvers_after_acl_statement(orm_execute_state) -> None:
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.local_table.name in _ACL_TABLES for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info.pop(_RESOLVER_KEY, None)
+
+
+async def get_scoped_notebook_ids(db: AsyncSession, user_id: int) -> list[int]:
+    """Notebook IDs in the stored scope of ``user_id`` (any permission)."""
+    resolver = await get_permission_resolver(db, user_id)
+    return list(resolver.notebooks)
@@ -1,9 +1,9 @@
 """Thin helper for writing activity log entries."""
 
 import logging
+from datetime import UTC, datetime
 
-from app.database import async_session_factory
-from app.models import ActivityLog
+from app.services.event_buffer import activity_log_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -20,17 +20,14 @@ async def log_activity(
     details: dict | None = None,
     triggered_by: str | None = None,
 ) -> None:
-    """Write one row to activity_logs using a fresh session."""
-    try:
-        async with async_session_factory() as session:
-            entry = ActivityLog(
-                operation=operation,
-                status=status,
-                message=message,
-                details=details,
-                triggered_by=triggered_by,
-            )
-            session.add(entry)
-            await session.commit()
-    except Exception:
-        logger.exception("Failed to write activity log")
+    """Queue one activity_logs row; the event buffer writes it shortly after."""
+    activity_log_buffer().add(
+        {
+            "operation": operation,
+            "status": status,
+            "message": message,
+            "details": details,
+            "triggered_by": triggered_by,
+            "created_at": datetime.now(UTC),
+        }
+    )
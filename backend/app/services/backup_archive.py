@@ -0,0 +1,160 @@
+"""Streaming JSONL record entries for backup and export zip archives.
+
+Native backups used to serialise every table into one ``json.dumps``
+string per archive entry, holding the whole library in memory several
+times over.  Archives are now written incrementally:
+
+- database rows are read through a server-side cursor in partitions
+  (:func:`stream_rows`) and each partition is encoded and compressed in a
+  worker thread, one JSON object per line (``<name>.jsonl``);
+- files are added in chunks, also off the event loop;
+- ``manifest.json`` is written last, once the record counts are known.
+
+:func:`read_records` reverses this for restores, yielding batches of
+records without materialising the entry.  Legacy ``<name>.json`` entries
+(a single JSON array) are still readable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import zipfile
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_BATCH_SIZE = 500
+
+# Files added per worker-thread hop in write_files().
+_FILES_PER_CHUNK = 50
+
+
+def _write_lines(handle, records: Iterable[dict]) -> None:
+    handle.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8"))
+
+
+async def stream_rows(
+    session: AsyncSession,
+    stmt,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> AsyncIterator[list]:
+    """Yield result rows of *stmt* in lists of up to *batch_size*.
+
+    Uses a server-side cursor, so only one partition is held at a time.
+    Select columns rather than ORM entities to keep the identity map empty.
+    """
+    result = await session.stream(stmt.execution_options(yield_per=batch_size))
+    async for partition in result.partitions(batch_size):
+        yield list(partition)
+
+
+class ArchiveWriter:
+    """Incremental zip writer whose blocking work runs in worker threads.
+
+    Only one entry can be open for writing at a time, so callers write
+    record entries one after another, then files, then the manifest.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+
+    async def write_records(
+        self,
+        name: str,
+        batches: AsyncIterator[list],
+        to_record: Callable[[Any], dict | None] = lambda row: row,
+    ) -> int:
+        """Write ``<name>.jsonl`` from async *batches*; return the record count.
+
+        *to_record* maps each row to a JSON-serialisable dict, or ``None``
+        to skip it.
+        """
+        handle = await asyncio.to_thread(self._zip.open, f"{name}.jsonl", "w", force_zip64=True)
+        count = 0
+        try:
+            async for batch in batches:
+                records = [r for r in map(to_record, batch) if r is not None]
+                if records:
+                    await asyncio.to_thread(_write_lines, handle, records)
+                    count += len(records)
+        finally:
+            await asyncio.to_thread(handle.close)
+        return count
+
+    async def write_json(self, name: str, payload: dict | list) -> None:
+        """Write a small JSON document (e.g. the manifest)."""
+        data = json.dumps(payload, ensure_ascii=False, indent=2)
+        await asyncio.to_thread(self._zip.writestr, name, data)
+
+    async def write_files(self, files: Iterable[tuple[Path, str]]) -> int:
+        """Add ``(path, arcname)`` pairs that exist on disk; return how many were added."""
+
+        def _write_chunk(chunk: list[tuple[Path, str]]) -> int:
+            written = 0
+            for path, arcname in chunk:
+                if path.is_file():
+                    self._zip.write(path, arcname=arcname)
+                    written += 1
+            return written
+
+        written = 0
+        chunk: list[tuple[Path, str]] = []
+        for item in files:
+            chunk.append(item)
+            if len(chunk) >= _FILES_PER_CHUNK:
+                written += await asyncio.to_thread(_write_chunk, chunk)
+                chunk = []
+        if chunk:
+            written += await asyncio.to_thread(_write_chunk, chunk)
+        return written
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._zip.close)
+
+    async def __aenter__(self) -> ArchiveWriter:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+        if exc_type is not None:
+            self.path.unlink(missing_ok=True)
+
+
+def _iter_batches(archive: zipfile.ZipFile, name: str, batch_size: int) -> Iterator[list[dict]]:
+    names = set(archive.namelist())
+    if f"{name}.jsonl" in names:
+        with archive.open(f"{name}.jsonl") as raw, io.TextIOWrapper(raw, encoding="utf-8") as lines:
+            batch: list[dict] = []
+            for line in lines:
+                if not line.strip():
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+    elif f"{name}.json" in names:
+        records = json.loads(archive.read(f"{name}.json").decode("utf-8"))
+        for start in range(0, len(records), batch_size):
+            yield records[start : start + batch_size]
+
+
+async def read_records(
+    archive: zipfile.ZipFile,
+    name: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> AsyncIterator[list[dict]]:
+    """Yield batches of records from ``<name>.jsonl`` (or legacy ``<name>.json``).
+
+    Decompression and parsing run in a worker thread.  Yields nothing
+    when the archive has no such entry.
+    """
+    batches = _iter_batches(archive, name, batch_size)
+    while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+        yield batch
@@ -0,0 +1,407 @@
+"""Content-addressed, deduplicated blob store for note images and uploads.
+
+Every image or attachment byte stream is stored once under
+``BLOB_STORE_PATH/<sha[:2]>/<sha[2:4]>/<sha256>``.  The familiar logical
+paths (``NSX_IMAGES_PATH/<note_id>/<ref>``, ``UPLOADS_PATH/<file_id>``)
+are hard links to that blob, so every existing reader keeps opening the
+same paths while identical content shared by many notes occupies disk
+space only once.  Writes go to a temporary file and are renamed into
+place, so readers never see partial files.
+
+References are tracked in the database:
+
+- ``blobs``     -- one row per stored content hash with ``ref_count``
+- ``blob_refs`` -- logical path -> content hash
+
+Filesystem operations (:class:`BlobStore`) are synchronous so they can
+run in threads and in the NSX parser subprocess; database bookkeeping
+(:func:`register_refs`, :func:`collect_garbage`) is async: every writer
+gets a :class:`StoredBlob` back and registers it through its own session,
+so the reference commits together with the rows that use the file.
+Garbage collection only deletes a blob once no row *and* no hard link
+references it, so a missed registration can never lose data.
+
+The store must live on the same filesystem as the logical paths for hard
+links to work; otherwise files are copied and nothing is saved.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import Blob, BlobRef
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1024 * 1024
+_DB_BATCH_SIZE = 500
+
+
+@dataclass
+class StoredBlob:
+    """Result of putting content into the store.
+
+    Attributes:
+        sha256: Content hash (blob identity).
+        md5: MD5 of the content, kept for NSX export compatibility.
+        size: Size in bytes.
+        path: Logical path linked to the blob, if any.
+        deduplicated: ``True`` when identical content was already stored.
+    """
+
+    sha256: str
+    md5: str
+    size: int
+    path: str | None = None
+    deduplicated: bool = False
+
+
+class BlobStore:
+    """Filesystem side of the blob store.
+
+    Args:
+        root: Directory holding the sharded blobs.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self._tmp_dir = self.root / ".tmp"
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put_bytes(self, data: bytes, link_to: str | Path | None = None) -> StoredBlob:
+        """Store *data* and optionally hard-link it at *link_to*.
+
+        The caller registers the linked path with :func:`register_refs`.
+        """
+        sha = hashlib.sha256(data).hexdigest()
+        md5 = hashlib.md5(data).hexdigest()  # noqa: S324
+        blob = self.blob_path(sha)
+        existed = blob.exists()
+        if not existed:
+            tmp = self._new_tmp()
+            tmp.write_bytes(data)
+            self._commit_tmp(tmp, blob)
+        return self._finish(StoredBlob(sha, md5, len(data), deduplicated=existed), link_to)
+
+    def put_stream(self, src, link_to: str | Path | None = None) -> StoredBlob:
+        """Store the contents of a binary file object, hashing while copying."""
+        sha = hashlib.sha256()
+        md5 = hashlib.md5()  # noqa: S324
+        size = 0
+        tmp = self._new_tmp()
+        try:
+            with open(tmp, "wb") as dst:
+                for chunk in iter(lambda: src.read(_CHUNK_SIZE), b""):
+                    sha.update(chunk)
+                    md5.update(chunk)
+                    size += len(chunk)
+                    dst.write(chunk)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        digest = sha.hexdigest()
+        blob = self.blob_path(digest)
+        existed = blob.exists()
+        if existed:
+            tmp.unlink(missing_ok=True)
+        else:
+            self._commit_tmp(tmp, blob)
+        return self._finish(StoredBlob(digest, md5.hexdigest(), size, deduplicated=existed), link_to)
+
+    def adopt(self, path: str | Path) -> StoredBlob:
+        """Move an existing file under management, in place.
+
+        The file keeps its path but becomes a hard link to the blob; if the
+        content was already stored, the duplicate copy is released.  The
+        caller registers the reference.
+        """
+        path = Path(path)
+        sha = hashlib.sha256()
+        md5 = hashlib.md5()  # noqa: S324
+        size = 0
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b""):
+                sha.update(chunk)
+                md5.update(chunk)
+                size += len(chunk)
+
+        digest = sha.hexdigest()
+        blob = self.blob_path(digest)
+        existed = blob.exists()
+        if not existed:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(path, blob)
+            except OSError:
+                tmp = self._new_tmp()
+                shutil.copyfile(path, tmp)
+                self._commit_tmp(tmp, blob)
+        return self._finish(StoredBlob(digest, md5.hexdigest(), size, deduplicated=existed), path)
+
+    def link(self, sha256: str, dest: str | Path) -> None:
+        """Atomically make *dest* a hard link to the blob (copy as fallback)."""
+        blob = self.blob_path(sha256)
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() and os.path.samefile(blob, dest):
+            return
+        tmp = dest.parent / f".tmp-{uuid4().hex}"
+        try:
+            try:
+                os.link(blob, tmp)
+            except OSError:
+                shutil.copyfile(blob, tmp)
+            os.replace(tmp, dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def remove(self, sha256: str) -> int:
+        """Delete a blob file if nothing links to it; return bytes freed."""
+        blob = self.blob_path(sha256)
+        try:
+            st = blob.stat()
+        except FileNotFoundError:
+            return 0
+        if st.st_nlink > 1:
+            return 0
+        blob.unlink(missing_ok=True)
+        return st.st_size
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _new_tmp(self) -> Path:
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=self._tmp_dir)
+        os.close(fd)
+        return Path(name)
+
+    @staticmethod
+    def _commit_tmp(tmp: Path, blob: Path) -> None:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, blob)
+
+    def _finish(self, stored: StoredBlob, link_to: str | Path | None) -> StoredBlob:
+        if link_to is not None:
+            self.link(stored.sha256, link_to)
+            stored.path = str(link_to)
+        return stored
+
+
+_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store rooted at ``BLOB_STORE_PATH``."""
+    global _store  # noqa: PLW0603
+    if _store is None:
+        _store = BlobStore(get_settings().BLOB_STORE_PATH)
+    return _store
+
+
+# ---------------------------------------------------------------------------
+# Reference bookkeeping
+# ---------------------------------------------------------------------------
+
+
+async def _recount(session: AsyncSession, shas: Iterable[str] | None = None) -> None:
+    count = select(func.count()).where(BlobRef.sha256 == Blob.sha256).scalar_subquery()
+    stmt = update(Blob).values(ref_count=count, updated_at=func.now())
+    if shas is not None:
+        shas = list(shas)
+        if not shas:
+            return
+        stmt = stmt.where(Blob.sha256.in_(shas))
+    await session.execute(stmt.execution_options(synchronize_session=False))
+
+
+async def register_refs(session: AsyncSession, blobs: Iterable[StoredBlob]) -> None:
+    """Record logical paths for stored blobs and refresh their ref counts.
+
+    Re-registering a path with new content moves the reference.  The
+    caller commits.
+    """
+    items = {b.path: b for b in blobs if b.path}
+    if not items:
+        return
+
+    paths = list(items)
+    for start in range(0, len(paths), _DB_BATCH_SIZE):
+        chunk = [items[p] for p in paths[start:start + _DB_BATCH_SIZE]]
+
+        blob_rows = {b.sha256: {"sha256": b.sha256, "md5": b.md5, "size_bytes": b.size} for b in chunk}
+        await session.execute(
+            pg_insert(Blob).values(list(blob_rows.values())).on_conflict_do_nothing(index_elements=["sha256"])
+        )
+
+        old = await session.execute(select(BlobRef.sha256).where(BlobRef.path.in_([b.path for b in chunk])))
+        affected = set(blob_rows) | set(old.scalars().all())
+
+        stmt = pg_insert(BlobRef).values([{"path": b.path, "sha256": b.sha256} for b in chunk])
+        stmt = stmt.on_conflict_do_update(index_elements=["path"], set_={"sha256": stmt.excluded.sha256})
+        await session.execute(stmt)
+        await _recount(session, affected)
+
+
+async def release_refs(session: AsyncSession, paths: Iterable[str]) -> None:
+    """Drop references for deleted logical paths.  The caller commits."""
+    paths = [str(p) for p in paths]
+    if not paths:
+        return
+    result = await session.execute(delete(BlobRef).where(BlobRef.path.in_(paths)).returning(BlobRef.sha256))
+    await _recount(session, set(result.scalars().all()))
+
+
+async def collect_garbage(session: AsyncSession) -> dict:
+    """Drop references to vanished paths and delete unreferenced blobs.
+
+    Commits as it goes; returns counts and bytes freed.
+    """
+    store = get_blob_store()
+
+    refs = (await session.execute(select(BlobRef.path))).scalars().all()
+    missing = await asyncio.to_thread(lambda: [p for p in refs if not os.path.exists(p)])
+    for start in range(0, len(missing), _DB_BATCH_SIZE):
+        await session.execute(delete(BlobRef).where(BlobRef.path.in_(missing[start:start + _DB_BATCH_SIZE])))
+    await _recount(session)
+    await session.commit()
+
+    unreferenced = (await session.execute(select(Blob.sha256).where(Blob.ref_count == 0))).scalars().all()
+    removed: list[str] = []
+    freed = 0
+    for sha in unreferenced:
+        size = await asyncio.to_thread(store.remove, sha)
+        if size or not store.blob_path(sha).exists():
+            removed.append(sha)
+            freed += size
+    for start in range(0, len(removed), _DB_BATCH_SIZE):
+        await session.execute(delete(Blob).where(Blob.sha256.in_(removed[start:start + _DB_BATCH_SIZE])))
+    await session.commit()
+
+    return {"removed_refs": len(missing), "removed_blobs": len(removed), "freed_bytes": freed}
+
+
+async def storage_savings(session: AsyncSession) -> dict:
+    """Blob count, physical vs. logical bytes and bytes saved by deduplication."""
+    row = (
+        await session.execute(
+            text("""
+                SELECT
+                    COUNT(*) AS blobs,
+                    COALESCE(SUM(size_bytes) FILTER (WHERE ref_count > 0), 0) AS physical_bytes,
+                    COALESCE(SUM(size_bytes * ref_count), 0) AS logical_bytes,
+                    COALESCE(SUM(ref_count), 0) AS refs
+                FROM blobs
+            """)
+        )
+    ).one()
+    return {
+        "blobs": row.blobs,
+        "refs": int(row.refs),
+        "physical_bytes": int(row.physical_bytes),
+        "logical_bytes": int(row.logical_bytes),
+        "saved_bytes": max(0, int(row.logical_bytes) - int(row.physical_bytes)),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Migration of pre-existing files
+# ---------------------------------------------------------------------------
+
+
+async def migrate_existing_files(
+    roots: Iterable[str | Path] | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+) -> dict:
+    """Adopt files under the image and upload directories into the store.
+
+    Idempotent: files already linked to their blob are only re-hashed.
+    Finishes with :func:`collect_garbage`.
+
+    Args:
+        roots: Directories to scan (default: ``NSX_IMAGES_PATH``, ``UPLOADS_PATH``).
+        on_progress: Called with ``(files_done, deduplicated)`` after each batch.
+        is_cancelled: Polled between batches.
+    """
+    from app.database import async_session_factory
+
+    settings = get_settings()
+    store = get_blob_store()
+    if roots is None:
+        roots = (settings.NSX_IMAGES_PATH, settings.UPLOADS_PATH)
+
+    def _list_files() -> list[Path]:
+        found: list[Path] = []
+        for root in roots:
+            for dirpath, _dirnames, filenames in os.walk(root):
+                for name in filenames:
+                    if not name.startswith(".tmp-"):
+                        found.append(Path(dirpath) / name)
+        return found
+
+    files = await asyncio.to_thread(_list_files)
+    done = 0
+    deduplicated = 0
+    failed = 0
+    saved_bytes = 0
+    cancelled = False
+
+    for start in range(0, len(files), _DB_BATCH_SIZE):
+        if is_cancelled is not None and is_cancelled():
+            cancelled = True
+            break
+        batch: list[StoredBlob] = []
+        for path in files[start:start + _DB_BATCH_SIZE]:
+            try:
+                stored = await asyncio.to_thread(store.adopt, path)
+            except OSError as exc:
+                failed += 1
+                logger.warning("Blob migration skipped %s: %s", path, exc)
+                continue
+            batch.append(stored)
+            if stored.deduplicated:
+                deduplicated += 1
+                saved_bytes += stored.size
+        async with async_session_factory() as session:
+            await register_refs(session, batch)
+            await session.commit()
+        done += len(batch)
+        if on_progress is not None:
+            on_progress(done, deduplicated)
+
+    async with async_session_factory() as session:
+        gc = await collect_garbage(session)
+
+    return {
+        "files": len(files),
+        "migrated": done,
+        "deduplicated": deduplicated,
+        "failed": failed,
+        "saved_bytes": saved_bytes,
+        "cancelled": cancelled,
+        **gc,
+    }
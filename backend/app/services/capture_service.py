@@ -10,7 +10,6 @@ from datetime import UTC, datetime
 import html2text
 import httpx
 from pydantic import BaseModel
-from readability import Document
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +46,8 @@ class CaptureService:
             resp = await client.get(url, headers=self._HEADERS)
             resp.raise_for_status()
 
+        from readability import Document
+
         raw_html = resp.text
         doc = Document(raw_html)
         article_html = doc.summary()
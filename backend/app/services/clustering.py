@@ -1,21 +1,33 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from dataclasses import dataclass
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 
 import numpy as np
-from sklearn.cluster import KMeans
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai_router.router import AIRouter
 from app.ai_router.schemas import AIRequest, Message
-from app.models import Note, NoteCluster, NoteEmbedding
+from app.config import get_settings
+from app.models import Note, NoteCluster
+from app.services.graph_service import fetch_note_centroids
 
 logger = logging.getLogger(__name__)
 
 CLUSTER_TTL_MINUTES = 5
+# Cluster summaries requested from the AI provider at once.
+SUMMARY_CONCURRENCY = 3
+# Seed k-means with the previous centroids when the notebook's note set
+# overlaps the previous run by at least this Jaccard ratio.
+WARM_START_MIN_OVERLAP = 0.9
+
+_executor: ProcessPoolExecutor | None = None
 
 
 @dataclass
@@ -31,27 +43,73 @@ class ClusterResult:
 class ClusteringResult:
     clusters: list[ClusterResult]
     unclustered_note_ids: list[int]
+    timings: dict = field(default_factory=dict)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, get_settings().CLUSTERING_WORKERS),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_clustering_pool() -> None:
+    """Stop the clustering worker processes (application shutdown)."""
+    global _executor  # noqa: PLW0603
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
 
 
 async def fetch_embeddings_for_notebook(
     db: AsyncSession,
     notebook_id: int,
-) -> dict[int, list[float]]:
-    query = (
-        select(NoteEmbedding.note_id, NoteEmbedding.embedding)
-        .join(Note, Note.id == NoteEmbedding.note_id)
-        .where(Note.notebook_id == notebook_id)
-        .where(NoteEmbedding.chunk_index == 0)
+    note_ids: list[int] | None = None,
+) -> dict[int, np.ndarray]:
+    """Per-note centroid embeddings (mean over all chunks) for a notebook."""
+    if note_ids is None:
+        note_ids = await fetch_notes_in_notebook(db, notebook_id)
+    if not note_ids:
+        return {}
+    return await fetch_note_centroids(db, note_ids)
+
+
+async def fetch_previous_centroids(
+    db: AsyncSession,
+    notebook_id: int,
+    note_ids: set[int],
+    num_clusters: int,
+) -> list[list[float]] | None:
+    """Centroids of the notebook's last clustering if it is still a good seed.
+
+    Returns ``None`` unless the previous run used the same ``num_clusters``
+    and its note set overlaps ``note_ids`` by ``WARM_START_MIN_OVERLAP``.
+    """
+    latest_task = (
+        select(NoteCluster.task_id)
+        .where(NoteCluster.notebook_id == notebook_id)
+        .order_by(NoteCluster.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(NoteCluster.cluster_index, NoteCluster.note_ids, NoteCluster.centroid)
+        .where(NoteCluster.task_id == latest_task)
+        .where(NoteCluster.cluster_index >= 0)
+        .order_by(NoteCluster.cluster_index)
     )
-    result = await db.execute(query)
     rows = result.all()
+    if len(rows) != num_clusters or any(not centroid for _, _, centroid in rows):
+        return None
 
-    note_embeddings: dict[int, list[float]] = {}
-    for note_id, embedding in rows:
-        if embedding is not None:
-            note_embeddings[note_id] = list(embedding)
-
-    return note_embeddings
+    previous = {nid for _, ids, _ in rows for nid in ids}
+    union = previous | note_ids
+    if not union or len(previous & note_ids) / len(union) < WARM_START_MIN_OVERLAP:
+        return None
+    return [centroid for _, _, centroid in rows]
 
 
 async def fetch_notes_in_notebook(
@@ -66,14 +124,32 @@ async def fetch_notes_in_notebook(
 def run_kmeans_clustering(
     note_embeddings: dict[int, list[float]],
     num_clusters: int,
+    init_centroids: list[list[float]] | None = None,
 ) -> dict[int, list[int]]:
+    """Assign notes to clusters with mini-batch k-means.
+
+    CPU-bound; :func:`cluster_notes` runs it in a worker process.  With
+    ``init_centroids`` (one per cluster) k-means starts from them and runs
+    a single initialisation.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
     if len(note_embeddings) < num_clusters:
         num_clusters = max(1, len(note_embeddings))
 
     note_ids = list(note_embeddings.keys())
-    embeddings_matrix = np.array([note_embeddings[nid] for nid in note_ids])
-
-    kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init=10)
+    embeddings_matrix = np.array([note_embeddings[nid] for nid in note_ids], dtype=np.float32)
+
+    if init_centroids is not None and len(init_centroids) == num_clusters:
+        kmeans = MiniBatchKMeans(
+            n_clusters=num_clusters,
+            init=np.array(init_centroids, dtype=np.float32),
+            n_init=1,
+            random_state=42,
+            batch_size=1024,
+        )
+    else:
+        kmeans = MiniBatchKMeans(n_clusters=num_clusters, random_state=42, n_init=3, batch_size=1024)
     labels = kmeans.fit_predict(embeddings_matrix)
 
     clusters: dict[int, list[int]] = {}
@@ -99,12 +175,12 @@ def compute_centroid(
 async def fetch_note_titles(
     db: AsyncSession,
     note_ids: list[int],
-) -> list[str]:
+) -> dict[int, str]:
     if not note_ids:
-        return []
-    query = select(Note.title).where(Note.id.in_(note_ids))
+        return {}
+    query = select(Note.id, Note.title).where(Note.id.in_(note_ids))
     result = await db.execute(query)
-    return [row[0] for row in result.all() if row[0]]
+    return {note_id: title for note_id, title in result.all() if title}
 
 
 async def generate_cluster_summary(
@@ -159,39 +235,59 @@ async def cluster_notes(
     num_clusters: int = 5,
     ai_router: AIRouter | None = None,
 ) -> ClusteringResult:
+    timings: dict = {}
+    started = time.monotonic()
+
     all_note_ids = await fetch_notes_in_notebook(db, notebook_id)
-    note_embeddings = await fetch_embeddings_for_notebook(db, notebook_id)
+    note_embeddings = await fetch_embeddings_for_notebook(db, notebook_id, all_note_ids)
 
     notes_with_embeddings = set(note_embeddings.keys())
     unclustered = [nid for nid in all_note_ids if nid not in notes_with_embeddings]
+    timings["fetch_ms"] = round((time.monotonic() - started) * 1000)
 
     if not note_embeddings:
-        return ClusteringResult(clusters=[], unclustered_note_ids=unclustered)
-
-    cluster_assignments = run_kmeans_clustering(note_embeddings, num_clusters)
+        return ClusteringResult(clusters=[], unclustered_note_ids=unclustered, timings=timings)
+
+    phase = time.monotonic()
+    init_centroids = await fetch_previous_centroids(db, notebook_id, notes_with_embeddings, num_clusters)
+    timings["warm_start"] = init_centroids is not None
+    loop = asyncio.get_running_loop()
+    cluster_assignments = await loop.run_in_executor(
+        _get_executor(), run_kmeans_clustering, note_embeddings, num_clusters, init_centroids
+    )
+    timings["kmeans_ms"] = round((time.monotonic() - phase) * 1000)
 
     if ai_router is None:
         ai_router = AIRouter()
 
-    results: list[ClusterResult] = []
-    for cluster_idx, note_ids_in_cluster in cluster_assignments.items():
-        titles = await fetch_note_titles(db, note_ids_in_cluster)
-        summary, keywords = await generate_cluster_summary(ai_router, titles)
-        centroid = compute_centroid(note_ids_in_cluster, note_embeddings)
+    phase = time.monotonic()
+    titles_by_note = await fetch_note_titles(db, list(notes_with_embeddings))
+    semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
 
+    async def _summarize(note_ids_in_cluster: list[int]) -> tuple[str, list[str]]:
+        titles = [titles_by_note[nid] for nid in note_ids_in_cluster if nid in titles_by_note]
+        async with semaphore:
+            return await generate_cluster_summary(ai_router, titles)
+
+    cluster_items = list(cluster_assignments.items())
+    summaries = await asyncio.gather(*(_summarize(ids) for _, ids in cluster_items))
+    timings["summaries_ms"] = round((time.monotonic() - phase) * 1000)
+
+    results: list[ClusterResult] = []
+    for (cluster_idx, note_ids_in_cluster), (summary, keywords) in zip(cluster_items, summaries, strict=True):
         results.append(
             ClusterResult(
                 cluster_index=cluster_idx,
                 note_ids=note_ids_in_cluster,
                 summary=summary,
                 keywords=keywords,
-                centroid=centroid,
+                centroid=compute_centroid(note_ids_in_cluster, note_embeddings),
             )
         )
 
     results.sort(key=lambda c: c.cluster_index)
 
-    return ClusteringResult(clusters=results, unclustered_note_ids=unclustered)
+    return ClusteringResult(clusters=results, unclustered_note_ids=unclustered, timings=timings)
 
 
 async def save_clustering_results(
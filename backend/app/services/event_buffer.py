@@ -0,0 +1,293 @@
+"""Write-behind buffers for append-only event tables.
+
+Search events and activity log lines used to open a session and commit one
+row each, competing with user requests for pooled connections.  They are
+now queued in memory and written by one background task per table as
+multi-row INSERTs, every ``EVENT_FLUSH_INTERVAL_SECONDS`` or as soon as
+``EVENT_FLUSH_BATCH_SIZE`` rows are pending.
+
+Rows carry their own ``created_at`` (and, for search events, an ``id``
+taken from a block reserved from the table's sequence), so callers never
+wait for the database.  When a buffer holds ``EVENT_BUFFER_MAX`` rows
+(database down), new rows are dropped and counted.  The lifespan hook
+flushes everything on shutdown via :func:`stop_event_buffers`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import Table, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session_factory, use_background_pool
+from app.models import ActivityLog, SearchEvent
+
+logger = logging.getLogger(__name__)
+
+# Ids reserved per sequence round trip, and the level that triggers a refill.
+_ID_BLOCK_SIZE = 200
+_ID_REFILL_BELOW = 50
+
+
+class EventBuffer:
+    """In-process write-behind queue for one table.
+
+    Args:
+        table: Table the rows are inserted into.
+        columns: Every column a row may set; missing keys are written as NULL
+            so all rows fit one multi-row INSERT.
+        after_insert: Optional coroutine run in the same transaction after
+            each batch (e.g. applying buffered updates).
+        has_updates: Tells the flush loop ``after_insert`` has work even
+            when no rows are pending.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        columns: tuple[str, ...],
+        after_insert: Callable[[AsyncSession], Awaitable[None]] | None = None,
+        has_updates: Callable[[], bool] = lambda: False,
+    ) -> None:
+        settings = get_settings()
+        self._table = table
+        self._columns = columns
+        self._after_insert = after_insert
+        self._has_updates = has_updates
+        self._interval = settings.EVENT_FLUSH_INTERVAL_SECONDS
+        self._batch_size = settings.EVENT_FLUSH_BATCH_SIZE
+        self._max_pending = settings.EVENT_BUFFER_MAX
+        self._pending: deque[dict[str, Any]] = deque()
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.stats = {"enqueued": 0, "written": 0, "dropped": 0, "flushes": 0, "failed_flushes": 0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def update_pending(self, key: str, value: Any, changes: dict[str, Any]) -> bool:
+        """Apply ``changes`` to a row still in the buffer; return ``False`` if none matched."""
+        for row in self._pending:
+            if row.get(key) == value:
+                row.update(changes)
+                return True
+        return False
+
+    def add(self, row: dict[str, Any]) -> bool:
+        """Queue one row; return ``False`` if it was dropped (buffer full)."""
+        if len(self._pending) >= self._max_pending:
+            self.stats["dropped"] += 1
+            return False
+        self._pending.append({col: row.get(col) for col in self._columns})
+        self.stats["enqueued"] += 1
+        if len(self._pending) >= self._batch_size:
+            self._wake.set()
+        self._ensure_task()
+        return True
+
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        use_background_pool()
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything pending in batches; return the number of rows written.
+
+        A failed batch is put back (if it still fits) and retried next time.
+        """
+        written = 0
+        async with self._lock:
+            # Updates run with every batch; without rows, at most once per flush.
+            updates = self._has_updates()
+            while self._pending or updates:
+                updates = False
+                batch = [self._pending.popleft() for _ in range(min(self._batch_size, len(self._pending)))]
+                try:
+                    async with async_session_factory() as session:
+                        if batch:
+                            await session.execute(insert(self._table).values(batch))
+                        if self._after_insert is not None:
+                            await self._after_insert(session)
+                        await session.commit()
+                except Exception:
+                    self.stats["failed_flushes"] += 1
+                    logger.warning("Failed to write %d %s rows", len(batch), self._table.name, exc_info=True)
+                    room = self._max_pending - len(self._pending)
+                    self._pending.extendleft(reversed(batch[:room]))
+                    self.stats["dropped"] += max(0, len(batch) - room)
+                    break
+                self.stats["flushes"] += 1
+                self.stats["written"] += len(batch)
+                written += len(batch)
+        return written
+
+    async def stop(self) -> None:
+        """Cancel the background task and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+
+class IdAllocator:
+    """Hands out ids reserved in blocks from a sequence.
+
+    A refill is started in the background when the block runs low, so
+    callers only wait on a cold start or after a burst.
+    """
+
+    def __init__(self, sequence: str) -> None:
+        self._sql = text(f"SELECT nextval('{sequence}') FROM generate_series(1, :n)")  # noqa: S608 - sequence names are literals in this module
+        self._ids: deque[int] = deque()
+        self._lock = asyncio.Lock()
+        self._refill_task: asyncio.Task | None = None
+
+    async def next_id(self) -> int:
+        while not self._ids:
+            await self._refill()
+        if len(self._ids) < _ID_REFILL_BELOW and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill())
+        return self._ids.popleft()
+
+    async def _refill(self) -> None:
+        async with self._lock:
+            if len(self._ids) >= _ID_REFILL_BELOW:
+                return
+            async with async_session_factory() as session:
+                result = await session.execute(self._sql, {"n": _ID_BLOCK_SIZE})
+                self._ids.extend(result.scalars().all())
+
+
+# --- Search events ------------------------------------------------------------
+
+# Flushes a click waits for its search event, which may still be buffered
+# in another process.
+_CLICK_MAX_FLUSHES = 60
+
+# search event id -> (clicked note id, flushes tried)
+_pending_clicks: dict[int, tuple[str, int]] = {}
+
+
+async def _apply_clicks(session: AsyncSession) -> None:
+    """Set clicked_note_id for buffered clicks whose search event is stored.
+
+    Clicks whose event is not in the table yet are kept for up to
+    ``_CLICK_MAX_FLUSHES`` flushes.
+    """
+    if not _pending_clicks:
+        return
+    clicks = dict(_pending_clicks)
+    _pending_clicks.clear()
+    try:
+        result = await session.execute(
+            text("""
+                UPDATE search_events s
+                SET clicked_note_id = c.note_id
+                FROM unnest(CAST(:ids AS integer[]), CAST(:note_ids AS text[])) AS c(id, note_id)
+                WHERE s.id = c.id
+                RETURNING s.id
+            """),
+            {"ids": list(clicks), "note_ids": [note_id for note_id, _ in clicks.values()]},
+        )
+        applied = set(result.scalars())
+    except Exception:
+        for event_id, click in clicks.items():
+            _pending_clicks.setdefault(event_id, click)
+        raise
+    expired = 0
+    for event_id, (note_id, tries) in clicks.items():
+        if event_id in applied:
+            continue
+        if tries + 1 >= _CLICK_MAX_FLUSHES:
+            expired += 1
+        else:
+            _pending_clicks.setdefault(event_id, (note_id, tries + 1))
+    if expired:
+        logger.debug("Dropped %d clicks whose search event never arrived", expired)
+
+
+_search_events: EventBuffer | None = None
+_search_event_ids: IdAllocator | None = None
+_activity_logs: EventBuffer | None = None
+
+
+def search_event_buffer() -> EventBuffer:
+    global _search_events
+    if _search_events is None:
+        _search_events = EventBuffer(
+            SearchEvent.__table__,
+            (
+                "id",
+                "user_id",
+                "query",
+                "search_type",
+                "result_count",
+                "duration_ms",
+                "clicked_note_id",
+                "judge_strategy",
+                "details",
+                "created_at",
+            ),
+            after_insert=_apply_clicks,
+            has_updates=lambda: bool(_pending_clicks),
+        )
+    return _search_events
+
+
+def search_event_ids() -> IdAllocator:
+    global _search_event_ids
+    if _search_event_ids is None:
+        _search_event_ids = IdAllocator("search_events_id_seq")
+    return _search_event_ids
+
+
+def queue_search_click(search_event_id: int, note_id: str) -> None:
+    """Buffer a click; it is applied with the next search-event flush."""
+    buffer = search_event_buffer()
+    if not buffer.update_pending("id", search_event_id, {"clicked_note_id": note_id}):
+        _pending_clicks[search_event_id] = (note_id, 0)
+    buffer._ensure_task()
+
+
+def activity_log_buffer() -> EventBuffer:
+    global _activity_logs
+    if _activity_logs is None:
+        _activity_logs = EventBuffer(
+            ActivityLog.__table__,
+            ("operation", "status", "message", "details", "triggered_by", "created_at"),
+        )
+    return _activity_logs
+
+
+def event_buffer_stats() -> dict[str, dict[str, int]]:
+    """Counters per buffer (enqueued, written, dropped, flushes, failed_flushes, pending)."""
+    return {
+        buffer._table.name: {**buffer.stats, "pending": buffer.pending}
+        for buffer in (_search_events, _activity_logs)
+        if buffer is not None
+    }
+
+
+async def stop_event_buffers() -> None:
+    """Flush all buffers (called from the lifespan shutdown hook)."""
+    for buffer in (_search_events, _activity_logs):
+        if buffer is not None:
+            await buffer.stop()
@@ -1,12 +1,13 @@
 """User feedback service — search relevance + AI quality ratings."""
 
 import logging
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import func, select, text
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import AIFeedback, SearchFeedback
+from app.services.metrics_rollup import EPOCH, combined, floor_hour, rollup_window
 
 logger = logging.getLogger(__name__)
 
@@ -74,73 +75,60 @@ class FeedbackService:
 
     @staticmethod
     async def get_feedback_summary(db: AsyncSession, period: str = "30d") -> dict:
-        """Aggregate feedback data for admin dashboard."""
+        """Aggregate feedback data for admin dashboard from the hourly rollups."""
         days = {"7d": 7, "30d": 30, "90d": 90}.get(period, 30)
-        since = datetime.utcnow() - timedelta(days=days)
+        since = floor_hour(datetime.now(UTC) - timedelta(days=days))
+        params = await rollup_window(db, since)
 
-        # Search feedback positive rate
-        search_total = await db.execute(select(func.count(SearchFeedback.id)).where(SearchFeedback.created_at >= since))
-        search_count = search_total.scalar() or 0
-
-        search_positive = await db.execute(
-            select(func.count(SearchFeedback.id)).where(
-                SearchFeedback.created_at >= since,
-                SearchFeedback.relevant == True,  # noqa: E712
-            )
-        )
-        positive_count = search_positive.scalar() or 0
-        positive_rate = round(positive_count / search_count * 100, 1) if search_count else 0
-
-        # Search feedback trend (daily)
+        # Search feedback trend (daily) and positive rate
         search_trend_result = await db.execute(
-            text("""
+            text(f"""
                 SELECT
-                    date_trunc('day', created_at)::date AS day,
-                    COUNT(*) FILTER (WHERE relevant = true) AS positive,
-                    COUNT(*) AS total
-                FROM search_feedback
-                WHERE created_at >= :since
+                    date_trunc('day', bucket)::date AS day,
+                    SUM(positive) AS positive,
+                    SUM(total) AS total
+                FROM {combined("search_feedback")} f
                 GROUP BY day ORDER BY day
-            """),
-            {"since": since},
+            """),  # noqa: S608 - combined() interpolates only _ROLLUPS constants
+            params,
         )
-        search_trend = [
-            {
-                "date": str(r[0]),
-                "positive": r[1],
-                "total": r[2],
-                "rate": round(r[1] / r[2] * 100, 1) if r[2] else 0,
-            }
-            for r in search_trend_result.fetchall()
-        ]
-
-        # AI feedback avg rating by feature
-        ai_by_feature = await db.execute(
-            select(
-                AIFeedback.feature,
-                func.avg(AIFeedback.rating),
-                func.count(AIFeedback.id),
+        search_trend = []
+        positive_count = search_count = 0
+        for r in search_trend_result.fetchall():
+            positive, total = int(r[1]), int(r[2])
+            positive_count += positive
+            search_count += total
+            search_trend.append(
+                {
+                    "date": str(r[0]),
+                    "positive": positive,
+                    "total": total,
+                    "rate": round(positive / total * 100, 1) if total else 0,
+                }
             )
-            .where(AIFeedback.created_at >= since)
-            .group_by(AIFeedback.feature)
-        )
-        feature_ratings = [
-            {"feature": r[0], "avg_rating": round(float(r[1]), 2), "count": r[2]} for r in ai_by_feature.fetchall()
-        ]
+        positive_rate = round(positive_count / search_count * 100, 1) if search_count else 0
 
-        # AI feedback avg rating by model
-        ai_by_model = await db.execute(
-            select(
-                AIFeedback.model_used,
-                func.avg(AIFeedback.rating),
-                func.count(AIFeedback.id),
-            )
-            .where(AIFeedback.created_at >= since, AIFeedback.model_used.isnot(None))
-            .group_by(AIFeedback.model_used)
+        # AI feedback avg rating by feature and by model
+        ai_result = await db.execute(
+            text(f"""
+                SELECT feature, model_used, SUM(rating_sum), SUM(count)
+                FROM {combined("ai_feedback")} a
+                GROUP BY feature, model_used
+            """),  # noqa: S608 - combined() interpolates only _ROLLUPS constants
+            params,
         )
-        model_ratings = [
-            {"model": r[0], "avg_rating": round(float(r[1]), 2), "count": r[2]} for r in ai_by_model.fetchall()
+        by_feature: dict[str, list[int]] = {}
+        by_model: dict[str, list[int]] = {}
+        for feature, model, rating_sum, count in ai_result.fetchall():
+            for key, totals in ((feature, by_feature), (model, by_model)):
+                if key:
+                    entry = totals.setdefault(key, [0, 0])
+                    entry[0] += int(rating_sum)
+                    entry[1] += int(count)
+        feature_ratings = [
+            {"feature": k, "avg_rating": round(v[0] / v[1], 2), "count": v[1]} for k, v in by_feature.items()
         ]
+        model_ratings = [{"model": k, "avg_rating": round(v[0] / v[1], 2), "count": v[1]} for k, v in by_model.items()]
 
         return {
             "search_feedback": {
@@ -160,31 +148,28 @@ class FeedbackService:
     async def compute_optimal_params(db: AsyncSession) -> dict:
         """Analyze engine contributions correlated with thumbs-up rate to recommend RRF weights."""
         result = await db.execute(
-            text("""
-                WITH feedback_with_details AS (
-                    SELECT sf.relevant, se.details, se.search_type
-                    FROM search_feedback sf
-                    JOIN search_events se ON se.id = sf.search_event_id
-                    WHERE se.details IS NOT NULL
-                )
+            text(f"""
                 SELECT
                     search_type,
-                    COUNT(*) FILTER (WHERE relevant = true) AS positive,
-                    COUNT(*) AS total
-                FROM feedback_with_details
+                    SUM(positive) AS positive,
+                    SUM(total) AS total
+                FROM {combined("search_feedback")} f
+                WHERE has_details
                 GROUP BY search_type
-            """)
+            """),  # noqa: S608 - combined() interpolates only _ROLLUPS constants
+            await rollup_window(db, EPOCH),
         )
         rows = result.fetchall()
 
         recommendations = []
         for r in rows:
-            rate = round(r[1] / r[2] * 100, 1) if r[2] else 0
+            positive, total = int(r[1]), int(r[2])
+            rate = round(positive / total * 100, 1) if total else 0
             recommendations.append(
                 {
                     "search_type": r[0],
                     "positive_rate": rate,
-                    "sample_size": r[2],
+                    "sample_size": total,
                 }
             )
 
@@ -5,11 +5,23 @@ from __future__ import annotations
 import logging
 from collections import defaultdict
 
-from sqlalchemy import text
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Integer, column, select, table, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+from app.models import NoteEmbedding
+
 logger = logging.getLogger(__name__)
 
+# Materialized view of per-note mean embeddings (migration 016).
+_note_avg_embeddings = table(
+    "note_avg_embeddings",
+    column("note_id", Integer),
+    column("avg_embedding", Vector(get_settings().EMBEDDING_DIMENSION)),
+)
+
 
 async def refresh_avg_embeddings(db: AsyncSession) -> None:
     """Refresh the note_avg_embeddings materialized view.
@@ -28,6 +40,33 @@ async def refresh_avg_embeddings(db: AsyncSession) -> None:
         await db.rollback()
 
 
+async def fetch_note_centroids(db: AsyncSession, note_ids: list[int]) -> dict:
+    """Return ``{note_id: centroid}`` from the note_avg_embeddings view.
+
+    Notes indexed since the view was last refreshed fall back to averaging
+    their chunk embeddings.
+    """
+    result = await db.execute(
+        select(_note_avg_embeddings.c.note_id, _note_avg_embeddings.c.avg_embedding).where(
+            _note_avg_embeddings.c.note_id.in_(note_ids)
+        )
+    )
+    centroids = {nid: emb for nid, emb in result.all() if emb is not None}
+
+    missing = [nid for nid in note_ids if nid not in centroids]
+    if missing:
+        emb_result = await db.execute(
+            select(NoteEmbedding.note_id, NoteEmbedding.embedding).where(NoteEmbedding.note_id.in_(missing))
+        )
+        chunks: dict[int, list] = {}
+        for nid, emb in emb_result.all():
+            chunks.setdefault(nid, []).append(emb)
+        for nid, vecs in chunks.items():
+            centroids[nid] = np.mean(np.asarray(vecs, dtype=np.float32), axis=0)
+
+    return centroids
+
+
 def compute_graph_analysis(
     nodes: list[dict],
     links: list[dict],
@@ -140,3 +179,76 @@ def compute_graph_analysis(
         },
         "cluster_summary": cluster_summary,
     }
+
+
+# Rows of the similarity matrix computed per matmul; bounds peak memory to
+# block_size × n float32 values.
+_SIMILARITY_BLOCK_SIZE = 1024
+
+
+def compute_similarity_edges(
+    note_ids: list[int],
+    vectors: list,
+    threshold: float,
+    neighbors_per_note: int,
+    exclude: set[tuple[int, int]] | None = None,
+    block_size: int = _SIMILARITY_BLOCK_SIZE,
+) -> list[tuple[int, int, float]]:
+    """Top-K cosine-similarity edges between note centroid vectors.
+
+    Vectors are L2-normalised into one float32 matrix and multiplied in row
+    blocks; each note keeps its ``neighbors_per_note`` most similar notes at
+    or above ``threshold``.  Symmetric duplicates are merged.  CPU-bound --
+    call via ``asyncio.to_thread``.
+
+    Args:
+        note_ids: Note IDs aligned with ``vectors``.
+        vectors: One embedding per note.
+        threshold: Minimum cosine similarity for an edge.
+        neighbors_per_note: K for the per-note top-K cut.
+        exclude: ``(min_id, max_id)`` pairs to leave out (already linked).
+        block_size: Rows per matrix multiply.
+
+    Returns:
+        ``(source, target, similarity)`` tuples with ``source < target``,
+        strongest first.
+    """
+    n = len(note_ids)
+    if n < 2:
+        return []
+
+    matrix = np.array(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1.0, norms)
+    k = min(neighbors_per_note, n - 1)
+
+    rows: list = []
+    cols: list = []
+    sims: list = []
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = matrix[start:stop] @ matrix.T
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        top = np.argpartition(block, -k, axis=1)[:, -k:]
+        top_sims = np.take_along_axis(block, top, axis=1)
+        keep = top_sims >= threshold
+        rows.append(np.nonzero(keep)[0] + start)
+        cols.append(top[keep])
+        sims.append(top_sims[keep])
+
+    row_idx = np.concatenate(rows)
+    col_idx = np.concatenate(cols)
+    sim_vals = np.concatenate(sims)
+    lo = np.minimum(row_idx, col_idx)
+    hi = np.maximum(row_idx, col_idx)
+    _, first = np.unique(lo.astype(np.int64) * n + hi, return_index=True)
+
+    ids = np.asarray(note_ids)
+    exclude = exclude or set()
+    edges = [
+        (int(ids[a]), int(ids[b]), float(s))
+        for a, b, s in zip(lo[first], hi[first], sim_vals[first], strict=True)
+        if (int(ids[a]), int(ids[b])) not in exclude
+    ]
+    edges.sort(key=lambda edge: edge[2], reverse=True)
+    return edges
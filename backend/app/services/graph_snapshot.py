@@ -0,0 +1,285 @@
+"""Versioned snapshot of the global note graph.
+
+``GET /graph?limit=0`` used to run a LATERAL top-K query over every note
+centroid on each request.  After indexing, :func:`refresh_graph_snapshot`
+stores each note's ``SNAPSHOT_NEIGHBORS`` nearest notes as a new
+``graph_snapshots`` version:
+
+- the lists are kept as columns (``note_ids``, ``neighbors``,
+  ``similarity``) packed with ``np.savez_compressed``;
+- only notes whose centroid changed, that are new, or that lost a
+  neighbour are re-queried.  Every other note merges in its similarity to
+  the changed notes, so its list stays exact without a new ANN search.
+
+Any ``neighbors_per_note`` / ``similarity_threshold`` / ``max_edges`` the
+API accepts is cut from the stored lists by :func:`snapshot_edges`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+import numpy as np
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import GraphSnapshot, NoteEmbedding
+
+logger = logging.getLogger(__name__)
+
+# Neighbours stored per note (matches the API's maximum ``neighbors_per_note``).
+SNAPSHOT_NEIGHBORS = 20
+# Rebuild from scratch when more than this share of notes needs re-querying.
+_FULL_REBUILD_RATIO = 0.5
+# Notes per incremental SQL statement.
+_QUERY_BATCH_SIZE = 200
+
+_NEIGHBORS_SELECT = """
+    SELECT a.note_id, b.note_id, 1 - (a.avg_embedding <=> b.avg_embedding)
+    FROM note_avg_embeddings a
+    CROSS JOIN LATERAL (
+        SELECT note_id, avg_embedding
+        FROM note_avg_embeddings
+        WHERE note_id != a.note_id
+        ORDER BY avg_embedding <=> a.avg_embedding
+        LIMIT :k
+    ) b
+"""
+_ALL_NEIGHBORS_SQL = text(_NEIGHBORS_SELECT)
+_NEIGHBORS_SQL = text(_NEIGHBORS_SELECT + " WHERE a.note_id = ANY(:note_ids)")
+
+_PAIR_SIMILARITY_SQL = text("""
+    SELECT a.note_id, c.note_id, 1 - (a.avg_embedding <=> c.avg_embedding)
+    FROM note_avg_embeddings a
+    JOIN note_avg_embeddings c ON c.note_id = ANY(:changed_ids)
+    WHERE a.note_id = ANY(:note_ids)
+      AND a.note_id != c.note_id
+""")
+
+NeighborLists = dict[int, list[tuple[int, float]]]
+
+
+@dataclass(slots=True)
+class GraphSnapshotData:
+    """Decoded snapshot: row ``i`` holds the neighbours of ``note_ids[i]``."""
+
+    version: int
+    created_at: datetime
+    note_ids: np.ndarray  # (n,) int32
+    neighbors: np.ndarray  # (n, K) int32 note IDs, -1 = padding
+    similarity: np.ndarray  # (n, K) float32, strongest first
+
+
+_cached: GraphSnapshotData | None = None
+
+
+def _encode(lists: NeighborLists) -> bytes:
+    ids = sorted(lists)
+    neighbors = np.full((len(ids), SNAPSHOT_NEIGHBORS), -1, dtype=np.int32)
+    similarity = np.zeros((len(ids), SNAPSHOT_NEIGHBORS), dtype=np.float32)
+    for row, note_id in enumerate(ids):
+        entries = lists[note_id][:SNAPSHOT_NEIGHBORS]
+        if entries:
+            neighbors[row, : len(entries)] = [nid for nid, _ in entries]
+            similarity[row, : len(entries)] = [sim for _, sim in entries]
+
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf,
+        note_ids=np.asarray(ids, dtype=np.int32),
+        neighbors=neighbors,
+        similarity=similarity,
+    )
+    return buf.getvalue()
+
+
+def _decode(payload: bytes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    with np.load(io.BytesIO(payload)) as data:
+        return data["note_ids"], data["neighbors"], data["similarity"]
+
+
+def _to_lists(note_ids: np.ndarray, neighbors: np.ndarray, similarity: np.ndarray) -> NeighborLists:
+    return {
+        note_id: [(nid, sim) for nid, sim in zip(row_ids, row_sims, strict=True) if nid >= 0]
+        for note_id, row_ids, row_sims in zip(note_ids.tolist(), neighbors.tolist(), similarity.tolist(), strict=True)
+    }
+
+
+def _group(rows) -> NeighborLists:
+    lists: NeighborLists = {}
+    for note_id, neighbor_id, similarity in rows:
+        lists.setdefault(note_id, []).append((neighbor_id, float(similarity)))
+    for entries in lists.values():
+        entries.sort(key=lambda e: e[1], reverse=True)
+    return lists
+
+
+def snapshot_edges(
+    snapshot: GraphSnapshotData,
+    neighbors_per_note: int,
+    threshold: float,
+    max_edges: int,
+    node_ids: list[int] | None = None,
+) -> list[tuple[int, int, float]]:
+    """Undirected edges cut from the stored top-K lists.
+
+    Each note contributes its ``neighbors_per_note`` strongest neighbours
+    above ``threshold``; symmetric duplicates are merged and at most
+    ``max_edges`` edges are kept.  ``node_ids`` restricts both endpoints.
+
+    Returns:
+        ``(source, target, similarity)`` tuples with ``source < target``,
+        strongest first.
+    """
+    k = min(neighbors_per_note, snapshot.neighbors.shape[1])
+    src = np.repeat(snapshot.note_ids, k).astype(np.int64)
+    dst = snapshot.neighbors[:, :k].ravel().astype(np.int64)
+    sim = snapshot.similarity[:, :k].ravel()
+
+    keep = (dst >= 0) & (sim > threshold)
+    if node_ids is not None:
+        allowed = np.asarray(node_ids, dtype=np.int64)
+        keep &= np.isin(src, allowed) & np.isin(dst, allowed)
+    src, dst, sim = src[keep], dst[keep], sim[keep]
+
+    order = np.argsort(-sim, kind="stable")
+    lo = np.minimum(src, dst)[order]
+    hi = np.maximum(src, dst)[order]
+    sim = sim[order]
+    # First occurrence of each pair is its strongest direction.
+    _, first = np.unique((lo << 32) | hi, return_index=True)
+    first = np.sort(first)[:max_edges]
+
+    return [
+        (a, b, round(s, 4))
+        for a, b, s in zip(lo[first].tolist(), hi[first].tolist(), sim[first].tolist(), strict=True)
+    ]
+
+
+async def _query_neighbors(session: AsyncSession, note_ids: list[int] | None) -> NeighborLists:
+    """ANN top-K lists for ``note_ids`` (``None`` = every note in the view)."""
+    if note_ids is None:
+        result = await session.execute(_ALL_NEIGHBORS_SQL, {"k": SNAPSHOT_NEIGHBORS})
+        return _group(result.all())
+
+    lists: NeighborLists = {}
+    for start in range(0, len(note_ids), _QUERY_BATCH_SIZE):
+        batch = note_ids[start : start + _QUERY_BATCH_SIZE]
+        result = await session.execute(_NEIGHBORS_SQL, {"k": SNAPSHOT_NEIGHBORS, "note_ids": batch})
+        lists.update(_group(result.all()))
+    return lists
+
+
+async def _merge_changed(
+    session: AsyncSession,
+    lists: NeighborLists,
+    note_ids: list[int],
+    changed_ids: list[int],
+) -> None:
+    """Fold similarities to ``changed_ids`` into the lists of ``note_ids``."""
+    for start in range(0, len(note_ids), _QUERY_BATCH_SIZE):
+        batch = note_ids[start : start + _QUERY_BATCH_SIZE]
+        result = await session.execute(_PAIR_SIMILARITY_SQL, {"note_ids": batch, "changed_ids": changed_ids})
+        for note_id, candidates in _group(result.all()).items():
+            merged = lists.get(note_id, []) + candidates
+            merged.sort(key=lambda e: e[1], reverse=True)
+            lists[note_id] = merged[:SNAPSHOT_NEIGHBORS]
+
+
+async def refresh_graph_snapshot(session: AsyncSession) -> int | None:
+    """Store a new snapshot version if any note centroid changed.
+
+    Reads ``note_avg_embeddings``, so refresh the view first.  The caller
+    commits.
+
+    Returns:
+        The new version, or ``None`` when the latest snapshot is current.
+    """
+    started = time.monotonic()
+    computed_at = datetime.now(UTC)
+
+    latest = await session.scalar(select(GraphSnapshot).order_by(GraphSnapshot.version.desc()).limit(1))
+    current = set((await session.execute(text("SELECT note_id FROM note_avg_embeddings"))).scalars().all())
+
+    lists: NeighborLists | None = None
+    requeried = len(current)
+    if latest is not None and latest.neighbors_per_note == SNAPSHOT_NEIGHBORS:
+        previous = _to_lists(*await asyncio.to_thread(_decode, latest.payload))
+        reembedded = await session.execute(
+            select(NoteEmbedding.note_id)
+            .group_by(NoteEmbedding.note_id)
+            .having(func.max(NoteEmbedding.created_at) > latest.created_at)
+        )
+        changed = (set(reembedded.scalars().all()) & current) | (current - previous.keys())
+        removed = previous.keys() - current
+        if not changed and not removed:
+            return None
+
+        moved = changed | removed
+        dirty = changed | {
+            note_id
+            for note_id, entries in previous.items()
+            if note_id in current and any(nid in moved for nid, _ in entries)
+        }
+        if len(dirty) <= len(current) * _FULL_REBUILD_RATIO:
+            clean = sorted(current - dirty)
+            lists = {note_id: previous[note_id] for note_id in clean}
+            lists.update(await _query_neighbors(session, sorted(dirty)))
+            if changed and clean:
+                await _merge_changed(session, lists, clean, sorted(changed))
+            requeried = len(dirty)
+
+    if lists is None:
+        lists = await _query_neighbors(session, None)
+
+    version = latest.version + 1 if latest else 1
+    payload = await asyncio.to_thread(_encode, lists)
+    session.add(
+        GraphSnapshot(
+            version=version,
+            node_count=len(lists),
+            neighbors_per_note=SNAPSHOT_NEIGHBORS,
+            payload=payload,
+            created_at=computed_at,
+        )
+    )
+    await session.execute(delete(GraphSnapshot).where(GraphSnapshot.version < version))
+
+    logger.info(
+        "Graph snapshot v%d: %d notes (%d re-queried), %d KB in %.2fs",
+        version,
+        len(lists),
+        requeried,
+        len(payload) // 1024,
+        time.monotonic() - started,
+    )
+    return version
+
+
+async def load_graph_snapshot(session: AsyncSession) -> GraphSnapshotData | None:
+    """Return the latest snapshot, decoding it only when the version changed."""
+    global _cached
+
+    row = (
+        await session.execute(
+            select(GraphSnapshot.version, GraphSnapshot.created_at).order_by(GraphSnapshot.version.desc()).limit(1)
+        )
+    ).first()
+    if row is None:
+        return None
+    if _cached is not None and _cached.version >= row.version:
+        # A lagging read replica may still report an older version.
+        return _cached
+
+    payload = await session.scalar(select(GraphSnapshot.payload).where(GraphSnapshot.version == row.version))
+    if payload is None:
+        # Superseded between the two queries; the next request picks up the new one.
+        return _cached
+    arrays = await asyncio.to_thread(_decode, payload)
+    _cached = GraphSnapshotData(row.version, row.created_at, *arrays)
+    return _cached
@@ -52,6 +52,7 @@ class ImageAnalysisService:
 
     OCR_CONCURRENCY = 8  # glm-ocr supports higher concurrency
     VISION_CONCURRENCY = 8  # glm-4.6v supports 10, but 8 avoids 429 rate limits
+    REINDEX_BATCH_SIZE = 20  # notes per committed re-embedding batch
 
     def __init__(self) -> None:
         self._ocr_sem = asyncio.Semaphore(self.OCR_CONCURRENCY)
@@ -105,7 +106,8 @@ class ImageAnalysisService:
             is_cancelled: Optional callable returning True if cancellation was requested
 
         Returns:
-            Summary dict with counts.
+            Summary dict with counts and ``reindex_job_id``, the ``image_reindex``
+            job that re-embeds the affected notes (None if nothing was analysed).
         """
         async with async_session_factory() as db:
             ocr_ids = [
@@ -137,7 +139,10 @@ class ImageAnalysisService:
 
         all_ids = list(set(ocr_ids) | set(vision_ids))
         if not all_ids:
-            return {"processed": 0, "ocr_done": 0, "vision_done": 0, "failed": 0}
+            return {
+                "processed": 0, "ocr_done": 0, "vision_done": 0, "failed": 0,
+                "reindex_job_id": None,
+            }
 
         total = len(all_ids)
         counters = {"ocr_done": 0, "vision_done": 0, "failed": 0}
@@ -206,14 +211,17 @@ class ImageAnalysisService:
             asyncio.gather(*vision_tasks, return_exceptions=True),
         )
 
-        # Re-index affected notes
-        await self._reindex_affected_notes(all_ids)
+        # Re-embed image segments of affected notes in a durable follow-up job.
+        # Queued even when the run was cancelled: notes that already have
+        # embeddings are never picked up by needs_indexing again.
+        reindex_job_id = await self.queue_reindex(sorted(done_set))
 
         return {
             "processed": len(done_set),
             "ocr_done": counters["ocr_done"],
             "vision_done": counters["vision_done"],
             "failed": counters["failed"],
+            "reindex_job_id": reindex_job_id,
         }
 
     async def _process_single(self, image_id: int) -> dict:
@@ -333,38 +341,107 @@ class ImageAnalysisService:
                 await db.flush()
                 return False
 
-    async def _reindex_affected_notes(self, image_ids: list[int]) -> None:
-        """Re-index notes that had images processed."""
-        try:
-            async with async_session_factory() as db:
-                # Find distinct note IDs from processed images
-                stmt = select(NoteImage.synology_note_id).where(NoteImage.id.in_(image_ids)).distinct()
-                result = await db.execute(stmt)
-                note_synology_ids = [row[0] for row in result.fetchall()]
+    async def queue_reindex(self, image_ids: list[int]) -> int | None:
+        """Submit an ``image_reindex`` job for the notes owning ``image_ids``.
 
-                if not note_synology_ids:
-                    return
+        Returns:
+            The job id, or None when there is nothing to re-embed.
+        """
+        if not image_ids:
+            return None
 
-                from app.models import Note
-                from app.search.embeddings import EmbeddingService
-                from app.search.indexer import NoteIndexer
+        from app.services.job_queue import submit_job
 
-                embedding_service = EmbeddingService()
-                indexer = NoteIndexer(db, embedding_service)
+        job, _ = await submit_job(
+            "image_reindex",
+            {"image_ids": image_ids},
+            progress={"reindex_total": 0, "reindexed": 0, "reindex_failed": 0},
+            max_attempts=3,
+            unique=False,
+        )
+        return job.id
 
-                # Find note DB IDs
-                note_stmt = select(Note.id).where(Note.synology_note_id.in_(note_synology_ids))
-                note_result = await db.execute(note_stmt)
-                note_ids = [row[0] for row in note_result.fetchall()]
+    async def reindex_affected_notes(
+        self,
+        image_ids: list[int],
+        on_progress: callable | None = None,
+    ) -> dict:
+        """Refresh image embeddings of notes that had images processed.
+
+        Only the OCR/Vision chunks of each note are regenerated (see
+        :meth:`NoteIndexer.reindex_image_segments`); notes that were never
+        indexed get a full first-time index instead.  Work is split into
+        batches of ``REINDEX_BATCH_SIZE`` notes, each committed in its own
+        session so no transaction stays open for the whole run.  Every note
+        runs in a savepoint, so a failed embedding call rolls back only that
+        note's chunk delete.
 
-                for note_id in note_ids:
-                    try:
-                        await indexer.reindex_note(note_id)
-                    except Exception as exc:
-                        logger.warning("Failed to re-index note %d: %s", note_id, exc)
+        Args:
+            image_ids: IDs of the images processed in this batch.
+            on_progress: Optional callback(reindexed, total, failed)
 
-                await db.commit()
+        Returns:
+            Summary dict with ``total``, ``reindexed`` and ``failed`` counts.
+        """
+        summary = {"total": 0, "reindexed": 0, "failed": 0}
+        if not image_ids:
+            return summary
 
-            logger.info("Re-indexed %d notes after image analysis", len(note_ids))
-        except Exception as exc:
-            logger.warning("Failed to re-index notes: %s", exc)
+        from app.config import get_settings
+        from app.models import Note
+        from app.search.embeddings import EmbeddingService
+        from app.search.indexer import NoteIndexer
+
+        async with async_session_factory() as db:
+            synology_ids = select(NoteImage.synology_note_id).where(NoteImage.id.in_(image_ids)).distinct()
+            result = await db.execute(
+                select(Note.id).where(Note.synology_note_id.in_(synology_ids)).order_by(Note.id)
+            )
+            note_ids = [row[0] for row in result.fetchall()]
+
+        summary["total"] = len(note_ids)
+        if not note_ids:
+            return summary
+        if on_progress:
+            on_progress(0, len(note_ids), 0)
+
+        settings = get_settings()
+        embedding_service = EmbeddingService(
+            api_key=settings.OPENAI_API_KEY,
+            model=settings.EMBEDDING_MODEL,
+            dimensions=settings.EMBEDDING_DIMENSION,
+        )
+
+        for i in range(0, len(note_ids), self.REINDEX_BATCH_SIZE):
+            batch = note_ids[i : i + self.REINDEX_BATCH_SIZE]
+            done = failed = 0
+            try:
+                async with async_session_factory() as db:
+                    indexer = NoteIndexer(db, embedding_service)
+                    for note_id in batch:
+                        try:
+                            async with db.begin_nested():
+                                if await indexer.needs_indexing(note_id):
+                                    await indexer.index_note(note_id)
+                                else:
+                                    await indexer.reindex_image_segments(note_id)
+                            done += 1
+                        except Exception as exc:
+                            failed += 1
+                            logger.warning("Failed to re-index note %d: %s", note_id, exc)
+                    await db.commit()
+            except Exception as exc:
+                # The commit itself failed: nothing in this batch was stored
+                done, failed = 0, len(batch)
+                logger.warning("Re-index batch failed: %s", exc)
+            summary["reindexed"] += done
+            summary["failed"] += failed
+
+            if on_progress:
+                on_progress(summary["reindexed"], summary["total"], summary["failed"])
+
+        logger.info(
+            "Re-indexed image segments for %d/%d notes (%d failed)",
+            summary["reindexed"], summary["total"], summary["failed"],
+        )
+        return summary
@@ -0,0 +1,319 @@
+"""Content-addressed disk cache for NAS-proxied NoteStation images.
+
+Images are fetched from the NAS once and then served from local disk:
+
+- ``keys/<sha256(link_id/nas_ver/att_key)>.json`` maps a NAS image
+  address to the SHA-256 of its bytes plus its content type.
+- ``blobs/<sha[:2]>/<sha>`` holds the bytes once, however many note
+  versions point at them (``nas_ver`` changes on every note edit while
+  the attachment usually does not).  The content hash doubles as ETag.
+- ``blobs/<sha[:2]>/<sha>.w<width>.webp`` are resized thumbnail variants,
+  rendered on demand in a small thread pool (Pillow releases the GIL
+  while decoding and resampling).
+
+Total size is bounded by ``NAS_IMAGE_CACHE_MAX_MB``; the least recently
+used files (by mtime, refreshed on every hit) are evicted first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of the limit so eviction does not run per write.
+_EVICT_TARGET_RATIO = 0.9
+
+THUMBNAIL_MEDIA_TYPE = "image/webp"
+
+
+class _FetchAbandonedError(Exception):
+    """The request leading a shared fetch was cancelled; waiters fetch again."""
+
+
+@dataclass
+class CachedImage:
+    """A cached image (or thumbnail variant) ready to stream from disk."""
+
+    path: Path
+    content_type: str
+    etag: str
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _render_thumbnail(src: Path, dst: Path, width: int) -> None:
+    """Resize *src* to at most *width* pixels wide and save as WebP."""
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            img.save(tmp, format="WEBP", quality=80, method=4)
+            os.replace(tmp, dst)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+class NasImageCache:
+    """Size-bounded LRU disk cache keyed by ``(link_id, nas_ver, att_key)``.
+
+    Args:
+        root: Cache directory.
+        max_bytes: Upper bound for blobs, variants and key files together.
+        thumbnail_workers: Threads used to render thumbnail variants.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int, thumbnail_workers: int = 2) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._keys_dir = self.root / "keys"
+        self._blobs_dir = self.root / "blobs"
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, thumbnail_workers),
+            thread_name_prefix="nas-thumb",
+        )
+        self._size: int | None = None
+        self._evicting = False
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key_hash(link_id: str, nas_ver: str, att_key: str) -> str:
+        return hashlib.sha256(f"{link_id}/{nas_ver}/{att_key}".encode()).hexdigest()
+
+    def _key_path(self, key_hash: str) -> Path:
+        return self._keys_dir / key_hash[:2] / f"{key_hash}.json"
+
+    def _blob_path(self, sha: str) -> Path:
+        return self._blobs_dir / sha[:2] / sha
+
+    def _variant_path(self, sha: str, width: int) -> Path:
+        return self._blobs_dir / sha[:2] / f"{sha}.w{width}.webp"
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def _lookup_sync(self, key_hash: str) -> CachedImage | None:
+        key_path = self._key_path(key_hash)
+        try:
+            meta = json.loads(key_path.read_text())
+            blob = self._blob_path(meta["sha256"])
+            os.utime(blob)  # LRU touch; raises if the blob was evicted
+            os.utime(key_path)
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        return CachedImage(path=blob, content_type=meta["content_type"], etag=meta["sha256"])
+
+    def _store_sync(self, key_hash: str, data: bytes, content_type: str) -> tuple[CachedImage, int]:
+        sha = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(sha)
+        added = 0
+        if blob.exists():
+            os.utime(blob)
+        else:
+            _write_atomic(blob, data)
+            added += len(data)
+        meta = json.dumps({"sha256": sha, "content_type": content_type, "size": len(data)}).encode()
+        _write_atomic(self._key_path(key_hash), meta)
+        added += len(meta)
+        return CachedImage(path=blob, content_type=content_type, etag=sha), added
+
+    async def lookup(self, link_id: str, nas_ver: str, att_key: str) -> CachedImage | None:
+        """Return the cached original for a NAS image address, if present."""
+        key_hash = self._key_hash(link_id, nas_ver, att_key)
+        return await asyncio.to_thread(self._lookup_sync, key_hash)
+
+    async def store(self, link_id: str, nas_ver: str, att_key: str, data: bytes, content_type: str) -> CachedImage:
+        """Write image bytes for a NAS image address and return the cache entry."""
+        key_hash = self._key_hash(link_id, nas_ver, att_key)
+        entry, added = await asyncio.to_thread(self._store_sync, key_hash, data, content_type)
+        await self._account(added)
+        return entry
+
+    async def get_or_fetch(self, link_id: str, nas_ver: str, att_key: str, fetch) -> CachedImage | None:
+        """Return a cached image, calling ``await fetch()`` once on a miss.
+
+        Concurrent misses for the same address share one NAS fetch.
+        *fetch* returns ``(nas_ver, bytes, content_type)`` -- the version it
+        actually fetched, which may be newer than *nas_ver* -- or ``None``
+        when there is nothing to cache.
+        """
+        entry = await self.lookup(link_id, nas_ver, att_key)
+        if entry is not None:
+            return entry
+
+        key_hash = self._key_hash(link_id, nas_ver, att_key)
+        pending = self._inflight.get(key_hash)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except _FetchAbandonedError:
+                return await self.get_or_fetch(link_id, nas_ver, att_key, fetch)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key_hash] = future
+        try:
+            fetched = await fetch()
+            entry = None
+            if fetched is not None:
+                fetched_ver, data, content_type = fetched
+                entry = await self.store(link_id, fetched_ver, att_key, data, content_type)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            # Only this request was cancelled: let waiters retry instead of
+            # propagating the cancellation into them.
+            future.set_exception(_FetchAbandonedError())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(key_hash, None)
+
+    async def open(self, entry: CachedImage) -> tuple[BinaryIO, int] | None:
+        """Open *entry* for streaming; returns ``(file, size)`` or None if it was evicted.
+
+        The open handle keeps the bytes readable even if eviction unlinks
+        the file while the response is being sent.
+        """
+
+        def _open() -> tuple[BinaryIO, int]:
+            fh = entry.path.open("rb")
+            return fh, os.fstat(fh.fileno()).st_size
+
+        try:
+            return await asyncio.to_thread(_open)
+        except FileNotFoundError:
+            return None
+
+    async def thumbnail(self, entry: CachedImage, width: int) -> CachedImage:
+        """Return a WebP variant of *entry* at most *width* pixels wide."""
+        variant = self._variant_path(entry.etag, width)
+        etag = f"{entry.etag}-w{width}"
+        try:
+            await asyncio.to_thread(os.utime, variant)
+            return CachedImage(path=variant, content_type=THUMBNAIL_MEDIA_TYPE, etag=etag)
+        except FileNotFoundError:
+            pass
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, _render_thumbnail, entry.path, variant, width)
+        size = await asyncio.to_thread(lambda: variant.stat().st_size)
+        await self._account(size)
+        return CachedImage(path=variant, content_type=THUMBNAIL_MEDIA_TYPE, etag=etag)
+
+    # ------------------------------------------------------------------
+    # Size accounting / LRU eviction
+    # ------------------------------------------------------------------
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        files: list[tuple[float, int, Path]] = []
+        for base in (self._keys_dir, self._blobs_dir):
+            if not base.exists():
+                continue
+            for dirpath, _dirnames, filenames in os.walk(base):
+                for name in filenames:
+                    path = Path(dirpath) / name
+                    try:
+                        st = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _evict_sync(self) -> int:
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return total
+        target = int(self.max_bytes * _EVICT_TARGET_RATIO)
+        removed = 0
+        for _mtime, size, path in sorted(files):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        logger.info("NAS image cache evicted %d files (now %.1f MB)", removed, total / 1_048_576)
+        return total
+
+    async def _account(self, added: int) -> None:
+        if self._size is None:
+            self._size = sum(size for _, size, _ in await asyncio.to_thread(self._scan))
+        else:
+            self._size += added
+        if self._size > self.max_bytes and not self._evicting:
+            self._evicting = True
+            try:
+                self._size = await asyncio.to_thread(self._evict_sync)
+            finally:
+                self._evicting = False
+
+    def stats(self) -> dict:
+        """Current cache size and limit (size is ``None`` until first write)."""
+        return {"path": str(self.root), "size_bytes": self._size, "max_bytes": self.max_bytes}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_cache: NasImageCache | None = None
+
+
+def get_image_cache() -> NasImageCache:
+    """Return the process-wide NAS image cache."""
+    global _cache  # noqa: PLW0603
+    if _cache is None:
+        settings = get_settings()
+        _cache = NasImageCache(
+            settings.NAS_IMAGE_CACHE_PATH,
+            max_bytes=settings.NAS_IMAGE_CACHE_MAX_MB * 1024 * 1024,
+            thumbnail_workers=settings.NAS_THUMBNAIL_WORKERS,
+        )
+    return _cache
+
+
+def shutdown_image_cache() -> None:
+    """Stop the thumbnail workers (application shutdown)."""
+    global _cache  # noqa: PLW0603
+    if _cache is not None:
+        _cache.shutdown()
+        _cache = None
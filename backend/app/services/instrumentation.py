@@ -0,0 +1,246 @@
+"""In-process metrics (counters, gauges, histograms) in Prometheus text format.
+
+Search engines, the embedding client, the AI router, sync and indexing
+record into the module-level metrics below; ``GET
+/admin/metrics/prometheus`` renders them with :func:`render_metrics`.
+Recording is a dict lookup plus a few additions under a lock, so it is
+safe from worker threads and cheap enough for per-request use.
+
+Values are per process; a scraper sums across API workers.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+# Latency buckets in seconds (SQL, API calls, LLM first token).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Long-running phases (sync, indexing batches).
+PHASE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_label_str(self.labels, key)} {_fmt(value)}"
+
+
+class Gauge(_Metric):
+    """Current value per label set; ``callback`` (if given) is read at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        callback: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> Iterator[str]:
+        values = dict(self._values)
+        if self._callback is not None:
+            values.update(self._callback())
+        for key, value in values.items():
+            yield f"{self.name}{_label_str(self.labels, key)} {_fmt(value)}"
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self._buckets = buckets
+        # label key -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self._buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the ``with`` block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        for key, row in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self._buckets, math.inf), row[:-1], strict=True):
+                cumulative += count
+                le = 'le="' + _fmt(bound) + '"'
+                yield f"{self.name}_bucket{_label_str(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_label_str(self.labels, key)} {_fmt(row[-1])}"
+            yield f"{self.name}_count{_label_str(self.labels, key)} {cumulative}"
+
+
+_registry: list[_Metric] = []
+
+
+def render_metrics() -> str:
+    """All registered metrics in Prometheus text exposition format 0.0.4."""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# --- Search ---------------------------------------------------------------------
+
+SEARCH_ENGINE_SECONDS = Histogram(
+    "labnote_search_engine_seconds", "Time spent in one search engine (SQL + embedding)", ("engine",)
+)
+SEARCH_ENGINE_FAILURES = Counter("labnote_search_engine_failures_total", "Search engine errors", ("engine",))
+SEARCH_REQUEST_SECONDS = Histogram(
+    "labnote_search_request_seconds", "End-to-end search time per composite engine", ("search_type",)
+)
+SEARCH_JUDGE_DECISIONS = Counter(
+    "labnote_search_judge_decisions_total", "Hybrid search judge outcomes", ("strategy",)
+)
+RERANK_SECONDS = Histogram("labnote_rerank_seconds", "Reranker latency", ("reranker",))
+
+# --- Embeddings -------------------------------------------------------------------
+
+EMBEDDING_SECONDS = Histogram("labnote_embedding_request_seconds", "Embedding API call latency", ("backend",))
+EMBEDDING_TEXTS = Counter("labnote_embedding_texts_total", "Texts sent to the embedding API", ("backend",))
+EMBEDDING_FAILURES = Counter("labnote_embedding_failures_total", "Failed embedding API calls", ("backend",))
+
+# --- AI providers -------------------------------------------------------------------
+
+AI_REQUEST_SECONDS = Histogram(
+    "labnote_ai_request_seconds", "AI provider call duration (full response)", ("provider", "mode")
+)
+AI_FIRST_TOKEN_SECONDS = Histogram(
+    "labnote_ai_first_token_seconds", "Time to first streamed chunk", ("provider",)
+)
+AI_FAILURES = Counter("labnote_ai_failures_total", "AI provider errors", ("provider", "mode"))
+
+# --- Sync and indexing ------------------------------------------------------------
+
+SYNC_PHASE_SECONDS = Histogram(
+    "labnote_sync_phase_seconds", "NoteStation sync duration per phase", ("phase",), buckets=PHASE_BUCKETS
+)
+SYNC_NOTES = Counter("labnote_sync_notes_total", "Notes changed by sync", ("change",))
+INDEX_NOTE_SECONDS = Histogram("labnote_index_note_seconds", "Time to embed and store one note", ())
+INDEX_NOTES = Counter("labnote_index_notes_total", "Notes processed by the indexer", ("status",))
+INDEX_EMBEDDINGS = Counter("labnote_index_embeddings_total", "Embedding rows written by the indexer")
+
+
+# --- Startup ---------------------------------------------------------------------
+
+STARTUP_SECONDS = Gauge("labnote_startup_seconds", "Time spent in each startup phase of this process", ("phase",))
+
+
+# --- Database pools -----------------------------------------------------------------
+
+DB_POOL_WAIT_SECONDS = Histogram(
+    "labnote_db_pool_wait_seconds", "Time to check a connection out of the pool", ("pool",)
+)
+
+
+def _db_pool_connections() -> dict[tuple[str, ...], float]:
+    from app.database import pool_status
+
+    return {
+        (pool, state): count
+        for pool, status in pool_status().items()
+        for state, count in status.items()
+    }
+
+
+DB_POOL_CONNECTIONS = Gauge(
+    "labnote_db_pool_connections", "Pool size and connections in use", ("pool", "state"), _db_pool_connections
+)
+
+
+def _event_buffer_pending() -> dict[tuple[str, ...], float]:
+    from app.services.event_buffer import event_buffer_stats
+
+    return {(table,): stats["pending"] for table, stats in event_buffer_stats().items()}
+
+
+EVENT_BUFFER_PENDING = Gauge(
+    "labnote_event_buffer_pending", "Rows waiting in a write-behind buffer", ("table",), _event_buffer_pending
+)
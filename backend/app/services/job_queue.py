@@ -0,0 +1,558 @@
+"""Durable Postgres-backed background job queue.
+
+Long-running work (sync, indexing, auto-tagging, NSX import, image sync,
+image analysis) is submitted as a row in ``background_jobs`` and the API
+returns immediately.  A :class:`JobWorker` -- running inside each API
+process or as a dedicated ``python -m app.worker`` process -- claims rows
+with ``FOR UPDATE SKIP LOCKED``, runs the registered handler and renews a
+lease while it works.  Progress is written back to the row, so every
+uvicorn worker answers status requests identically and a restart does
+not lose the job: once the lease lapses another worker picks it up (or
+marks it failed when its attempts are used up).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import importlib
+import logging
+import os
+import socket
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import func, select, text, update
+
+from app.config import get_settings
+from app.database import async_session_factory, use_background_pool
+from app.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# Modules that register handlers with @job_handler; imported by every worker
+_HANDLER_MODULES = (
+    "app.api.sync",
+    "app.api.search",
+    "app.api.discovery",
+    "app.api.notes",
+    "app.api.nsx",
+    "app.api.image_analysis",
+    "app.api.admin",
+    "app.api.metrics",
+)
+
+# State attributes never persisted into job progress
+_PROGRESS_EXCLUDE = frozenset({"api_key", "cancel_requested"})
+
+_RETRY_BACKOFF_SECONDS = 15
+
+JobHandler = Callable[["JobContext"], Awaitable[dict | None]]
+
+_handlers: dict[str, JobHandler] = {}
+_local_workers: list[JobWorker] = []
+
+
+class JobError(Exception):
+    """Raised by a handler to mark its job as failed with a clean message."""
+
+
+# ---------------------------------------------------------------------------
+# Handler registry
+# ---------------------------------------------------------------------------
+
+
+def job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Register *func* as the handler for ``job_type``."""
+
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[job_type] = func
+        return func
+
+    return decorator
+
+
+def load_handlers() -> None:
+    """Import every module that registers job handlers."""
+    for module in _HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def registered_job_types() -> list[str]:
+    return sorted(_handlers)
+
+
+# ---------------------------------------------------------------------------
+# State <-> progress helpers
+# ---------------------------------------------------------------------------
+
+
+def snapshot_state(state: object) -> dict[str, Any]:
+    """Return the JSON-safe public attributes of an in-memory state object."""
+    snapshot: dict[str, Any] = {}
+    for key, value in vars(state).items():
+        if key.startswith("_") or key in _PROGRESS_EXCLUDE:
+            continue
+        if value is None or isinstance(value, str | int | float | bool | list | dict):
+            snapshot[key] = value
+    return snapshot
+
+
+def apply_progress(state: object, job: BackgroundJob | None, running_flag: str | None = None) -> object:
+    """Populate a fresh state object from the latest job row.
+
+    Status endpoints build their responses from the returned object, so the
+    answer no longer depends on which process handled the request.
+    """
+    if job is None:
+        return state
+    for key, value in (job.progress or {}).items():
+        if hasattr(state, key) and key not in _PROGRESS_EXCLUDE:
+            setattr(state, key, value)
+    if job.status == "failed":
+        state.status = "error"
+        state.error_message = getattr(state, "error_message", None) or job.error
+    elif job.status == "cancelled":
+        state.status = "cancelled"
+    if running_flag:
+        setattr(state, running_flag, job.status in ACTIVE_STATUSES)
+    return state
+
+
+# ---------------------------------------------------------------------------
+# Queue operations
+# ---------------------------------------------------------------------------
+
+
+async def submit_job(
+    job_type: str,
+    payload: dict | None = None,
+    *,
+    progress: dict | None = None,
+    triggered_by: str | None = None,
+    max_attempts: int = 1,
+    unique: bool = True,
+    min_interval: timedelta | None = None,
+) -> tuple[BackgroundJob, bool]:
+    """Enqueue a job.
+
+    Args:
+        job_type: Registered handler name.
+        payload: JSON arguments passed to the handler.
+        progress: Initial progress, shown by status endpoints until a worker
+            picks the job up.
+        triggered_by: Display name for activity logs.
+        max_attempts: Total runs allowed before the job is marked failed.
+        unique: When True and a job of the same type is already queued or
+            running, return that job instead of creating a new one.
+        min_interval: With ``unique``, also return the latest job of this
+            type if it was created less than this long ago.  Lets several
+            processes run the same schedule without multiplying the work.
+
+    Returns:
+        ``(job, created)`` tuple.
+    """
+    async with async_session_factory() as db:
+        if unique:
+            # Serialise concurrent submits of the same type across processes
+            await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"job:{job_type}"})
+            existing = await db.scalar(
+                select(BackgroundJob)
+                .where(BackgroundJob.job_type == job_type, BackgroundJob.status.in_(ACTIVE_STATUSES))
+                .order_by(BackgroundJob.id.desc())
+                .limit(1)
+            )
+            if existing is not None:
+                return existing, False
+            if min_interval is not None:
+                recent = await db.scalar(
+                    select(BackgroundJob)
+                    .where(
+                        BackgroundJob.job_type == job_type,
+                        BackgroundJob.created_at > func.now() - min_interval,
+                    )
+                    .order_by(BackgroundJob.id.desc())
+                    .limit(1)
+                )
+                if recent is not None:
+                    return recent, False
+
+        job = BackgroundJob(
+            job_type=job_type,
+            payload=payload or {},
+            progress=progress,
+            max_attempts=max_attempts,
+            triggered_by=triggered_by,
+        )
+        db.add(job)
+        await db.commit()
+
+    for worker in _local_workers:
+        worker.wake()
+    return job, True
+
+
+async def get_job(job_id: int) -> BackgroundJob | None:
+    async with async_session_factory() as db:
+        return await db.get(BackgroundJob, job_id)
+
+
+async def get_latest_job(job_type: str, status: str | None = None) -> BackgroundJob | None:
+    """Return the most recently created job of ``job_type``."""
+    stmt = select(BackgroundJob).where(BackgroundJob.job_type == job_type)
+    if status:
+        stmt = stmt.where(BackgroundJob.status == status)
+    async with async_session_factory() as db:
+        return await db.scalar(stmt.order_by(BackgroundJob.id.desc()).limit(1))
+
+
+async def get_active_job(job_type: str) -> BackgroundJob | None:
+    async with async_session_factory() as db:
+        return await db.scalar(
+            select(BackgroundJob)
+            .where(BackgroundJob.job_type == job_type, BackgroundJob.status.in_(ACTIVE_STATUSES))
+            .order_by(BackgroundJob.id.desc())
+            .limit(1)
+        )
+
+
+async def request_cancel(job_id: int) -> bool:
+    """Ask a job to stop.
+
+    Queued jobs are cancelled immediately; running jobs see the flag at
+    their next heartbeat through :meth:`JobContext.is_cancelled`.
+
+    Returns:
+        True if the job was active and the request was recorded.
+    """
+    async with async_session_factory() as db:
+        result = await db.execute(
+            text("""
+                UPDATE background_jobs
+                SET cancel_requested = true,
+                    status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+                    completed_at = CASE WHEN status = 'queued' THEN now() ELSE completed_at END,
+                    updated_at = now()
+                WHERE id = :id AND status IN ('queued', 'running')
+            """),
+            {"id": job_id},
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+
+class JobContext:
+    """Handle given to a running job handler.
+
+    Handlers report progress either explicitly via :meth:`report` or by
+    registering their in-memory state object with :meth:`track`; the
+    worker persists a snapshot at every heartbeat.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        job_type: str,
+        payload: dict | None,
+        attempt: int,
+        triggered_by: str | None,
+        progress: dict | None,
+    ) -> None:
+        self.job_id = job_id
+        self.job_type = job_type
+        self.payload = payload or {}
+        self.attempt = attempt
+        self.triggered_by = triggered_by
+        self.cancel_requested = False
+        self._progress: dict[str, Any] = dict(progress or {})
+        self._tracked: object | None = None
+
+    def is_cancelled(self) -> bool:
+        """Synchronous check usable as an ``is_cancelled`` callback."""
+        return self.cancel_requested
+
+    def report(self, **progress: Any) -> None:
+        self._progress.update(progress)
+
+    def track(self, state: object) -> None:
+        self._tracked = state
+
+    def snapshot(self) -> dict[str, Any]:
+        if self._tracked is not None:
+            self._progress.update(snapshot_state(self._tracked))
+        return dict(self._progress)
+
+
+class JobWorker:
+    """Claims and runs queued jobs until stopped.
+
+    Long job types (``JOB_LONG_TYPES``) may fill at most ``concurrency -
+    JOB_SHORT_SLOTS`` slots, so a long sync or image analysis never starves
+    short jobs such as ``metrics_rollup`` or indexing.
+
+    Args:
+        job_types: Job types this worker handles (default: all registered).
+        concurrency: Maximum jobs run at once.
+        worker_id: Identifier stored on claimed rows.
+    """
+
+    def __init__(
+        self,
+        job_types: list[str] | None = None,
+        concurrency: int | None = None,
+        worker_id: str | None = None,
+    ) -> None:
+        settings = get_settings()
+        self._job_types = job_types or None
+        self._concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self._poll_interval = settings.JOB_POLL_INTERVAL_SECONDS
+        self._lease = timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        self._heartbeat_interval = settings.JOB_PROGRESS_INTERVAL_SECONDS
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self._slots = asyncio.Semaphore(self._concurrency)
+        self._long_types = frozenset(t.strip() for t in settings.JOB_LONG_TYPES.split(",") if t.strip())
+        self._long_limit = max(1, self._concurrency - settings.JOB_SHORT_SLOTS)
+        self._long_running = 0
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    # -- lifecycle --------------------------------------------------------
+
+    def start(self) -> None:
+        load_handlers()
+        _local_workers.append(self)
+        self._loop_task = asyncio.create_task(self.run())
+        logger.info("Job worker %s started (types=%s)", self.worker_id, self._job_types or "all")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming and give running jobs ``timeout`` seconds to finish.
+
+        Jobs still running afterwards are cancelled; their lease lapses and
+        another worker retries or fails them.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self in _local_workers:
+            _local_workers.remove(self)
+        if self._loop_task:
+            await self._loop_task
+        if self._running:
+            _, pending = await asyncio.wait(self._running, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            with contextlib.suppress(Exception):
+                await asyncio.gather(*pending, return_exceptions=True)
+        logger.info("Job worker %s stopped", self.worker_id)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def run(self) -> None:
+        # Jobs (and the tasks they start) use the background connection pool
+        use_background_pool()
+        while not self._stop.is_set():
+            await self._slots.acquire()
+            try:
+                claimed = await self._claim(self._claimable_types())
+            except Exception:
+                logger.exception("Job claim failed")
+                claimed = None
+
+            if claimed is None:
+                self._slots.release()
+                self._wake.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), timeout=self._poll_interval)
+                continue
+
+            is_long = claimed.job_type in self._long_types
+            if is_long:
+                self._long_running += 1
+            task = asyncio.create_task(self._execute(claimed))
+            self._running.add(task)
+            task.add_done_callback(functools.partial(self._on_done, is_long=is_long))
+
+    def _on_done(self, task: asyncio.Task, is_long: bool = False) -> None:
+        self._running.discard(task)
+        if is_long:
+            self._long_running -= 1
+        self._slots.release()
+
+    def _claimable_types(self) -> list[str]:
+        """Job types this worker may claim now (short ones only once long jobs fill their share)."""
+        job_types = self._job_types or registered_job_types()
+        if self._long_running >= self._long_limit:
+            job_types = [t for t in job_types if t not in self._long_types]
+        return job_types
+
+    # -- queue access -----------------------------------------------------
+
+    async def _claim(self, job_types: list[str]) -> JobContext | None:
+        if not job_types:
+            return None
+
+        now = func.now()
+        async with async_session_factory() as db:
+            # Jobs whose worker died after the last allowed attempt
+            await db.execute(
+                update(BackgroundJob)
+                .execution_options(synchronize_session=False)
+                .where(
+                    BackgroundJob.status == "running",
+                    BackgroundJob.lease_expires_at < now,
+                    (BackgroundJob.attempts >= BackgroundJob.max_attempts) | BackgroundJob.cancel_requested,
+                )
+                .values(
+                    status="failed",
+                    error=func.coalesce(BackgroundJob.error, "Worker lease expired"),
+                    completed_at=now,
+                )
+            )
+
+            candidate = (
+                select(BackgroundJob.id)
+                .where(
+                    BackgroundJob.job_type.in_(job_types),
+                    ~BackgroundJob.cancel_requested,
+                    (
+                        (BackgroundJob.status == "queued") & (BackgroundJob.run_after <= now)
+                    )
+                    | (
+                        (BackgroundJob.status == "running")
+                        & (BackgroundJob.lease_expires_at < now)
+                        & (BackgroundJob.attempts < BackgroundJob.max_attempts)
+                    ),
+                )
+                .order_by(BackgroundJob.run_after, BackgroundJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            row = (
+                await db.execute(
+                    update(BackgroundJob)
+                    .execution_options(synchronize_session=False)
+                    .where(BackgroundJob.id == candidate)
+                    .values(
+                        status="running",
+                        worker_id=self.worker_id,
+                        attempts=BackgroundJob.attempts + 1,
+                        lease_expires_at=now + self._lease,
+                        started_at=func.coalesce(BackgroundJob.started_at, now),
+                    )
+                    .returning(
+                        BackgroundJob.id,
+                        BackgroundJob.job_type,
+                        BackgroundJob.payload,
+                        BackgroundJob.attempts,
+                        BackgroundJob.triggered_by,
+                        BackgroundJob.progress,
+                    )
+                )
+            ).first()
+            await db.commit()
+
+        if row is None:
+            return None
+        return JobContext(
+            job_id=row.id,
+            job_type=row.job_type,
+            payload=row.payload,
+            attempt=row.attempts,
+            triggered_by=row.triggered_by,
+            progress=row.progress,
+        )
+
+    async def _heartbeat(self, ctx: JobContext) -> None:
+        """Renew the lease, flush progress and pick up cancellation."""
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                async with async_session_factory() as db:
+                    cancel = await db.scalar(
+                        update(BackgroundJob)
+                        .execution_options(synchronize_session=False)
+                        .where(BackgroundJob.id == ctx.job_id, BackgroundJob.worker_id == self.worker_id)
+                        .values(lease_expires_at=func.now() + self._lease, progress=ctx.snapshot())
+                        .returning(BackgroundJob.cancel_requested)
+                    )
+                    await db.commit()
+            except Exception:
+                logger.warning("Heartbeat failed for job %d", ctx.job_id, exc_info=True)
+                continue
+            if cancel is None:
+                logger.warning("Job %d lease lost by %s; stopping", ctx.job_id, self.worker_id)
+                ctx.cancel_requested = True
+            elif cancel:
+                ctx.cancel_requested = True
+
+    async def _execute(self, ctx: JobContext) -> None:
+        handler = _handlers.get(ctx.job_type)
+        heartbeat = asyncio.create_task(self._heartbeat(ctx))
+        error: Exception | None = None
+        result: dict | None = None
+        try:
+            if handler is None:
+                raise JobError(f"No handler registered for job type {ctx.job_type!r}")
+            logger.info("Job %d (%s) started, attempt %d", ctx.job_id, ctx.job_type, ctx.attempt)
+            result = await handler(ctx)
+        except asyncio.CancelledError:
+            heartbeat.cancel()
+            raise
+        except Exception as exc:
+            error = exc
+            if not isinstance(exc, JobError):
+                logger.exception("Job %d (%s) failed", ctx.job_id, ctx.job_type)
+        finally:
+            heartbeat.cancel()
+
+        try:
+            await self._finish(ctx, result, error)
+        except Exception:
+            logger.exception("Failed to record completion of job %d", ctx.job_id)
+
+    async def _finish(self, ctx: JobContext, result: dict | None, error: Exception | None) -> None:
+        values: dict[str, Any] = {"progress": ctx.snapshot(), "lease_expires_at": None}
+        if error is None:
+            values.update(
+                status="cancelled" if ctx.cancel_requested else "completed",
+                result=result,
+                error=None,
+                completed_at=func.now(),
+            )
+        else:
+            async with async_session_factory() as db:
+                max_attempts = await db.scalar(
+                    select(BackgroundJob.max_attempts).where(BackgroundJob.id == ctx.job_id)
+                )
+            if not ctx.cancel_requested and ctx.attempt < (max_attempts or 1):
+                values.update(
+                    status="queued",
+                    error=str(error),
+                    run_after=func.now() + timedelta(seconds=_RETRY_BACKOFF_SECONDS * 2 ** (ctx.attempt - 1)),
+                )
+            else:
+                values.update(status="failed", error=str(error), completed_at=func.now())
+
+        async with async_session_factory() as db:
+            await db.execute(
+                update(BackgroundJob)
+                .execution_options(synchronize_session=False)
+                .where(BackgroundJob.id == ctx.job_id, BackgroundJob.worker_id == self.worker_id)
+                .values(**values)
+            )
+            await db.commit()
+        logger.info("Job %d (%s) finished: %s", ctx.job_id, ctx.job_type, values["status"])
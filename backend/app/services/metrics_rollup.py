@@ -0,0 +1,305 @@
+"""Hourly rollups behind the search metrics and feedback dashboards.
+
+The dashboards used to scan raw ``search_events`` / ``search_feedback`` /
+``ai_feedback`` rows with several COUNT/AVG/GROUP BY queries per load.
+The ``metrics_rollup`` job now folds every closed hour into small rollup
+tables and advances a watermark (Setting ``metrics_rollup``).  Dashboards
+read rollup rows before the watermark plus the same aggregate computed
+live over the raw rows after it (:func:`combined`), so results stay
+current to the second while the raw scan covers at most one interval.
+
+Once rolled up, raw events older than ``METRICS_RAW_RETENTION_DAYS`` are
+deleted in batches (:func:`prune_raw_events`); feedback rows go with their
+search event through the FK cascade.
+
+Search relevance feedback is counted with the ``relevant`` value it had
+when its hour was rolled up; later changes of a vote are not re-counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import Setting
+from app.services.job_queue import submit_job
+
+logger = logging.getLogger(__name__)
+
+# Setting row holding {"rolled_up_to": iso}; everything before it is in the rollups.
+_WATERMARK_KEY = "metrics_rollup"
+# Hours are rolled up only once this long past their end, so buffered
+# events (see services/event_buffer) have been written.
+_SETTLE = timedelta(minutes=5)
+_PRUNE_BATCH_SIZE = 5000
+
+# Upper edges (ms) of the search duration histogram; bin i covers
+# [edges[i-1], edges[i]), the last bin everything from the last edge up.
+DURATION_EDGES_MS = (0, 10, 25, 50, 75, 100, 150, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+_EDGES_SQL = "ARRAY[{}]".format(", ".join(str(e) for e in DURATION_EDGES_MS))
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+@dataclass(frozen=True, slots=True)
+class _Rollup:
+    table: str
+    keys: tuple[str, ...]
+    sums: tuple[str, ...]
+    # Aggregate over raw rows; ``{window}`` is the created_at condition and
+    # the columns come out in table order (bucket, *keys, *sums).
+    select: str
+
+
+_ROLLUPS = {
+    "search_events": _Rollup(
+        table="search_event_rollups",
+        keys=("search_type",),
+        sums=("searches", "zero_results", "result_count_sum", "duration_sum", "duration_count"),
+        select="""
+            SELECT date_trunc('hour', created_at, 'UTC') AS bucket, search_type,
+                   COUNT(*) AS searches,
+                   COUNT(*) FILTER (WHERE result_count = 0) AS zero_results,
+                   COALESCE(SUM(result_count), 0) AS result_count_sum,
+                   COALESCE(SUM(duration_ms), 0) AS duration_sum,
+                   COUNT(duration_ms) AS duration_count
+            FROM search_events
+            WHERE {window}
+            GROUP BY 1, 2
+        """,
+    ),
+    "search_durations": _Rollup(
+        table="search_duration_rollups",
+        keys=("bin",),
+        sums=("count",),
+        select=f"""
+            SELECT date_trunc('hour', created_at, 'UTC') AS bucket,
+                   width_bucket(duration_ms, {_EDGES_SQL}) AS bin,
+                   COUNT(*) AS count
+            FROM search_events
+            WHERE duration_ms IS NOT NULL AND {{window}}
+            GROUP BY 1, 2
+        """,  # noqa: S608 - histogram edges are a module constant
+    ),
+    "search_zero_results": _Rollup(
+        table="search_zero_result_rollups",
+        keys=("query",),
+        sums=("count",),
+        select="""
+            SELECT date_trunc('hour', created_at, 'UTC') AS bucket, query, COUNT(*) AS count
+            FROM search_events
+            WHERE result_count = 0 AND {window}
+            GROUP BY 1, 2
+        """,
+    ),
+    "search_feedback": _Rollup(
+        table="search_feedback_rollups",
+        keys=("search_type", "has_details"),
+        sums=("positive", "total"),
+        select="""
+            SELECT date_trunc('hour', sf.created_at, 'UTC') AS bucket, se.search_type,
+                   se.details IS NOT NULL AS has_details,
+                   COUNT(*) FILTER (WHERE sf.relevant) AS positive,
+                   COUNT(*) AS total
+            FROM search_feedback sf
+            JOIN search_events se ON se.id = sf.search_event_id
+            WHERE {window}
+            GROUP BY 1, 2, 3
+        """,
+    ),
+    "ai_feedback": _Rollup(
+        table="ai_feedback_rollups",
+        keys=("feature", "model_used"),
+        sums=("rating_sum", "count"),
+        select="""
+            SELECT date_trunc('hour', created_at, 'UTC') AS bucket, feature,
+                   COALESCE(model_used, '') AS model_used,
+                   SUM(rating) AS rating_sum,
+                   COUNT(*) AS count
+            FROM ai_feedback
+            WHERE {window}
+            GROUP BY 1, 2, 3
+        """,
+    ),
+}
+
+# Raw created_at column per rollup (search_feedback is windowed on the feedback time).
+_TIME_COLUMN = {"search_feedback": "sf.created_at"}
+
+
+def floor_hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _insert_sql(name: str) -> str:
+    rollup = _ROLLUPS[name]
+    column = _TIME_COLUMN.get(name, "created_at")
+    columns = ("bucket", *rollup.keys, *rollup.sums)
+    updates = ", ".join(f"{col} = {rollup.table}.{col} + EXCLUDED.{col}" for col in rollup.sums)
+    return f"""
+        INSERT INTO {rollup.table} ({", ".join(columns)})
+        {rollup.select.format(window=f"{column} >= :start AND {column} < :end")}
+        ON CONFLICT (bucket, {", ".join(rollup.keys)}) DO UPDATE SET {updates}
+    """
+
+
+def combined(name: str) -> str:
+    """Subquery of rollup rows in ``[:since, :watermark)`` plus live rows from ``:start``.
+
+    Bind the parameters returned by :func:`rollup_window`.
+    """
+    rollup = _ROLLUPS[name]
+    column = _TIME_COLUMN.get(name, "created_at")
+    return f"""(
+        SELECT {", ".join(("bucket", *rollup.keys, *rollup.sums))}
+        FROM {rollup.table}
+        WHERE bucket >= :since AND bucket < :watermark
+        UNION ALL
+        {rollup.select.format(window=f"{column} >= :start")}
+    )"""  # noqa: S608 - names and SQL come from _ROLLUPS
+
+
+async def rollup_watermark(session: AsyncSession) -> datetime | None:
+    row = await session.scalar(select(Setting).where(Setting.key == _WATERMARK_KEY))
+    if row is None or not row.value.get("rolled_up_to"):
+        return None
+    return datetime.fromisoformat(row.value["rolled_up_to"])
+
+
+async def rollup_window(session: AsyncSession, since: datetime) -> dict[str, datetime]:
+    """Bind parameters for :func:`combined` covering ``since`` (an hour boundary) until now."""
+    watermark = await rollup_watermark(session) or since
+    return {"since": since, "watermark": watermark, "start": max(since, watermark)}
+
+
+def duration_percentile(bins: dict[int, int], q: float) -> float:
+    """Estimate the ``q`` quantile from histogram counts (linear within a bin)."""
+    total = sum(bins.values())
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for b in sorted(bins):
+        count = bins[b]
+        if seen + count >= rank and count:
+            lower = DURATION_EDGES_MS[b - 1] if b > 0 else 0
+            if b >= len(DURATION_EDGES_MS):
+                return float(lower)
+            upper = DURATION_EDGES_MS[b]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return float(DURATION_EDGES_MS[-1])
+
+
+async def roll_up_metrics(session: AsyncSession) -> dict:
+    """Fold every settled hour since the watermark into the rollup tables.
+
+    Serialised across processes with an advisory lock.  The caller commits
+    (the rollup rows and the new watermark land together).
+    """
+    started = time.monotonic()
+    await session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _WATERMARK_KEY})
+
+    end = floor_hour(datetime.now(UTC) - _SETTLE)
+    start = await rollup_watermark(session)
+    if start is None:
+        earliest = await session.scalar(
+            text("""
+                SELECT LEAST(
+                    (SELECT MIN(created_at) FROM search_events),
+                    (SELECT MIN(created_at) FROM search_feedback),
+                    (SELECT MIN(created_at) FROM ai_feedback)
+                )
+            """)
+        )
+        start = floor_hour(earliest) if earliest is not None else end
+    if start >= end:
+        return {"rolled_up_to": start.isoformat(), "hours": 0}
+
+    for name in _ROLLUPS:
+        await session.execute(text(_insert_sql(name)), {"start": start, "end": end})
+
+    value = {"rolled_up_to": end.isoformat()}
+    row = await session.scalar(select(Setting).where(Setting.key == _WATERMARK_KEY))
+    if row is None:
+        session.add(Setting(key=_WATERMARK_KEY, value=value))
+    else:
+        row.value = value
+
+    hours = int((end - start).total_seconds() // 3600)
+    logger.info("Rolled up %d hour(s) of metrics up to %s in %.2fs", hours, end, time.monotonic() - started)
+    return {"rolled_up_to": end.isoformat(), "hours": hours}
+
+
+async def prune_raw_events(session: AsyncSession) -> dict[str, int]:
+    """Delete rolled-up raw events past ``METRICS_RAW_RETENTION_DAYS``.
+
+    Commits after each batch so locks are held briefly.
+    """
+    days = get_settings().METRICS_RAW_RETENTION_DAYS
+    watermark = await rollup_watermark(session)
+    if days <= 0 or watermark is None:
+        return {}
+
+    cutoff = min(watermark, datetime.now(UTC) - timedelta(days=days))
+    deleted: dict[str, int] = {}
+    for table in ("search_events", "ai_feedback"):
+        total = 0
+        while True:
+            result = await session.execute(
+                text(f"""
+                    DELETE FROM {table}
+                    WHERE id IN (SELECT id FROM {table} WHERE created_at < :cutoff LIMIT :n)
+                """),  # noqa: S608 - table is one of two literals
+                {"cutoff": cutoff, "n": _PRUNE_BATCH_SIZE},
+            )
+            await session.commit()
+            total += result.rowcount
+            if result.rowcount < _PRUNE_BATCH_SIZE:
+                break
+        deleted[table] = total
+    if any(deleted.values()):
+        logger.info("Pruned raw metric events before %s: %s", cutoff, deleted)
+    return deleted
+
+
+class MetricsRollupScheduler:
+    """Background loop that enqueues ``metrics_rollup`` jobs."""
+
+    def __init__(self) -> None:
+        self._interval = max(60, get_settings().METRICS_ROLLUP_INTERVAL_MINUTES * 60)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        logger.info("Metrics rollup scheduler started (every %ds)", self._interval)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        await asyncio.sleep(random.uniform(0, self._interval / 4))  # noqa: S311
+        while True:
+            try:
+                await submit_job(
+                    "metrics_rollup",
+                    triggered_by="scheduler",
+                    min_interval=timedelta(seconds=self._interval / 2),
+                )
+            except Exception:
+                logger.exception("Scheduled metrics rollup submission failed")
+            await asyncio.sleep(self._interval)
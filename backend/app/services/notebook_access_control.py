@@ -3,11 +3,11 @@
 
 from __future__ import annotations
 
-from sqlalchemy import delete, or_, select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.constants import NotePermission
-from app.models import GroupNotebookAccess, MemberGroupMembership, Membership, NoteAccess, NotebookAccess
+from app.models import GroupNotebookAccess, MemberGroupMembership, Membership, NotebookAccess
 
 PERMISSION_HIERARCHY: dict[str, int] = {
     NotePermission.READ: 1,
@@ -85,39 +85,12 @@ async def check_notebook_access(
     """Check if user has required permission on notebook.
 
     Resolution: Individual user access > Group access > Org access.
+    Answered from the session's permission resolver (see services/access_scope.py).
     """
-    org_ids = await get_user_org_ids(db, user_id)
+    from app.services.access_scope import get_permission_resolver
 
-    # 1. Check individual user access first
-    result = await db.execute(
-        select(NotebookAccess).where(
-            NotebookAccess.notebook_id == notebook_id,
-            NotebookAccess.user_id == user_id,
-        )
-    )
-    user_access = result.scalars().all()
-    if user_access:
-        return any(permission_satisfies(a.permission, required_permission) for a in user_access)
-
-    # 2. Check group access
-    group_perms = await get_user_group_notebook_permissions(db, user_id, org_ids)
-    group_perm = group_perms.get(notebook_id)
-    if group_perm is not None:
-        return permission_satisfies(group_perm, required_permission)
-
-    # 3. Check org access
-    if org_ids:
-        result = await db.execute(
-            select(NotebookAccess).where(
-                NotebookAccess.notebook_id == notebook_id,
-                NotebookAccess.org_id.in_(org_ids),
-            )
-        )
-        org_access = result.scalars().all()
-        if org_access:
-            return any(permission_satisfies(a.permission, required_permission) for a in org_access)
-
-    return False
+    resolver = await get_permission_resolver(db, user_id)
+    return resolver.can_access_notebook(notebook_id, required_permission)
 
 
 async def get_accessible_notebooks(
@@ -129,37 +102,10 @@ async def get_accessible_notebooks(
 
     Merges individual, group, and org access. Individual overrides group overrides org.
     """
-    org_ids = await get_user_org_ids(db, user_id)
-
-    # Collect all notebook permissions: {notebook_id: permission}
-    notebook_permissions: dict[int, str] = {}
-
-    # 3. Org access (lowest priority, add first)
-    if org_ids:
-        result = await db.execute(
-            select(NotebookAccess).where(
-                NotebookAccess.org_id.in_(org_ids),
-            )
-        )
-        for access in result.scalars().all():
-            notebook_permissions[access.notebook_id] = access.permission
-
-    # 2. Group access (overrides org)
-    group_perms = await get_user_group_notebook_permissions(db, user_id, org_ids)
-    notebook_permissions.update(group_perms)
-
-    # 1. Individual access (highest priority, overrides all)
-    result = await db.execute(
-        select(NotebookAccess).where(NotebookAccess.user_id == user_id)
-    )
-    for access in result.scalars().all():
-        notebook_permissions[access.notebook_id] = access.permission
+    from app.services.access_scope import get_permission_resolver
 
-    # Filter by min_permission
-    return [
-        nb_id for nb_id, perm in notebook_permissions.items()
-        if permission_satisfies(perm, min_permission)
-    ]
+    resolver = await get_permission_resolver(db, user_id)
+    return resolver.accessible_notebooks(min_permission)
 
 
 async def grant_notebook_access(
@@ -240,24 +186,20 @@ async def get_user_notebook_accesses(
     from app.models import Notebook
 
     result = await db.execute(
-        select(NotebookAccess).where(NotebookAccess.user_id == user_id)
+        select(NotebookAccess, Notebook.name)
+        .outerjoin(Notebook, Notebook.id == NotebookAccess.notebook_id)
+        .where(NotebookAccess.user_id == user_id)
     )
-    accesses = result.scalars().all()
 
-    items = []
-    for access in accesses:
-        nb_result = await db.execute(
-            select(Notebook.name).where(Notebook.id == access.notebook_id)
-        )
-        notebook_name = nb_result.scalar_one_or_none() or "Unknown"
-        items.append({
+    return [
+        {
             "access_id": access.id,
             "notebook_id": access.notebook_id,
-            "notebook_name": notebook_name,
+            "notebook_name": notebook_name or "Unknown",
             "permission": access.permission,
-        })
-
-    return items
+        }
+        for access, notebook_name in result.all()
+    ]
 
 
 async def get_effective_note_permission(
@@ -275,81 +217,7 @@ async def get_effective_note_permission(
 
     Note-level permission ALWAYS overrides notebook-level, regardless of which is more restrictive.
     """
-    from app.models import Note
-
-    org_ids = await get_user_org_ids(db, user_id)
-
-    # Step 1: Check note-level access first
-    note_conditions = [NoteAccess.note_id == note_id]
-    note_access_conditions = [NoteAccess.user_id == user_id]
-    if org_ids:
-        note_access_conditions.append(NoteAccess.org_id.in_(org_ids))
-    note_conditions.append(or_(*note_access_conditions))
-
-    result = await db.execute(select(NoteAccess).where(*note_conditions))
-    note_access_records = result.scalars().all()
-
-    # If note-level access exists, return the highest permission found
-    if note_access_records:
-        highest_permission = None
-        highest_level = 0
-        for access in note_access_records:
-            level = PERMISSION_HIERARCHY.get(access.permission, 0)
-            if level > highest_level:
-                highest_level = level
-                highest_permission = access.permission
-        return highest_permission
-
-    # Step 2: No note-level access, check notebook-level access
-    # First get the note's notebook_id
-    note_result = await db.execute(select(Note.notebook_id).where(Note.id == note_id))
-    notebook_id = note_result.scalar_one_or_none()
-
-    if notebook_id is None:
-        return None
-
-    # Check individual notebook access first
-    result = await db.execute(
-        select(NotebookAccess).where(
-            NotebookAccess.notebook_id == notebook_id,
-            NotebookAccess.user_id == user_id,
-        )
-    )
-    user_notebook_access = result.scalars().all()
-
-    if user_notebook_access:
-        highest_permission = None
-        highest_level = 0
-        for access in user_notebook_access:
-            level = PERMISSION_HIERARCHY.get(access.permission, 0)
-            if level > highest_level:
-                highest_level = level
-                highest_permission = access.permission
-        return highest_permission
-
-    # Check group notebook access
-    group_perms = await get_user_group_notebook_permissions(db, user_id, org_ids)
-    group_perm = group_perms.get(notebook_id)
-    if group_perm is not None:
-        return group_perm
-
-    # Check org notebook access
-    if org_ids:
-        result = await db.execute(
-            select(NotebookAccess).where(
-                NotebookAccess.notebook_id == notebook_id,
-                NotebookAccess.org_id.in_(org_ids),
-            )
-        )
-        org_notebook_access = result.scalars().all()
-        if org_notebook_access:
-            highest_permission = None
-            highest_level = 0
-            for access in org_notebook_access:
-                level = PERMISSION_HIERARCHY.get(access.permission, 0)
-                if level > highest_level:
-                    highest_level = level
-                    highest_permission = access.permission
-            return highest_permission
-
-    return None
+    from app.services.access_scope import get_permission_resolver
+
+    resolver = await get_permission_resolver(db, user_id)
+    return await resolver.note_permission(db, note_id)
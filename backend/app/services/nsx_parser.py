@@ -15,16 +15,28 @@ Usage::
     parser = NsxParser(nsx_path="/path/to/export.nsx", output_dir="/path/to/images")
     result = parser.parse()
     # result contains note_id -> image mappings
+
+Large exports should be streamed instead, so that neither the notes nor
+the attachment list are held in memory and the event loop stays free::
+
+    async for batch in stream_batches_in_subprocess(nsx_path, output_dir):
+        ...  # upsert batch.notes / batch.attachments
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import multiprocessing
+import queue as queue_module
 import zipfile
+from collections.abc import AsyncIterator, Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from app.services.blob_store import StoredBlob, get_blob_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +52,7 @@ class AttachmentInfo:
     width: int | None = None
     height: int | None = None
     mime_type: str = "application/octet-stream"
+    blob: StoredBlob | None = None  # Blob store entry backing file_path
 
 
 @dataclass
@@ -68,6 +81,22 @@ class NoteRecord:
     mtime: int | float | None
 
 
+@dataclass
+class NsxBatch:
+    """A slice of parsed notes and their extracted images.
+
+    ``notes_processed`` and ``images_extracted`` are running totals for
+    the whole archive, ``notes_total`` is the count from ``config.json``.
+    """
+
+    notes: list[NoteRecord] = field(default_factory=list)
+    attachments: list[AttachmentInfo] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    notes_total: int = 0
+    notes_processed: int = 0
+    images_extracted: int = 0
+
+
 class NsxParser:
     """Parser for Synology NoteStation NSX export files.
 
@@ -93,55 +122,85 @@ class NsxParser:
             NsxParseResult with extraction statistics and attachment mappings.
         """
         result = NsxParseResult()
+        for batch in self.iter_batches():
+            result.notes.extend(batch.notes)
+            result.attachments.extend(batch.attachments)
+            result.errors.extend(batch.errors)
+            result.notes_processed = batch.notes_processed
+            result.images_extracted = batch.images_extracted
+        return result
+
+    def iter_batches(self, batch_size: int = 50) -> Iterator[NsxBatch]:
+        """Parse the NSX file, yielding notes and extracted images in batches.
+
+        Images are written to ``output_dir`` as each note is processed.
+        Errors are reported on the batch they occur in; a failure to open
+        the archive yields a single batch carrying only the error.
+
+        Args:
+            batch_size: Notes per yielded batch.
+        """
+        notes_processed = 0
+        images_extracted = 0
 
         if not self.nsx_path.exists():
-            result.errors.append(f"NSX file not found: {self.nsx_path}")
-            return result
+            yield NsxBatch(errors=[f"NSX file not found: {self.nsx_path}"])
+            return
 
+        batch = NsxBatch()
         try:
             with zipfile.ZipFile(self.nsx_path, "r") as nsx:
                 # Parse config.json to get note IDs
                 config = self._parse_config(nsx)
                 if config is None:
-                    result.errors.append("Failed to parse config.json")
-                    return result
+                    yield NsxBatch(errors=["Failed to parse config.json"])
+                    return
 
                 note_ids = config.get("note", [])
                 notebook_map = self._parse_notebooks(nsx, config)
                 logger.info("Found %d notes in NSX file", len(note_ids))
+                batch.notes_total = len(note_ids)
 
                 # Process each note
                 for note_id in note_ids:
                     try:
                         note_data = self._read_note_data(nsx, note_id)
                         if note_data is None:
-                            result.errors.append(f"Failed to read note {note_id}")
+                            batch.errors.append(f"Failed to read note {note_id}")
                             continue
 
                         attachments = self._extract_attachments(nsx, note_id, note_data)
-                        result.attachments.extend(attachments)
-                        result.images_extracted += len(attachments)
-                        result.notes_processed += 1
+                        batch.attachments.extend(attachments)
+                        images_extracted += len(attachments)
+                        notes_processed += 1
                         note_record = self._build_note_record(note_id, note_data, notebook_map)
                         if note_record:
-                            result.notes.append(note_record)
+                            batch.notes.append(note_record)
                     except Exception as e:
-                        result.errors.append(f"Error processing note {note_id}: {e}")
+                        batch.errors.append(f"Error processing note {note_id}: {e}")
                         logger.warning("Error processing note %s: %s", note_id, e)
 
+                    if len(batch.notes) >= batch_size:
+                        batch.notes_processed = notes_processed
+                        batch.images_extracted = images_extracted
+                        yield batch
+                        batch = NsxBatch(notes_total=len(note_ids))
+
         except zipfile.BadZipFile:
-            result.errors.append(f"Invalid ZIP/NSX file: {self.nsx_path}")
+            batch.errors.append(f"Invalid ZIP/NSX file: {self.nsx_path}")
         except Exception as e:
-            result.errors.append(f"Unexpected error: {e}")
+            batch.errors.append(f"Unexpected error: {e}")
             logger.exception("Unexpected error parsing NSX file")
 
+        batch.notes_processed = notes_processed
+        batch.images_extracted = images_extracted
+        yield batch
+
         logger.info(
-            "NSX parsing complete: %d notes, %d images, %d errors",
-            result.notes_processed,
-            result.images_extracted,
-            len(result.errors),
+            "NSX parsing complete: %d notes, %d images",
+            notes_processed,
+            images_extracted,
         )
-        return result
 
     def _parse_config(self, nsx: zipfile.ZipFile) -> dict | None:
         """Parse config.json from the NSX archive."""
@@ -191,19 +250,17 @@ class NsxParser:
             if not self._is_image(mime_type, name):
                 continue
 
-            # Extract the file
+            # Extract the file into the blob store (streamed, deduplicated)
+            # and link it at output_dir/note_id/ref.
             try:
                 file_key = f"file_{md5}"
-                file_data = nsx.read(file_key)
-
-                # Create output path: output_dir/note_id/filename
-                note_dir = self.output_dir / note_id
-                note_dir.mkdir(parents=True, exist_ok=True)
+                info = nsx.getinfo(file_key)
 
                 # Use ref as filename to maintain consistency
                 safe_ref = self._sanitize_filename(ref)
-                file_path = note_dir / safe_ref
-                file_path.write_bytes(file_data)
+                file_path = self.output_dir / note_id / safe_ref
+                with nsx.open(info) as src:
+                    blob = get_blob_store().put_stream(src, link_to=file_path)
 
                 attachments.append(
                     AttachmentInfo(
@@ -215,6 +272,7 @@ class NsxParser:
                         width=att_meta.get("width"),
                         height=att_meta.get("height"),
                         mime_type=mime_type or self._guess_mime_type(name),
+                        blob=blob,
                     )
                 )
                 logger.debug("Extracted image: %s -> %s", ref, file_path)
@@ -309,3 +367,63 @@ class NsxParser:
         for char in unsafe_chars:
             result = result.replace(char, "_")
         return result
+
+
+# ---------------------------------------------------------------------------
+# Off-loop streaming
+# ---------------------------------------------------------------------------
+
+# Batches buffered between the parser process and the DB writer; the
+# parser blocks when the writer falls behind.
+_STREAM_QUEUE_SIZE = 4
+
+
+def _parse_worker(nsx_path: str, output_dir: str, batch_size: int, out: multiprocessing.Queue) -> None:
+    """Subprocess entry point: push every batch onto *out*, then ``None``."""
+    try:
+        for batch in NsxParser(nsx_path, output_dir).iter_batches(batch_size):
+            out.put(batch)
+    except BaseException as e:  # noqa: BLE001 - reported to the parent
+        out.put(NsxBatch(errors=[f"Parser process failed: {e}"]))
+    finally:
+        out.put(None)
+
+
+async def stream_batches_in_subprocess(
+    nsx_path: str | Path,
+    output_dir: str | Path,
+    batch_size: int = 50,
+) -> AsyncIterator[NsxBatch]:
+    """Run :meth:`NsxParser.iter_batches` in a separate process.
+
+    ZIP inflation, JSON decoding and image writes happen in the child;
+    the caller only awaits ready batches, so the event loop stays
+    responsive during multi-GB imports.  The child is terminated if the
+    consumer stops early.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    out: multiprocessing.Queue = ctx.Queue(maxsize=_STREAM_QUEUE_SIZE)
+    proc = ctx.Process(
+        target=_parse_worker,
+        args=(str(nsx_path), str(output_dir), batch_size, out),
+        name="nsx-parser",
+        daemon=True,
+    )
+    proc.start()
+    try:
+        while True:
+            try:
+                batch = await asyncio.to_thread(out.get, True, 1.0)
+            except queue_module.Empty:
+                if not proc.is_alive():
+                    yield NsxBatch(errors=[f"Parser process exited unexpectedly (code {proc.exitcode})"])
+                    return
+                continue
+            if batch is None:
+                return
+            yield batch
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        await asyncio.to_thread(proc.join, 5)
+        out.close()
@@ -0,0 +1,120 @@
+"""Per-request SQL statement accounting (opt-in, ``QUERY_ACCOUNTING_ENABLED``).
+
+Engine events count every statement and its cursor time into the
+:class:`QueryStats` of the current request (a context variable set by
+the middleware in ``app.main``).  The middleware reports the totals in a
+``Server-Timing`` header and logs requests that exceed their query budget
+or repeat one statement shape often enough to look like an N+1 loop.
+
+Routes declare a tighter budget with ``Depends(query_budget(n))``;
+otherwise ``QUERY_BUDGET_DEFAULT`` applies.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"\$\d+|%\(\w+\)s|:\w+")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals and bind parameters replaced by ``?``."""
+    shape = _STRING_RE.sub("?", statement)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _IN_LIST_RE.sub("(?...)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()[:300]
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Statements issued while handling one request."""
+
+    budget: int
+    count: int = 0
+    db_seconds: float = 0.0
+    fingerprints: Counter[str] = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.fingerprints.most_common(3) if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+def begin_request() -> tuple[QueryStats, object]:
+    stats = QueryStats(budget=get_settings().QUERY_BUDGET_DEFAULT)
+    return stats, _current.set(stats)
+
+
+def end_request(token: object) -> None:
+    _current.reset(token)
+
+
+def query_budget(limit: int) -> Callable[[], None]:
+    """Route dependency declaring the most statements the route should need."""
+
+    def _declare() -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = limit
+
+    return _declare
+
+
+def report(stats: QueryStats, method: str, path: str) -> None:
+    """Log a request that exceeded its budget or repeated a statement shape."""
+    threshold = get_settings().QUERY_REPEAT_THRESHOLD
+    repeated = stats.repeated(threshold)
+    if stats.count > stats.budget:
+        logger.warning(
+            "%s %s issued %d queries (budget %d, %.1fms in DB)",
+            method,
+            path,
+            stats.count,
+            stats.budget,
+            stats.db_seconds * 1000,
+        )
+    for shape, n in repeated:
+        logger.warning("%s %s repeated a statement %d times (possible N+1): %s", method, path, n, shape)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        stats.db_seconds += time.perf_counter() - started.pop()
+    stats.count += 1
+    stats.fingerprints[fingerprint(statement)] += 1
+
+
+def install(engine: AsyncEngine) -> None:
+    """Attach the accounting listeners to ``engine``."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,8 +1,15 @@
 """Service for rediscovering forgotten but relevant notes.
 
-Computes the centroid of recent note embeddings and finds old notes
-whose embeddings are close to the centroid, surfacing forgotten notes
-that are relevant to the user's current work.
+Computes the centroid of recent notes and finds old notes close to it,
+surfacing forgotten notes that are relevant to the user's current work.
+
+The expensive part -- an ANN search over the per-note centroids in
+``note_avg_embeddings`` -- runs in a ``rediscovery_pool`` background job,
+at most daily per user or when the user's recent notes change.  Each
+user's pool only holds notes they can read and is cached in
+``rediscovery_candidates``; ``rediscovery_pools`` records what it was
+built from.  Dashboard requests only queue a rebuild when the pool is
+stale and sample from the pool they already have.
 """
 
 from __future__ import annotations
@@ -12,13 +19,52 @@ import random
 from datetime import datetime, timedelta, timezone
 
 import numpy as np
-from sqlalchemy import select
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, delete, func, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Note, NoteEmbedding
+from app.config import get_settings
+from app.models import Note, RediscoveryCandidate, RediscoveryPool
+from app.services.access_scope import ensure_access_scope, readable_notes_clause
+from app.services.graph_service import fetch_note_centroids
+from app.services.job_queue import submit_job
 
 logger = logging.getLogger(__name__)
 
+_POOL_SIZE = 200
+_POOL_TTL = timedelta(days=1)
+# A requested rebuild that has not finished by then (failed job) may be requested again.
+_REQUEST_RETRY = timedelta(minutes=5)
+_RECENT_COUNT = 10
+# Smallest ``days_threshold`` the API accepts; larger thresholds filter the pool.
+_POOL_MIN_AGE_DAYS = 7
+
+_POOL_SQL = text("""
+    SELECT c.note_id, 1 - best.dist AS similarity, best.chunk_text
+    FROM (
+        SELECT a.note_id
+        FROM note_avg_embeddings a
+        JOIN notes n ON n.id = a.note_id
+        WHERE n.source_updated_at < :cutoff
+          AND a.note_id != ALL(:recent_ids)
+          AND (
+              n.notebook_id IS NULL
+              OR n.notebook_id IN (SELECT notebook_id FROM access_scope_notebooks WHERE user_id = :user_id)
+              OR n.id IN (SELECT note_id FROM access_scope_notes WHERE user_id = :user_id)
+          )
+        ORDER BY a.avg_embedding <=> :centroid
+        LIMIT :pool_size
+    ) c
+    CROSS JOIN LATERAL (
+        SELECT e.chunk_text, e.embedding <=> :centroid AS dist
+        FROM note_embeddings e
+        WHERE e.note_id = c.note_id
+        ORDER BY dist
+        LIMIT 1
+    ) best
+""").bindparams(bindparam("centroid", type_=Vector(get_settings().EMBEDDING_DIMENSION)))
+
 
 class RediscoveryItem:
     __slots__ = ("note_id", "title", "snippet", "similarity", "last_updated", "reason")
@@ -41,113 +87,96 @@ class RediscoveryItem:
 
 
 class RediscoveryService:
-    """Find forgotten notes that are relevant to recent work."""
+    """Find forgotten notes that are relevant to a user's recent work."""
 
     def __init__(self, session: AsyncSession):
         self._session = session
 
+    async def _recent_note_ids(self, user_id: int) -> list[int]:
+        result = await self._session.execute(
+            select(Note.id)
+            .where(Note.source_updated_at.is_not(None), readable_notes_clause(user_id))
+            .order_by(Note.source_updated_at.desc())
+            .limit(_RECENT_COUNT)
+        )
+        return [row[0] for row in result.all()]
+
     async def get_rediscoveries(
         self,
+        user_id: int,
         limit: int = 5,
         days_threshold: int = 30,
-        recent_count: int = 10,
         min_similarity: float = 0.3,
     ) -> list[RediscoveryItem]:
         """Return forgotten notes similar to the user's recent work.
 
-        1. Find embeddings of the N most recently modified notes.
-        2. Compute the average (centroid) embedding.
-        3. Query for old notes (not updated in ``days_threshold`` days)
-           whose embeddings are close to the centroid.
+        1. Find the user's most recently modified readable notes.
+        2. Queue a pool rebuild if the pool is older than a day or was
+           built from a different set of recent notes.
+        3. Take the best pooled notes not updated in ``days_threshold``
+           days that the user can still read.
         4. Add slight randomness so results vary between calls.
+
+        Flushes but does not commit.
         """
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days_threshold)
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=days_threshold)
 
         # --- 1. Get IDs of recent notes ---
-        recent_ids_stmt = (
-            select(Note.id)
-            .where(Note.source_updated_at.is_not(None))
-            .order_by(Note.source_updated_at.desc())
-            .limit(recent_count)
-        )
-        recent_result = await self._session.execute(recent_ids_stmt)
-        recent_note_ids = [row[0] for row in recent_result.all()]
-
+        await ensure_access_scope(self._session, user_id)
+        recent_note_ids = await self._recent_note_ids(user_id)
         if not recent_note_ids:
             logger.debug("No recent notes found for rediscovery")
             return []
 
-        # --- 2. Compute centroid in Python (pgvector AVG returns text) ---
-        emb_stmt = select(NoteEmbedding.embedding).where(
-            NoteEmbedding.note_id.in_(recent_note_ids)
-        )
-        emb_result = await self._session.execute(emb_stmt)
-        emb_rows = emb_result.all()
-
-        if not emb_rows:
-            logger.debug("No embeddings found for recent notes")
-            return []
+        # --- 2. Queue a rebuild when the pool no longer matches recent activity ---
+        pool = await self._session.get(RediscoveryPool, user_id)
+        if (
+            pool is None
+            or pool.recent_ids != recent_note_ids
+            or pool.computed_at is None
+            or now - pool.computed_at > _POOL_TTL
+        ):
+            await self._request_refresh(user_id)
 
-        vectors = [np.array(row[0], dtype=np.float32) for row in emb_rows]
-        centroid = np.mean(vectors, axis=0).tolist()
-
-        # --- 3. Find old notes close to the centroid ---
+        # --- 3. Filter the (possibly previous) pool for this request ---
         # Fetch more candidates than needed, then sample for randomness.
-        fetch_limit = limit * 4
-        cosine_dist = NoteEmbedding.embedding.cosine_distance(centroid)
-
-        old_notes_stmt = (
+        result = await self._session.execute(
             select(
                 Note.synology_note_id.label("note_id"),
                 Note.title,
-                NoteEmbedding.chunk_text,
-                cosine_dist.label("distance"),
+                RediscoveryCandidate.snippet,
+                RediscoveryCandidate.similarity,
                 Note.source_updated_at,
             )
-            .join(Note, NoteEmbedding.note_id == Note.id)
+            .join(Note, Note.id == RediscoveryCandidate.note_id)
             .where(
+                RediscoveryCandidate.user_id == user_id,
                 Note.source_updated_at < cutoff,
-                Note.id.notin_(recent_note_ids),
+                RediscoveryCandidate.similarity >= min_similarity,
+                readable_notes_clause(user_id),
             )
-            .order_by(cosine_dist.asc())
-            .limit(fetch_limit)
+            .order_by(RediscoveryCandidate.similarity.desc())
+            .limit(limit * 4)
         )
-
-        result = await self._session.execute(old_notes_stmt)
-        rows = result.all()
-
-        if not rows:
-            return []
-
-        # --- 4. Filter by similarity threshold & deduplicate by note_id ---
-        seen: dict[str, tuple] = {}
-        for row in rows:
-            similarity = round(1.0 - float(row.distance), 4)
-            if similarity < min_similarity:
-                continue
-            nid = row.note_id
-            if nid not in seen or similarity > seen[nid][0]:
-                seen[nid] = (similarity, row)
-
-        candidates = list(seen.values())
+        candidates = result.all()
         if not candidates:
             return []
 
-        # Random sample from top candidates
+        # --- 4. Random sample from top candidates ---
         selected = random.sample(candidates, min(limit, len(candidates)))
-        # Sort selected by similarity descending
-        selected.sort(key=lambda x: x[0], reverse=True)
+        selected.sort(key=lambda row: row.similarity, reverse=True)
 
         items: list[RediscoveryItem] = []
-        for similarity, row in selected:
-            snippet = (row.chunk_text or "")[:200].strip()
+        for row in selected:
+            similarity = round(float(row.similarity), 4)
             updated_iso = (
                 row.source_updated_at.isoformat()
                 if row.source_updated_at
                 else None
             )
             days_ago = (
-                (datetime.now(timezone.utc) - row.source_updated_at).days
+                (now - row.source_updated_at).days
                 if row.source_updated_at
                 else None
             )
@@ -157,7 +186,7 @@ class RediscoveryService:
                 RediscoveryItem(
                     note_id=row.note_id,
                     title=row.title or "",
-                    snippet=snippet,
+                    snippet=row.snippet or "",
                     similarity=similarity,
                     last_updated=updated_iso,
                     reason=reason,
@@ -165,3 +194,86 @@ class RediscoveryService:
             )
 
         return items
+
+    async def _request_refresh(self, user_id: int) -> None:
+        """Queue a pool rebuild unless one was requested recently.
+
+        The request is claimed with a single upsert, so concurrent
+        dashboard loads queue one job between them.
+        """
+        stmt = pg_insert(RediscoveryPool).values(user_id=user_id, requested_at=func.now())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RediscoveryPool.user_id],
+            set_={"requested_at": func.now()},
+            where=or_(
+                RediscoveryPool.requested_at.is_(None),
+                RediscoveryPool.requested_at < func.now() - _REQUEST_RETRY,
+            ),
+        ).returning(RediscoveryPool.user_id)
+        if (await self._session.execute(stmt)).first() is None:
+            return
+        await submit_job("rediscovery_pool", {"user_id": user_id}, unique=False)
+
+    async def refresh_pool(self, user_id: int) -> int:
+        """Rebuild ``user_id``'s candidate pool around their recent notes.
+
+        Runs in the ``rediscovery_pool`` job.  Commits.  Returns the
+        number of pooled candidates.
+        """
+        # Rebuilds of the same pool never overlap
+        await self._session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"rediscovery:{user_id}"}
+        )
+        now = datetime.now(timezone.utc)
+        rows: list = []
+
+        await ensure_access_scope(self._session, user_id)
+        recent_note_ids = await self._recent_note_ids(user_id)
+        centroids = await fetch_note_centroids(self._session, recent_note_ids) if recent_note_ids else {}
+        if centroids:
+            centroid = np.mean(np.asarray(list(centroids.values()), dtype=np.float32), axis=0)
+            result = await self._session.execute(
+                _POOL_SQL,
+                {
+                    "cutoff": now - timedelta(days=_POOL_MIN_AGE_DAYS),
+                    "recent_ids": recent_note_ids,
+                    "user_id": user_id,
+                    "centroid": centroid,
+                    "pool_size": _POOL_SIZE,
+                },
+            )
+            rows = result.all()
+        else:
+            logger.debug("No embeddings found for recent notes of user %d", user_id)
+
+        await self._session.execute(delete(RediscoveryCandidate).where(RediscoveryCandidate.user_id == user_id))
+        if rows:
+            await self._session.execute(
+                pg_insert(RediscoveryCandidate)
+                .values(
+                    [
+                        {
+                            "user_id": user_id,
+                            "note_id": note_id,
+                            "similarity": float(similarity),
+                            "snippet": (chunk_text or "")[:200].strip(),
+                            "computed_at": now,
+                        }
+                        for note_id, similarity, chunk_text in rows
+                    ]
+                )
+                .on_conflict_do_nothing()
+            )
+
+        await self._session.execute(
+            pg_insert(RediscoveryPool)
+            .values(user_id=user_id, recent_ids=recent_note_ids, computed_at=now, requested_at=None)
+            .on_conflict_do_update(
+                index_elements=[RediscoveryPool.user_id],
+                set_={"recent_ids": recent_note_ids, "computed_at": now, "requested_at": None},
+            )
+        )
+
+        await self._session.commit()
+        logger.info("Rebuilt rediscovery pool for user %d: %d candidates", user_id, len(rows))
+        return len(rows)
@@ -1,7 +1,15 @@
 """Service for finding semantically related notes.
 
-Given a note's embedding, finds other notes whose embeddings are
-closest using pgvector cosine distance.
+Related notes are precomputed: :func:`refresh_neighbors` stores the
+top-K neighbours of every note in ``note_neighbors`` after indexing, so
+opening a note costs one indexed lookup.  Candidates come from an ANN
+search over the per-note centroids in ``note_avg_embeddings``; each
+candidate is then scored by its best chunk against the note's centroid.
+
+Notes re-embedded since their neighbours were computed (or never
+computed) fall back to the same search run live, from the centroid of
+their current chunks.  ``note_neighbor_refreshes`` records when each
+note was last computed, including notes that had no neighbours.
 """
 
 from __future__ import annotations
@@ -9,13 +17,62 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 
-from sqlalchemy import select
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Note, NoteEmbedding
+from app.config import get_settings
+from app.models import Note, NoteEmbedding, NoteNeighbor, NoteNeighborRefresh
 
 logger = logging.getLogger(__name__)
 
+# Neighbours stored per note (matches the API's maximum ``limit``).
+NEIGHBORS_PER_NOTE = 20
+# Centroid ANN candidates re-scored by best chunk.
+_CANDIDATES = NEIGHBORS_PER_NOTE * 2
+# Notes refreshed per SQL statement.
+_REFRESH_BATCH_SIZE = 100
+_SNIPPET_LENGTH = 200
+
+_BATCH_NEIGHBORS_SQL = text("""
+    SELECT a.note_id, c.note_id AS neighbor_id, 1 - best.dist AS similarity, best.chunk_text
+    FROM note_avg_embeddings a
+    CROSS JOIN LATERAL (
+        SELECT note_id
+        FROM note_avg_embeddings
+        WHERE note_id != a.note_id
+        ORDER BY avg_embedding <=> a.avg_embedding
+        LIMIT :candidates
+    ) c
+    CROSS JOIN LATERAL (
+        SELECT e.chunk_text, e.embedding <=> a.avg_embedding AS dist
+        FROM note_embeddings e
+        WHERE e.note_id = c.note_id
+        ORDER BY dist
+        LIMIT 1
+    ) best
+    WHERE a.note_id = ANY(:note_ids)
+""")
+
+_LIVE_NEIGHBORS_SQL = text("""
+    SELECT c.note_id AS neighbor_id, 1 - best.dist AS similarity, best.chunk_text
+    FROM (
+        SELECT note_id
+        FROM note_avg_embeddings
+        WHERE note_id != :note_id
+        ORDER BY avg_embedding <=> :centroid
+        LIMIT :candidates
+    ) c
+    CROSS JOIN LATERAL (
+        SELECT e.chunk_text, e.embedding <=> :centroid AS dist
+        FROM note_embeddings e
+        WHERE e.note_id = c.note_id
+        ORDER BY dist
+        LIMIT 1
+    ) best
+""").bindparams(bindparam("centroid", type_=Vector(get_settings().EMBEDDING_DIMENSION)))
+
 
 @dataclass(slots=True)
 class RelatedNoteItem:
@@ -26,6 +83,79 @@ class RelatedNoteItem:
     notebook: str | None
 
 
+def _top_k(rows: list[tuple[int, float, str | None]]) -> list[tuple[int, float, str]]:
+    """Best ``NEIGHBORS_PER_NOTE`` of ``(neighbor_id, similarity, chunk_text)``."""
+    rows = sorted(rows, key=lambda r: r[1], reverse=True)[:NEIGHBORS_PER_NOTE]
+    return [(nid, round(float(sim), 4), (chunk or "")[:_SNIPPET_LENGTH].strip()) for nid, sim, chunk in rows]
+
+
+async def refresh_neighbors(session: AsyncSession, note_ids: list[int]) -> int:
+    """Recompute and store the neighbour lists of ``note_ids``.
+
+    Reads centroids from ``note_avg_embeddings``, so refresh the view first.
+    The caller commits.
+
+    Returns:
+        Number of notes refreshed.
+    """
+    refreshed = 0
+    for start in range(0, len(note_ids), _REFRESH_BATCH_SIZE):
+        batch = note_ids[start : start + _REFRESH_BATCH_SIZE]
+        result = await session.execute(_BATCH_NEIGHBORS_SQL, {"note_ids": batch, "candidates": _CANDIDATES})
+
+        by_note: dict[int, list[tuple[int, float, str | None]]] = {}
+        for note_id, neighbor_id, similarity, chunk_text in result.all():
+            by_note.setdefault(note_id, []).append((neighbor_id, similarity, chunk_text))
+
+        await session.execute(delete(NoteNeighbor).where(NoteNeighbor.note_id.in_(batch)))
+        await session.execute(
+            pg_insert(NoteNeighborRefresh)
+            .values([{"note_id": note_id} for note_id in batch])
+            .on_conflict_do_update(index_elements=[NoteNeighborRefresh.note_id], set_={"computed_at": func.now()})
+        )
+        values = [
+            {"note_id": note_id, "neighbor_id": nid, "rank": rank, "similarity": sim, "snippet": snippet}
+            for note_id, rows in by_note.items()
+            for rank, (nid, sim, snippet) in enumerate(_top_k(rows))
+        ]
+        if values:
+            await session.execute(pg_insert(NoteNeighbor).values(values).on_conflict_do_nothing())
+        refreshed += len(by_note)
+    return refreshed
+
+
+async def refresh_stale_neighbors(session: AsyncSession) -> int:
+    """Refresh neighbours for notes re-embedded since their last refresh.
+
+    Notes whose stored lists point at a refreshed note are recomputed too,
+    since that neighbour's centroid moved.  The caller commits.
+    """
+    latest_embedding = (
+        select(NoteEmbedding.note_id, func.max(NoteEmbedding.created_at).label("embedded_at"))
+        .group_by(NoteEmbedding.note_id)
+        .subquery()
+    )
+    result = await session.execute(
+        select(latest_embedding.c.note_id)
+        .outerjoin(NoteNeighborRefresh, NoteNeighborRefresh.note_id == latest_embedding.c.note_id)
+        .where(
+            NoteNeighborRefresh.computed_at.is_(None)
+            | (latest_embedding.c.embedded_at > NoteNeighborRefresh.computed_at)
+        )
+    )
+    touched = {row[0] for row in result.all()}
+    if not touched:
+        return 0
+
+    dependents = await session.execute(
+        select(NoteNeighbor.note_id).distinct().where(NoteNeighbor.neighbor_id.in_(touched))
+    )
+    note_ids = sorted(touched | {row[0] for row in dependents.all()})
+    refreshed = await refresh_neighbors(session, note_ids)
+    logger.info("Refreshed related-note neighbours for %d notes (%d re-embedded)", refreshed, len(touched))
+    return refreshed
+
+
 class RelatedNotesService:
     """Find notes semantically related to a given note."""
 
@@ -40,10 +170,8 @@ class RelatedNotesService:
     ) -> list[RelatedNoteItem]:
         """Return notes similar to the given note_id.
 
-        1. Look up the note's internal ID and its embeddings.
-        2. Compute average embedding (centroid) for multi-chunk notes.
-        3. Query for similar notes using cosine distance.
-        4. Deduplicate by note (keep best chunk per note).
+        Served from ``note_neighbors`` when the stored list is current;
+        otherwise computed live with the same centroid ANN search.
         """
         # Resolve internal note ID
         id_stmt = select(Note.id).where(Note.synology_note_id == note_id)
@@ -54,70 +182,70 @@ class RelatedNotesService:
             logger.debug("Note %s not found in database", note_id)
             return []
 
-        # Get embeddings for this note
-        emb_stmt = select(NoteEmbedding.embedding).where(
-            NoteEmbedding.note_id == internal_id
-        )
-        emb_result = await self._session.execute(emb_stmt)
-        emb_rows = emb_result.all()
-
-        if not emb_rows:
-            logger.debug("No embeddings for note %s", note_id)
+        if await self._neighbors_are_current(internal_id):
+            neighbors = await self._stored_neighbors(internal_id, limit, min_similarity)
+        else:
+            neighbors = await self._live_neighbors(internal_id, limit, min_similarity)
+        if not neighbors:
             return []
 
-        # Compute centroid for multi-chunk notes
-        import numpy as np
-
-        vectors = [np.array(row[0], dtype=np.float32) for row in emb_rows]
-        centroid = np.mean(vectors, axis=0).tolist()
-
-        # Find similar notes (exclude self)
-        fetch_limit = limit * 4
-        cosine_dist = NoteEmbedding.embedding.cosine_distance(centroid)
-
-        similar_stmt = (
-            select(
-                Note.synology_note_id.label("note_id"),
-                Note.title,
-                NoteEmbedding.chunk_text,
-                cosine_dist.label("distance"),
-                Note.notebook_name,
+        notes_result = await self._session.execute(
+            select(Note.id, Note.synology_note_id, Note.title, Note.notebook_name).where(
+                Note.id.in_([nid for nid, _, _ in neighbors])
             )
-            .join(Note, NoteEmbedding.note_id == Note.id)
-            .where(Note.id != internal_id)
-            .order_by(cosine_dist.asc())
-            .limit(fetch_limit)
         )
-
-        result = await self._session.execute(similar_stmt)
-        rows = result.all()
-
-        if not rows:
-            return []
-
-        # Deduplicate: keep best chunk per note
-        seen: dict[str, tuple[float, object]] = {}
-        for row in rows:
-            similarity = round(1.0 - float(row.distance), 4)
-            if similarity < min_similarity:
-                continue
-            nid = row.note_id
-            if nid not in seen or similarity > seen[nid][0]:
-                seen[nid] = (similarity, row)
-
-        if not seen:
-            return []
-
-        # Sort by similarity descending, take top `limit`
-        candidates = sorted(seen.values(), key=lambda x: x[0], reverse=True)[:limit]
+        notes = {row.id: row for row in notes_result.all()}
 
         return [
             RelatedNoteItem(
-                note_id=row.note_id,
-                title=row.title or "",
-                snippet=(row.chunk_text or "")[:200].strip(),
+                note_id=notes[nid].synology_note_id,
+                title=notes[nid].title or "",
+                snippet=snippet,
                 similarity=similarity,
-                notebook=row.notebook_name,
+                notebook=notes[nid].notebook_name,
             )
-            for similarity, row in candidates
+            for nid, similarity, snippet in neighbors
+            if nid in notes
         ]
+
+    async def _neighbors_are_current(self, internal_id: int) -> bool:
+        computed_at = await self._session.scalar(
+            select(NoteNeighborRefresh.computed_at).where(NoteNeighborRefresh.note_id == internal_id)
+        )
+        if computed_at is None:
+            return False
+        embedded_at = await self._session.scalar(
+            select(func.max(NoteEmbedding.created_at)).where(NoteEmbedding.note_id == internal_id)
+        )
+        return embedded_at is None or embedded_at <= computed_at
+
+    async def _stored_neighbors(
+        self, internal_id: int, limit: int, min_similarity: float
+    ) -> list[tuple[int, float, str]]:
+        result = await self._session.execute(
+            select(NoteNeighbor.neighbor_id, NoteNeighbor.similarity, NoteNeighbor.snippet)
+            .where(NoteNeighbor.note_id == internal_id)
+            .where(NoteNeighbor.similarity >= min_similarity)
+            .order_by(NoteNeighbor.rank)
+            .limit(limit)
+        )
+        return [(nid, similarity, snippet or "") for nid, similarity, snippet in result.all()]
+
+    async def _live_neighbors(
+        self, internal_id: int, limit: int, min_similarity: float
+    ) -> list[tuple[int, float, str]]:
+        # The note_avg_embeddings row may predate the re-embedding that made
+        # the stored list stale, so average the current chunks.
+        centroid = await self._session.scalar(
+            select(func.avg(NoteEmbedding.embedding)).where(NoteEmbedding.note_id == internal_id)
+        )
+        if centroid is None:
+            logger.debug("No embeddings for note %d", internal_id)
+            return []
+
+        result = await self._session.execute(
+            _LIVE_NEIGHBORS_SQL,
+            {"note_id": internal_id, "centroid": centroid, "candidates": _CANDIDATES},
+        )
+        rows = _top_k([tuple(row) for row in result.all()])
+        return [row for row in rows if row[1] >= min_similarity][:limit]
@@ -0,0 +1,125 @@
+"""Restore-time benchmark for native backup archives.
+
+Builds synthetic archives of increasing size (notes, one image entry per
+note by default, one attachment every ``--attachment-every`` notes) and
+times :func:`app.api.backup._restore_native_backup_internal` on each, so
+restore throughput can be compared against archive size when tuning
+``_RESTORE_BATCH_SIZE`` and ``_RESTORE_EXTRACT_WORKERS``::
+
+    python -m app.services.restore_benchmark
+    python -m app.services.restore_benchmark --notes 1000,5000,20000 --image-kb 256
+
+Rows are written to ``DATABASE_URL`` -- point it at a scratch database.
+Benchmark notes use a ``bench-`` id prefix and are deleted after each run;
+files go to a temporary directory that replaces the image, upload and
+blob store paths for the process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from uuid import uuid4
+
+_PREFIX = "bench-"
+
+
+def build_archive(path: Path, notes: int, images_per_note: int, image_kb: int, attachment_every: int) -> None:
+    """Write a native backup archive with synthetic notes and random file content."""
+    run = uuid4().hex[:8]
+    note_ids = [f"{_PREFIX}{run}-{i}" for i in range(notes)]
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        zf.writestr(
+            "notes.jsonl",
+            "".join(
+                json.dumps({"note_id": nid, "title": f"Benchmark {i}", "content_html": f"<p>note {i}</p>"}) + "\n"
+                for i, nid in enumerate(note_ids)
+            ),
+        )
+        images = []
+        attachments = []
+        for i, nid in enumerate(note_ids):
+            for j in range(images_per_note):
+                ref = f"img{j}.png"
+                images.append({"note_id": nid, "ref": ref, "mime_type": "image/png"})
+                zf.writestr(f"images/{nid}/{ref}", os.urandom(image_kb * 1024))
+            if attachment_every and i % attachment_every == 0:
+                file_id = f"{nid}.bin"
+                attachments.append({"note_id": nid, "file_id": file_id, "size": image_kb * 1024})
+                zf.writestr(f"attachments/{file_id}", os.urandom(image_kb * 1024))
+        zf.writestr("note_images.jsonl", "".join(json.dumps(r) + "\n" for r in images))
+        zf.writestr("note_attachments.jsonl", "".join(json.dumps(r) + "\n" for r in attachments))
+        zf.writestr(
+            "manifest.json",
+            json.dumps({"note_count": notes, "image_count": len(images), "attachment_count": len(attachments)}),
+        )
+
+
+async def _cleanup(files_root: Path) -> None:
+    from sqlalchemy import delete, select
+
+    from app.database import async_session_factory
+    from app.models import Blob, BlobRef, Note, NoteImage
+    from app.services.blob_store import release_refs
+
+    async with async_session_factory() as session:
+        refs = (
+            await session.execute(
+                select(BlobRef.path, BlobRef.sha256).where(BlobRef.path.startswith(f"{files_root}/", autoescape=True))
+            )
+        ).all()
+        shas = {row.sha256 for row in refs}
+        await release_refs(session, [row.path for row in refs])
+        if shas:
+            await session.execute(delete(Blob).where(Blob.sha256.in_(shas), Blob.ref_count == 0))
+        await session.execute(delete(NoteImage).where(NoteImage.synology_note_id.startswith(_PREFIX)))
+        await session.execute(delete(Note).where(Note.synology_note_id.startswith(_PREFIX)))
+        await session.commit()
+
+
+async def _run(sizes: list[int], images_per_note: int, image_kb: int, attachment_every: int, work: Path) -> None:
+    from app.api.backup import _restore_native_backup_internal
+
+    print(f"{'notes':>8} {'archive MB':>11} {'seconds':>9} {'MB/s':>8} {'notes/s':>9}")  # noqa: T201
+    for notes in sizes:
+        archive = work / f"bench_{notes}.zip"
+        await asyncio.to_thread(build_archive, archive, notes, images_per_note, image_kb, attachment_every)
+        archive_mb = archive.stat().st_size / 1_048_576
+        try:
+            started = time.perf_counter()
+            await _restore_native_backup_internal(archive)
+            elapsed = time.perf_counter() - started
+        finally:
+            await _cleanup(work)
+            archive.unlink(missing_ok=True)
+        print(  # noqa: T201
+            f"{notes:>8} {archive_mb:>11.1f} {elapsed:>9.2f} {archive_mb / elapsed:>8.1f} {notes / elapsed:>9.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Native backup restore benchmark")
+    parser.add_argument("--notes", default="200,1000,5000", help="Comma-separated note counts, one archive each")
+    parser.add_argument("--images-per-note", type=int, default=1, help="Image entries per note")
+    parser.add_argument("--image-kb", type=int, default=64, help="Size of each image and attachment")
+    parser.add_argument("--attachment-every", type=int, default=10, help="One attachment per N notes (0 = none)")
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.notes.split(",") if n.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="restore-bench-") as tmp:
+        work = Path(tmp)
+        # Must be set before app.config is imported (settings are cached).
+        os.environ["NSX_IMAGES_PATH"] = str(work / "images")
+        os.environ["UPLOADS_PATH"] = str(work / "uploads")
+        os.environ["BLOB_STORE_PATH"] = str(work / "blobs")
+        asyncio.run(_run(sizes, args.images_per_note, args.image_kb, args.attachment_every, work))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,13 @@
-"""Search quality metrics service — fire-and-forget event recording + admin dashboard."""
+"""Search quality metrics service — buffered event recording + admin dashboard."""
 
 import logging
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import func, select, text
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session_factory
-from app.models import SearchEvent
+from app.services.event_buffer import queue_search_click, search_event_buffer, search_event_ids
+from app.services.metrics_rollup import combined, duration_percentile, floor_hour, rollup_window
 
 logger = logging.getLogger(__name__)
 
@@ -25,116 +25,96 @@ class SearchMetrics:
         judge_strategy: str | None = None,
         details: dict | None = None,
     ) -> int | None:
-        """Write one row to search_events using a fresh session (fire-and-forget)."""
+        """Queue one search_events row and return its pre-allocated id.
+
+        The row is written by the event buffer; only an occasional id block
+        refill touches the database here.
+        """
         try:
-            async with async_session_factory() as session:
-                event = SearchEvent(
-                    user_id=user_id,
-                    query=query,
-                    search_type=search_type,
-                    result_count=result_count,
-                    duration_ms=duration_ms,
-                    judge_strategy=judge_strategy,
-                    details=details,
-                )
-                session.add(event)
-                await session.commit()
-                await session.refresh(event)
-                return event.id
+            event_id = await search_event_ids().next_id()
         except Exception:
-            logger.exception("Failed to record search event")
+            logger.exception("Failed to allocate search event id")
             return None
+        queued = search_event_buffer().add(
+            {
+                "id": event_id,
+                "user_id": user_id,
+                "query": query,
+                "search_type": search_type,
+                "result_count": result_count,
+                "duration_ms": duration_ms,
+                "judge_strategy": judge_strategy,
+                "details": details,
+                "created_at": datetime.now(UTC),
+            }
+        )
+        return event_id if queued else None
 
     @staticmethod
     async def record_click(search_event_id: int, note_id: str) -> None:
-        """Update clicked_note_id on a search event."""
-        try:
-            async with async_session_factory() as session:
-                await session.execute(
-                    text("UPDATE search_events SET clicked_note_id = :note_id WHERE id = :id"),
-                    {"note_id": note_id, "id": search_event_id},
-                )
-                await session.commit()
-        except Exception:
-            logger.exception("Failed to record click for event %d", search_event_id)
+        """Queue an update of clicked_note_id on a search event."""
+        queue_search_click(search_event_id, note_id)
 
     @staticmethod
     async def get_dashboard_data(db: AsyncSession, period: str = "7d") -> dict:
-        """Aggregate search metrics for the admin dashboard."""
+        """Aggregate search metrics for the admin dashboard from the hourly rollups."""
         days = {"1d": 1, "7d": 7, "30d": 30, "90d": 90}.get(period, 7)
-        since = datetime.utcnow() - timedelta(days=days)
-
-        # Total searches
-        total_result = await db.execute(select(func.count(SearchEvent.id)).where(SearchEvent.created_at >= since))
-        total_searches = total_result.scalar() or 0
-
-        # Averages
-        avg_result = await db.execute(
-            select(
-                func.avg(SearchEvent.result_count),
-                func.avg(SearchEvent.duration_ms),
-            ).where(SearchEvent.created_at >= since)
-        )
-        row = avg_result.one()
-        avg_result_count = round(float(row[0] or 0), 1)
-        avg_duration_ms = round(float(row[1] or 0), 1)
-
-        # Zero-result rate
-        zero_result = await db.execute(
-            select(func.count(SearchEvent.id)).where(
-                SearchEvent.created_at >= since,
-                SearchEvent.result_count == 0,
+        since = floor_hour(datetime.now(UTC) - timedelta(days=days))
+        params = await rollup_window(db, since)
+
+        # Totals and averages per search type
+        type_rows = (
+            await db.execute(
+                text(f"""
+                    SELECT search_type, SUM(searches), SUM(zero_results),
+                           SUM(result_count_sum), SUM(duration_sum), SUM(duration_count)
+                    FROM {combined("search_events")} e
+                    GROUP BY search_type
+                """),  # noqa: S608 - combined() interpolates only _ROLLUPS constants
+                params,
             )
-        )
-        zero_count = zero_result.scalar() or 0
+        ).fetchall()
+        total_searches = sum(int(r[1]) for r in type_rows)
+        zero_count = sum(int(r[2]) for r in type_rows)
+        result_sum = sum(int(r[3]) for r in type_rows)
+        duration_sum = sum(int(r[4]) for r in type_rows)
+        duration_count = sum(int(r[5]) for r in type_rows)
+
+        avg_result_count = round(result_sum / total_searches, 1) if total_searches else 0.0
+        avg_duration_ms = round(duration_sum / duration_count, 1) if duration_count else 0.0
         zero_result_rate = round(zero_count / total_searches * 100, 1) if total_searches else 0
+        type_distribution = [{"type": r[0], "count": int(r[1])} for r in type_rows]
 
         # Daily volume
         daily_result = await db.execute(
-            text("""
-                SELECT date_trunc('day', created_at)::date AS day, COUNT(*) AS count
-                FROM search_events
-                WHERE created_at >= :since
+            text(f"""
+                SELECT date_trunc('day', bucket)::date AS day, SUM(searches) AS count
+                FROM {combined("search_events")} e
                 GROUP BY day ORDER BY day
-            """),
-            {"since": since},
-        )
-        daily_volume = [{"date": str(r[0]), "count": r[1]} for r in daily_result.fetchall()]
-
-        # Type distribution
-        type_result = await db.execute(
-            select(SearchEvent.search_type, func.count(SearchEvent.id))
-            .where(SearchEvent.created_at >= since)
-            .group_by(SearchEvent.search_type)
+            """),  # noqa: S608 - combined() interpolates only _ROLLUPS constants
+            params,
         )
-        type_distribution = [{"type": r[0], "count": r[1]} for r in type_result.fetchall()]
+        daily_volume = [{"date": str(r[0]), "count": int(r[1])} for r in daily_result.fetchall()]
 
         # Top zero-result queries
         zero_queries_result = await db.execute(
-            text("""
-                SELECT query, COUNT(*) AS cnt
-                FROM search_events
-                WHERE created_at >= :since AND result_count = 0
+            text(f"""
+                SELECT query, SUM(count) AS cnt
+                FROM {combined("search_zero_results")} z
                 GROUP BY query ORDER BY cnt DESC LIMIT 10
-            """),
-            {"since": since},
+            """),  # noqa: S608 - combined() interpolates only _ROLLUPS constants
+            params,
         )
-        top_zero_result_queries = [{"query": r[0], "count": r[1]} for r in zero_queries_result.fetchall()]
-
-        # Response time percentiles
-        p_result = await db.execute(
-            text("""
-                SELECT
-                    percentile_cont(0.5) WITHIN GROUP (ORDER BY duration_ms) AS p50,
-                    percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms) AS p95
-                FROM search_events
-                WHERE created_at >= :since AND duration_ms IS NOT NULL
-            """),
-            {"since": since},
+        top_zero_result_queries = [{"query": r[0], "count": int(r[1])} for r in zero_queries_result.fetchall()]
+
+        # Response time percentiles (estimated from the duration histogram)
+        bins_result = await db.execute(
+            text(f"SELECT bin, SUM(count) FROM {combined('search_durations')} d GROUP BY bin"),  # noqa: S608 - combined() interpolates only _ROLLUPS constants
+            params,
         )
-        p_row = p_result.one()
-        response_time_p50 = round(float(p_row[0] or 0), 1)
-        response_time_p95 = round(float(p_row[1] or 0), 1)
+        bins = {r[0]: int(r[1]) for r in bins_result.fetchall()}
+        response_time_p50 = round(duration_percentile(bins, 0.5), 1)
+        response_time_p95 = round(duration_percentile(bins, 0.95), 1)
 
         return {
             "total_searches": total_searches,
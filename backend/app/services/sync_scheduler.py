@@ -0,0 +1,107 @@
+"""Periodic NoteStation sync scheduler.
+
+Submits a ``sync`` job with ``mode="auto"`` every ``SYNC_INTERVAL_MINUTES``
+(+/- ``SYNC_JITTER_SECONDS``).  The job itself decides between a cheap
+delta run driven by the stored mtime watermark and the periodic full
+reconciliation (see :func:`app.api.sync._run_sync_background`).
+
+Scheduled runs act for :func:`schedule_owner_id` (``SYNC_SCHEDULE_OWNER``
+or the first organisation owner), who is granted admin on notebooks the
+run creates -- without a grant their notes would be invisible to everyone.
+
+Every API process may run a scheduler; :func:`submit_job` with
+``min_interval`` makes sure only one of them actually enqueues a run per
+interval, and the random start offset keeps them from waking together.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.constants import MemberRole
+from app.database import async_session_factory
+from app.models import Membership, User
+from app.services.job_queue import submit_job
+
+logger = logging.getLogger(__name__)
+
+
+async def schedule_owner_id() -> int | None:
+    """User id scheduled syncs run as (notebook grants go to this user)."""
+    owner_email = get_settings().SYNC_SCHEDULE_OWNER
+    async with async_session_factory() as db:
+        if owner_email:
+            return await db.scalar(select(User.id).where(User.email == owner_email, User.is_active.is_(True)))
+        return await db.scalar(
+            select(Membership.user_id)
+            .join(User, User.id == Membership.user_id)
+            .where(
+                Membership.role == MemberRole.OWNER,
+                Membership.accepted_at.isnot(None),
+                User.is_active.is_(True),
+            )
+            .order_by(Membership.created_at, Membership.id)
+            .limit(1)
+        )
+
+
+class SyncScheduler:
+    """Background loop that enqueues scheduled sync jobs."""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._interval = max(60, settings.SYNC_INTERVAL_MINUTES * 60)
+        self._jitter = max(0, settings.SYNC_JITTER_SECONDS)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        logger.info("Sync scheduler started (every %ds, jitter %ds)", self._interval, self._jitter)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def _next_delay(self) -> float:
+        return max(30.0, self._interval + random.uniform(-self._jitter, self._jitter))  # noqa: S311
+
+    async def _run(self) -> None:
+        # Spread the first run so restarted processes do not sync together
+        await asyncio.sleep(random.uniform(0, self._interval / 4))  # noqa: S311
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Scheduled sync submission failed")
+            await asyncio.sleep(self._next_delay())
+
+    async def tick(self) -> bool:
+        """Enqueue one scheduled sync unless a recent run exists.
+
+        Returns:
+            True if a new job was created.
+        """
+        owner_id = await schedule_owner_id()
+        if owner_id is None:
+            logger.warning("No owner found for scheduled syncs; new notebooks will have no grants")
+        job, created = await submit_job(
+            "sync",
+            {"mode": "auto", "user_id": owner_id},
+            progress={"status": "syncing", "is_syncing": True},
+            triggered_by="scheduler",
+            min_interval=timedelta(seconds=self._interval / 2),
+        )
+        if created:
+            logger.info("Scheduled sync job %d submitted", job.id)
+        return created
@@ -13,11 +13,19 @@ Sync strategy (Push before Pull):
 3. **Delete** — Notes absent from remote:
    - If local_modified → mark as 'local_only' (preserve)
    - Otherwise → DELETE
+
+Delta runs (``sync_all(full=False)``) use a persisted high-water mark of
+remote ``mtime``: the note list is paged newest-first and stops at the
+first note older than the mark, only those notes are compared and
+fetched in detail, and the deletion step is skipped.  A full run
+reconciles everything (including notes that appear with an old mtime)
+and is still required periodically to catch deletions.
 """
 
 from __future__ import annotations
 
 import logging
+import time
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 
@@ -25,7 +33,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.constants import NotePermission
-from app.models import Note, Notebook
+from app.models import Note, Notebook, Setting
+from app.services.blob_store import StoredBlob, register_refs
+from app.services.instrumentation import SYNC_NOTES, SYNC_PHASE_SECONDS
 from app.services.notebook_access_control import grant_notebook_access
 from app.synology_gateway.notestation import NoteStationService
 
@@ -34,6 +44,16 @@ logger = logging.getLogger(__name__)
 # Page size used when the API does not return all notes at once.
 _PAGE_SIZE = 500
 
+# Page size for the newest-first listing of delta runs.
+_DELTA_PAGE_SIZE = 100
+
+# Setting row holding the remote mtime high-water mark for delta syncs.
+_WATERMARK_KEY = "sync_watermark"
+
+# Delta runs re-check notes this far behind the watermark to absorb NAS
+# clock skew and edits saved while the previous run was listing notes.
+_WATERMARK_OVERLAP_SECONDS = 300
+
 
 @dataclass
 class SyncResult:
@@ -46,6 +66,11 @@ class SyncResult:
     conflicts: int = 0
     total: int = 0
     synced_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    mode: str = "full"  # "full" | "delta"
+    scanned: int = 0  # remote summaries compared against the DB
+    fetched: int = 0  # notes fetched in detail from NoteStation
+    written: int = 0  # rows inserted, updated, flagged or deleted
+    duration_ms: int = 0
 
 
 class SyncService:
@@ -68,41 +93,82 @@ class SyncService:
         self._db = db
         self._write_enabled = write_enabled
         self._user_id = user_id
+        # Files written from data URIs; registered with the run's changes
+        self._blobs: list[StoredBlob] = []
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    async def sync_all(self) -> SyncResult:
-        """Run a full bidirectional synchronisation.
+    async def sync_all(self, full: bool = True) -> SyncResult:
+        """Run a bidirectional synchronisation.
 
         Step 1: Push local changes to NoteStation (if write_enabled).
         Step 2: Pull remote changes, detecting conflicts.
-        Step 3: Handle deletions (preserve local_modified notes).
+        Step 3: Handle deletions (preserve local_modified notes) -- full runs only.
+
+        Args:
+            full: Compare every remote note and reconcile deletions.  When
+                False, only notes modified since the stored watermark are
+                examined; falls back to a full run if no watermark exists.
 
         Returns:
-            A :class:`SyncResult` with add/update/delete/pushed/conflicts counts.
+            A :class:`SyncResult` with add/update/delete/pushed/conflicts counts
+            and per-run metrics.
         """
+        started = time.monotonic()
         try:
             now = datetime.now(UTC)
 
+            watermark = None if full else await self._load_watermark()
+            if watermark is None:
+                full = True
+
             # Step 1: Push local changes to NoteStation
-            pushed = await self._push_local_changes()
+            with SYNC_PHASE_SECONDS.time(phase="push"):
+                pushed = await self._push_local_changes()
 
             # Step 1.5: Sync notebooks (NAS → DB)
-            notebook_map = await self._fetch_notebook_map()
-            notebook_db_map = await self._sync_notebooks(notebook_map)
-
-            # Step 2: Fetch all remote notes (list – summary only)
-            remote_notes = await self._fetch_all_notes()
-            existing = await self._get_existing_notes()
+            with SYNC_PHASE_SECONDS.time(phase="notebooks"):
+                notebook_map = await self._fetch_notebook_map()
+                notebook_db_map = await self._sync_notebooks(notebook_map)
+
+            # Step 2: List remote notes (summary only) -- delta runs only the recent ones
+            recent = None
+            with SYNC_PHASE_SECONDS.time(phase="list"):
+                if not full:
+                    recent = await self._fetch_notes_since(watermark - _WATERMARK_OVERLAP_SECONDS)
+                if recent is None:
+                    remote_notes = await self._fetch_all_notes()
+                    remote_total = len(remote_notes)
+                else:
+                    remote_notes, remote_total = recent
+            pull_started = time.monotonic()
+            if full:
+                candidates = remote_notes
+                existing = await self._get_existing_notes()
+            else:
+                if recent is None:
+                    # The NAS ignored mtime ordering: filter the complete listing
+                    known_ids = await self._get_known_note_ids()
+                    cutoff = watermark - _WATERMARK_OVERLAP_SECONDS
+                    candidates = [
+                        n for n in remote_notes
+                        if (n.get("mtime") or 0) > cutoff or str(n["object_id"]) not in known_ids
+                    ]
+                else:
+                    candidates = remote_notes
+                existing = await self._get_existing_notes(
+                    [str(n["object_id"]) for n in candidates]
+                )
 
             remote_ids: set[str] = set()
             added = 0
             updated = 0
             conflicts = 0
+            fetched = 0
 
-            for note_summary in remote_notes:
+            for note_summary in candidates:
                 note_id = str(note_summary["object_id"])
                 remote_ids.add(note_id)
 
@@ -111,6 +177,7 @@ class SyncService:
                     # New remote note → INSERT
                     try:
                         detail = await self._notestation.get_note(note_id)
+                        fetched += 1
                     except Exception:
                         logger.warning("Failed to fetch detail for note %s, using summary", note_id)
                         detail = note_summary
@@ -132,6 +199,7 @@ class SyncService:
                     # Both sides changed → CONFLICT
                     try:
                         detail = await self._notestation.get_note(note_id)
+                        fetched += 1
                     except Exception:
                         detail = note_summary
 
@@ -150,6 +218,7 @@ class SyncService:
                     # Remote only changed → UPDATE local
                     try:
                         detail = await self._notestation.get_note(note_id)
+                        fetched += 1
                     except Exception:
                         logger.warning("Failed to fetch detail for note %s, using summary", note_id)
                         detail = note_summary
@@ -164,6 +233,7 @@ class SyncService:
                     if not db_note.link_id or not db_note.nas_ver:
                         try:
                             detail = await self._notestation.get_note(note_id)
+                            fetched += 1
                         except Exception:
                             detail = note_summary
                         new_link = detail.get("link_id", "")
@@ -173,21 +243,32 @@ class SyncService:
                         if new_ver and not db_note.nas_ver:
                             db_note.nas_ver = new_ver
 
-            # Step 3: Handle deletions
+            SYNC_PHASE_SECONDS.observe(time.monotonic() - pull_started, phase="pull")
+
+            # Step 3: Handle deletions (needs the complete remote listing)
             deleted = 0
-            for syn_id, db_note in existing.items():
-                if syn_id not in remote_ids:
-                    if db_note.sync_status in ("local_modified", "local_only"):
-                        # Preserve locally modified notes
-                        db_note.sync_status = "local_only"
-                        logger.info("Note %s not on remote, marked as local_only", syn_id)
-                    else:
-                        await self._db.delete(db_note)
-                        deleted += 1
+            if full:
+                for syn_id, db_note in existing.items():
+                    if syn_id not in remote_ids:
+                        if db_note.sync_status in ("local_modified", "local_only"):
+                            # Preserve locally modified notes
+                            db_note.sync_status = "local_only"
+                            logger.info("Note %s not on remote, marked as local_only", syn_id)
+                        else:
+                            await self._db.delete(db_note)
+                            deleted += 1
+
+            # Advance the watermark only after every candidate was handled
+            high_water = max((n.get("mtime") or 0 for n in remote_notes), default=0)
+            await self._save_watermark(
+                max(high_water, watermark or 0), full_at=now if full else None
+            )
 
+            await register_refs(self._db, self._blobs)
+            self._blobs.clear()
             await self._db.flush()
 
-            total = len(remote_notes)
+            total = remote_total
             result = SyncResult(
                 added=added,
                 updated=updated,
@@ -196,10 +277,20 @@ class SyncService:
                 conflicts=conflicts,
                 total=total,
                 synced_at=now,
+                mode="full" if full else "delta",
+                scanned=len(candidates),
+                fetched=fetched,
+                written=added + updated + conflicts + deleted,
+                duration_ms=int((time.monotonic() - started) * 1000),
             )
+            SYNC_PHASE_SECONDS.observe(time.monotonic() - started, phase=f"total_{result.mode}")
+            for change in ("added", "updated", "deleted", "pushed", "conflicts"):
+                SYNC_NOTES.inc(getattr(result, change), change=change)
             logger.info(
-                "Sync completed: added=%d, updated=%d, deleted=%d, pushed=%d, conflicts=%d, total=%d",
-                added, updated, deleted, pushed, conflicts, total,
+                "Sync completed (%s): added=%d, updated=%d, deleted=%d, pushed=%d, conflicts=%d, total=%d, "
+                "scanned=%d, fetched=%d, %dms",
+                result.mode, added, updated, deleted, pushed, conflicts, total,
+                result.scanned, fetched, result.duration_ms,
             )
             return result
 
@@ -207,6 +298,36 @@ class SyncService:
             await self._db.rollback()
             raise
 
+    async def last_full_sync_at(self) -> datetime | None:
+        """Return when the last full reconciliation finished, if known."""
+        value = await self._get_watermark_setting()
+        raw = (value or {}).get("last_full_at")
+        return datetime.fromisoformat(raw) if raw else None
+
+    # ------------------------------------------------------------------
+    # Watermark persistence
+    # ------------------------------------------------------------------
+
+    async def _get_watermark_setting(self) -> dict | None:
+        row = await self._db.scalar(select(Setting).where(Setting.key == _WATERMARK_KEY))
+        return row.value if row else None
+
+    async def _load_watermark(self) -> int | None:
+        value = await self._get_watermark_setting()
+        mtime = (value or {}).get("mtime")
+        return int(mtime) if mtime else None
+
+    async def _save_watermark(self, mtime: int, full_at: datetime | None) -> None:
+        row = await self._db.scalar(select(Setting).where(Setting.key == _WATERMARK_KEY))
+        value = dict(row.value) if row else {}
+        value["mtime"] = int(mtime)
+        if full_at is not None:
+            value["last_full_at"] = full_at.isoformat()
+        if row:
+            row.value = value
+        else:
+            self._db.add(Setting(key=_WATERMARK_KEY, value=value))
+
     # ------------------------------------------------------------------
     # Push logic
     # ------------------------------------------------------------------
@@ -311,7 +432,7 @@ class SyncService:
 
                 # Extract data URI images the NAS may have left in the content
                 from app.utils.note_utils import extract_data_uri_images
-                push_content = extract_data_uri_images(push_content)
+                push_content = extract_data_uri_images(push_content, self._blobs)
 
                 # Update DB with NAS-format content to keep it clean
                 note.content_html = push_content
@@ -433,6 +554,42 @@ class SyncService:
             logger.warning("Failed to fetch notebooks for name lookup")
             return {}
 
+    async def _fetch_notes_since(self, cutoff: int) -> tuple[list[dict], int] | None:
+        """List notes modified after ``cutoff`` (unix time), newest first.
+
+        Pages through ``list`` sorted by ``mtime`` descending and stops at
+        the first note at or before ``cutoff``, so a delta run costs a page
+        or two instead of the whole library.
+
+        Returns:
+            ``(notes, total)`` with ``total`` the library size reported by
+            the NAS, or None when the server does not honour the ordering
+            (the caller then falls back to :meth:`_fetch_all_notes`).
+        """
+        notes: list[dict] = []
+        offset = 0
+        last_mtime: int | None = None
+        while True:
+            page = await self._notestation.list_notes(
+                offset=offset, limit=_DELTA_PAGE_SIZE, sort_by="mtime", order="desc",
+            )
+            batch = page.get("notes", [])
+            total = page.get("total", 0)
+            for note in batch:
+                mtime = note.get("mtime") or 0
+                if last_mtime is not None and mtime > last_mtime:
+                    logger.info("NoteStation list is not ordered by mtime; listing every note")
+                    return None
+                last_mtime = mtime
+                if mtime <= cutoff:
+                    logger.info("NoteStation delta list: %d notes changed (total=%d)", len(notes), total)
+                    return notes, total
+                notes.append(note)
+            offset += len(batch)
+            if not batch or offset >= total:
+                logger.info("NoteStation delta list: %d notes changed (total=%d)", len(notes), total)
+                return notes, total
+
     async def _fetch_all_notes(self) -> list[dict]:
         """Fetch all notes from NoteStation.
 
@@ -489,17 +646,29 @@ class SyncService:
         logger.info("Total notes fetched from NoteStation: %d", len(all_notes))
         return all_notes
 
-    async def _get_existing_notes(self) -> dict[str, Note]:
-        """Load all notes from the local DB, keyed by synology_note_id.
+    async def _get_existing_notes(self, note_ids: list[str] | None = None) -> dict[str, Note]:
+        """Load notes from the local DB, keyed by synology_note_id.
+
+        Args:
+            note_ids: Restrict to these synology note IDs (default: all notes).
 
         Returns:
             A mapping of ``synology_note_id`` -> :class:`Note`.
         """
         stmt = select(Note)
+        if note_ids is not None:
+            if not note_ids:
+                return {}
+            stmt = stmt.where(Note.synology_note_id.in_(note_ids))
         result = await self._db.execute(stmt)
         notes = result.scalars().all()
         return {note.synology_note_id: note for note in notes}
 
+    async def _get_known_note_ids(self) -> set[str]:
+        """Return every synology_note_id in the local DB (IDs only)."""
+        result = await self._db.execute(select(Note.synology_note_id))
+        return {row[0] for row in result.fetchall()}
+
     def _note_to_model(
         self,
         note_data: dict,
@@ -524,7 +693,7 @@ class SyncService:
         note_id = str(note_data["object_id"])
         content_html = note_data.get("content", "")
         # Extract data URI images to local files (rehype-raw can't parse huge data URIs)
-        content_html = extract_data_uri_images(content_html)
+        content_html = extract_data_uri_images(content_html, self._blobs)
 
         # Pre-bake NAS image proxy URLs so note opens never need a NAS call
         att_raw = note_data.get("attachment")
@@ -579,7 +748,7 @@ class SyncService:
         note_id = str(note_data.get("object_id", db_note.synology_note_id))
         content_html = note_data.get("content", "")
         # Extract data URI images to local files (rehype-raw can't parse huge data URIs)
-        content_html = extract_data_uri_images(content_html)
+        content_html = extract_data_uri_images(content_html, self._blobs)
 
         # Pre-bake NAS image proxy URLs so note opens never need a NAS call
         att_raw = note_data.get("attachment")
@@ -12,11 +12,11 @@ import logging
 import shutil
 from pathlib import Path
 
-from sqlalchemy import text
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from app.models import TrashOperation
+from app.models import Blob, BlobRef, TrashOperation
 
 logger = logging.getLogger(__name__)
 
@@ -160,34 +160,54 @@ async def restore_activity_logs(db: AsyncSession, op: TrashOperation) -> int:
 # ---------------------------------------------------------------------------
 
 
+async def _stored_files(db: AsyncSession, root: str) -> list[tuple[str, int]]:
+    """Return ``(path, size)`` of every stored file under *root*.
+
+    Blob store references supply the sizes; files on disk that have no
+    ``blob_refs`` row yet (installs that have not run ``blob_migrate``) are
+    found by walking *root*.
+    """
+    prefix = str(Path(root)).rstrip("/") + "/"
+    result = await db.execute(
+        select(BlobRef.path, Blob.size_bytes)
+        .join(Blob, Blob.sha256 == BlobRef.sha256)
+        .where(BlobRef.path.startswith(prefix, autoescape=True))
+    )
+    files = {row.path: row.size_bytes for row in result}
+
+    root_path = Path(root)
+    if root_path.exists():
+        for f in root_path.rglob("*"):
+            if str(f) not in files and f.is_file():
+                with contextlib.suppress(OSError):
+                    files[str(f)] = f.stat().st_size
+    return list(files.items())
+
+
 async def trash_orphan_files(db: AsyncSession, triggered_by: str) -> TrashOperation:
+    """Move stored files that no note references to the trash.
+
+    Candidates come from ``blob_refs`` plus a walk for files the blob store
+    has not adopted yet, so cleanup works before ``blob_migrate`` has run.
+    """
     settings = get_settings()
     orphans: list[dict] = []
 
     # Find orphan images
-    images_path = Path(settings.NSX_IMAGES_PATH)
-    if images_path.exists():
-        db_result = await db.execute(text("SELECT file_path FROM note_images"))
-        db_paths = {row.file_path for row in db_result.fetchall() if row.file_path}
-        db_names = {Path(p).name for p in db_paths}
-
-        for f in images_path.rglob("*"):
-            if not f.is_file():
-                continue
-            if str(f) not in db_paths and f.name not in db_names:
-                orphans.append({"path": str(f), "source": "images", "size": f.stat().st_size})
+    db_result = await db.execute(text("SELECT file_path FROM note_images"))
+    db_paths = {row.file_path for row in db_result.fetchall() if row.file_path}
+    db_names = {Path(p).name for p in db_paths}
+    for path, size in await _stored_files(db, settings.NSX_IMAGES_PATH):
+        if path not in db_paths and Path(path).name not in db_names:
+            orphans.append({"path": path, "source": "images", "size": size})
 
     # Find orphan uploads
-    uploads_path = Path(settings.UPLOADS_PATH)
-    if uploads_path.exists():
-        db_result = await db.execute(text("SELECT file_id FROM note_attachments"))
-        db_file_ids = {row.file_id for row in db_result.fetchall()}
-
-        for f in uploads_path.rglob("*"):
-            if not f.is_file():
-                continue
-            if f.stem not in db_file_ids and f.name not in db_file_ids:
-                orphans.append({"path": str(f), "source": "uploads", "size": f.stat().st_size})
+    db_result = await db.execute(text("SELECT file_id FROM note_attachments"))
+    db_file_ids = {row.file_id for row in db_result.fetchall()}
+    for path, size in await _stored_files(db, settings.UPLOADS_PATH):
+        f = Path(path)
+        if f.stem not in db_file_ids and f.name not in db_file_ids:
+            orphans.append({"path": path, "source": "uploads", "size": size})
 
     if not orphans:
         raise ValueError("No orphan files found")
@@ -219,6 +239,11 @@ async def trash_orphan_files(db: AsyncSession, triggered_by: str) -> TrashOperat
                 shutil.move(str(src), str(dest))
                 moved += 1
 
+    # Moved files no longer hold blob store references
+    from app.services.blob_store import release_refs
+
+    await release_refs(db, [o["path"] for o in orphans])
+
     op.item_count = moved
     op.size_bytes = total_size
     return op
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import secrets
+from collections.abc import Iterable
 from datetime import UTC, datetime, timedelta
 
 import bcrypt
@@ -33,6 +34,15 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
     return result.scalar_one_or_none()
 
 
+async def get_users_by_ids(db: AsyncSession, user_ids: Iterable[int]) -> dict[int, User]:
+    """Load several users in one query, keyed by id; unknown ids are absent."""
+    ids = set(user_ids)
+    if not ids:
+        return {}
+    result = await db.execute(select(User).where(User.id.in_(ids)))
+    return {user.id: user for user in result.scalars()}
+
+
 async def create_user(
     db: AsyncSession,
     email: str,
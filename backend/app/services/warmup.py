@@ -0,0 +1,89 @@
+"""Optional preloading of lazily imported dependencies.
+
+Heavy packages (kiwipiepy, tiktoken, scikit-learn, vendor AI SDKs,
+PyMuPDF, HTML extraction) are imported on first use so that every API
+worker starts quickly.  A deployment that knows what it will serve lists
+the components in ``WARMUP_COMPONENTS`` and the lifespan loads them
+before the worker accepts requests, moving the cost off the first
+request.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import time
+from collections.abc import Callable
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_kiwi() -> None:
+    from app.search.query_preprocessor import analyze_query
+
+    analyze_query("검색 준비")
+
+
+def _warm_tiktoken() -> None:
+    from app.search.embeddings import encoding_for_model
+
+    encoding_for_model(get_settings().EMBEDDING_MODEL)
+
+
+def _warm_clustering() -> None:
+    importlib.import_module("sklearn.cluster")
+
+
+def _warm_ai_providers() -> None:
+    from app.ai_router.router import _PROVIDER_REGISTRY
+
+    for env_var, _name, class_path in _PROVIDER_REGISTRY:
+        if os.environ.get(env_var):
+            importlib.import_module(class_path.rsplit(".", 1)[0])
+
+
+def _warm_pdf() -> None:
+    importlib.import_module("fitz")
+
+
+def _warm_html() -> None:
+    importlib.import_module("bs4")
+    importlib.import_module("readability")
+
+
+WARMUP_TASKS: dict[str, Callable[[], None]] = {
+    "kiwi": _warm_kiwi,
+    "tiktoken": _warm_tiktoken,
+    "clustering": _warm_clustering,
+    "ai_providers": _warm_ai_providers,
+    "pdf": _warm_pdf,
+    "html": _warm_html,
+}
+
+
+def warm_up(components: str) -> dict[str, float]:
+    """Run the comma-separated warm-up ``components``; returns seconds per component.
+
+    Blocking (imports and model loads); call from a thread.  Failures are
+    logged and skipped -- the component then loads on first use as usual.
+    """
+    timings: dict[str, float] = {}
+    for name in (c.strip() for c in components.split(",")):
+        if not name:
+            continue
+        task = WARMUP_TASKS.get(name)
+        if task is None:
+            logger.warning("Unknown warm-up component %r (known: %s)", name, ", ".join(WARMUP_TASKS))
+            continue
+        started = time.perf_counter()
+        try:
+            task()
+        except Exception:
+            logger.warning("Warm-up of %s failed", name, exc_info=True)
+            continue
+        timings[name] = time.perf_counter() - started
+        logger.info("Warmed up %s in %.2fs", name, timings[name])
+    return timings
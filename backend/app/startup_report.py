@@ -0,0 +1,95 @@
+"""Import-time report for the API application.
+
+Imports ``app.main`` in a fresh interpreter with ``-X importtime`` and
+prints the slowest top-level packages, then checks the total against
+``STARTUP_IMPORT_BUDGET_SECONDS`` and that none of the lazily imported
+heavy packages were loaded eagerly::
+
+    python -m app.startup_report              # report, exit 1 when over budget
+    python -m app.startup_report --top 40 --budget 2.5
+
+Exit status is non-zero when the budget is exceeded or a lazy package
+shows up, so the command can gate a CI job or container build.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+
+from app.config import get_settings
+
+# Packages that must only be imported on first use (see app.services.warmup).
+LAZY_PACKAGES = (
+    "anthropic",
+    "bs4",
+    "fitz",
+    "google.genai",
+    "kiwipiepy",
+    "openai",
+    "readability",
+    "sklearn",
+    "tiktoken",
+    "zai",
+)
+
+
+def measure_imports(target: str = "app.main") -> tuple[float, dict[str, float], set[str]]:
+    """Import ``target`` with ``-X importtime``.
+
+    Returns the total seconds, self time per top-level package and the set
+    of imported module names.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+
+    total = 0.0
+    per_package: dict[str, float] = defaultdict(float)
+    modules: set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        module = name.strip()
+        modules.add(module)
+        per_package[module.split(".", 1)[0]] += int(self_us) / 1_000_000
+        if module == target:
+            total = int(cumulative_us) / 1_000_000
+    return total, dict(per_package), modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LabNote AI import-time report")
+    parser.add_argument("--top", type=int, default=20, help="Packages to list")
+    parser.add_argument("--budget", type=float, default=None, help="Seconds allowed for `import app.main`")
+    args = parser.parse_args()
+
+    budget = args.budget if args.budget is not None else get_settings().STARTUP_IMPORT_BUDGET_SECONDS
+    total, per_package, modules = measure_imports()
+
+    print(f"{'package':<32} {'self ms':>10}")  # noqa: T201
+    for package, seconds in sorted(per_package.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"{package:<32} {seconds * 1000:>10.1f}")  # noqa: T201
+    print(f"\nimport app.main: {total:.2f}s (budget {budget:.2f}s)")  # noqa: T201
+
+    eager = [p for p in LAZY_PACKAGES if p in modules]
+    failed = False
+    if eager:
+        print(f"Imported eagerly (should be lazy): {', '.join(eager)}")  # noqa: T201
+        failed = True
+    if budget > 0 and total > budget:
+        print("Import time exceeds the budget")  # noqa: T201
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,11 @@ the Synology DiskStation Manager (DSM) Web API.  It handles:
 - Login / logout via ``SYNO.API.Auth``
 - Automatic session ID (``_sid``) injection into every request
 - Transparent re-authentication when the session expires (error codes 105, 106, 119)
+- Per-client request/latency statistics (see :class:`ClientStats`)
+
+Long-lived processes should not construct clients directly for NAS
+traffic; :mod:`app.synology_gateway.pool` hands out shared, already
+authenticated clients instead.
 
 Usage::
 
@@ -18,7 +23,11 @@ Usage::
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
 
 import httpx
 
@@ -66,6 +75,45 @@ class SynologyApiError(Exception):
         super().__init__(self.message)
 
 
+@dataclass
+class ClientStats:
+    """Request counters and latency figures for one :class:`SynologyClient`."""
+
+    requests: int = 0
+    errors: int = 0
+    relogins: int = 0
+    in_flight: int = 0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+    last_latency_ms: float = 0.0
+    last_error: str | None = None
+    last_error_at: str | None = None
+
+    def record(self, latency_ms: float, error: str | None = None) -> None:
+        self.requests += 1
+        self.total_latency_ms += latency_ms
+        self.last_latency_ms = latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        if error is not None:
+            self.errors += 1
+            self.last_error = error
+            self.last_error_at = datetime.now(UTC).isoformat()
+
+    def as_dict(self) -> dict:
+        avg = self.total_latency_ms / self.requests if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "relogins": self.relogins,
+            "in_flight": self.in_flight,
+            "avg_latency_ms": round(avg, 1),
+            "max_latency_ms": round(self.max_latency_ms, 1),
+            "last_latency_ms": round(self.last_latency_ms, 1),
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+
+
 class SynologyClient:
     """Async client for the Synology DiskStation Manager Web API.
 
@@ -81,17 +129,33 @@ class SynologyClient:
         url: Base URL of the Synology NAS (trailing slash is stripped).
         user: Account name for SYNO.API.Auth login.
         password: Account password.
+        http_client: Optional shared ``httpx.AsyncClient``.  When given,
+            :meth:`close` leaves it open for its owner (the client pool).
     """
 
-    def __init__(self, url: str, user: str, password: str) -> None:
+    def __init__(
+        self,
+        url: str,
+        user: str,
+        password: str,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self._url: str = url.rstrip("/")
         self._user: str = user
         self._password: str = password
         self._sid: str | None = None
-        self._client: httpx.AsyncClient = httpx.AsyncClient(
+        self._owns_http_client = http_client is None
+        self._client: httpx.AsyncClient = http_client or httpx.AsyncClient(
             timeout=30.0,
             verify=False,  # Synology 자체 서명 인증서 허용
         )
+        self._login_lock = asyncio.Lock()
+        self.stats = ClientStats()
+
+    @property
+    def sid(self) -> str | None:
+        """The current session ID, or ``None`` before login."""
+        return self._sid
 
     # ------------------------------------------------------------------
     # Authentication
@@ -169,6 +233,28 @@ class SynologyClient:
         finally:
             self._sid = None
 
+    async def ensure_login(self) -> str:
+        """Return the current session ID, logging in first if needed."""
+        if self._sid is None:
+            async with self._login_lock:
+                if self._sid is None:
+                    await self.login()
+        return self._sid  # type: ignore[return-value]
+
+    async def _relogin(self, stale_sid: str | None) -> str:
+        """Replace an expired session exactly once.
+
+        Concurrent requests that all fail with the same stale ``_sid``
+        queue on the login lock; only the first re-authenticates and the
+        rest retry with the fresh session, so in-flight requests are not
+        dropped and the NAS is not hit with a burst of logins.
+        """
+        async with self._login_lock:
+            if self._sid is None or self._sid == stale_sid:
+                self.stats.relogins += 1
+                await self.login()
+        return self._sid  # type: ignore[return-value]
+
     # ------------------------------------------------------------------
     # API requests
     # ------------------------------------------------------------------
@@ -200,34 +286,7 @@ class SynologyClient:
             SynologyAuthError: If (re-)authentication fails.
             SynologyApiError: If the API returns a non-session error.
         """
-        # Ensure we have a session
-        if self._sid is None:
-            await self.login()
-
-        result = await self._raw_request(api, method, version, **params)
-
-        if result.get("success"):
-            return result.get("data", {})
-
-        # Check for session-expired errors
-        error_code = result.get("error", {}).get("code", 0)
-
-        if error_code in _SESSION_EXPIRED_CODES:
-            logger.info(
-                "Session expired (code=%d), re-authenticating...",
-                error_code,
-            )
-            await self.login()  # may raise SynologyAuthError
-            result = await self._raw_request(api, method, version, **params)
-
-            if result.get("success"):
-                return result.get("data", {})
-
-            # Second attempt also failed
-            retry_code = result.get("error", {}).get("code", 0)
-            raise SynologyApiError(retry_code)
-
-        raise SynologyApiError(error_code)
+        return await self._call(self._raw_request, api, method, version, **params)
 
     async def post_request(
         self,
@@ -241,34 +300,49 @@ class SynologyClient:
         Same session management as :meth:`request` but uses HTTP POST,
         which is required for write operations with large payloads.
         """
-        if self._sid is None:
-            await self.login()
-
-        result = await self._raw_post_request(api, method, version, **params)
-
-        if result.get("success"):
-            return result.get("data", {})
-
-        error_code = result.get("error", {}).get("code", 0)
-
-        if error_code in _SESSION_EXPIRED_CODES:
-            logger.info("Session expired (code=%d), re-authenticating...", error_code)
-            await self.login()
-            result = await self._raw_post_request(api, method, version, **params)
-
+        return await self._call(self._raw_post_request, api, method, version, **params)
+
+    async def _call(self, send, api: str, method: str, version: int, **params: object) -> dict:
+        """Run *send* with session handling, one retry on expiry, and stats."""
+        sid = await self.ensure_login()
+        self.stats.in_flight += 1
+        started = time.perf_counter()
+        error: str | None = None
+        try:
+            result = await send(api, method, version, sid=sid, **params)
             if result.get("success"):
                 return result.get("data", {})
 
-            retry_code = result.get("error", {}).get("code", 0)
-            raise SynologyApiError(retry_code)
-
-        raise SynologyApiError(error_code)
+            error_code = result.get("error", {}).get("code", 0)
+            if error_code in _SESSION_EXPIRED_CODES:
+                logger.info(
+                    "Session expired (code=%d), re-authenticating...",
+                    error_code,
+                )
+                sid = await self._relogin(sid)  # may raise SynologyAuthError
+                result = await send(api, method, version, sid=sid, **params)
+                if result.get("success"):
+                    return result.get("data", {})
+                # Second attempt also failed
+                error_code = result.get("error", {}).get("code", 0)
+
+            error = f"{api}.{method}: code {error_code}"
+            raise SynologyApiError(error_code)
+        except SynologyApiError:
+            raise
+        except Exception as exc:
+            error = f"{api}.{method}: {type(exc).__name__}"
+            raise
+        finally:
+            self.stats.in_flight -= 1
+            self.stats.record((time.perf_counter() - started) * 1000, error)
 
     async def _raw_request(
         self,
         api: str,
         method: str,
         version: int,
+        sid: str | None = None,
         **extra_params: object,
     ) -> dict:
         """Send a raw GET request to the Synology ``/webapi/entry.cgi``.
@@ -280,7 +354,7 @@ class SynologyClient:
             "api": api,
             "version": version,
             "method": method,
-            "_sid": self._sid,
+            "_sid": sid or self._sid,
             **extra_params,
         }
 
@@ -295,6 +369,7 @@ class SynologyClient:
         api: str,
         method: str,
         version: int,
+        sid: str | None = None,
         **extra_params: object,
     ) -> dict:
         """Send a raw POST request to the Synology ``/webapi/entry.cgi``."""
@@ -302,7 +377,7 @@ class SynologyClient:
             "api": api,
             "version": version,
             "method": method,
-            "_sid": self._sid,
+            "_sid": sid or self._sid,
             **extra_params,
         }
 
@@ -328,19 +403,27 @@ class SynologyClient:
         Returns:
             Tuple of (bytes, content_type).
         """
-        if self._sid is None:
-            await self.login()
-
+        sid = await self.ensure_login()
         separator = "&" if "?" in path else "?"
-        url = f"{self._url}{path}{separator}_sid={self._sid}"
-
-        response = await self._client.get(url)
 
-        # Re-auth if needed
-        if response.status_code == 403 or response.status_code == 401:
-            await self.login()
-            url = f"{self._url}{path}{separator}_sid={self._sid}"
-            response = await self._client.get(url)
+        self.stats.in_flight += 1
+        started = time.perf_counter()
+        error: str | None = None
+        try:
+            response = await self._client.get(f"{self._url}{path}{separator}_sid={sid}")
+
+            # Re-auth if needed
+            if response.status_code == 403 or response.status_code == 401:
+                sid = await self._relogin(sid)
+                response = await self._client.get(f"{self._url}{path}{separator}_sid={sid}")
+            if response.status_code >= 500:
+                error = f"fetch_binary: HTTP {response.status_code}"
+        except Exception as exc:
+            error = f"fetch_binary: {type(exc).__name__}"
+            raise
+        finally:
+            self.stats.in_flight -= 1
+            self.stats.record((time.perf_counter() - started) * 1000, error)
 
         content_type = response.headers.get("content-type", "application/octet-stream")
         return response.content, content_type
@@ -350,8 +433,9 @@ class SynologyClient:
     # ------------------------------------------------------------------
 
     async def close(self) -> None:
-        """Dispose the underlying ``httpx.AsyncClient``."""
-        await self._client.aclose()
+        """Dispose the underlying ``httpx.AsyncClient`` if this client owns it."""
+        if self._owns_http_client:
+            await self._client.aclose()
 
     async def __aenter__(self) -> SynologyClient:
         """Enter the async context: log in and return self."""
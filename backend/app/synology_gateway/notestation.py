@@ -19,8 +19,6 @@ from __future__ import annotations
 
 import logging
 
-from bs4 import BeautifulSoup
-
 from app.synology_gateway.client import SynologyApiError, SynologyClient
 
 logger = logging.getLogger(__name__)
@@ -60,6 +58,8 @@ class NoteStationService:
         self,
         offset: int | None = None,
         limit: int | None = None,
+        sort_by: str | None = None,
+        order: str | None = None,
     ) -> dict:
         """Retrieve a list of notes.
 
@@ -73,6 +73,8 @@ class NoteStationService:
         Args:
             offset: Number of notes to skip.  Pass ``None`` to omit.
             limit: Maximum number of notes to return.  Pass ``None`` to omit.
+            sort_by: Sort field (e.g. ``"mtime"``).  Pass ``None`` to omit.
+            order: ``"asc"`` or ``"desc"``, used with *sort_by*.
 
         Returns:
             A dict containing ``notes`` (list) and ``total`` (int).
@@ -82,6 +84,10 @@ class NoteStationService:
             extra["offset"] = offset
         if limit is not None:
             extra["limit"] = limit
+        if sort_by is not None:
+            extra["sort_by"] = sort_by
+        if order is not None:
+            extra["order"] = order
 
         return await self._client.request(
             f"{self.NOTESTATION_API}.Note",
@@ -368,6 +374,8 @@ class NoteStationService:
         if not html or not html.strip():
             return ""
 
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(html, "lxml")
 
         # Remove script and style elements entirely
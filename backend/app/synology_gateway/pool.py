@@ -0,0 +1,206 @@
+"""Shared pool of authenticated Synology clients.
+
+Every NAS consumer in the API process (sync and push, the image proxy,
+NoteStation/FileStation endpoints, image sync) draws clients from one
+:class:`SynologyClientPool` instead of building its own
+:class:`~app.synology_gateway.client.SynologyClient` and logging in:
+
+- ``NAS_POOL_SIZE`` sessions share one ``httpx.AsyncClient`` whose
+  connection limits (``NAS_POOL_MAX_CONNECTIONS``) bound traffic to the
+  NAS host and keep TCP/TLS connections alive between requests.
+- :meth:`SynologyClientPool.get_client` returns the least busy session;
+  clients are safe to use concurrently and must not be closed by callers.
+- Session expiry (codes 105/106/119) is handled inside the client: one
+  re-login per stale session while concurrent requests wait and retry.
+- :meth:`SynologyClientPool.stats` reports per-session health and latency.
+
+The pool is rebuilt when the NAS settings change at runtime.
+
+Usage::
+
+    pool = await get_nas_pool()
+    client = await pool.get_client()
+    notes = await NoteStationService(client).list_notes()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.config import get_settings
+from app.synology_gateway.client import SynologyClient
+
+logger = logging.getLogger(__name__)
+
+
+class SynologyClientPool:
+    """A fixed-size set of authenticated sessions for one NAS account.
+
+    Args:
+        url: Base URL of the Synology NAS.
+        user: Account name.
+        password: Account password.
+        size: Maximum number of sessions (logins) kept open.
+        max_connections: HTTP connection limit towards the NAS host.
+        max_keepalive: Idle keep-alive connections retained.
+        timeout: Per-request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        user: str,
+        password: str,
+        *,
+        size: int = 2,
+        max_connections: int = 16,
+        max_keepalive: int = 8,
+        timeout: float = 30.0,
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.user = user
+        self._password = password
+        self.size = max(1, size)
+        self.max_connections = max_connections
+        self._http = httpx.AsyncClient(
+            timeout=timeout,
+            verify=False,  # Synology 자체 서명 인증서 허용
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+            ),
+        )
+        self._clients: list[SynologyClient] = []
+        self._lock = asyncio.Lock()
+        self._created_at = time.time()
+        self._closed = False
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return (self.url, self.user, self._password)
+
+    async def get_client(self, login: bool = True) -> SynologyClient:
+        """Return the least busy pooled client, creating sessions up to ``size``.
+
+        Args:
+            login: Authenticate before returning so callers see
+                ``Synology2FARequired`` / ``SynologyAuthError`` up front.
+
+        Raises:
+            RuntimeError: If the pool has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("NAS client pool is closed")
+
+        async with self._lock:
+            idle = [c for c in self._clients if c.stats.in_flight == 0]
+            if idle:
+                client = min(idle, key=lambda c: c.stats.requests)
+            elif len(self._clients) < self.size:
+                client = SynologyClient(self.url, self.user, self._password, http_client=self._http)
+                self._clients.append(client)
+            else:
+                client = min(self._clients, key=lambda c: c.stats.in_flight)
+
+        if login:
+            await client.ensure_login()
+        return client
+
+    def stats(self) -> dict:
+        """Pool-wide health and latency summary plus per-session stats."""
+        sessions = [
+            {"authenticated": c.sid is not None, **c.stats.as_dict()}
+            for c in self._clients
+        ]
+        requests = sum(s["requests"] for s in sessions)
+        errors = sum(s["errors"] for s in sessions)
+        total_latency = sum(c.stats.total_latency_ms for c in self._clients)
+        return {
+            "url": self.url,
+            "user": self.user,
+            "size": self.size,
+            "max_connections": self.max_connections,
+            "open_sessions": len(self._clients),
+            "in_flight": sum(s["in_flight"] for s in sessions),
+            "requests": requests,
+            "errors": errors,
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "avg_latency_ms": round(total_latency / requests, 1) if requests else 0.0,
+            "relogins": sum(s["relogins"] for s in sessions),
+            "healthy": not self._closed and (not requests or errors / requests < 0.5),
+            "uptime_seconds": int(time.time() - self._created_at),
+            "sessions": sessions,
+        }
+
+    async def close(self) -> None:
+        """Log out every session and close the shared HTTP client."""
+        self._closed = True
+        async with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            try:
+                await client.logout()
+            except Exception:
+                logger.debug("NAS logout failed during pool close", exc_info=True)
+        await self._http.aclose()
+
+
+_pool: SynologyClientPool | None = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_nas_pool() -> SynologyClientPool:
+    """Return the process-wide pool for the currently configured NAS.
+
+    NAS credentials come from :func:`app.api.settings.get_nas_config`, so
+    changing them in the Settings UI replaces the pool on next use.
+    """
+    from app.api.settings import get_nas_config
+
+    global _pool  # noqa: PLW0603
+
+    nas = get_nas_config()
+    key = (nas["url"].rstrip("/"), nas["user"], nas["password"])
+
+    async with _pool_lock:
+        if _pool is not None and _pool.key == key:
+            return _pool
+
+        stale, _pool = _pool, None
+        settings = get_settings()
+        _pool = SynologyClientPool(
+            nas["url"],
+            nas["user"],
+            nas["password"],
+            size=settings.NAS_POOL_SIZE,
+            max_connections=settings.NAS_POOL_MAX_CONNECTIONS,
+            max_keepalive=settings.NAS_POOL_MAX_KEEPALIVE,
+            timeout=settings.NAS_REQUEST_TIMEOUT_SECONDS,
+        )
+        logger.info("Created NAS client pool for %s (size=%d)", _pool.url, _pool.size)
+
+    if stale is not None:
+        # Let requests already running on the old pool finish first.
+        asyncio.get_running_loop().call_later(
+            60, lambda: asyncio.ensure_future(stale.close())
+        )
+    return _pool
+
+
+def get_pool_stats() -> dict | None:
+    """Stats for the current pool, or ``None`` if no NAS traffic happened yet."""
+    return _pool.stats() if _pool is not None else None
+
+
+async def close_nas_pool() -> None:
+    """Close the process-wide pool (application shutdown)."""
+    global _pool  # noqa: PLW0603
+
+    async with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import secrets
+import time
 from datetime import UTC, datetime
 
 from sqlalchemy import select, update
@@ -54,8 +55,11 @@ async def update_task_status(
     task_id: str,
     status: str,
     error_message: str | None = None,
+    timings: dict | None = None,
 ) -> None:
     values: dict = {"status": status}
+    if timings is not None:
+        values["timings"] = timings
 
     if status == "processing":
         values["started_at"] = datetime.now(UTC)
@@ -84,9 +88,11 @@ async def run_clustering_task(task_id: str) -> None:
                 timeout=TASK_TIMEOUT_SECONDS,
             )
 
+            save_started = time.monotonic()
             await save_clustering_results(db, task_id, task.notebook_id, result)
-            await update_task_status(db, task_id, "completed")
-            logger.info("Clustering task completed: %s", task_id)
+            result.timings["save_ms"] = round((time.monotonic() - save_started) * 1000)
+            await update_task_status(db, task_id, "completed", timings=result.timings)
+            logger.info("Clustering task completed: %s (%s)", task_id, result.timings)
 
         except TimeoutError:
             logger.error("Clustering task timed out: %s", task_id)
@@ -14,6 +14,7 @@ logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from app.models import NoteImage
+    from app.services.blob_store import StoredBlob
 
 
 _NOTESTATION_IMG_RE = re.compile(
@@ -340,7 +341,7 @@ _DATA_URI_IMG_RE = re.compile(
 )
 
 
-def extract_data_uri_images(html: str) -> str:
+def extract_data_uri_images(html: str, blobs: list[StoredBlob] | None = None) -> str:
     """Extract inline ``data:`` URI images, save them to disk, and replace with ``/api/files/`` URLs.
 
     This is the reverse of :func:`inline_local_file_images`.  ``rehype-raw``
@@ -352,6 +353,9 @@ def extract_data_uri_images(html: str) -> str:
 
     Args:
         html: HTML content that may contain ``data:`` URI images.
+        blobs: Receives the newly written files; the caller registers them
+            with :func:`app.services.blob_store.register_refs` in the same
+            session that saves the rewritten HTML.
 
     Returns:
         HTML with data URI images replaced by ``/api/files/`` URLs.
@@ -388,7 +392,11 @@ def extract_data_uri_images(html: str) -> str:
 
         try:
             if not file_path.exists():
-                file_path.write_bytes(data)
+                from app.services.blob_store import get_blob_store
+
+                stored = get_blob_store().put_bytes(data, link_to=file_path)
+                if blobs is not None:
+                    blobs.append(stored)
                 logger.debug("Saved data URI image to %s (%d bytes)", file_id, len(data))
         except Exception:
             logger.warning("Failed to save data URI image to %s", file_id)
@@ -457,6 +465,33 @@ def extract_first_image_url(html: str | None) -> str | None:
     return None
 
 
+# Image-reference patterns counted into the ``notes.image_*`` columns.
+# ``_NAS_IMAGE_REF_RE`` must stay in sync with migration 034's backfill.
+_NAS_IMAGE_REF_RE = re.compile(r'<img[^>]*ref="[^"]+"')
+_PROXY_IMAGE_MARKER = "/api/nas-images/"
+_DATA_URI_IMAGE_MARKER = 'src="data:image/'
+_LOCAL_IMAGE_MARKERS = ("/api/files/", "/api/images/")
+
+
+def count_image_refs(html: str | None) -> dict[str, int]:
+    """Count image references in note HTML by kind.
+
+    Returns:
+        Dict with ``image_nas_refs`` (original NoteStation ``ref="..."``
+        images), ``image_proxy_refs`` (``/api/nas-images/`` URLs),
+        ``image_data_uris`` (inline ``data:image/`` sources) and
+        ``image_local_refs`` (``/api/files/`` and ``/api/images/`` URLs).
+    """
+    if not html:
+        return {"image_nas_refs": 0, "image_proxy_refs": 0, "image_data_uris": 0, "image_local_refs": 0}
+    return {
+        "image_nas_refs": len(_NAS_IMAGE_REF_RE.findall(html)),
+        "image_proxy_refs": html.count(_PROXY_IMAGE_MARKER),
+        "image_data_uris": html.count(_DATA_URI_IMAGE_MARKER),
+        "image_local_refs": sum(html.count(marker) for marker in _LOCAL_IMAGE_MARKERS),
+    }
+
+
 # Regex to match comment mark spans: <span ... data-comment-id="..." ...>...</span>
 _COMMENT_MARK_RE = re.compile(
     r'<span[^>]*\bdata-comment-id="[^"]*"[^>]*>(.*?)</span>',
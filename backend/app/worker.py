@@ -0,0 +1,74 @@
+"""Dedicated background job worker process.
+
+Runs :class:`app.services.job_queue.JobWorker` outside the API so heavy
+jobs (sync, indexing, imports, image analysis) do not share an event loop
+with request handling.  Start as many as needed::
+
+    python -m app.worker                      # all job types
+    python -m app.worker --types sync,index   # only some job types
+
+Set ``JOB_WORKER_ENABLED=false`` on the API containers when every job
+should run here.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.config import get_settings
+from app.database import dispose_engines, use_background_pool
+from app.services.event_buffer import stop_event_buffers
+from app.services.job_queue import JobWorker
+from app.synology_gateway.pool import close_nas_pool
+
+
+async def _main(job_types: list[str] | None, concurrency: int | None) -> None:
+    from app.api.settings import sync_api_keys_to_env
+    from app.database import async_session_factory
+
+    # Every session in this process uses the background pool
+    use_background_pool()
+
+    async with async_session_factory() as db:
+        await sync_api_keys_to_env(db)
+
+    warmup_components = get_settings().WARMUP_COMPONENTS
+    if warmup_components:
+        from app.services.warmup import warm_up
+
+        await asyncio.to_thread(warm_up, warmup_components)
+
+    worker = JobWorker(job_types=job_types, concurrency=concurrency)
+    worker.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await stop.wait()
+    await worker.stop(timeout=30.0)
+    await close_nas_pool()
+    # Jobs log activity through the write-behind buffer
+    await stop_event_buffers()
+    await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LabNote AI background job worker")
+    parser.add_argument("--types", default=None, help="Comma-separated job types (default: all)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Jobs run at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    types_arg = args.types or get_settings().JOB_WORKER_TYPES
+    job_types = [t.strip() for t in types_arg.split(",") if t.strip()] or None
+    asyncio.run(_main(job_types, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Add background_jobs table for the durable job queue.
+
+Revision ID: 032_add_background_jobs
+Revises: 031_add_notifications
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "032_add_background_jobs"
+down_revision = "031_add_notifications"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_type", sa.String(50), nullable=False),
+        sa.Column("status", sa.String(20), server_default="queued", nullable=False),
+        sa.Column("payload", JSONB(), nullable=True),
+        sa.Column("progress", JSONB(), nullable=True),
+        sa.Column("result", JSONB(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("max_attempts", sa.Integer(), server_default="1", nullable=False),
+        sa.Column("cancel_requested", sa.Boolean(), server_default="false", nullable=False),
+        sa.Column("worker_id", sa.String(100), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("run_after", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("triggered_by", sa.String(255), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("idx_background_jobs_claim", "background_jobs", ["status", "run_after"])
+    op.create_index("idx_background_jobs_type_created", "background_jobs", ["job_type", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_background_jobs_type_created")
+    op.drop_index("idx_background_jobs_claim")
+    op.drop_table("background_jobs")
@@ -0,0 +1,49 @@
+"""Add blobs and blob_refs tables for the content-addressed blob store.
+
+Revision ID: 033_add_blob_store
+Revises: 032_add_background_jobs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "033_add_blob_store"
+down_revision = "032_add_background_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("md5", sa.String(32), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("idx_blobs_md5", "blobs", ["md5"])
+    op.create_index("idx_blobs_ref_count", "blobs", ["ref_count"])
+
+    op.create_table(
+        "blob_refs",
+        sa.Column("path", sa.String(1024), primary_key=True),
+        sa.Column(
+            "sha256",
+            sa.String(64),
+            sa.ForeignKey("blobs.sha256", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("idx_blob_refs_sha256", "blob_refs", ["sha256"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_blob_refs_sha256", table_name="blob_refs")
+    op.drop_table("blob_refs")
+    op.drop_index("idx_blobs_ref_count", table_name="blobs")
+    op.drop_index("idx_blobs_md5", table_name="blobs")
+    op.drop_table("blobs")
@@ -0,0 +1,50 @@
+"""Add precomputed image reference counts to notes.
+
+Revision ID: 034_add_note_image_ref_counts
+Revises: 033_add_blob_store
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "034_add_note_image_ref_counts"
+down_revision = "033_add_blob_store"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = ("image_nas_refs", "image_proxy_refs", "image_data_uris", "image_local_refs")
+
+
+def _substr_count(needle: str) -> str:
+    return f"(length(content_html) - length(replace(content_html, '{needle}', ''))) / length('{needle}')"
+
+
+def upgrade() -> None:
+    for name in _COLUMNS:
+        op.add_column("notes", sa.Column(name, sa.Integer(), server_default="0", nullable=False))
+
+    # Backfill with the same patterns as app.utils.note_utils.count_image_refs
+    op.execute(
+        f"""
+        UPDATE notes SET
+            image_nas_refs = regexp_count(content_html, '<img[^>]*ref="[^"]+"'),
+            image_proxy_refs = {_substr_count("/api/nas-images/")},
+            image_data_uris = {_substr_count('src="data:image/')},
+            image_local_refs = {_substr_count("/api/files/")} + {_substr_count("/api/images/")}
+        WHERE content_html IS NOT NULL AND content_html <> ''
+        """  # noqa: S608 - needles are literals in this migration
+    )
+
+    op.create_index(
+        "idx_notes_image_sync",
+        "notes",
+        ["synology_note_id"],
+        postgresql_where=sa.text("image_nas_refs > 0 OR image_proxy_refs > 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_notes_image_sync", table_name="notes")
+    for name in reversed(_COLUMNS):
+        op.drop_column("notes", name)
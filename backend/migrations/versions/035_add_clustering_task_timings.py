@@ -0,0 +1,23 @@
+"""Add per-phase timings to clustering tasks.
+
+Revision ID: 035_add_clustering_task_timings
+Revises: 034_add_note_image_ref_counts
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "035_add_clustering_task_timings"
+down_revision = "034_add_note_image_ref_counts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("clustering_tasks", sa.Column("timings", JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("clustering_tasks", "timings")
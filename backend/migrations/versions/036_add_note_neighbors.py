@@ -0,0 +1,34 @@
+"""Add note_neighbors table for precomputed related notes.
+
+Revision ID: 036_add_note_neighbors
+Revises: 035_add_clustering_task_timings
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "036_add_note_neighbors"
+down_revision = "035_add_clustering_task_timings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "note_neighbors",
+        sa.Column("note_id", sa.Integer(), sa.ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("neighbor_id", sa.Integer(), sa.ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("rank", sa.SmallInteger(), nullable=False),
+        sa.Column("similarity", sa.Float(), nullable=False),
+        sa.Column("snippet", sa.Text(), server_default="", nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("idx_note_neighbors_note_rank", "note_neighbors", ["note_id", "rank"])
+    op.create_index("idx_note_neighbors_neighbor_id", "note_neighbors", ["neighbor_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_note_neighbors_neighbor_id", table_name="note_neighbors")
+    op.drop_index("idx_note_neighbors_note_rank", table_name="note_neighbors")
+    op.drop_table("note_neighbors")
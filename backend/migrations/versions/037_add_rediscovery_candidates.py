@@ -0,0 +1,30 @@
+"""Add rediscovery_candidates table for the cached rediscovery pool.
+
+Revision ID: 037_add_rediscovery_candidates
+Revises: 036_add_note_neighbors
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "037_add_rediscovery_candidates"
+down_revision = "036_add_note_neighbors"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rediscovery_candidates",
+        sa.Column("note_id", sa.Integer(), sa.ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("similarity", sa.Float(), nullable=False),
+        sa.Column("snippet", sa.Text(), server_default="", nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("idx_rediscovery_candidates_similarity", "rediscovery_candidates", ["similarity"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_rediscovery_candidates_similarity", table_name="rediscovery_candidates")
+    op.drop_table("rediscovery_candidates")
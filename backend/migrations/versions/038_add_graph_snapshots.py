@@ -0,0 +1,29 @@
+"""Add graph_snapshots table for the precomputed global note graph.
+
+Revision ID: 038_add_graph_snapshots
+Revises: 037_add_rediscovery_candidates
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "038_add_graph_snapshots"
+down_revision = "037_add_rediscovery_candidates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "graph_snapshots",
+        sa.Column("version", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("node_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("neighbors_per_note", sa.SmallInteger(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("graph_snapshots")
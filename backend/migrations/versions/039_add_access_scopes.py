@@ -0,0 +1,87 @@
+"""Add materialised per-user access scopes.
+
+Creates access_scopes / access_scope_notebooks / access_scope_notes and a
+single-row access_scope_generation counter.  Statement triggers on every
+table that feeds permission resolution bump the counter, which marks all
+stored scopes stale.
+
+Revision ID: 039_add_access_scopes
+Revises: 038_add_graph_snapshots
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "039_add_access_scopes"
+down_revision = "038_add_graph_snapshots"
+branch_labels = None
+depends_on = None
+
+_ACL_TABLES = (
+    "memberships",
+    "notebook_access",
+    "note_access",
+    "member_group_memberships",
+    "group_notebook_access",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "access_scopes",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.Column("built_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_table(
+        "access_scope_notebooks",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column(
+            "notebook_id", sa.Integer(), sa.ForeignKey("notebooks.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("permission", sa.String(20), nullable=False),
+    )
+    op.create_index("idx_access_scope_notebooks_notebook_id", "access_scope_notebooks", ["notebook_id"])
+    op.create_table(
+        "access_scope_notes",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("note_id", sa.Integer(), sa.ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("permission", sa.String(20), nullable=False),
+    )
+    op.create_index("idx_access_scope_notes_note_id", "access_scope_notes", ["note_id"])
+
+    op.execute("""
+        CREATE TABLE access_scope_generation (
+            id smallint PRIMARY KEY CHECK (id = 1),
+            value bigint NOT NULL DEFAULT 0
+        )
+    """)
+    op.execute("INSERT INTO access_scope_generation (id, value) VALUES (1, 0)")
+    op.execute("""
+        CREATE FUNCTION bump_access_scope_generation() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE access_scope_generation SET value = value + 1 WHERE id = 1;
+            RETURN NULL;
+        END
+        $$
+    """)
+    for table in _ACL_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_access_scope
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_access_scope_generation()
+        """)
+
+
+def downgrade() -> None:
+    for table in _ACL_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_access_scope ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_access_scope_generation()")
+    op.execute("DROP TABLE IF EXISTS access_scope_generation")
+    op.drop_index("idx_access_scope_notes_note_id", table_name="access_scope_notes")
+    op.drop_table("access_scope_notes")
+    op.drop_index("idx_access_scope_notebooks_notebook_id", table_name="access_scope_notebooks")
+    op.drop_table("access_scope_notebooks")
+    op.drop_table("access_scopes")
@@ -0,0 +1,121 @@
+"""Add rollup tables for the metrics, feedback and timeline dashboards.
+
+Creates hourly rollups of search_events / search_feedback / ai_feedback
+(filled by the ``metrics_rollup`` job), created_at indexes used by the
+rollup windows and raw-event retention, and notebook_note_days, a per
+notebook/day note count maintained by row triggers on notes.
+
+Revision ID: 040_add_metric_rollups
+Revises: 039_add_access_scopes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "040_add_metric_rollups"
+down_revision = "039_add_access_scopes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_event_rollups",
+        sa.Column("bucket", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("search_type", sa.String(30), primary_key=True),
+        sa.Column("searches", sa.Integer(), nullable=False),
+        sa.Column("zero_results", sa.Integer(), nullable=False),
+        sa.Column("result_count_sum", sa.BigInteger(), nullable=False),
+        sa.Column("duration_sum", sa.BigInteger(), nullable=False),
+        sa.Column("duration_count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "search_duration_rollups",
+        sa.Column("bucket", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("bin", sa.SmallInteger(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "search_zero_result_rollups",
+        sa.Column("bucket", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("query", sa.String(500), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "search_feedback_rollups",
+        sa.Column("bucket", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("search_type", sa.String(30), primary_key=True),
+        sa.Column("has_details", sa.Boolean(), primary_key=True),
+        sa.Column("positive", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "ai_feedback_rollups",
+        sa.Column("bucket", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("feature", sa.String(50), primary_key=True),
+        sa.Column("model_used", sa.String(100), primary_key=True),
+        sa.Column("rating_sum", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.create_index("idx_search_events_created", "search_events", ["created_at"])
+    op.create_index("idx_search_feedback_created", "search_feedback", ["created_at"])
+
+    op.create_table(
+        "notebook_note_days",
+        sa.Column(
+            "notebook_id", sa.Integer(), sa.ForeignKey("notebooks.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    op.execute("""
+        CREATE FUNCTION maintain_notebook_note_days() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.notebook_id IS NOT NULL AND OLD.created_at IS NOT NULL THEN
+                UPDATE notebook_note_days SET count = count - 1
+                WHERE notebook_id = OLD.notebook_id AND day = date_trunc('day', OLD.created_at)::date;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.notebook_id IS NOT NULL AND NEW.created_at IS NOT NULL THEN
+                INSERT INTO notebook_note_days (notebook_id, day, count)
+                VALUES (NEW.notebook_id, date_trunc('day', NEW.created_at)::date, 1)
+                ON CONFLICT (notebook_id, day) DO UPDATE SET count = notebook_note_days.count + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_notes_notebook_note_days
+        AFTER INSERT OR DELETE ON notes
+        FOR EACH ROW EXECUTE FUNCTION maintain_notebook_note_days()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_notes_notebook_note_days_update
+        AFTER UPDATE OF notebook_id, created_at ON notes
+        FOR EACH ROW
+        WHEN (OLD.notebook_id IS DISTINCT FROM NEW.notebook_id OR OLD.created_at IS DISTINCT FROM NEW.created_at)
+        EXECUTE FUNCTION maintain_notebook_note_days()
+    """)
+    op.execute("""
+        INSERT INTO notebook_note_days (notebook_id, day, count)
+        SELECT notebook_id, date_trunc('day', created_at)::date, COUNT(*)
+        FROM notes
+        WHERE notebook_id IS NOT NULL AND created_at IS NOT NULL
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_notes_notebook_note_days_update ON notes")
+    op.execute("DROP TRIGGER IF EXISTS trg_notes_notebook_note_days ON notes")
+    op.execute("DROP FUNCTION IF EXISTS maintain_notebook_note_days()")
+    op.drop_table("notebook_note_days")
+    op.drop_index("idx_search_feedback_created", table_name="search_feedback")
+    op.drop_index("idx_search_events_created", table_name="search_events")
+    op.drop_table("ai_feedback_rollups")
+    op.drop_table("search_feedback_rollups")
+    op.drop_table("search_zero_result_rollups")
+    op.drop_table("search_duration_rollups")
+    op.drop_table("search_event_rollups")
@@ -0,0 +1,43 @@
+"""Grant the first organisation owner admin on notebooks without any grant.
+
+Scheduled syncs used to run without a user, so notebooks they created got
+no notebook_access row and their notes were invisible to every user's
+read scope.  Scheduled runs now act for an owner (SYNC_SCHEDULE_OWNER);
+this backfills the notebooks created before that.
+
+Revision ID: 041_backfill_sync_grants
+Revises: 040_add_metric_rollups
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "041_backfill_sync_grants"
+down_revision = "040_add_metric_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        WITH owner AS (
+            SELECT m.user_id
+            FROM memberships m
+            JOIN users u ON u.id = m.user_id
+            WHERE m.role = 'owner' AND m.accepted_at IS NOT NULL AND u.is_active
+            ORDER BY m.created_at, m.id
+            LIMIT 1
+        )
+        INSERT INTO notebook_access (notebook_id, user_id, permission, granted_by, created_at)
+        SELECT nb.id, owner.user_id, 'admin', owner.user_id, now()
+        FROM notebooks nb
+        CROSS JOIN owner
+        WHERE nb.synology_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM notebook_access na WHERE na.notebook_id = nb.id)
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    # Backfilled grants are indistinguishable from manual ones; keep them.
+    pass
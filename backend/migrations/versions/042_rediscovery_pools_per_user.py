@@ -0,0 +1,60 @@
+"""Key the rediscovery candidate pool by user.
+
+The pool was shared across the library and rebuilt inside dashboard
+requests.  It is now built per user by a background job, restricted to
+notes the user can read; ``rediscovery_pools`` records what each pool was
+built from and when a rebuild was last requested.  The cached rows are
+dropped (they are rebuilt on demand).
+
+Revision ID: 042_rediscovery_pools_per_user
+Revises: 041_backfill_sync_grants
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "042_rediscovery_pools_per_user"
+down_revision = "041_backfill_sync_grants"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("idx_rediscovery_candidates_similarity", table_name="rediscovery_candidates")
+    op.drop_table("rediscovery_candidates")
+    op.execute("DELETE FROM settings WHERE key = 'rediscovery_pool'")
+
+    op.create_table(
+        "rediscovery_pools",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("recent_ids", JSONB(), server_default="[]", nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("requested_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_table(
+        "rediscovery_candidates",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("note_id", sa.Integer(), sa.ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("similarity", sa.Float(), nullable=False),
+        sa.Column("snippet", sa.Text(), server_default="", nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "idx_rediscovery_candidates_user_similarity", "rediscovery_candidates", ["user_id", "similarity"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_rediscovery_candidates_user_similarity", table_name="rediscovery_candidates")
+    op.drop_table("rediscovery_candidates")
+    op.drop_table("rediscovery_pools")
+    op.create_table(
+        "rediscovery_candidates",
+        sa.Column("note_id", sa.Integer(), sa.ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("similarity", sa.Float(), nullable=False),
+        sa.Column("snippet", sa.Text(), server_default="", nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("idx_rediscovery_candidates_similarity", "rediscovery_candidates", ["similarity"])
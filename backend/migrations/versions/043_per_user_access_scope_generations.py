@@ -0,0 +1,120 @@
+"""Invalidate access scopes per affected user instead of globally.
+
+The statement triggers from 039 bumped one global counter, so any grant
+or membership change made every stored scope stale and each user's next
+request rebuilt it.  Row changes now bump ``access_scope_user_generations``
+only for the users they affect, found through the statement's transition
+tables:
+
+- memberships, member_group_memberships: the member;
+- notebook_access, note_access: the grantee, or every member of the
+  granted organisation;
+- group_notebook_access: every member of the group.
+
+A user's current generation is the global counter plus their own; the
+global counter is still bumped on TRUNCATE.
+
+Revision ID: 043_user_scope_generations
+Revises: 042_rediscovery_pools_per_user
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "043_user_scope_generations"
+down_revision = "042_rediscovery_pools_per_user"
+branch_labels = None
+depends_on = None
+
+# Users affected by the rows of transition table ``{rows}``.
+_AFFECTED = {
+    "memberships": "SELECT user_id FROM {rows}",
+    "member_group_memberships": """
+        SELECT m.user_id FROM {rows} r JOIN memberships m ON m.id = r.membership_id
+    """,
+    "notebook_access": """
+        SELECT user_id FROM {rows} WHERE user_id IS NOT NULL
+        UNION
+        SELECT m.user_id FROM {rows} r JOIN memberships m ON m.org_id = r.org_id
+    """,
+    "note_access": """
+        SELECT user_id FROM {rows} WHERE user_id IS NOT NULL
+        UNION
+        SELECT m.user_id FROM {rows} r JOIN memberships m ON m.org_id = r.org_id
+    """,
+    "group_notebook_access": """
+        SELECT m.user_id
+        FROM {rows} r
+        JOIN member_group_memberships mgm ON mgm.group_id = r.group_id
+        JOIN memberships m ON m.id = mgm.membership_id
+    """,
+}
+
+_BUMP = """
+            INSERT INTO access_scope_user_generations (user_id, value)
+            SELECT DISTINCT user_id, 1 FROM ({affected}) a WHERE user_id IS NOT NULL
+            ON CONFLICT (user_id) DO UPDATE SET value = access_scope_user_generations.value + 1;
+"""
+
+
+def upgrade() -> None:
+    # No FK to users: cascaded deletes bump users that are being removed.
+    op.execute("""
+        CREATE TABLE access_scope_user_generations (
+            user_id integer PRIMARY KEY,
+            value bigint NOT NULL DEFAULT 0
+        )
+    """)
+
+    for table, affected in _AFFECTED.items():
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_access_scope ON {table}")
+        op.execute(f"""
+            CREATE FUNCTION bump_access_scope_{table}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    {_BUMP.format(affected=affected.format(rows="new_rows"))}
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    {_BUMP.format(affected=affected.format(rows="old_rows"))}
+                END IF;
+                RETURN NULL;
+            END
+            $$
+        """)
+        # Transition tables allow only one event per trigger.
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_access_scope_ins
+            AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_access_scope_{table}()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_access_scope_upd
+            AFTER UPDATE ON {table} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_access_scope_{table}()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_access_scope_del
+            AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_access_scope_{table}()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_access_scope_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_access_scope_generation()
+        """)
+
+
+def downgrade() -> None:
+    for table in _AFFECTED:
+        for suffix in ("ins", "upd", "del", "truncate"):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_access_scope_{suffix} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS bump_access_scope_{table}()")
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_access_scope
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_access_scope_generation()
+        """)
+    op.execute("DROP TABLE IF EXISTS access_scope_user_generations")
+    # Scopes were built against the per-user sum; force a rebuild.
+    op.execute("DELETE FROM access_scopes")
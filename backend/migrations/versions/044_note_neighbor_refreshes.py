@@ -0,0 +1,35 @@
+"""Record when each note's related-note list was last computed.
+
+A refresh that found no neighbours stored no ``note_neighbors`` row, so
+the note always looked stale and was recomputed on every run.
+``note_neighbor_refreshes`` keeps one row per refreshed note, backfilled
+from the existing lists.
+
+Revision ID: 044_note_neighbor_refreshes
+Revises: 043_user_scope_generations
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "044_note_neighbor_refreshes"
+down_revision = "043_user_scope_generations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "note_neighbor_refreshes",
+        sa.Column("note_id", sa.Integer(), sa.ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.execute("""
+        INSERT INTO note_neighbor_refreshes (note_id, computed_at)
+        SELECT note_id, MAX(computed_at) FROM note_neighbors GROUP BY note_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("note_neighbor_refreshes")
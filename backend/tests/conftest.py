@@ -0,0 +1,245 @@
+"""Shared fixtures: the API in-process against a scratch database, and a query-budget guard.
+
+API tests need ``TEST_DATABASE_URL`` to point at a migrated PostgreSQL
+database (``alembic upgrade head``); without it they are skipped.  Query
+accounting is switched on before ``app`` is imported, and the autouse
+:func:`query_budget_guard` fails any test in which a request issued more
+statements than its route allows (``query_budget(n)`` or
+``QUERY_BUDGET_DEFAULT``).
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["QUERY_ACCOUNTING_ENABLED"] = "true"
+# Statement counts are measured on the primary
+os.environ["READ_REPLICA_URL"] = ""
+
+
+@dataclass
+class RequestQueries:
+    """Statements one request issued, as reported by the accounting middleware."""
+
+    method: str
+    path: str
+    count: int
+    budget: int
+
+
+class RequestLog(list[RequestQueries]):
+    """Requests seen during a test, oldest first."""
+
+    def last(self, path: str, method: str = "GET") -> RequestQueries:
+        """The most recent request to ``path``."""
+        for recorded in reversed(self):
+            if recorded.method == method and recorded.path == path:
+                return recorded
+        raise AssertionError(f"no {method} {path} request was recorded")
+
+
+@dataclass
+class Member:
+    """A user with an accepted owner membership in a fresh organisation."""
+
+    user_id: int
+    org_id: int
+    membership_id: int
+    email: str
+    headers: dict[str, str]
+
+
+@pytest.fixture(autouse=True)
+def query_budget_guard(monkeypatch) -> Iterator[RequestLog]:
+    """Record each request's statement count and fail the test if one went over budget.
+
+    Yields the recorded requests so tests can assert tighter numbers.
+    """
+    from app.services import query_accounting
+
+    seen = RequestLog()
+    report = query_accounting.report
+
+    def _record(stats, method: str, path: str) -> None:
+        seen.append(RequestQueries(method, path, stats.count, stats.budget))
+        report(stats, method, path)
+
+    monkeypatch.setattr(query_accounting, "report", _record)
+    yield seen
+
+    over = [r for r in seen if r.count > r.budget]
+    if over:
+        pytest.fail(
+            "Query budget exceeded:\n"
+            + "\n".join(f"  {r.method} {r.path}: {r.count} queries (budget {r.budget})" for r in over)
+        )
+
+
+@pytest.fixture
+async def client():
+    """HTTP client bound to the app (no lifespan: workers and schedulers stay off)."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    import httpx
+
+    from app.database import background_engine, engine
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+    await background_engine.dispose()
+
+
+@pytest.fixture
+def count_queries(client, query_budget_guard) -> Callable[..., Awaitable[int]]:
+    """Statements a warm ``GET path`` issues.
+
+    The request is made twice and the second one is counted, so per-process
+    caches filled by the first (e.g. the permission resolver) do not make
+    counts taken before and after adding rows incomparable.
+    """
+
+    async def _count(path: str, headers: dict[str, str], **params) -> int:
+        for _ in range(2):
+            response = await client.get(path, headers=headers, params=params)
+            assert response.status_code == 200, response.text
+        return query_budget_guard.last(path).count
+
+    return _count
+
+
+@pytest.fixture
+async def db(client):
+    """Session for arranging test data outside any request."""
+    from app.database import async_session_factory
+
+    async with async_session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def member(db) -> AsyncIterator[Member]:
+    """Create an organisation owner; the organisation and user are deleted afterwards."""
+    from sqlalchemy import delete
+
+    from app.models import Membership, Organization, User
+    from app.services.auth_service import create_access_token
+
+    suffix = uuid.uuid4().hex[:12]
+    org = Organization(name=f"Test {suffix}", slug=f"test-{suffix}")
+    user = User(email=f"{suffix}@example.test", password_hash="!", name="Test", is_active=True)
+    db.add_all([org, user])
+    await db.flush()
+    membership = Membership(user_id=user.id, org_id=org.id, role="owner", accepted_at=datetime.now(UTC))
+    db.add(membership)
+    await db.commit()
+
+    token = create_access_token(
+        data={"sub": user.email, "user_id": user.id, "org_id": org.id, "role": "owner"}
+    )
+    yield Member(
+        user_id=user.id,
+        org_id=org.id,
+        membership_id=membership.id,
+        email=user.email,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    await db.rollback()
+    await db.execute(delete(User).where(User.id == user.id))
+    await db.execute(delete(Organization).where(Organization.id == org.id))
+    await db.commit()
+
+
+@pytest.fixture
+async def make_user(db) -> AsyncIterator[Callable[..., Awaitable[Member]]]:
+    """Factory adding another user to an organisation; the users are deleted afterwards."""
+    from sqlalchemy import delete
+
+    from app.models import Membership, User
+    from app.services.auth_service import create_access_token
+
+    created: list[int] = []
+
+    async def _make(org_id: int, role: str = "member") -> Member:
+        suffix = uuid.uuid4().hex[:12]
+        user = User(email=f"{suffix}@example.test", password_hash="!", name=f"User {suffix}", is_active=True)
+        db.add(user)
+        await db.flush()
+        membership = Membership(user_id=user.id, org_id=org_id, role=role, accepted_at=datetime.now(UTC))
+        db.add(membership)
+        await db.commit()
+        created.append(user.id)
+        token = create_access_token(data={"sub": user.email, "user_id": user.id, "org_id": org_id, "role": role})
+        return Member(
+            user_id=user.id,
+            org_id=org_id,
+            membership_id=membership.id,
+            email=user.email,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    yield _make
+
+    await db.rollback()
+    if created:
+        await db.execute(delete(User).where(User.id.in_(created)))
+        await db.commit()
+
+
+@pytest.fixture
+async def make_notebook(db) -> AsyncIterator[Callable[..., Awaitable[int]]]:
+    """Factory for a notebook the given user administers, with ``notes`` notes.
+
+    Returns the notebook id; the notebooks and their notes are deleted afterwards.
+    """
+    from sqlalchemy import delete
+
+    from app.constants import NotePermission
+    from app.models import Note, Notebook, NotebookAccess
+
+    created: list[int] = []
+
+    async def _make(owner_id: int, notes: int = 0) -> int:
+        notebook = Notebook(name=f"Notebook {uuid.uuid4().hex[:8]}", owner_id=owner_id)
+        db.add(notebook)
+        await db.flush()
+        db.add(
+            NotebookAccess(
+                notebook_id=notebook.id,
+                user_id=owner_id,
+                permission=NotePermission.ADMIN,
+                granted_by=owner_id,
+            )
+        )
+        db.add_all(
+            Note(
+                synology_note_id=f"test-{uuid.uuid4().hex}",
+                title=f"Note {i}",
+                notebook_id=notebook.id,
+                notebook_name=notebook.name,
+            )
+            for i in range(notes)
+        )
+        await db.commit()
+        created.append(notebook.id)
+        return notebook.id
+
+    yield _make
+
+    await db.rollback()
+    if created:
+        await db.execute(delete(Note).where(Note.notebook_id.in_(created)))
+        await db.execute(delete(Notebook).where(Notebook.id.in_(created)))
+        await db.commit()
@@ -0,0 +1,31 @@
+"""Statement counts of the discovery endpoints stay flat as notes are added."""
+
+from __future__ import annotations
+
+
+async def test_timeline_is_constant_in_notes(member, make_notebook, count_queries):
+    few = await make_notebook(member.user_id, notes=2)
+    many = await make_notebook(member.user_id, notes=30)
+
+    two = await count_queries("/api/discovery/timeline", member.headers, notebook_id=few)
+    thirty = await count_queries("/api/discovery/timeline", member.headers, notebook_id=many)
+
+    assert thirty == two
+    assert thirty <= 6
+
+
+async def test_graph_is_constant_in_notes(member, make_notebook, count_queries):
+    few = await make_notebook(member.user_id, notes=2)
+    many = await make_notebook(member.user_id, notes=30)
+
+    two = await count_queries("/api/discovery/graph", member.headers, notebook_id=few)
+    thirty = await count_queries("/api/discovery/graph", member.headers, notebook_id=many)
+
+    assert thirty == two
+    assert thirty <= 8
+
+
+async def test_rediscovery_stays_within_budget(member, make_notebook, count_queries):
+    await make_notebook(member.user_id, notes=5)
+
+    assert await count_queries("/api/discovery/rediscovery", member.headers) <= 10
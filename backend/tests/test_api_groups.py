@@ -0,0 +1,60 @@
+"""Statement counts of the member group endpoints stay flat as rows are added."""
+
+from __future__ import annotations
+
+from app.constants import NotePermission
+from app.models import GroupNotebookAccess, MemberGroup, MemberGroupMembership
+
+
+async def _group(db, org_id: int, name: str, membership_ids: list[int]) -> int:
+    group = MemberGroup(org_id=org_id, name=name)
+    db.add(group)
+    await db.flush()
+    db.add_all(MemberGroupMembership(group_id=group.id, membership_id=m) for m in membership_ids)
+    await db.commit()
+    return group.id
+
+
+async def test_list_groups_is_constant_in_groups(db, member, make_user, count_queries):
+    other = await make_user(member.org_id)
+    await _group(db, member.org_id, "g0", [member.membership_id])
+    one = await count_queries("/api/groups", member.headers)
+
+    for i in range(1, 5):
+        await _group(db, member.org_id, f"g{i}", [member.membership_id, other.membership_id])
+    five = await count_queries("/api/groups", member.headers)
+
+    assert five == one
+    assert five <= 4
+
+
+async def test_group_members_is_constant_in_members(db, member, make_user, count_queries):
+    others = [await make_user(member.org_id) for _ in range(4)]
+    small = await _group(db, member.org_id, "small", [member.membership_id])
+    large = await _group(db, member.org_id, "large", [member.membership_id] + [o.membership_id for o in others])
+
+    one = await count_queries(f"/api/groups/{small}/members", member.headers)
+    five = await count_queries(f"/api/groups/{large}/members", member.headers)
+
+    assert five == one
+    assert five <= 4
+
+
+async def test_group_notebook_access_is_constant_in_grants(db, member, make_notebook, count_queries):
+    group_id = await _group(db, member.org_id, "readers", [member.membership_id])
+    path = f"/api/groups/{group_id}/notebook-access"
+
+    async def grant() -> None:
+        notebook_id = await make_notebook(member.user_id)
+        db.add(GroupNotebookAccess(group_id=group_id, notebook_id=notebook_id, permission=NotePermission.READ))
+        await db.commit()
+
+    await grant()
+    one = await count_queries(path, member.headers)
+
+    for _ in range(4):
+        await grant()
+    five = await count_queries(path, member.headers)
+
+    assert five == one
+    assert five <= 4
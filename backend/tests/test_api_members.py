@@ -0,0 +1,65 @@
+"""Statement counts of the member endpoints stay flat as rows are added."""
+
+from __future__ import annotations
+
+from app.constants import NotePermission
+from app.models import MemberGroup, MemberGroupMembership, NotebookAccess
+
+
+async def test_list_members_is_constant_in_members(member, make_user, count_queries):
+    one = await count_queries("/api/members", member.headers)
+
+    for _ in range(4):
+        await make_user(member.org_id)
+    five = await count_queries("/api/members", member.headers)
+
+    assert five == one
+    assert five <= 4
+
+
+async def test_member_notebook_access_is_constant_in_grants(db, member, make_user, make_notebook, count_queries):
+    other = await make_user(member.org_id)
+    path = f"/api/members/{other.membership_id}/notebook-access"
+
+    async def grant() -> None:
+        notebook_id = await make_notebook(member.user_id)
+        db.add(
+            NotebookAccess(
+                notebook_id=notebook_id,
+                user_id=other.user_id,
+                permission=NotePermission.READ,
+                granted_by=member.user_id,
+            )
+        )
+        await db.commit()
+
+    await grant()
+    one = await count_queries(path, member.headers)
+
+    for _ in range(4):
+        await grant()
+    five = await count_queries(path, member.headers)
+
+    assert five == one
+    assert five <= 4
+
+
+async def test_member_groups_is_constant_in_groups(db, member, count_queries):
+    path = f"/api/members/{member.membership_id}/groups"
+
+    async def join(name: str) -> None:
+        group = MemberGroup(org_id=member.org_id, name=name)
+        db.add(group)
+        await db.flush()
+        db.add(MemberGroupMembership(group_id=group.id, membership_id=member.membership_id))
+        await db.commit()
+
+    await join("g0")
+    one = await count_queries(path, member.headers)
+
+    for i in range(1, 5):
+        await join(f"g{i}")
+    five = await count_queries(path, member.headers)
+
+    assert five == one
+    assert five <= 4
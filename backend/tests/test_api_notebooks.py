@@ -0,0 +1,51 @@
+"""Statement counts of the notebook endpoints stay flat as rows are added."""
+
+from __future__ import annotations
+
+from app.constants import NotePermission
+from app.models import NotebookAccess
+
+
+async def test_list_notebooks_is_constant_in_notebooks(member, make_notebook, count_queries):
+    await make_notebook(member.user_id, notes=1)
+    one = await count_queries("/api/notebooks", member.headers)
+
+    for _ in range(4):
+        await make_notebook(member.user_id, notes=3)
+    five = await count_queries("/api/notebooks", member.headers)
+
+    assert five == one
+    assert five <= 6
+
+
+async def test_get_notebook_is_constant_in_notes(member, make_notebook, count_queries):
+    few = await make_notebook(member.user_id, notes=1)
+    many = await make_notebook(member.user_id, notes=20)
+
+    one = await count_queries(f"/api/notebooks/{few}", member.headers)
+    twenty = await count_queries(f"/api/notebooks/{many}", member.headers)
+
+    assert twenty == one
+    assert twenty <= 6
+
+
+async def test_list_notebook_access_is_constant_in_grants(db, member, make_user, make_notebook, count_queries):
+    notebook_id = await make_notebook(member.user_id)
+    path = f"/api/notebooks/{notebook_id}/access"
+    owner_only = await count_queries(path, member.headers)
+
+    for _ in range(4):
+        other = await make_user(member.org_id)
+        db.add(
+            NotebookAccess(
+                notebook_id=notebook_id,
+                user_id=other.user_id,
+                permission=NotePermission.READ,
+                granted_by=member.user_id,
+            )
+        )
+    await db.commit()
+    shared = await count_queries(path, member.headers)
+
+    assert shared == owner_only
+    assert shared <= 6
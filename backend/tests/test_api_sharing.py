@@ -0,0 +1,28 @@
+"""Statement counts of the note sharing endpoints stay flat as grants are added."""
+
+from __future__ import annotations
+
+from sqlalchemy import select
+
+from app.constants import NotePermission
+from app.models import Note, NoteAccess
+
+
+async def test_get_note_sharing_is_constant_in_grants(db, member, make_user, make_notebook, count_queries):
+    notebook_id = await make_notebook(member.user_id, notes=1)
+    note_id = (await db.execute(select(Note.id).where(Note.notebook_id == notebook_id))).scalar_one()
+    path = f"/api/notes/{note_id}/share"
+
+    first = await make_user(member.org_id)
+    db.add(NoteAccess(note_id=note_id, user_id=first.user_id, permission=NotePermission.READ))
+    await db.commit()
+    one = await count_queries(path, member.headers)
+
+    for _ in range(4):
+        other = await make_user(member.org_id)
+        db.add(NoteAccess(note_id=note_id, user_id=other.user_id, permission=NotePermission.READ))
+    await db.commit()
+    five = await count_queries(path, member.headers)
+
+    assert five == one
+    assert five <= 8
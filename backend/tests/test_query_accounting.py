@@ -0,0 +1,37 @@
+"""Per-request statement accounting and the query-budget guard."""
+
+from __future__ import annotations
+
+from app.services.query_accounting import QueryStats, fingerprint, query_budget
+
+
+def test_fingerprint_replaces_literals_and_parameters():
+    a = fingerprint("SELECT * FROM notes WHERE id = $1 AND title = 'a''b' LIMIT 10")
+    b = fingerprint("SELECT  *  FROM notes WHERE id = $7 AND title = 'other' LIMIT 20")
+    assert a == b == "SELECT * FROM notes WHERE id = ? AND title = ? LIMIT ?"
+
+
+def test_fingerprint_collapses_in_lists():
+    assert fingerprint("SELECT 1 WHERE id IN ($1, $2, $3)") == "SELECT ? WHERE id IN (?...)"
+    assert fingerprint("SELECT 1 WHERE id IN ($1, $2)") == "SELECT ? WHERE id IN (?...)"
+
+
+def test_repeated_reports_shapes_over_threshold():
+    stats = QueryStats(budget=30)
+    stats.fingerprints["SELECT ?"] = 12
+    stats.fingerprints["SELECT 1 FROM t"] = 2
+    assert stats.repeated(10) == [("SELECT ?", 12)]
+
+
+def test_query_budget_without_request_is_a_no_op():
+    query_budget(5)()
+
+
+async def test_guard_records_request_counts(client, member, query_budget_guard):
+    response = await client.get("/api/notes", headers=member.headers)
+
+    assert response.status_code == 200
+    assert "Server-Timing" in response.headers
+    (recorded,) = [r for r in query_budget_guard if r.path == "/api/notes"]
+    assert recorded.budget == 10
+    assert 0 < recorded.count <= recorded.budget
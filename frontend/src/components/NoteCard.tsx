@@ -155,8 +155,13 @@ export function NoteCard({ note, className, selectable, selected, onSelect }: No
     const url = note.thumbnail_url
     if (!url) return null
     if (url.startsWith('/api/files/')) return url
+    // NAS images: request a small cached thumbnail variant instead of the original
+    const params = new URLSearchParams()
+    if (url.startsWith('/api/nas-images/')) params.set('w', '256')
     const token = apiClient.getToken()
-    return token ? `${url}?token=${token}` : url
+    if (token) params.set('token', token)
+    const query = params.toString()
+    return query ? `${url}?${query}` : url
   }, [note.thumbnail_url])
 
   const formattedDate = noteDate ? noteDate.toLocaleDateString('ko-KR', {
@@ -111,7 +111,13 @@ export function NsxImportSection() {
           {(importStatus.notes_processed !== null || importStatus.images_extracted !== null) && (
             <div className="flex gap-4 text-xs text-muted-foreground">
               {importStatus.notes_processed !== null && (
-                <span>{t('settings.nsxNotesCount', { count: importStatus.notes_processed })}</span>
+                <span>
+                  {t('settings.nsxNotesCount', { count: importStatus.notes_processed })}
+                  {importStatus.status === 'importing' && importStatus.notes_total ? ` / ${importStatus.notes_total}` : ''}
+                </span>
+              )}
+              {importStatus.notes_per_second != null && (
+                <span>{t('settings.nsxThroughput', { rate: importStatus.notes_per_second })}</span>
               )}
               {importStatus.images_extracted !== null && (
                 <span>{t('settings.nsxImagesCount', { count: importStatus.images_extracted })}</span>
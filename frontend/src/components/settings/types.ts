@@ -11,6 +11,9 @@ export interface NsxImportStatus {
   last_import_at: string | null
   notes_processed: number | null
   images_extracted: number | null
+  notes_total?: number | null
+  notes_per_second?: number | null
+  elapsed_seconds?: number | null
   error_message: string | null
   errors: string[]
 }
@@ -3,11 +3,15 @@ import { apiClient } from '@/lib/api'
 
 interface AnalysisStatus {
   status: string
+  phase: string | null
   total: number
   processed: number
   ocr_done: number
   vision_done: number
   failed: number
+  reindex_total: number
+  reindexed: number
+  reindex_failed: number
   error_message: string | null
   started_at: string | null
   completed_at: string | null
@@ -16,11 +20,15 @@ interface AnalysisStatus {
 export function useBatchImageAnalysis() {
   const [status, setStatus] = useState<AnalysisStatus>({
     status: 'idle',
+    phase: null,
     total: 0,
     processed: 0,
     ocr_done: 0,
     vision_done: 0,
     failed: 0,
+    reindex_total: 0,
+    reindexed: 0,
+    reindex_failed: 0,
     error_message: null,
     started_at: null,
     completed_at: null,
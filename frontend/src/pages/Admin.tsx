@@ -68,6 +68,7 @@ export interface UsageData {
     exports: { human: string; bytes: number }
     uploads: { human: string }
   }
+  blob_store?: { blobs: number; saved_bytes: number; saved_size: string; physical_size: string }
   activity_logs: { count: number }
   vision_data: { ocr_completed: number; vision_completed: number }
   exports: { count: number; size: number; size_pretty: string }
@@ -328,6 +329,13 @@ function OverviewTab() {
             <StorageItem label={t('admin.imageCount')} value={usage.storage.images.human} sub={`${usage.images.count} ${t('common.count_items', {count: usage.images.count})}`} />
             <StorageItem label={t('settings.backup')} value={usage.storage.exports.human} />
             <StorageItem label={t('common.default')} value={usage.storage.uploads.human} />
+            {usage.blob_store && (
+              <StorageItem
+                label={t('admin.dedupSaved')}
+                value={usage.blob_store.saved_size}
+                sub={`${usage.blob_store.physical_size} · ${usage.blob_store.blobs} ${t('common.count_items', {count: usage.blob_store.blobs})}`}
+              />
+            )}
           </div>
         </div>
       )}